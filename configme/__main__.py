@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run the CLI with `python -m configme`.
+"""
+
+import sys
+
+from .cli import main
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
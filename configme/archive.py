@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+"""
+Archive output module. Writes the configs of the roles into a tar archive,
+a file or stdout, instead of the output folder.
+"""
+
+import sys
+import tarfile
+
+from gzip import GzipFile
+
+from io import BytesIO
+from io import open as io_open
+
+from .assets import MemoryAssetManager
+from .exceptions import AssetCreationError
+from .exceptions import LocationCreationError
+
+
+# --------------------------------------------------------------------------- #
+# archive path writing the archive to stdout
+STDOUT_PATH = '-'
+
+# endings of the archive paths compressed with gzip
+GZIP_EXTENSIONS = ('.gz', '.tgz')
+
+# permissions of the archive members
+FILE_MODE = 0o644
+FOLDER_MODE = 0o755
+
+
+# --------------------------------------------------------------------------- #
+class ArchiveAssetManager(MemoryAssetManager):
+    """
+    Asset manager writing the output files and folders into a tar archive
+    instead of the file system. Templates and settings are still read from
+    the file system by :class:`AssetManager`.
+
+    Files are collected in memory as they are written, see
+    :class:`MemoryAssetManager`, until :meth:`flush` writes them out to the
+    archive, such as once each role is written, so only the files of one
+    role are held in memory. Members are written sorted by name and with
+    fixed modification times, owners and permissions, so the same configs
+    always make the same archive, no matter in which order they were
+    rendered.
+
+    The archive is written to the file object given to :meth:`open`, so the
+    archive file is only created once the asset manager is known to be used.
+
+    :param root_path:
+
+        output path, the names of the archive members are the paths of the
+        files and folders relative to it.
+
+    :type root_path: str/unicode
+
+    :param mtime:
+
+        Optional, modification time of the members and of the gzip header.
+        Defaults to 0.
+
+    :type mtime: int
+    """
+
+    file_object = None
+    compress = False
+    close_file = False
+
+    # ....................................................................... #
+    def __init__(self, root_path, mtime=0):
+
+        MemoryAssetManager.__init__(self, root_path)
+
+        self.mtime = mtime
+
+        # names of the members written to the archive
+        self._written = set()
+
+        self._archive = None
+        self._gzip_file = None
+
+    # ....................................................................... #
+    def open(self, file_object, compress=False, close_file=False):
+        """
+        Start writing the archive to the given file object. The archive is
+        streamed, so the file object does not have to be seekable.
+
+        :param file_object: binary file object the archive is written to.
+        :type file_object: file
+
+        :param compress: Optional, compress the archive with gzip.
+        :type compress: bool
+
+        :param close_file:
+
+            Optional, close the file object once the archive is written.
+            Defaults to False.
+
+        :type close_file: bool
+
+        :raises:
+
+            :class:`AssetCreationError` if the archive could not be written.
+        """
+
+        self.file_object = file_object
+        self.compress = compress
+        self.close_file = close_file
+
+        try:
+            if compress:
+                # the gzip header has a fixed time and no file name
+                self._gzip_file = file_object = GzipFile(
+                    filename='',
+                    mode='wb',
+                    fileobj=file_object,
+                    mtime=self.mtime)
+
+            self._archive = tarfile.open(
+                fileobj=file_object,
+                mode='w|',
+                format=tarfile.GNU_FORMAT,
+                encoding='utf-8')
+        except EnvironmentError as err:
+            msg = "[Errno %d] %s: '%s'" \
+                % (err.errno, err.strerror, err.filename)
+            raise AssetCreationError(msg)
+
+    # ....................................................................... #
+    def flush(self):
+        """
+        Write the files and folders added since the last flush out to the
+        archive, sorted by name, and drop the content of the files. Folders
+        are kept, so files can still be written into them, but are only
+        written out once.
+
+        :return: sorted list of the names of the members written out.
+        :rtype: list
+
+        :raises:
+
+            :class:`AssetCreationError` if the archive could not be written.
+        """
+
+        with self._lock:
+            files = self._files
+            self._files = {}
+            names = sorted(
+                self._folders.difference(self._written).union(files))
+            self._written.update(names)
+
+        try:
+            for name in names:
+                self._archive.addfile(*self._member(name, files.get(name)))
+        except EnvironmentError as err:
+            msg = "[Errno %d] %s: '%s'" \
+                % (err.errno, err.strerror, err.filename)
+            raise AssetCreationError(msg)
+
+        return names
+
+    # ....................................................................... #
+    def close(self):
+        """
+        Flush the files and folders not written out yet and end the archive.
+
+        :return: sorted list of the names of the archive members.
+        :rtype: list
+
+        :raises:
+
+            :class:`AssetCreationError` if the archive could not be written.
+        """
+
+        try:
+            try:
+                self.flush()
+            finally:
+                try:
+                    self._archive.close()
+                finally:
+                    if self._gzip_file is not None:
+                        self._gzip_file.close()
+
+            self.file_object.flush()
+
+            if self.close_file:
+                self.file_object.close()
+        except EnvironmentError as err:
+            msg = "[Errno %d] %s: '%s'" \
+                % (err.errno, err.strerror, err.filename)
+            raise AssetCreationError(msg)
+
+        return sorted(self._written)
+
+    # ....................................................................... #
+    def _member(self, name, content):
+        """
+        :return:
+
+            two element tuple of the tar info of the archive member with the
+            given name and the file object of its content, or None for a
+            folder.
+
+        :rtype: tuple
+        """
+
+        member = tarfile.TarInfo(name)
+        member.mtime = self.mtime
+
+        if content is None:
+            member.type = tarfile.DIRTYPE
+            member.mode = FOLDER_MODE
+            return member, None
+
+        member.mode = FILE_MODE
+        member.size = len(content)
+        return member, BytesIO(content)
+
+
+# --------------------------------------------------------------------------- #
+def open_archive(archive, path, compress=None, _stdout=None,
+                 _io_open=io_open):
+    """
+    Open the archive file and start writing the archive to it, see
+    :meth:`ArchiveAssetManager.open`.
+
+    :param archive: asset manager writing the archive.
+    :type archive: :class:`ArchiveAssetManager`
+
+    :param path: path of the archive file, or '-' to write it to stdout.
+    :type path: str/unicode
+
+    :param compress:
+
+        Optional, compress the archive with gzip. Defaults to compressing
+        archives whose path ends with `.gz` or `.tgz`.
+
+    :type compress: bool
+
+    :return: the asset manager, see :meth:`ArchiveAssetManager.close`.
+    :rtype: :class:`ArchiveAssetManager`
+
+    :raises:
+
+        :class:`LocationCreationError` if the archive file could not be
+        created.
+    """
+
+    if compress is None:
+        compress = path.endswith(GZIP_EXTENSIONS)
+
+    if path == STDOUT_PATH:
+        if _stdout is None:  # pragma: no cover
+            _stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+
+        archive.open(_stdout, compress=compress)
+        return archive
+
+    try:
+        file_object = _io_open(path, 'wb')
+    except EnvironmentError as err:
+        msg = "[Errno %d] %s: '%s'" \
+            % (err.errno, err.strerror, err.filename)
+        raise LocationCreationError(msg)
+
+    archive.open(file_object, compress=compress, close_file=True)
+    return archive
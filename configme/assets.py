@@ -4,18 +4,49 @@
 Asset management.
 """
 
+from binascii import hexlify
+
+from errno import EEXIST
+from errno import ENOENT
+from errno import ENOTDIR
+
+from hashlib import sha1
+
+from io import BytesIO
+from io import TextIOWrapper
 from io import open as io_open
 
+from os import chmod
+from os import close
+from os import O_CREAT
+from os import O_EXCL
+from os import O_WRONLY
+from os import listdir
 from os import makedirs
+from os import mkdir
+from os import open as os_open
+from os import remove
+from os import rename
+from os import rmdir
+from os import sep
+from os import stat
+from os import urandom
+from os import walk
 
 from os.path import basename
 from os.path import dirname
+from os.path import exists
+from os.path import getsize
 from os.path import isdir
 from os.path import isfile
 from os.path import join
 
 from shutil import rmtree
 
+from stat import S_IMODE
+
+from threading import Lock
+
 from .exceptions import AssetCreationError
 from .exceptions import AssetLocationTaken
 from .exceptions import LocationCreationError
@@ -23,6 +54,87 @@ from .exceptions import LocationNotFound
 from .exceptions import LocationRemovalError
 
 
+# --------------------------------------------------------------------------- #
+# number of characters of rendered content buffered before it is written out
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+# --------------------------------------------------------------------------- #
+def encoded_chunks(chunks, binary=False, buffer_size=WRITE_BUFFER_SIZE):
+    """
+    :param chunks: iterable of content chunks, such as a generator.
+    :type chunks: iterable
+
+    :param binary:
+
+        Optional, the chunks are bytes joined as they are instead of unicode.
+        Defaults to False.
+
+    :type binary: bool
+
+    :param buffer_size:
+
+        Optional, number of characters collected before they are encoded.
+        Defaults to :data:`WRITE_BUFFER_SIZE`.
+
+    :type buffer_size: int
+
+    :return:
+
+        generator of the content of the chunks in batches of at least
+        `buffer_size` characters, encoded the same way as when they are
+        written to a file opened in text mode, so memory use is bounded no
+        matter how large the content is.
+
+    :rtype: generator
+    """
+
+    if binary:
+        encode = b''.join
+    else:
+        buffer = BytesIO()
+        text_buffer = TextIOWrapper(buffer)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def encode(batch):
+            text_buffer.write(u''.join(batch))
+            text_buffer.flush()
+            content = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return content
+
+    batch = []
+    batch_size = 0
+
+    for chunk in chunks:
+        batch.append(chunk)
+        batch_size += len(chunk)
+
+        if batch_size >= buffer_size:
+            yield encode(batch)
+            batch = []
+            batch_size = 0
+
+    if batch:
+        yield encode(batch)
+
+
+# --------------------------------------------------------------------------- #
+def encode_chunks(chunks, binary=False):
+    """
+    :param chunks: iterable of content chunks, such as a generator.
+    :type chunks: iterable
+
+    :param binary: Optional, see :func:`encoded_chunks`.
+    :type binary: bool
+
+    :return: content of the chunks, see :func:`encoded_chunks`.
+    :rtype: bytes
+    """
+    return b''.join(encoded_chunks(chunks, binary))
+
+
 # --------------------------------------------------------------------------- #
 class AssetManager(object):
     """
@@ -61,6 +173,35 @@ class AssetManager(object):
 
         return location
 
+    # ....................................................................... #
+    def asset_location(self, location, location_subject,
+                       _os_path_exists=exists):
+        """
+        Return given location first checking if a file or a folder exists at
+        the given path. And if not raise a error.
+
+        :param location: File or folder path to check.
+        :type location: str/unicode
+
+        :param location_desc: Description of a location to be used in the error
+                          message
+        :type location_desc: str/unicode
+
+        :return: given location
+        :rtype: str/unicode
+
+        :raises: :class:`LocationNotFound` exception if nothing exists at the
+                 given path.
+        """
+
+        msg = "%s does not exist or is not accessible: %s" \
+            % (location_subject.capitalize(), location)
+
+        if _os_path_exists(location) is False:
+            raise LocationNotFound(msg)
+
+        return location
+
     # ....................................................................... #
     def path_join(self, path_parts, _os_path_join=join):
         """
@@ -94,6 +235,52 @@ class AssetManager(object):
         """
         return _os_path_dirname(path)
 
+    # ....................................................................... #
+    def list_folder(self, folder_path, _os_listdir=listdir):
+        """
+        Return sorted list of names of the files and folders in the given
+        folder.
+
+        :param folder_path: folder path
+        :type folder_path: str/unicode
+
+        :return: sorted list of file and folder names.
+        :rtype: list
+
+        :raises: :class:`LocationNotFound` if folder could not be listed.
+        """
+
+        try:
+            names = _os_listdir(folder_path)
+        except EnvironmentError as err:
+            msg = "[Errno %d] %s: '%s'" \
+                % (err.errno, err.strerror, err.filename)
+            raise LocationNotFound(msg)
+
+        names.sort()
+        return names
+
+    # ....................................................................... #
+    def list_files(self, folder_path, _os_walk=walk):
+        """
+        :param folder_path: full path of the folder
+        :type folder_path: str/unicode
+
+        :return:
+
+            sorted list of the full paths of the files in the given folder
+            and its sub folders, empty if the folder does not exist.
+
+        :rtype: list
+        """
+
+        file_paths = [self.path_join((path, file_name))
+                      for path, _, file_names in _os_walk(folder_path)
+                      for file_name in file_names]
+
+        file_paths.sort()
+        return file_paths
+
     # ....................................................................... #
     def asset_or_location_exists(self, path, _os_path_isfile=isfile):
         """
@@ -138,13 +325,21 @@ class AssetManager(object):
         return folder_path
 
     # ....................................................................... #
-    def create_folder(self, folder_path, _os_makedirs=makedirs):
+    def create_folder(self, folder_path, exist_ok=False,
+                      _os_makedirs=makedirs, _os_path_isdir=isdir):
         """
         Create folder at the given folder path.
 
         :param folder_path: full path of the folder that was created.
         :type folder_path: str
 
+        :param exist_ok:
+
+            Optional, do nothing if the folder already exists. Defaults to
+            False.
+
+        :type exist_ok: bool
+
         :return: folder name
         :rtype: str
 
@@ -153,6 +348,9 @@ class AssetManager(object):
             :class:`LocationCreationError` if folder could not be created.
         """
 
+        if exist_ok and _os_path_isdir(folder_path):
+            return folder_path
+
         try:
             # create the top level folder
             _os_makedirs(folder_path)
@@ -163,6 +361,156 @@ class AssetManager(object):
 
         return folder_path
 
+    # ....................................................................... #
+    def create_folders(self, folder_paths, exist_ok=False,
+                       replace_files=False, _os_mkdir=mkdir,
+                       _os_path_isdir=isdir):
+        """
+        Create the folders at the given folder paths with a single mkdir
+        each, in the given order. The parent of each folder must exist or
+        come before it, as in a sorted list of the folders and all their
+        parents.
+
+        :param folder_paths: full paths of the folders to create.
+        :type folder_paths: list
+
+        :param exist_ok:
+
+            Optional, skip the folders which already exist. Defaults to
+            False.
+
+        :type exist_ok: bool
+
+        :param replace_files:
+
+            Optional, remove the files at folder paths, such as the configs
+            of a previous run, and create the folders instead. Defaults to
+            False.
+
+        :type replace_files: bool
+
+        :return: folder paths
+        :rtype: list
+
+        :raises:
+
+            :class:`AssetLocationTaken` if there is a file at a folder path,
+            unless `replace_files`.
+
+            :class:`LocationRemovalError` if a file at a folder path could
+            not be removed.
+
+            :class:`LocationCreationError` if a folder could not be created.
+        """
+
+        for folder_path in folder_paths:
+            try:
+                _os_mkdir(folder_path)
+            except EnvironmentError as err:
+                if err.errno == EEXIST:
+                    if not _os_path_isdir(folder_path):
+                        if not replace_files:
+                            raise AssetLocationTaken(
+                                "Asset or Location already exist: %s"
+                                % folder_path)
+                        self.remove_file(folder_path)
+                        self.create_folder(folder_path)
+                        continue
+                    if exist_ok:
+                        continue
+
+                msg = "[Errno %d] %s: '%s'" \
+                    % (err.errno, err.strerror, err.filename)
+                raise LocationCreationError(msg)
+
+        return folder_paths
+
+    # ....................................................................... #
+    def remove_file(self, file_path, stop_folder_path=None,
+                    _os_remove=remove, _os_rmdir=rmdir):
+        """
+        Remove file at the given file path if it exists. When
+        `stop_folder_path` is given, the parent folders of the file left
+        empty are removed as well, up to but excluding `stop_folder_path`.
+
+        :param file_path: full path of the file to remove.
+        :type file_path: str/unicode
+
+        :param stop_folder_path: Optional, path of the top folder.
+        :type stop_folder_path: str/unicode
+
+        :return: file path
+        :rtype: str/unicode
+
+        :raises:
+            :class:`LocationRemovalError` if file could not be removed.
+        """
+
+        try:
+            _os_remove(file_path)
+        except EnvironmentError as err:
+            # a file in a folder replaced by a file does not exist either
+            if err.errno not in (ENOENT, ENOTDIR):
+                msg = "[Errno %d] %s: '%s'" \
+                    % (err.errno, err.strerror, err.filename)
+                raise LocationRemovalError(msg)
+
+        if stop_folder_path is None:
+            return file_path
+
+        # stop folder path with the trailing separator
+        stop_prefix = self.path_join((stop_folder_path, ''))
+
+        folder_path = self.path_folder(file_path)
+        while folder_path.startswith(stop_prefix):
+            try:
+                _os_rmdir(folder_path)
+            except EnvironmentError:
+                # folder is not empty
+                break
+            folder_path = self.path_folder(folder_path)
+
+        return file_path
+
+    # ....................................................................... #
+    def file_size(self, file_path, _os_path_getsize=getsize):
+        """
+        :param file_path: full path of the file
+        :type file_path: str/unicode
+
+        :return: size of the file in bytes or None if it does not exist.
+        :rtype: int
+        """
+
+        try:
+            return _os_path_getsize(file_path)
+        except EnvironmentError:
+            return None
+
+    # ....................................................................... #
+    def read_file(self, file_path, _io_open=io_open):
+        """
+        Return the content of the file at the given file path.
+
+        :return: file content
+        :rtype: unicode
+
+        :raises:
+
+            :class:`LocationNotFound` if file could not be read.
+        """
+
+        try:
+            file_handler = _io_open(file_path, 'r')
+            try:
+                return file_handler.read()
+            finally:
+                file_handler.close()
+        except EnvironmentError as err:
+            msg = "[Errno %d] %s: '%s'" \
+                % (err.errno, err.strerror, err.filename)
+            raise LocationNotFound(msg)
+
     # ....................................................................... #
     def write_to_file(self, file_path, content, _io_open=io_open):
         """
@@ -186,3 +534,734 @@ class AssetManager(object):
             raise AssetCreationError(msg)
 
         return file_path
+
+    # ....................................................................... #
+    def write_chunks_to_file(self, file_path, chunks,
+                             buffer_size=WRITE_BUFFER_SIZE, binary=False,
+                             _io_open=io_open, _os_rename=rename):
+        """
+        Write the content chunks from the given iterable to the file at the
+        given file path. The chunks are streamed to a temporary file in the
+        same folder, see :meth:`write_temporary_file`, renamed over the file
+        once they are all written, so readers never see a partially written
+        file and a failing chunks iterable leaves the existing file, if any,
+        untouched.
+
+        :param file_path: path of the file to create
+        :type file_path: str/unicode
+
+        :param chunks: iterable of content chunks, such as a generator.
+        :type chunks: iterable
+
+        :param buffer_size: Optional, number of characters to buffer.
+        :type buffer_size: int
+
+        :param binary:
+
+            Optional, the chunks are bytes written out as is instead of
+            unicode. Defaults to False.
+
+        :type binary: bool
+
+        :return: file path of the created file.
+        :rtype: str/unicode
+
+        :raises:
+
+            :class:`AssetCreationError` if file could not be created for some
+            reason (permssions, or any other file system or os error).
+            Any error raised by the chunks iterable is bubbled up.
+        """
+
+        temporary_path = self.write_temporary_file(
+            file_path,
+            chunks,
+            buffer_size,
+            binary,
+            _io_open=_io_open)
+
+        return self.replace_file(
+            temporary_path,
+            file_path,
+            _os_rename=_os_rename)
+
+    # ....................................................................... #
+    def write_temporary_file(self, file_path, chunks,
+                             buffer_size=WRITE_BUFFER_SIZE, binary=False,
+                             content_hash=None, _io_open=io_open,
+                             _os_open=os_open):
+        """
+        Create a temporary file in the folder of the given file path and
+        write the content chunks from the given iterable to it. Chunks are
+        encoded and written out in batches of at least `buffer_size`
+        characters, see :func:`encoded_chunks`, so memory use is bounded no
+        matter how large the content is. The temporary file is created with
+        the permissions a new file would get, and removed if writing it fails
+        for any reason.
+
+        :param file_path: path of the file the temporary file is for.
+        :type file_path: str/unicode
+
+        :param chunks: see :meth:`write_chunks_to_file`.
+        :type chunks: iterable
+
+        :param buffer_size: see :meth:`write_chunks_to_file`.
+        :type buffer_size: int
+
+        :param binary: see :meth:`write_chunks_to_file`.
+        :type binary: bool
+
+        :param content_hash:
+
+            Optional, hash object updated with the encoded content as it is
+            written, such as a :func:`hashlib.sha1` object. Defaults to None.
+
+        :type content_hash: object
+
+        :return:
+
+            path of the temporary file, to be renamed over the file with
+            :meth:`replace_file` or removed.
+
+        :rtype: str/unicode
+
+        :raises:
+
+            :class:`AssetCreationError` if file could not be created for some
+            reason (permssions, or any other file system or os error).
+            Any error raised by the chunks iterable is bubbled up.
+        """
+
+        temporary_path = self.path_join((
+            dirname(file_path),
+            '.%s.%012x' % (basename(file_path), int(hexlify(urandom(6)), 16))))
+
+        written = False
+
+        try:
+            file_descriptor = _os_open(
+                temporary_path,
+                O_WRONLY | O_CREAT | O_EXCL,
+                0o666)
+        except EnvironmentError as err:
+            msg = "[Errno %d] %s: '%s'" \
+                % (err.errno, err.strerror, err.filename)
+            raise AssetCreationError(msg)
+
+        try:
+            try:
+                file_handler = _io_open(file_descriptor, 'wb')
+            except EnvironmentError:  # pragma: no cover
+                close(file_descriptor)
+                raise
+            try:
+                for content in encoded_chunks(chunks, binary, buffer_size):
+                    if content_hash is not None:
+                        content_hash.update(content)
+                    file_handler.write(content)
+            finally:
+                file_handler.close()
+            written = True
+        except EnvironmentError as err:
+            msg = "[Errno %d] %s: '%s'" \
+                % (err.errno, err.strerror, err.filename)
+            raise AssetCreationError(msg)
+        finally:
+            if not written:
+                self._remove_temporary_file(temporary_path)
+
+        return temporary_path
+
+    # ....................................................................... #
+    def replace_file(self, temporary_path, file_path, _os_stat=stat,
+                     _os_rename=rename):
+        """
+        Rename the temporary file over the file at the given file path,
+        giving it the permissions of the existing file, if any. The temporary
+        file is removed if it could not be renamed.
+
+        :param temporary_path: path of the temporary file.
+        :type temporary_path: str/unicode
+
+        :param file_path: path of the file to replace or create.
+        :type file_path: str/unicode
+
+        :return: file path
+        :rtype: str/unicode
+
+        :raises:
+
+            :class:`AssetCreationError` if the file could not be replaced.
+        """
+
+        try:
+            mode = S_IMODE(_os_stat(file_path).st_mode)
+        except EnvironmentError:
+            mode = None
+
+        try:
+            if mode is not None:
+                chmod(temporary_path, mode)
+            _os_rename(temporary_path, file_path)
+        except EnvironmentError as err:
+            self._remove_temporary_file(temporary_path)
+            msg = "[Errno %d] %s: '%s'" \
+                % (err.errno, err.strerror, err.filename)
+            raise AssetCreationError(msg)
+
+        return file_path
+
+    # ....................................................................... #
+    def _remove_temporary_file(self, temporary_path):
+        """
+        Remove the temporary file, if it can not be removed it is left
+        behind rather than hiding the error which made it unnecessary.
+        """
+
+        try:
+            self.remove_file(temporary_path)
+        except LocationRemovalError:
+            pass
+
+    # ....................................................................... #
+    def write_chunks_if_changed(self, file_path, chunks,
+                                buffer_size=WRITE_BUFFER_SIZE, binary=False,
+                                _io_open=io_open, _os_rename=rename):
+        """
+        Write the content chunks from the given iterable to the file at the
+        given file path, only if the content differs from the one of the
+        existing file, so the modification time of identical files is kept.
+
+        The chunks are streamed to a temporary file in the same folder and
+        hashed as they are written, see :meth:`write_temporary_file`. The
+        temporary file is renamed over the file, see :meth:`replace_file`,
+        if the file is missing or its size or digest differ, and removed
+        otherwise. The existing file is only read when the sizes are equal.
+
+        :param file_path: path of the file to write
+        :type file_path: str/unicode
+
+        :param chunks: iterable of content chunks, such as a generator.
+        :type chunks: iterable
+
+        :param buffer_size: Optional, see :meth:`write_chunks_to_file`.
+        :type buffer_size: int
+
+        :param binary: Optional, see :meth:`write_chunks_to_file`.
+        :type binary: bool
+
+        :return: True if the file was written, False if it was unchanged.
+        :rtype: bool
+
+        :raises:
+
+            :class:`AssetCreationError` if file could not be written for some
+            reason (permssions, or any other file system or os error).
+            :class:`LocationRemovalError` if the temporary file of an
+            unchanged file could not be removed.
+            Any error raised by the chunks iterable is bubbled up.
+        """
+
+        content_hash = sha1()
+        temporary_path = self.write_temporary_file(
+            file_path,
+            chunks,
+            buffer_size,
+            binary,
+            content_hash,
+            _io_open=_io_open)
+
+        size = self.file_size(file_path)
+
+        if size is not None and \
+                size == self.file_size(temporary_path) and \
+                self.file_digest(file_path, _io_open) == \
+                content_hash.hexdigest():
+            self.remove_file(temporary_path)
+            return False
+
+        self.replace_file(temporary_path, file_path, _os_rename=_os_rename)
+
+        return True
+
+    # ....................................................................... #
+    def file_matches(self, file_path, chunks, binary=False,
+                     _os_path_getsize=getsize, _io_open=io_open):
+        """
+        Compare the content chunks from the given iterable with the content
+        of the file at the given file path, without writing anything. The
+        chunks are encoded and hashed as they are consumed, see
+        :func:`encoded_chunks`, so the content is never held in memory. The
+        sizes are compared first, the file is read and hashed only when they
+        are equal.
+
+        :param file_path: path of the file to compare with
+        :type file_path: str/unicode
+
+        :param chunks: iterable of content chunks, such as a generator.
+        :type chunks: iterable
+
+        :param binary: Optional, see :meth:`write_chunks_if_changed`.
+        :type binary: bool
+
+        :return:
+
+            True if the file has the same content, False if it differs or
+            could not be read.
+
+        :rtype: bool
+        """
+
+        content_hash = sha1()
+        content_size = 0
+
+        for content in encoded_chunks(chunks, binary):
+            content_hash.update(content)
+            content_size += len(content)
+
+        try:
+            size = _os_path_getsize(file_path)
+        except EnvironmentError:
+            return False
+
+        return size == content_size and \
+            self.file_digest(file_path, _io_open) == content_hash.hexdigest()
+
+    # ....................................................................... #
+    def file_digest(self, file_path, _io_open=io_open):
+        """
+        :param file_path: full path of the file
+        :type file_path: str/unicode
+
+        :return:
+
+            SHA-1 hex digest of the content of the file at the given path, as
+            recorded by :class:`Manifest`, or None if it could not be read.
+
+        :rtype: str
+        """
+
+        digest = sha1()
+
+        try:
+            file_handler = _io_open(file_path, 'rb')
+            try:
+                for block in iter(
+                        lambda: file_handler.read(WRITE_BUFFER_SIZE), b''):
+                    digest.update(block)
+            finally:
+                file_handler.close()
+        except EnvironmentError:
+            return None
+
+        return digest.hexdigest()
+
+    # ....................................................................... #
+    def remove_files_except(self, folder_path, file_paths, _os_walk=walk,
+                            _os_rmdir=rmdir):
+        """
+        Remove the files in the given folder and its sub folders other than
+        the ones at the given file paths, and the sub folders left empty.
+
+        :param folder_path: full path of the folder
+        :type folder_path: str/unicode
+
+        :param file_paths: full paths of the files to keep.
+        :type file_paths: list
+
+        :return: sorted list of the paths of the files removed.
+        :rtype: list
+
+        :raises:
+            :class:`LocationRemovalError` if a file could not be removed.
+        """
+
+        keep = set(file_paths)
+        removed = []
+
+        for path, folder_names, file_names in _os_walk(
+                folder_path, topdown=False):
+            for file_name in file_names:
+                file_path = self.path_join((path, file_name))
+                if file_path not in keep:
+                    self.remove_file(file_path)
+                    removed.append(file_path)
+
+            if path != folder_path:
+                try:
+                    _os_rmdir(path)
+                except EnvironmentError:
+                    # folder is not empty
+                    pass
+
+        removed.sort()
+        return removed
+
+
+# --------------------------------------------------------------------------- #
+class MemoryAssetManager(AssetManager):
+    """
+    Asset manager keeping the output files and folders in an in-memory tree
+    instead of writing them to the file system, for applications which only
+    need the rendered configs. Templates and settings are still read from
+    the file system by :class:`AssetManager`.
+
+    Files and folders are stored by their path relative to the root path,
+    the member name, with '/' separators. Files are stored encoded, as they
+    would be written to a file. They can be written from any number of
+    threads.
+
+    :param root_path:
+
+        Optional, output path the paths of the files and folders are in.
+        Defaults to an empty string, the output path of a
+        :class:`Configurator` without one.
+
+    :type root_path: str/unicode
+    """
+
+    # ....................................................................... #
+    def __init__(self, root_path=''):
+
+        self.root_path = root_path
+
+        # contents of the files and names of the folders by member name
+        self._files = {}
+        self._folders = set()
+        self._lock = Lock()
+
+    # ....................................................................... #
+    def member_name(self, path):
+        """
+        :param path: full path of a file or folder in the root path.
+        :type path: str/unicode
+
+        :return: name of the member at the given path.
+        :rtype: str/unicode
+
+        :raises:
+
+            :class:`AssetCreationError` if the path is not in the root path.
+        """
+
+        prefix = self.path_join((self.root_path, ''))
+        if not path.startswith(prefix):
+            raise AssetCreationError(
+                "Path is not in the output path: %s" % path)
+
+        return path[len(prefix):].replace(sep, '/')
+
+    # ....................................................................... #
+    def location(self, location, location_subject):
+        """
+        See :meth:`AssetManager.location`. Folders in memory are found too.
+        """
+
+        try:
+            name = self.member_name(self.path_join((location, '')))
+        except AssetCreationError:
+            name = None
+
+        with self._lock:
+            if name is not None and name.rstrip('/') in self._folders:
+                return location
+
+        return AssetManager.location(self, location, location_subject)
+
+    # ....................................................................... #
+    def member_names(self):
+        """
+        :return: sorted list of the names of the files and folders.
+        :rtype: list
+        """
+        with self._lock:
+            return sorted(self._folders.union(self._files))
+
+    # ....................................................................... #
+    def _add_folder(self, name):
+        """
+        Add the folder with the given member name and its parent folders.
+        Must be called holding the lock.
+        """
+
+        while name and name not in self._folders:
+            if name in self._files:
+                raise AssetLocationTaken(
+                    "Asset or Location already exist: %s"
+                    % self.path_join((self.root_path, name)))
+
+            self._folders.add(name)
+            name = name.rpartition('/')[0]
+
+    # ....................................................................... #
+    def _add_file(self, file_path, content):
+        """
+        Add the file at the given path, and its folders.
+
+        :return: True if the file content changed.
+        :rtype: bool
+        """
+
+        name = self.member_name(file_path)
+
+        with self._lock:
+            if name in self._folders:
+                raise AssetCreationError(
+                    "Is a directory: '%s'" % file_path)
+
+            self._add_folder(name.rpartition('/')[0])
+
+            changed = self._files.get(name) != content
+            self._files[name] = content
+
+        return changed
+
+    # ....................................................................... #
+    def _remove(self, name, folder=False):
+        """
+        Remove the member with the given name, with all the members in it
+        if it is a folder. Must be called holding the lock.
+        """
+
+        self._files.pop(name, None)
+
+        if not folder:
+            return
+
+        self._folders.discard(name)
+
+        prefix = name + '/' if name else ''
+        for member_name in [member_name for member_name in self._files
+                            if member_name.startswith(prefix)]:
+            del self._files[member_name]
+        self._folders.difference_update(
+            [member_name for member_name in self._folders
+             if member_name.startswith(prefix)])
+
+    # ....................................................................... #
+    def asset_or_location_exists(self, path):
+        """
+        See :meth:`AssetManager.asset_or_location_exists`.
+        """
+
+        with self._lock:
+            if self.member_name(path) in self._files:
+                raise AssetLocationTaken(
+                    "Asset or Location already exist: %s" % path)
+
+        return path
+
+    # ....................................................................... #
+    def remove_folder(self, folder_path):
+        """
+        Remove the folder at the given path and everything in it.
+        """
+
+        name = self.member_name(self.path_join((folder_path, '')))
+
+        with self._lock:
+            self._remove(name.rstrip('/'), folder=True)
+
+        return folder_path
+
+    # ....................................................................... #
+    def create_folder(self, folder_path, exist_ok=False):
+        """
+        Add the folder at the given path and its parent folders.
+        """
+
+        name = self.member_name(self.path_join((folder_path, '')))
+
+        with self._lock:
+            self._add_folder(name.rstrip('/'))
+
+        return folder_path
+
+    # ....................................................................... #
+    def create_folders(self, folder_paths, exist_ok=False,
+                       replace_files=False):
+        """
+        Add the folders at the given paths.
+
+        :raises:
+
+            :class:`AssetLocationTaken` if there is a file at a folder path,
+            unless `replace_files`.
+        """
+
+        for folder_path in folder_paths:
+            if replace_files:
+                self.remove_file(folder_path)
+            self.create_folder(folder_path)
+
+        return folder_paths
+
+    # ....................................................................... #
+    def remove_file(self, file_path, stop_folder_path=None):
+        """
+        Remove the file at the given path if it exists.
+        The folders are kept.
+        """
+
+        with self._lock:
+            self._remove(self.member_name(file_path))
+
+        return file_path
+
+    # ....................................................................... #
+    def remove_files_except(self, folder_path, file_paths):
+        """
+        See :meth:`AssetManager.remove_files_except`.
+        """
+
+        prefix = self.member_name(self.path_join((folder_path, '')))
+        keep = set(self.member_name(file_path) for file_path in file_paths)
+
+        with self._lock:
+            names = sorted(name for name in self._files
+                           if name.startswith(prefix) and name not in keep)
+            for name in names:
+                self._remove(name)
+
+        return [self.path_join((self.root_path, name)) for name in names]
+
+    # ....................................................................... #
+    def list_files(self, folder_path):
+        """
+        See :meth:`AssetManager.list_files`.
+        """
+
+        prefix = self.member_name(self.path_join((folder_path, '')))
+
+        with self._lock:
+            names = sorted(name for name in self._files
+                           if name.startswith(prefix))
+
+        return [self.path_join((self.root_path, name)) for name in names]
+
+    # ....................................................................... #
+    def file_size(self, file_path):
+        """
+        :return: size of the file or None if it does not exist.
+        :rtype: int
+        """
+
+        with self._lock:
+            content = self._files.get(self.member_name(file_path))
+
+        return None if content is None else len(content)
+
+    # ....................................................................... #
+    def file_digest(self, file_path):
+        """
+        See :meth:`AssetManager.file_digest`.
+        """
+
+        with self._lock:
+            content = self._files.get(self.member_name(file_path))
+
+        return None if content is None else sha1(content).hexdigest()
+
+    # ....................................................................... #
+    def read_file(self, file_path):
+        """
+        Return the content of the file at the given path.
+
+        :raises:
+
+            :class:`LocationNotFound` if the file does not exist.
+        """
+
+        with self._lock:
+            content = self._files.get(self.member_name(file_path))
+
+        if content is None:
+            raise LocationNotFound(
+                "File does not exist: '%s'" % file_path)
+
+        return TextIOWrapper(BytesIO(content)).read()
+
+    # ....................................................................... #
+    def write_to_file(self, file_path, content):
+        """
+        Add the file with the given content.
+        """
+
+        self._add_file(file_path, encode_chunks([content]))
+        return file_path
+
+    # ....................................................................... #
+    def write_chunks_to_file(self, file_path, chunks, buffer_size=None,
+                             binary=False):
+        """
+        Add the file with the content of the given chunks.
+        """
+
+        self._add_file(file_path, encode_chunks(chunks, binary))
+        return file_path
+
+    # ....................................................................... #
+    def write_temporary_file(self, file_path, chunks, buffer_size=None,
+                             binary=False, content_hash=None):
+        """
+        Add a temporary file with the content of the given chunks next to
+        the file at the given path.
+        """
+
+        temporary_path = self.path_join((
+            self.path_folder(file_path),
+            '.%s.tmp' % self.path_filename(file_path)))
+
+        content = encode_chunks(chunks, binary)
+        if content_hash is not None:
+            content_hash.update(content)
+
+        self._add_file(temporary_path, content)
+        return temporary_path
+
+    # ....................................................................... #
+    def replace_file(self, temporary_path, file_path):
+        """
+        Move the content of the temporary file to the file at the given path.
+        """
+
+        with self._lock:
+            content = self._files.pop(self.member_name(temporary_path))
+
+        self._add_file(file_path, content)
+        return file_path
+
+    # ....................................................................... #
+    def write_chunks_if_changed(self, file_path, chunks, buffer_size=None,
+                                binary=False):
+        """
+        Add the file with the content of the given chunks.
+
+        :return: True if the file content changed.
+        :rtype: bool
+        """
+        return self._add_file(file_path, encode_chunks(chunks, binary))
+
+    # ....................................................................... #
+    def file_matches(self, file_path, chunks, binary=False):
+        """
+        See :meth:`AssetManager.file_matches`.
+        """
+
+        content = encode_chunks(chunks, binary)
+
+        with self._lock:
+            return self._files.get(self.member_name(file_path)) == content
+
+    # ....................................................................... #
+    def files(self):
+        """
+        :return:
+
+            sorted list of two element tuples of the member name and the
+            content of the files.
+
+        :rtype: list
+        """
+        with self._lock:
+            return sorted(self._files.items())
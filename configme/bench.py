@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark module. Generates synthetic projects of configurable size and
+measures how fast their roles are written, for `configme bench`.
+"""
+
+import sys
+
+from io import open as io_open
+
+from os import makedirs
+from os import walk
+
+from os.path import getsize
+from os.path import join
+
+from shutil import rmtree
+
+from tempfile import mkdtemp
+
+from time import time
+
+from .config import Configurator
+from .exceptions import LocationCreationError
+from .package_info import PACKAGE_VERSION_FULL
+from .role import Role
+from .timings import Timings
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+# --------------------------------------------------------------------------- #
+# sub folders of the generated project
+TEMPLATES_FOLDER = 'templates'
+SETTINGS_FOLDER = 'settings'
+OUTPUT_FOLDER = 'output'
+
+
+# --------------------------------------------------------------------------- #
+def section_name(index):
+    """
+    :return:
+
+        path of the config of the section with the given index. Every config
+        is in a folder of its own, like the configs of separate services.
+
+    :rtype: str
+    """
+    return 'etc/service-%05d/service.conf' % index
+
+
+# --------------------------------------------------------------------------- #
+def _write(path, content, _io_open=io_open):
+    with _io_open(path, 'w', encoding='utf-8') as file_handler:
+        file_handler.write(content)
+
+
+# --------------------------------------------------------------------------- #
+def generate_project(path, roles=4, sections=100, depth=1, settings=10,
+                     template_size=1024):
+    """
+    Generate a synthetic project in the given folder: a template per
+    section and a settings file per role, setting `settings` keys in every
+    section. Every role has the same sections with different values.
+
+    :param path: project folder, created if it does not exist.
+    :type path: str/unicode
+
+    :param roles: Optional, number of roles. Defaults to 4.
+    :type roles: int
+
+    :param sections: Optional, number of sections per role. Defaults to 100.
+    :type sections: int
+
+    :param depth:
+
+        Optional, number of layout templates each section template extends,
+        one extending the other, the first one including a partial
+        template. With 0 the templates only substitute settings, so they
+        can be rendered by the `substitution` renderer too. Defaults to 1.
+
+    :type depth: int
+
+    :param settings: Optional, number of settings per section. Defaults to 10.
+    :type settings: int
+
+    :param template_size:
+
+        Optional, approximate size of the body of each section template in
+        bytes. Defaults to 1024.
+
+    :type template_size: int
+
+    :return:
+
+        dictionary of the `templates_path`, `settings_path` and
+        `output_path` of the project.
+
+    :rtype: dict
+
+    :raises:
+
+        :class:`LocationCreationError` if the project could not be created,
+        or the folder already contains one.
+    """
+
+    try:
+        return _generate_project(
+            path, roles, sections, depth, settings, template_size)
+    except EnvironmentError as err:
+        raise LocationCreationError(
+            "[Errno %d] %s: '%s'" % (err.errno, err.strerror, err.filename))
+
+
+# --------------------------------------------------------------------------- #
+def _generate_project(path, roles, sections, depth, settings, template_size):
+
+    templates_path = join(path, TEMPLATES_FOLDER)
+    settings_path = join(path, SETTINGS_FOLDER)
+    output_path = join(path, OUTPUT_FOLDER)
+
+    for folder_path in (templates_path, settings_path, output_path):
+        makedirs(folder_path)
+
+    # layouts extending each other, the first one includes a partial
+    if depth > 0:
+        makedirs(join(templates_path, 'layouts'))
+        _write(
+            join(templates_path, 'layouts', 'header.conf'),
+            u'# generated for {{ role }}\n')
+        _write(
+            join(templates_path, 'layouts', 'layout-0.conf'),
+            u"{% include 'layouts/header.conf' %}\n"
+            u"{% block body %}{% endblock %}\n")
+
+        for level in range(1, depth):
+            _write(
+                join(templates_path, 'layouts', 'layout-%d.conf' % level),
+                u"{%% extends 'layouts/layout-%d.conf' %%}\n"
+                u"{%% block body %%}# layout %d\n{{ super() }}"
+                u"{%% endblock %%}\n" % (level - 1, level))
+
+    # the body cycles through the settings until it is large enough
+    lines = []
+    size = 0
+    while size < template_size:
+        line = u'key_%d = {{ setting_%d }}\n' % (
+            len(lines), len(lines) % max(settings, 1))
+        lines.append(line)
+        size += len(line)
+    body = u''.join(lines)
+
+    if depth > 0:
+        template = (
+            u"{%% extends 'layouts/layout-%d.conf' %%}\n"
+            u"{%% block body %%}{{ super() }}%s{%% endblock %%}\n"
+            % (depth - 1, body))
+    else:
+        template = body
+
+    for index in range(sections):
+        name = section_name(index)
+        folder_path = join(templates_path, *name.split('/')[:-1])
+        makedirs(folder_path)
+        _write(join(templates_path, *name.split('/')), template)
+
+    for role_index in range(roles):
+        role = 'role-%03d' % role_index
+
+        parts = [u'[DEFAULT]\nrole = %s\n' % role]
+        for index in range(sections):
+            parts.append(u'\n[%s]\n' % section_name(index))
+            parts.extend(
+                u'setting_%d = %s-%d-%d\n' % (key, role, index, key)
+                for key in range(settings))
+
+        _write(
+            join(settings_path, '%s.configme' % role),
+            u''.join(parts))
+
+    return {
+        'templates_path': templates_path,
+        'settings_path': settings_path,
+        'output_path': output_path,
+        }
+
+
+# --------------------------------------------------------------------------- #
+def peak_rss(_resource=resource, _platform=sys.platform):
+    """
+    :return:
+
+        peak resident set size of the current process in bytes, or None
+        where it is not available.
+
+    :rtype: int
+    """
+
+    if _resource is None:  # pragma: no cover
+        return None
+
+    peak = _resource.getrusage(_resource.RUSAGE_SELF).ru_maxrss
+
+    # reported in bytes on macOS and in kilobytes elsewhere
+    if _platform == 'darwin':
+        return peak
+
+    return peak * 1024
+
+
+# --------------------------------------------------------------------------- #
+def folder_size(path):
+    """
+    :return: two element tuple of number of files and their total size.
+    :rtype: tuple
+    """
+
+    files = 0
+    size = 0
+
+    for folder_path, _, file_names in walk(path):
+        for file_name in file_names:
+            # the manifests of incremental runs are not part of the output
+            if file_name.endswith('.manifest.json'):
+                continue
+            files += 1
+            size += getsize(join(folder_path, file_name))
+
+    return files, size
+
+
+# --------------------------------------------------------------------------- #
+def run_benchmark(path=None, roles=4, sections=100, depth=1, settings=10,
+                  template_size=1024, workers=1, incremental=False,
+                  keep_unchanged=False, template_renderers=None, repeat=1,
+                  timings=False, _configurator_factory=Configurator,
+                  _role_factory=Role, _timer=time, _peak_rss=peak_rss):
+    """
+    Generate a synthetic project, see :func:`generate_project` for the
+    project arguments, then write out all of its roles `repeat` times with
+    :meth:`Role.write_configs` using the same configurator, as a long running
+    process would.
+
+    :param path:
+
+        Optional, folder to generate the project in, it must not contain a
+        project already. Defaults to a temporary folder removed afterwards.
+
+    :type path: str/unicode
+
+    :param workers: Optional, see :meth:`Role.write_configs`.
+    :type workers: int
+
+    :param incremental:
+
+        Optional, see :meth:`Role.write_configs`. The first run writes out
+        all the configs, the next ones only check that they did not change.
+
+    :type incremental: bool
+
+    :param keep_unchanged:
+
+        Optional, see :meth:`Role.write_configs`. The first run writes out
+        all the configs, the next ones compare them with the files written.
+
+    :type keep_unchanged: bool
+
+    :param template_renderers: Optional, see :class:`Configurator`.
+    :type template_renderers: list
+
+    :param repeat: Optional, number of runs. Defaults to 1.
+    :type repeat: int
+
+    :param timings:
+
+        Optional, time each phase of the role generation too, see
+        :class:`Timings`. Defaults to False.
+
+    :type timings: bool
+
+    :return:
+
+        JSON serializable dictionary of the benchmark `parameters`, the
+        number of `files` and `bytes` written per run, the `runs` with their
+        `elapsed` seconds, `files_per_second` and `mb_per_second`, the best
+        `files_per_second` and `mb_per_second`, the `peak_rss` in bytes and
+        the seconds spent in each of the `phases`: generating the project,
+        creating the configurator, and writing the roles of all the runs.
+        With `timings`, the seconds spent in each of the `role_phases` of
+        all the roles and runs too.
+
+    :rtype: dict
+    """
+
+    parameters = {
+        'roles': roles,
+        'sections': sections,
+        'depth': depth,
+        'settings': settings,
+        'template_size': template_size,
+        'workers': workers,
+        'incremental': incremental,
+        'keep_unchanged': keep_unchanged,
+        'template_renderers': [
+            list(pair) for pair in template_renderers or ()],
+        'repeat': repeat,
+        'timings': timings,
+        }
+
+    temporary = path is None
+    if temporary:
+        path = mkdtemp(prefix='configme-bench-')
+
+    phases = {}
+    role_timings = Timings() if timings else None
+
+    try:
+        start = _timer()
+        paths = generate_project(
+            path,
+            roles=roles,
+            sections=sections,
+            depth=depth,
+            settings=settings,
+            template_size=template_size)
+        phases['generate'] = _timer() - start
+
+        start = _timer()
+        config = _configurator_factory(
+            templates_path=paths['templates_path'],
+            settings_path=paths['settings_path'],
+            output_path=paths['output_path'],
+            template_renderers=template_renderers)
+        names = config.role_names()
+        phases['configure'] = _timer() - start
+
+        runs = []
+        for _ in range(max(repeat, 1)):
+            start = _timer()
+            for name in names:
+                _role_factory(config, name).write_configs(
+                    workers=workers,
+                    incremental=incremental,
+                    keep_unchanged=keep_unchanged,
+                    timings=role_timings)
+            runs.append(_timer() - start)
+
+        phases['write'] = sum(runs)
+
+        files, size = folder_size(paths['output_path'])
+    finally:
+        if temporary:
+            rmtree(path, ignore_errors=True)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    def rate(amount, elapsed):
+        return amount / elapsed if elapsed > 0 else None
+
+    runs = [{
+        'elapsed': elapsed,
+        'files_per_second': rate(files, elapsed),
+        'mb_per_second': rate(size / 1048576.0, elapsed),
+        } for elapsed in runs]
+
+    best = min(runs, key=lambda run: run['elapsed'])
+
+    result = {
+        'configme': PACKAGE_VERSION_FULL,
+        'python': '%d.%d.%d' % tuple(sys.version_info[:3]),
+        'parameters': parameters,
+        'files': files,
+        'bytes': size,
+        'runs': runs,
+        'files_per_second': best['files_per_second'],
+        'mb_per_second': best['mb_per_second'],
+        'peak_rss': _peak_rss(),
+        'phases': phases,
+        }
+
+    if role_timings is not None:
+        result['role_phases'] = role_timings.phases
+
+    return result
@@ -6,6 +6,8 @@
 
 import sys
 
+from json import dumps
+
 from logging import CRITICAL
 from logging import DEBUG
 from logging import ERROR
@@ -18,9 +20,15 @@ from logging import StreamHandler
 from .cli_argparse import CliArgumentParser
 from .config import Configurator
 from .role import Role
+from .role import check_roles
+from .role import write_roles
+from .timings import Timings
 from .utils import AllowedLevelsFilter
+from .utils import deferred
 
 from .exceptions import ConfigMeException
+from .exceptions import InvalidName
+from .exceptions import ScriptArgumentError
 from .exceptions import ScriptHelpArgumentError
 
 from .package_info import PACKAGE_NAME
@@ -28,6 +36,30 @@ from .package_info import PACKAGE_VERSION_FULL
 from .package_info import PACKAGE_LOGGER_NAME
 
 
+# --------------------------------------------------------------------------- #
+# the modules of the commands and of the optional features are imported when
+# used, so the start up of plain runs and of the help does not pay for them,
+# nor for importing Jinja2 when no config is rendered with it
+compile_templates_bundle = deferred(
+    'configme.renderers.jinja2_rendering', 'compile_templates_bundle')
+warm_bytecode_cache = deferred(
+    'configme.renderers.jinja2_rendering', 'warm_bytecode_cache')
+RenderService = deferred('configme.server', 'RenderService')
+remote_write_roles = deferred('configme.server', 'remote_write_roles')
+ArchiveAssetManager = deferred('configme.archive', 'ArchiveAssetManager')
+open_archive = deferred('configme.archive', 'open_archive')
+serve = deferred('configme.server', 'serve')
+affected_role_names = deferred('configme.watch', 'affected_role_names')
+changed_template_names = deferred('configme.watch', 'changed_template_names')
+watch_changes = deferred('configme.watch', 'watch_changes')
+run_benchmark = deferred('configme.bench', 'run_benchmark')
+
+
+# --------------------------------------------------------------------------- #
+# return code of the check mode when the configs differ from the role folders
+CHECK_DIFFERENCES_RETURN_CODE = 3
+
+
 # --------------------------------------------------------------------------- #
 def configured_argument_parser(_argument_parser_factory=CliArgumentParser):
 
@@ -44,7 +76,10 @@ def configured_argument_parser(_argument_parser_factory=CliArgumentParser):
 
     parser = _argument_parser_factory(
         description='%s %s command line utility.'
-        % (PACKAGE_NAME, PACKAGE_VERSION_FULL))
+        % (PACKAGE_NAME, PACKAGE_VERSION_FULL),
+        prog=PACKAGE_NAME,
+        epilog="Other commands: '%s'. Run '%s <command> --help' for "
+        "command usage." % ("', '".join(sorted(CLI_COMMANDS)), PACKAGE_NAME))
 
     # template path
     parser.add_argument(
@@ -70,12 +105,25 @@ def configured_argument_parser(_argument_parser_factory=CliArgumentParser):
         help="Path to output folder."
         )
 
-    # role name
+    # role names
     parser.add_argument(
         "-r",
         "--role-name",
-        required=True,
-        help="Role name."
+        required=False,
+        nargs="+",
+        default=None,
+        help="Role names or glob patterns matching role settings files, "
+        "such as 'prod-*'."
+        )
+
+    # all roles
+    parser.add_argument(
+        "-a",
+        "--all-roles",
+        required=False,
+        action='store_true',
+        default=False,
+        help="Generate all the roles in the settings folder."
         )
 
     # role suffix
@@ -99,12 +147,453 @@ def configured_argument_parser(_argument_parser_factory=CliArgumentParser):
         help="Variables that will interpolated into the settings files."
         )
 
+    # bytecode cache path
+    parser.add_argument(
+        "-c",
+        "--bytecode-cache",
+        required=False,
+        default=None,
+        help="Path to folder used to cache compiled templates between runs."
+        )
+
+    # compiled templates bundle path
+    parser.add_argument(
+        "-m",
+        "--compiled-templates",
+        required=False,
+        default=None,
+        help="Path to compiled templates bundle folder or zip file created "
+        "by the 'compile' command."
+        )
+
+    # parsed settings cache
+    parser.add_argument(
+        "-C",
+        "--settings-cache",
+        required=False,
+        default=None,
+        help="Path to folder used to cache parsed settings files between "
+        "runs."
+        )
+
+    # number of threads
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        required=False,
+        default=1,
+        type=int,
+        help="Number of threads rendering configs and as many threads "
+        "writing them out. Defaults to 1."
+        )
+
+    # number of processes
+    parser.add_argument(
+        "-p",
+        "--processes",
+        required=False,
+        default=1,
+        type=int,
+        help="Number of processes generating roles in parallel. Defaults "
+        "to 1."
+        )
+
+    # incremental generation
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Only write out configs that changed since the previous run "
+        "and remove configs of removed sections, instead of rebuilding the "
+        "role folder."
+        )
+
+    # keep unchanged files
+    parser.add_argument(
+        "-K",
+        "--keep-unchanged",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Leave configs identical to the existing files untouched, "
+        "keeping their modification times, and replace changed configs "
+        "atomically, instead of rebuilding the role folder."
+        )
+
+    # watch mode
+    parser.add_argument(
+        "-w",
+        "--watch",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Keep running, regenerating the roles affected by template and "
+        "settings changes. Implies --incremental."
+        )
+
+    # template renderers by pattern
+    parser.add_argument(
+        "-e",
+        "--renderers",
+        required=False,
+        nargs="+",
+        default=[],
+        type=parser.split_argument,
+        help="Template renderers of the configs matching glob patterns, "
+        "such as '*.conf=substitution'. Renderers: jinja2, substitution, "
+        "verbatim and installed plugins. Defaults to jinja2."
+        )
+
+    # render server socket
+    parser.add_argument(
+        "-S",
+        "--socket",
+        required=False,
+        default=None,
+        help="Path to the UNIX socket of a render server started by the "
+        "'serve' command. Roles are generated in-process when the server is "
+        "not running."
+        )
+
+    # tar archive output
+    parser.add_argument(
+        "-A",
+        "--archive",
+        required=False,
+        default=None,
+        help="Write the configs into a tar archive at this path instead of "
+        "the output folder, '-' for stdout. Member names are relative to the "
+        "output path. Roles are generated in-process."
+        )
+
+    # gzip compressed archive
+    parser.add_argument(
+        "-z",
+        "--gzip",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Compress the archive with gzip, the default for archive paths "
+        "ending with .gz or .tgz."
+        )
+
+    # check mode
+    parser.add_argument(
+        "-n",
+        "--check",
+        required=False,
+        default=False,
+        action="store_true",
+        help="Compare the rendered configs with the files in the role "
+        "folders and list the files which would be added, changed and "
+        "removed, without writing nor removing anything. Exits with 3 when "
+        "they differ. Roles are checked in-process."
+        )
+
+    # timings
+    parser.add_argument(
+        "-T",
+        "--timings",
+        required=False,
+        nargs="?",
+        default=None,
+        const=10,
+        type=int,
+        metavar="COUNT",
+        help="Write out the time spent in each phase of the role generation "
+        "and the COUNT slowest templates, 10 unless given, after the list of "
+        "files. Roles are generated in-process."
+        )
+
     # TODO: add version parameter
     # TODO: figure out how to handle "--help/-h", as it now throws an error
 
     return parser
 
 
+# --------------------------------------------------------------------------- #
+def configured_warm_argument_parser(
+    _argument_parser_factory=CliArgumentParser
+):
+    """
+    Setup and return a parser object with with configured command-line
+    arguments for the `warm` command.
+
+    :return:
+
+        argparse.ArgumentParser with configured command-line arguments.
+
+    :rtype: argparse.ArgumentParser
+    """
+
+    parser = _argument_parser_factory(
+        prog='%s warm' % PACKAGE_NAME,
+        description='%s %s command line utility. Precompile all the templates '
+        'into the bytecode cache.' % (PACKAGE_NAME, PACKAGE_VERSION_FULL))
+
+    # template path
+    parser.add_argument(
+        "-t",
+        "--templates-path",
+        required=True,
+        help="Path to configuration templates folder."
+        )
+
+    # bytecode cache path
+    parser.add_argument(
+        "-c",
+        "--bytecode-cache",
+        required=True,
+        help="Path to folder used to cache compiled templates between runs."
+        )
+
+    # number of processes
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        required=False,
+        default=None,
+        type=int,
+        help="Number of processes compiling templates. Defaults to the "
+        "number of CPUs."
+        )
+
+    return parser
+
+
+# --------------------------------------------------------------------------- #
+def configured_compile_argument_parser(
+    _argument_parser_factory=CliArgumentParser
+):
+    """
+    Setup and return a parser object with with configured command-line
+    arguments for the `compile` command.
+
+    :return:
+
+        argparse.ArgumentParser with configured command-line arguments.
+
+    :rtype: argparse.ArgumentParser
+    """
+
+    parser = _argument_parser_factory(
+        prog='%s compile' % PACKAGE_NAME,
+        description='%s %s command line utility. Compile all the templates '
+        'into a bundle of Python modules.'
+        % (PACKAGE_NAME, PACKAGE_VERSION_FULL))
+
+    # template path
+    parser.add_argument(
+        "-t",
+        "--templates-path",
+        required=True,
+        help="Path to configuration templates folder."
+        )
+
+    # bundle path
+    parser.add_argument(
+        "-m",
+        "--compiled-templates",
+        required=True,
+        help="Path to compiled templates bundle folder or zip file."
+        )
+
+    # zip the bundle
+    parser.add_argument(
+        "-z",
+        "--zip",
+        required=False,
+        action='store_true',
+        default=False,
+        help="Compile templates into a zip file instead of a folder."
+        )
+
+    return parser
+
+
+# --------------------------------------------------------------------------- #
+def configured_serve_argument_parser(
+    _argument_parser_factory=CliArgumentParser
+):
+    """
+    Setup and return a parser object with with configured command-line
+    arguments for the `serve` command.
+
+    :return:
+
+        argparse.ArgumentParser with configured command-line arguments.
+
+    :rtype: argparse.ArgumentParser
+    """
+
+    parser = _argument_parser_factory(
+        prog='%s serve' % PACKAGE_NAME,
+        description='%s %s command line utility. Run a render server keeping '
+        'settings and compiled templates in memory between requests.'
+        % (PACKAGE_NAME, PACKAGE_VERSION_FULL))
+
+    # socket path
+    parser.add_argument(
+        "-S",
+        "--socket",
+        required=True,
+        help="Path to the UNIX socket to listen on."
+        )
+
+    return parser
+
+
+# --------------------------------------------------------------------------- #
+def configured_bench_argument_parser(
+    _argument_parser_factory=CliArgumentParser
+):
+    """
+    Setup and return a parser object with with configured command-line
+    arguments for the `bench` command.
+
+    :return:
+
+        argparse.ArgumentParser with configured command-line arguments.
+
+    :rtype: argparse.ArgumentParser
+    """
+
+    parser = _argument_parser_factory(
+        prog='%s bench' % PACKAGE_NAME,
+        description='%s %s command line utility. Generate a synthetic project '
+        'and measure how fast its roles are written, reported as JSON.'
+        % (PACKAGE_NAME, PACKAGE_VERSION_FULL))
+
+    # project path
+    parser.add_argument(
+        "-d",
+        "--path",
+        required=False,
+        default=None,
+        help="Folder to generate the project in, it is kept. Defaults to a "
+        "temporary folder."
+        )
+
+    # number of roles
+    parser.add_argument(
+        "-n",
+        "--roles",
+        required=False,
+        default=4,
+        type=int,
+        help="Number of roles. Defaults to 4."
+        )
+
+    # number of sections
+    parser.add_argument(
+        "-k",
+        "--sections",
+        required=False,
+        default=100,
+        type=int,
+        help="Number of sections, and templates, per role. Defaults to 100."
+        )
+
+    # extends depth
+    parser.add_argument(
+        "-x",
+        "--depth",
+        required=False,
+        default=1,
+        type=int,
+        help="Number of layout templates each template extends. 0 for "
+        "templates which only substitute settings. Defaults to 1."
+        )
+
+    # number of settings
+    parser.add_argument(
+        "-y",
+        "--settings",
+        required=False,
+        default=10,
+        type=int,
+        help="Number of settings per section. Defaults to 10."
+        )
+
+    # template size
+    parser.add_argument(
+        "-z",
+        "--template-size",
+        required=False,
+        default=1024,
+        type=int,
+        help="Size of each template in bytes. Defaults to 1024."
+        )
+
+    # number of runs
+    parser.add_argument(
+        "-R",
+        "--repeat",
+        required=False,
+        default=1,
+        type=int,
+        help="Number of times the roles are written. Defaults to 1."
+        )
+
+    # number of threads
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        required=False,
+        default=1,
+        type=int,
+        help="Number of threads rendering configs and as many writing them "
+        "out. Defaults to 1."
+        )
+
+    # incremental generation
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        required=False,
+        action="store_true",
+        default=False,
+        help="Only write out configs which changed since the previous run."
+        )
+
+    # keep unchanged files
+    parser.add_argument(
+        "-K",
+        "--keep-unchanged",
+        required=False,
+        action="store_true",
+        default=False,
+        help="Only write out configs which differ from the existing files."
+        )
+
+    # template renderers
+    parser.add_argument(
+        "-e",
+        "--renderers",
+        required=False,
+        nargs="+",
+        default=[],
+        type=parser.split_argument,
+        help="Template renderers of the configs matching glob patterns, "
+        "such as '*.conf=substitution'. Defaults to jinja2."
+        )
+
+    # role phase timings
+    parser.add_argument(
+        "-T",
+        "--timings",
+        required=False,
+        action="store_true",
+        default=False,
+        help="Also report the time spent in each phase of the role "
+        "generation, summed over all the roles and runs."
+        )
+
+    return parser
+
+
 # --------------------------------------------------------------------------- #
 def cli_logger_factory(name, out, err):
     """
@@ -140,21 +629,21 @@ def cli_logger_factory(name, out, err):
 
 
 # --------------------------------------------------------------------------- #
-def cli_run(
+def cli_command_run(
     script_args,
     argument_parser,
+    command,
     logger_name,
     logger_out,
     logger_err,
     logger_fatal=None,
-    _logger_factory=cli_logger_factory,
-    _configurator_factory=Configurator,
-    _role_factory=Role
+    _logger_factory=cli_logger_factory
 ):
     """
-    Run CLI config generation.
+    Run CLI command.
 
-    Parses arguments from the command line and run role generation.
+    Parses arguments from the command line and runs the given command with
+    them.
 
     :param script_args:
 
@@ -163,14 +652,7 @@ def cli_run(
 
         script arguments as a list or a tuple, in the same format as
         sys.argv but without the script name as the script name as the
-        first element. The arguments should include:
-
-            - templates_path - templates path, required.
-            - settings_path - settings path, required.
-            - output_path - output path, required.
-            - role_name - role name, required.
-            - role_suffix - role suffix, optional.
-            - role_variables - role variables, optional.
+        first element.
 
     :type script_args: list/tuple of sysv style arguments
 
@@ -180,6 +662,14 @@ def cli_run(
 
     :type argument_parser: :class:`CliArgumentParser`
 
+    :param command:
+
+        callable accepting the parsed arguments and the logger. It returns a
+        two element tuple of the list of files to write out and the return
+        code.
+
+    :type command: callable
+
     :param logger_name: name of the logger to be used.
     :type logger_name: str/unicode
 
@@ -203,11 +693,10 @@ def cli_run(
 
         In case of success:
 
-        - Write out list files generated files, one file per line to
-          logger.info. The path of the file is relative to the given
-          --output-path
+        - Write out list files returned by the command, one file per line to
+          logger.info.
 
-        - return 0
+        - return the return code returned by the command
 
         In case of known errors
         (all ConfigMeException, except ScriptHelpArgumentError):
@@ -259,21 +748,8 @@ def cli_run(
         # parse args
         parsed_args = argument_parser.parse(script_args)
 
-        # setup config
-        config = _configurator_factory(
-            templates_path=parsed_args.templates_path,
-            settings_path=parsed_args.settings_path,
-            output_path=parsed_args.output_path)
-
-        # init role
-        role = _role_factory(
-            config=config,
-            name=parsed_args.role_name,
-            suffix=parsed_args.role_suffix,
-            variables=parsed_args.role_variables)
-
-        # and write config files out
-        output_list = role.write_configs()
+        # and run the command
+        output_list, return_code = command(parsed_args, logger)
     #try:
     #    pass
     except ScriptHelpArgumentError as err:
@@ -296,11 +772,575 @@ def cli_run(
 
 
 # --------------------------------------------------------------------------- #
-def main(_cli_run=cli_run):
+def cli_run(
+    script_args,
+    argument_parser,
+    logger_name,
+    logger_out,
+    logger_err,
+    logger_fatal=None,
+    _logger_factory=cli_logger_factory,
+    _configurator_factory=Configurator,
+    _role_factory=Role,
+    _write_roles=write_roles,
+    _watch_changes=watch_changes,
+    _remote_write_roles=remote_write_roles,
+    _archive_factory=ArchiveAssetManager,
+    _open_archive=open_archive,
+    _check_roles=check_roles
+):
+    """
+    Run CLI config generation.
+
+    Parses arguments from the command line and run role generation. See
+    :func:`cli_command_run` for arguments and return codes.
+
+    :param script_args:
+
+        script arguments, basically sysv but without the first argument of
+        script name. The arguments should include:
+
+            - templates_path - templates path, required.
+            - settings_path - settings path, required.
+            - output_path - output path, required.
+            - role_name - role names or glob patterns, required unless
+              all_roles is specified.
+            - all_roles - generate all the roles, optional.
+            - role_suffix - role suffix, optional.
+            - role_variables - role variables, optional.
+            - bytecode_cache - bytecode cache path, optional.
+            - compiled_templates - compiled templates bundle path, optional.
+            - settings_cache - parsed settings cache path, optional.
+            - jobs - number of rendering and writing threads, optional.
+            - processes - number of role generating processes, optional.
+            - incremental - incremental generation, optional.
+            - keep_unchanged - leave identical configs untouched, optional.
+            - watch - keep regenerating roles on changes, optional.
+            - renderers - template renderers by glob pattern, optional.
+            - socket - render server socket path, optional.
+            - archive - tar archive path or '-' for stdout, optional.
+            - gzip - compress the archive, optional.
+            - check - compare configs with the role folders, optional.
+            - timings - number of slowest templates to report, optional.
+
+    :type script_args: list/tuple of sysv style arguments
+
+    :return:
+
+        In case of success write out list files generated files, one file
+        per line to logger.info. The path of the file is relative to the
+        given --output-path and return 0.
+
+        If some of the roles failed, write out 'Error: ' followed by the role
+        name and the error message for each failed role to logger.error,
+        write out files generated for the other roles and return 1.
+
+        In the watch mode write out generated files and errors after every
+        regeneration, until interrupted, and return 0.
+
+        With a render server socket, roles are generated by the render
+        server, or in-process if the server is not running.
+
+        With an archive, the configs are written into the tar archive, one
+        role at a time. The archive file is created once the configuration
+        and the roles are found valid. The list of files is not written out
+        when the archive is written to stdout.
+
+        With timings, write out the time spent in each phase and the slowest
+        templates after the generated files.
+
+        In the check mode nothing is written out, write out the files which
+        would be added, changed and removed, one per line prefixed with
+        'added: ', 'changed: ' or 'removed: ', and return 3 if there are
+        any, 0 otherwise. Failed roles are reported as above and return 1.
+
+    :rtype: int
+    """
+
+    # ....................................................................... #
+    def collect(result, logger, failed=None):
+        output_list = []
+        return_code = 0
+
+        for name, role_output_list, error in result:
+            output_list.extend(role_output_list)
+            if error is not None:
+                logger.error("Error: role '%s': %s" % (name, error))
+                return_code = 1
+                if failed is not None:
+                    failed.append(name)
+
+        return output_list, return_code
+
+    # ....................................................................... #
+    def generate(parsed_args, logger):
+
+        if not parsed_args.all_roles and not parsed_args.role_name:
+            raise ScriptArgumentError(
+                "Either --role-name or --all-roles has to be specified")
+
+        if parsed_args.check and (
+                parsed_args.archive is not None or parsed_args.incremental or
+                parsed_args.keep_unchanged or parsed_args.watch or
+                parsed_args.timings is not None):
+            raise ScriptArgumentError(
+                "--check can not be combined with --archive, --incremental, "
+                "--keep-unchanged, --watch or --timings")
+
+        if parsed_args.archive is not None and (
+                parsed_args.incremental or parsed_args.keep_unchanged or
+                parsed_args.watch or parsed_args.processes > 1):
+            raise ScriptArgumentError(
+                "--archive can not be combined with --incremental, "
+                "--keep-unchanged, --watch or --processes")
+
+        # try the render server first, the watch mode keeps its own config
+        # and timings, archives and checks are only done in-process
+        if parsed_args.socket and not parsed_args.watch \
+                and parsed_args.timings is None \
+                and parsed_args.archive is None and not parsed_args.check:
+            try:
+                result = _remote_write_roles(
+                    parsed_args.socket,
+                    templates_path=parsed_args.templates_path,
+                    settings_path=parsed_args.settings_path,
+                    output_path=parsed_args.output_path,
+                    roles=None if parsed_args.all_roles
+                    else parsed_args.role_name,
+                    suffix=parsed_args.role_suffix,
+                    variables=parsed_args.role_variables,
+                    bytecode_cache_path=parsed_args.bytecode_cache,
+                    compiled_templates_path=parsed_args.compiled_templates,
+                    settings_cache_path=parsed_args.settings_cache,
+                    template_renderers=parsed_args.renderers,
+                    processes=parsed_args.processes,
+                    workers=parsed_args.jobs,
+                    incremental=parsed_args.incremental,
+                    keep_unchanged=parsed_args.keep_unchanged)
+            except EnvironmentError:
+                # the server is not running, generate roles in-process
+                pass
+            else:
+                return collect(result, logger)
+
+        # the configs are written into the archive instead of the output
+        # folder
+        archive = None
+        configurator_options = {}
+        if parsed_args.archive is not None:
+            archive = _archive_factory(parsed_args.output_path)
+            configurator_options['_asset_manager_factory'] = lambda: archive
+
+        # setup config
+        config = _configurator_factory(
+            templates_path=parsed_args.templates_path,
+            settings_path=parsed_args.settings_path,
+            output_path=parsed_args.output_path,
+            bytecode_cache_path=parsed_args.bytecode_cache,
+            compiled_templates_path=parsed_args.compiled_templates,
+            settings_cache_path=parsed_args.settings_cache,
+            template_renderers=parsed_args.renderers,
+            **configurator_options)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def find_roles():
+            if parsed_args.all_roles:
+                return config.role_names()
+            return config.role_names(parsed_args.role_name)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def flush_archive(failed):
+
+            # the archive only has the roles written out completely
+            for name in failed:
+                try:
+                    role = _role_factory(
+                        config=config,
+                        name=name,
+                        suffix=parsed_args.role_suffix)
+                except InvalidName:
+                    continue
+                archive.remove_folder(role.output_folder_path)
+
+            archive.flush()
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def write_out(names):
+
+            timings = None
+            if parsed_args.timings is not None:
+                timings = Timings()
+
+            # roles are written into the archive one at a time, so only the
+            # configs of one role are held in memory
+            batches = [names]
+            if archive is not None:
+                batches = [[name] for name in names]
+
+            output_list = []
+            return_code = 0
+
+            for batch in batches:
+                failed = []
+
+                # and write config files out
+                batch_output_list, batch_return_code = collect(_write_roles(
+                    config=config,
+                    names=batch,
+                    suffix=parsed_args.role_suffix,
+                    variables=parsed_args.role_variables,
+                    processes=parsed_args.processes,
+                    workers=parsed_args.jobs,
+                    incremental=parsed_args.incremental or parsed_args.watch,
+                    keep_unchanged=parsed_args.keep_unchanged,
+                    timings=timings,
+                    _role_factory=_role_factory), logger, failed)
+
+                output_list.extend(batch_output_list)
+                return_code = max(return_code, batch_return_code)
+
+                if archive is not None:
+                    flush_archive(failed)
+
+            # the timings follow the list of files
+            if timings is not None:
+                output_list.extend(timings.report(parsed_args.timings))
+
+            return output_list, return_code
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def check(names):
+            output_list = []
+            return_code = 0
+
+            for name, added, changed, removed, error in _check_roles(
+                    config=config,
+                    names=names,
+                    suffix=parsed_args.role_suffix,
+                    variables=parsed_args.role_variables,
+                    _role_factory=_role_factory):
+
+                if error is not None:
+                    logger.error("Error: role '%s': %s" % (name, error))
+                    return_code = 1
+                    continue
+
+                for status, paths in (('added', added),
+                                      ('changed', changed),
+                                      ('removed', removed)):
+                    output_list.extend(
+                        '%s: %s' % (status, path) for path in paths)
+
+            # errors take precedence over differences
+            if output_list and return_code == 0:
+                return_code = CHECK_DIFFERENCES_RETURN_CODE
+
+            return output_list, return_code
+
+        if parsed_args.check:
+            return check(find_roles())
+
+        if not parsed_args.watch:
+            names = find_roles()
+
+            if archive is None:
+                return write_out(names)
+
+            # the archive file is only created once the configuration and
+            # the roles are valid
+            _open_archive(
+                archive,
+                parsed_args.archive,
+                compress=parsed_args.gzip or None)
+
+            output_list, return_code = write_out(names)
+            archive.close()
+
+            # the list would be mixed into the archive written to stdout
+            if parsed_args.archive == '-':
+                output_list = []
+
+            return output_list, return_code
+
+        # watch mode, the config and its templates are kept across runs
+        names = find_roles()
+        for item in write_out(names)[0]:
+            logger.info(item)
+
+        try:
+            for changed in _watch_changes(
+                    [config.templates_path, config.settings_path]):
+
+                config.invalidate_templates(
+                    changed_template_names(config.templates_path, changed))
+
+                try:
+                    names = find_roles()
+                except ConfigMeException as err:
+                    logger.error("Error: %s" % err.message)
+                    continue
+
+                for item in write_out(
+                        affected_role_names(config, names, changed))[0]:
+                    logger.info(item)
+        except KeyboardInterrupt:
+            pass
+
+        return [], 0
+
+    return cli_command_run(
+        script_args,
+        argument_parser,
+        generate,
+        logger_name,
+        logger_out,
+        logger_err,
+        logger_fatal=logger_fatal,
+        _logger_factory=_logger_factory)
+
+
+# --------------------------------------------------------------------------- #
+def cli_warm_run(
+    script_args,
+    argument_parser,
+    logger_name,
+    logger_out,
+    logger_err,
+    logger_fatal=None,
+    _logger_factory=cli_logger_factory,
+    _warm_bytecode_cache=warm_bytecode_cache
+):
+    """
+    Run CLI bytecode cache warming.
+
+    Parses arguments from the command line and compiles every template in
+    the templates path into the bytecode cache. See :func:`cli_command_run`
+    for arguments and return codes.
+
+    :return:
+
+        Write out the list of compiled templates, one per line, to
+        logger.info. Templates that could not be compiled are written out to
+        logger.error and the return code is 1. Otherwise returns 0.
+
+    :rtype: int
+    """
+
+    # ....................................................................... #
+    def warm(parsed_args, logger):
+
+        output_list = []
+        return_code = 0
+
+        result = _warm_bytecode_cache(
+            templates_path=parsed_args.templates_path,
+            bytecode_cache_path=parsed_args.bytecode_cache,
+            processes=parsed_args.jobs)
+
+        for name, error in result:
+            if error is None:
+                output_list.append(name)
+            else:
+                logger.error("Error: could not compile %s: %s" % (name, error))
+                return_code = 1
+
+        return output_list, return_code
+
+    return cli_command_run(
+        script_args,
+        argument_parser,
+        warm,
+        logger_name,
+        logger_out,
+        logger_err,
+        logger_fatal=logger_fatal,
+        _logger_factory=_logger_factory)
+
+
+# --------------------------------------------------------------------------- #
+def cli_compile_run(
+    script_args,
+    argument_parser,
+    logger_name,
+    logger_out,
+    logger_err,
+    logger_fatal=None,
+    _logger_factory=cli_logger_factory,
+    _compile_templates_bundle=compile_templates_bundle
+):
+    """
+    Run CLI templates bundle compilation.
+
+    Parses arguments from the command line and compiles every template in
+    the templates path into the compiled templates bundle. See
+    :func:`cli_command_run` for arguments and return codes.
+
+    :return:
+
+        In case of success write out the list of compiled templates, one per
+        line, to logger.info and return 0.
+
+    :rtype: int
+    """
+
+    # ....................................................................... #
+    def compile_(parsed_args, logger):
+
+        output_list = _compile_templates_bundle(
+            templates_path=parsed_args.templates_path,
+            bundle_path=parsed_args.compiled_templates,
+            zip=parsed_args.zip)
+
+        return output_list, 0
+
+    return cli_command_run(
+        script_args,
+        argument_parser,
+        compile_,
+        logger_name,
+        logger_out,
+        logger_err,
+        logger_fatal=logger_fatal,
+        _logger_factory=_logger_factory)
+
+
+# --------------------------------------------------------------------------- #
+def cli_serve_run(
+    script_args,
+    argument_parser,
+    logger_name,
+    logger_out,
+    logger_err,
+    logger_fatal=None,
+    _logger_factory=cli_logger_factory,
+    _serve=serve,
+    _service_factory=RenderService
+):
+    """
+    Run CLI render server.
+
+    Parses arguments from the command line and serves render requests on
+    the given UNIX socket until interrupted. See :func:`cli_command_run` for
+    arguments and return codes.
+
+    :return:
+
+        Return 0 once interrupted, 1 if the server could not be started.
+
+    :rtype: int
+    """
+
+    # ....................................................................... #
+    def serve_(parsed_args, logger):
+
+        logger.info("Serving on %s" % parsed_args.socket)
+
+        try:
+            _serve(parsed_args.socket, service=_service_factory())
+        except KeyboardInterrupt:
+            pass
+
+        return [], 0
+
+    return cli_command_run(
+        script_args,
+        argument_parser,
+        serve_,
+        logger_name,
+        logger_out,
+        logger_err,
+        logger_fatal=logger_fatal,
+        _logger_factory=_logger_factory)
+
+
+# --------------------------------------------------------------------------- #
+def cli_bench_run(
+    script_args,
+    argument_parser,
+    logger_name,
+    logger_out,
+    logger_err,
+    logger_fatal=None,
+    _logger_factory=cli_logger_factory,
+    _run_benchmark=run_benchmark
+):
+    """
+    Run CLI benchmark.
+
+    Parses arguments from the command line, generates a synthetic project and
+    writes its roles out. See :func:`cli_command_run` for arguments and
+    return codes and :func:`run_benchmark` for the results.
+
+    :return:
+
+        Write out the benchmark results as JSON to logger.info and return 0.
+
+    :rtype: int
+    """
+
+    # ....................................................................... #
+    def bench(parsed_args, logger):
+
+        for name in ('roles', 'sections', 'repeat', 'jobs'):
+            if getattr(parsed_args, name) < 1:
+                raise ScriptArgumentError(
+                    "--%s has to be at least 1" % name)
+
+        result = _run_benchmark(
+            path=parsed_args.path,
+            roles=parsed_args.roles,
+            sections=parsed_args.sections,
+            depth=parsed_args.depth,
+            settings=parsed_args.settings,
+            template_size=parsed_args.template_size,
+            workers=parsed_args.jobs,
+            incremental=parsed_args.incremental,
+            keep_unchanged=parsed_args.keep_unchanged,
+            template_renderers=parsed_args.renderers,
+            repeat=parsed_args.repeat,
+            timings=parsed_args.timings)
+
+        return [dumps(result, indent=2, sort_keys=True)], 0
+
+    return cli_command_run(
+        script_args,
+        argument_parser,
+        bench,
+        logger_name,
+        logger_out,
+        logger_err,
+        logger_fatal=logger_fatal,
+        _logger_factory=_logger_factory)
+
+
+# --------------------------------------------------------------------------- #
+# commands run by specifying the command name as the first script argument,
+# mapped to the run function and its argument parser factory
+CLI_COMMANDS = {
+    'bench': (cli_bench_run, configured_bench_argument_parser),
+    'compile': (cli_compile_run, configured_compile_argument_parser),
+    'serve': (cli_serve_run, configured_serve_argument_parser),
+    'warm': (cli_warm_run, configured_warm_argument_parser),
+    }
+
+
+# --------------------------------------------------------------------------- #
+def main(_cli_run=cli_run, _script_args=None, _cli_commands=CLI_COMMANDS):
+
+    if _script_args is None:  # pragma: no cover
+        _script_args = sys.argv[1:]
+
+    run = _cli_run
+    parser_factory = configured_argument_parser
+
+    # dispatch to a command if its name is the first argument
+    if len(_script_args) > 0 and _script_args[0] in _cli_commands:
+        run, parser_factory = _cli_commands[_script_args[0]]
+        _script_args = _script_args[1:]
 
-    return _cli_run(
-        sys.argv[1:],
-        configured_argument_parser(),
+    return run(
+        _script_args,
+        parser_factory(),
         PACKAGE_LOGGER_NAME,
         sys.stdout,
         sys.stderr)
@@ -11,6 +11,13 @@ import os
 POSIX = os.name == 'posix'
 WIN = os.name == 'nt'
 
+# ........................................................................... #
+# string types, basestring does not exist in py3
+try:
+    string_types = basestring
+except NameError:  # pragma: no cover
+    string_types = str
+
 # ........................................................................... #
 # in py2 io.StringIO does not behave like py3 io.StringIO
 # but instead matches behaviour of StringIO.StringIO
@@ -19,3 +26,19 @@ try:
     from StringIO import StringIO
 except ImportError:  # pragma: no cover
     from io import StringIO  # NOQA
+
+# ........................................................................... #
+# Queue module was renamed to queue in py3
+try:
+    from Queue import Empty
+    from Queue import Queue
+except ImportError:  # pragma: no cover
+    from queue import Empty  # NOQA
+    from queue import Queue  # NOQA
+
+# ........................................................................... #
+# abstract base classes of collections moved to collections.abc in py3
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping  # NOQA
@@ -4,9 +4,19 @@
 Config Generator
 """
 
+from fnmatch import filter as fnmatch_filter
+
 from .assets import AssetManager
+from .assets import MemoryAssetManager
+from .exceptions import InvalidName
+from .exceptions import RoleNotFound
+from .exceptions import SettingsParsingError
 from .settings import SettingsParser
-from .renderers.jinja2_rendering import Jinja2TemplateRenderer
+from .renderers.registry import template_renderer_registry
+
+# --------------------------------------------------------------------------- #
+# section setting selecting the template renderer of the section by name
+TEMPLATE_RENDERER_SETTING = 'configme_renderer'
 
 
 # --------------------------------------------------------------------------- #
@@ -49,7 +59,10 @@ class Configurator(object):
 
     :param output_path:
 
-        Path to the folder where the role folders and configs are written to.
+        Optional, path to the folder where the role folders and configs are
+        written to. Defaults to None, the configs are only rendered, see
+        :meth:`Role.render`, or written to a :class:`MemoryAssetManager`,
+        which is the default asset manager without an output path.
 
         :raises: :class:`LocationNotFound` if the folder does not exist.
 
@@ -66,6 +79,67 @@ class Configurator(object):
         `settings_path` folder.
 
 
+    :param template_environment_options:
+
+        Optional, dictionary of options passed to the template environment
+        when it is created, for example Jinja2's `cache_size` and
+        `auto_reload`. Defaults to an empty dictionary.
+
+    :type template_environment_options: dict
+
+
+    :param bytecode_cache_path:
+
+        Optional, path to the folder where compiled templates are cached
+        between runs. The folder may be shared between concurrent runs and
+        between machines. Defaults to None, no bytecode cache.
+
+        :raises: :class:`LocationNotFound` if the folder does not exist.
+
+    :type bytecode_cache_path: str/unicode
+
+
+    :param compiled_templates_path:
+
+        Optional, path to the compiled templates bundle folder or zip file
+        created from the `templates_path` by `configme compile`. When
+        specified templates are loaded from the bundle instead of being
+        compiled. Defaults to None.
+
+        :raises: :class:`LocationNotFound` if the bundle does not exist.
+
+    :type compiled_templates_path: str/unicode
+
+
+    :param template_renderers:
+
+        Optional, list of two element tuples of a glob pattern, such as
+        `*.conf`, and the template renderer factory, or its name, used for
+        the configs whose paths match the pattern. The first matching
+        pattern is used, then the patterns of the template renderer
+        registry. Configs matching no pattern use the default template
+        renderer. Renderers given by name are only imported when used.
+
+        A section can also select the template renderer by name in its
+        `configme_renderer` setting, see :class:`TemplateRendererRegistry`,
+        which takes precedence over the patterns.
+
+        :raises: :class:`InvalidName` if a renderer name is unknown.
+
+    :type template_renderers: list
+
+
+    :param settings_cache_path:
+
+        Optional, path to the folder where parsed settings files are cached
+        between runs, see :class:`SettingsParser`. The folder may be shared
+        between concurrent runs. Defaults to None, no settings cache.
+
+        :raises: :class:`LocationNotFound` if the folder does not exist.
+
+    :type settings_cache_path: str/unicode
+
+
     :raises:
 
         :class:`LocationNotFound` if any of the arguments that take folders
@@ -75,11 +149,21 @@ class Configurator(object):
     _templates_path = None
     _settings_path = None
     _output_path = None
+    _bytecode_cache_path = None
+    _compiled_templates_path = None
+    _settings_cache_path = None
     _settings_parser_factory = None
     _template_renderer_factory = None
+    _template_renderer_registry = None
     _asset_manager_factory = None
 
     _asset_manager = None
+    _template_environments = None
+
+    # ....................................................................... #
+    # resolved settings of the settings files extended by others, by file
+    # path, see :class:`SettingsParser`
+    settings_bases = None
 
     # ....................................................................... #
     @property
@@ -109,24 +193,82 @@ class Configurator(object):
     # the noqa below is to disable pyflake check W806, redefinition of function
     @output_path.setter  # NOQA
     def output_path(self, value):
-        self._output_path = self._asset_manager.location(value, "output")
+        if value is not None:
+            value = self._asset_manager.location(value, "output")
+        self._output_path = value
+
+    # ....................................................................... #
+    @property
+    def bytecode_cache_path(self):
+        return self._bytecode_cache_path
+
+    # the noqa below is to disable pyflake check W806, redefinition of function
+    @bytecode_cache_path.setter  # NOQA
+    def bytecode_cache_path(self, value):
+        if value is not None:
+            value = self._asset_manager.location(value, "bytecode cache")
+        self._bytecode_cache_path = value
+
+    # ....................................................................... #
+    @property
+    def compiled_templates_path(self):
+        return self._compiled_templates_path
+
+    # the noqa below is to disable pyflake check W806, redefinition of function
+    @compiled_templates_path.setter  # NOQA
+    def compiled_templates_path(self, value):
+        if value is not None:
+            value = self._asset_manager.asset_location(
+                value, "compiled templates")
+        self._compiled_templates_path = value
+
+    # ....................................................................... #
+    @property
+    def settings_cache_path(self):
+        return self._settings_cache_path
+
+    # the noqa below is to disable pyflake check W806, redefinition of function
+    @settings_cache_path.setter  # NOQA
+    def settings_cache_path(self, value):
+        if value is not None:
+            value = self._asset_manager.location(value, "settings cache")
+        self._settings_cache_path = value
 
     # ....................................................................... #
     settings_file_extension = None
 
+    # ....................................................................... #
+    template_environment_options = None
+
     # ....................................................................... #
     def __init__(self,
                  templates_path,
                  settings_path,
-                 output_path,
+                 output_path=None,
                  settings_file_extension='configme',
+                 template_environment_options=None,
+                 bytecode_cache_path=None,
+                 compiled_templates_path=None,
+                 template_renderers=None,
+                 settings_cache_path=None,
                  _settings_parser_factory=SettingsParser,
-                 _template_renderer_factory=Jinja2TemplateRenderer,
-                 _asset_manager_factory=AssetManager):
+                 _template_renderer_factory=None,
+                 _template_renderer_registry=template_renderer_registry,
+                 _asset_manager_factory=None):
 
-        # set factories
+        # set factories, the default template renderer factory is looked up
+        # in the registry when first needed
         self._settings_parser_factory = _settings_parser_factory
         self._template_renderer_factory = _template_renderer_factory
+        self._template_renderer_registry = _template_renderer_registry
+
+        # without an output path the configs are kept in memory
+        if _asset_manager_factory is None:
+            if output_path is None:
+                _asset_manager_factory = MemoryAssetManager
+            else:
+                _asset_manager_factory = AssetManager
+
         self._asset_manager_factory = _asset_manager_factory
 
         # create asset manager since we will need it for property setting
@@ -137,3 +279,202 @@ class Configurator(object):
         self.settings_path = settings_path
         self.output_path = output_path
         self.settings_file_extension = settings_file_extension
+        self.bytecode_cache_path = bytecode_cache_path
+        self.compiled_templates_path = compiled_templates_path
+        self.settings_cache_path = settings_cache_path
+
+        # handle mutable default for template environment options
+        if template_environment_options is None:
+            template_environment_options = {}
+
+        self.template_environment_options = template_environment_options
+
+        # handle mutable default for template renderers
+        if template_renderers is None:
+            template_renderers = []
+
+        for _, factory in template_renderers:
+            self._template_renderer_registry.check(factory)
+
+        self.template_renderers = list(template_renderers)
+
+        # template environments are created lazily, one per renderer factory
+        self._template_environments = {}
+
+        # base settings are parsed once for all the roles extending them
+        self.settings_bases = {}
+
+    # ....................................................................... #
+    def settings_parser(self, file_path, variables=None):
+        """
+        :param file_path: path to the role's settings file.
+        :type file_path: str/unicode
+
+        :param variables: Optional, role variables.
+        :type variables: dict
+
+        :return:
+
+            settings parser of the given settings file, using the settings
+            cache if any, and sharing the settings files extended with the
+            other roles.
+
+        :rtype: :class:`SettingsParser`
+        """
+        return self._settings_parser_factory(
+            file_path=file_path,
+            variables=variables,
+            cache_path=self.settings_cache_path,
+            bases=self.settings_bases)
+
+    # ....................................................................... #
+    def template_environment(self, template_renderer_factory):
+        """
+        Return the template environment shared by all the renderers created
+        by the given template renderer factory. The environment is created
+        on first access using the factory's `create_environment` and reused
+        by every renderer of every role using this configurator, so parsed
+        and compiled templates are cached across output files.
+
+        :param template_renderer_factory: template renderer class
+        :type template_renderer_factory: :class:`BaseTemplateRenderer`
+
+        :return: template environment, as created by the renderer factory
+        """
+
+        try:
+            return self._template_environments[template_renderer_factory]
+        except KeyError:
+            environment = template_renderer_factory.create_environment(self)
+            self._template_environments[template_renderer_factory] = \
+                environment
+            return environment
+
+    # ....................................................................... #
+    def template_renderer_factory(self, path, settings):
+        """
+        Return the template renderer factory for the config with the given
+        path and settings, see the `template_renderers` argument.
+
+        :param path: config path, the section name in the settings file.
+        :type path: str/unicode
+
+        :param settings: settings of the section.
+        :type settings: dict/:class:`SectionSettings`
+
+        :return: template renderer class
+        :rtype: :class:`BaseTemplateRenderer`
+
+        :raises:
+
+            :class:`SettingsParsingError` if the section selects a template
+            renderer which does not exist.
+        """
+
+        registry = self._template_renderer_registry
+
+        # only the setting selecting the renderer is interpolated
+        name = settings.get(TEMPLATE_RENDERER_SETTING)
+        if name is not None:
+            try:
+                return registry.get(name)
+            except InvalidName as err:
+                raise SettingsParsingError(
+                    "%s, in section: %s" % (err.message, path))
+
+        return registry.match(
+            path,
+            self.template_renderers,
+            self._template_renderer_factory)
+
+    # ....................................................................... #
+    def role_names(self, patterns=None):
+        """
+        Return role names matching the given role names and glob patterns,
+        such as `prod-*`. Patterns are matched against the names of the
+        settings files in the `settings_path`. Role names which are not
+        patterns are returned as is, without looking for their settings file.
+
+        :param patterns:
+
+            Optional, list of role names and glob patterns. Defaults to all
+            the roles in the `settings_path`.
+
+        :type patterns: list
+
+        :return: list of role names, in the order of the given patterns and
+                 sorted within each pattern, without duplicates.
+        :rtype: list
+
+        :raises:
+
+            :class:`RoleNotFound` if no role matches one of the patterns.
+        """
+
+        # all the roles by default
+        if patterns is None:
+            patterns = ['*']
+
+        extension = '.%s' % self.settings_file_extension
+        available = None
+        result = []
+
+        for pattern in patterns:
+
+            # plain role names do not need to be looked up
+            if not set('*?[').intersection(pattern):
+                matched = [pattern]
+            else:
+                # list the settings folder only once
+                if available is None:
+                    available = [
+                        name[:-len(extension)] for name in
+                        self._asset_manager.list_folder(self.settings_path)
+                        if name.endswith(extension)]
+
+                matched = fnmatch_filter(available, pattern)
+
+                if len(matched) == 0:
+                    raise RoleNotFound(
+                        "No role settings files in %s match: %s"
+                        % (self.settings_path, pattern))
+
+            result.extend(name for name in matched if name not in result)
+
+        return result
+
+    # ....................................................................... #
+    def prewarm_templates(self):
+        """
+        Load and compile all the templates into the shared template
+        environment ahead of time, see `template_renderer_factory.prewarm`.
+        Used before forking worker processes, so that they share the compiled
+        templates copy-on-write instead of compiling them each.
+        """
+
+        registry = self._template_renderer_registry
+
+        template_renderer_factories = [registry.resolve(
+            self._template_renderer_factory or registry.default)]
+        template_renderer_factories.extend(
+            registry.resolve(template_renderer_factory)
+            for _, template_renderer_factory in
+            self.template_renderers + registry.patterns)
+
+        for template_renderer_factory in set(template_renderer_factories):
+            template_renderer_factory.prewarm(self)
+
+    # ....................................................................... #
+    def invalidate_templates(self, names=None):
+        """
+        Drop what the shared template environments know about the templates
+        with the given names, after their sources changed, see
+        `template_renderer_factory.invalidate`. Used by the watch mode which
+        keeps the configurator across runs.
+
+        :param names: Optional, template names. Defaults to all templates.
+        :type names: list
+        """
+
+        for template_renderer_factory in self._template_environments:
+            template_renderer_factory.invalidate(self, names)
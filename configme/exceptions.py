@@ -62,3 +62,18 @@ class SettingsParsingError(ConfigMeException):
 # --------------------------------------------------------------------------- #
 class TemplateRenderError(ConfigMeException):
     pass
+
+
+# --------------------------------------------------------------------------- #
+class TemplateBundleError(ConfigMeException):
+    pass
+
+
+# --------------------------------------------------------------------------- #
+class RoleNotFound(ConfigMeException):
+    pass
+
+
+# --------------------------------------------------------------------------- #
+class RenderServerError(ConfigMeException):
+    pass
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+
+"""
+Output manifest module.
+"""
+
+from hashlib import sha1
+
+from json import dumps
+from json import loads
+
+# --------------------------------------------------------------------------- #
+# format of the manifest file names, stored next to the role folders
+MANIFEST_FILE_NAME_FORMAT = '.%s.manifest.json'
+
+# bumped whenever manifest contents change in an incompatible way
+MANIFEST_VERSION = 2
+
+# keys of every manifest entry
+_ENTRY_KEYS = frozenset(('hash', 'size', 'dependencies'))
+
+
+# --------------------------------------------------------------------------- #
+class Manifest(object):
+    """
+    Manifest of the config files written for a role, recording the content
+    hash and the size of each file. It is used by incremental generation to
+    skip writing configs which did not change since the previous run and to
+    remove configs of sections that were removed from the settings file.
+
+    When the renderer can tell what a config depends on, the manifest also
+    records the dependency graph of the config: the templates it is rendered
+    from, including the templates they extend, include and import, and the
+    settings keys they use, with a digest of the template sources and the
+    settings values. Configs whose dependencies did not change are not even
+    rendered.
+
+    The Manifest accepts the following arguments:
+
+    :param previous_entries:
+
+        Optional, dictionary of the manifest of the previous run, mapping the
+        config paths relative to the role folder to entry dictionaries with
+        the `hash`, `size` and `dependencies` keys. Defaults to no previous
+        entries, all configs are written.
+
+    :type previous_entries: dict
+    """
+
+    # ....................................................................... #
+    previous_entries = None
+
+    # ....................................................................... #
+    entries = None
+
+    # ....................................................................... #
+    def __init__(self, previous_entries=None):
+
+        # handle mutable defaults
+        if previous_entries is None:
+            previous_entries = {}
+
+        self.previous_entries = previous_entries
+        self.entries = {}
+
+    # ....................................................................... #
+    @classmethod
+    def loads(cls, content):
+        """
+        Create manifest with the previous entries loaded from the given
+        manifest file content.
+
+        :param content: manifest file content
+        :type content: str/unicode
+
+        :return: manifest or None if the content is not a valid manifest.
+        :rtype: :class:`Manifest`
+        """
+
+        try:
+            data = loads(content)
+            if data['version'] != MANIFEST_VERSION:
+                return None
+            entries = data['files']
+            for entry in entries.values():
+                if not isinstance(entry, dict) \
+                        or not _ENTRY_KEYS.issubset(entry):
+                    return None
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+        return cls(entries)
+
+    # ....................................................................... #
+    def dumps(self):
+        """
+        :return: manifest file content for the recorded entries.
+        :rtype: str/unicode
+        """
+
+        data = {'version': MANIFEST_VERSION, 'files': self.entries}
+
+        # py2 dumps returns ascii str, written out files take unicode
+        return u'%s' % dumps(data, sort_keys=True)
+
+    # ....................................................................... #
+    @staticmethod
+    def digest(chunks):
+        """
+        :param chunks: iterable of rendered config chunks
+        :type chunks: iterable
+
+        :return:
+
+            hex digest of the UTF-8 encoded content of the chunks, bytes
+            chunks are digested as they are.
+
+        :rtype: str
+        """
+
+        content_hash = sha1()
+        for _ in Manifest.digesting(chunks, content_hash):
+            pass
+
+        return content_hash.hexdigest()
+
+    # ....................................................................... #
+    @staticmethod
+    def digesting(chunks, content_hash):
+        """
+        :param chunks: iterable of rendered config chunks
+        :type chunks: iterable
+
+        :param content_hash: hash object updated with the chunks.
+        :type content_hash: :func:`hashlib.sha1`
+
+        :return:
+
+            generator of the chunks, updating the given hash object with them
+            as they are consumed, see :meth:`digest`.
+
+        :rtype: generator
+        """
+
+        for chunk in chunks:
+            content_hash.update(
+                chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+            yield chunk
+
+    # ....................................................................... #
+    @staticmethod
+    def dependencies(templates, settings):
+        """
+        :param templates:
+
+            dictionary mapping the names of all the templates a config is
+            rendered from to the digests of their sources.
+
+        :type templates: dict
+
+        :param settings:
+
+            dictionary of the settings keys used by the templates and their
+            values, None for the keys which are not set.
+
+        :type settings: dict
+
+        :return:
+
+            dependencies of a config, a dictionary with the sorted `templates`
+            names, the sorted `settings` keys and the `digest` of them all.
+
+        :rtype: dict
+        """
+
+        content = dumps([templates, settings], sort_keys=True)
+
+        return {
+            'digest': sha1(content.encode('utf-8')).hexdigest(),
+            'templates': sorted(templates),
+            'settings': sorted(settings),
+            }
+
+    # ....................................................................... #
+    def recorded_dependencies(self, path):
+        """
+        :param path: config path relative to the role folder
+        :type path: str/unicode
+
+        :return:
+
+            dependencies of the config recorded by the previous manifest, see
+            :meth:`dependencies`, or None if not recorded.
+
+        :rtype: dict
+        """
+
+        entry = self.previous_entries.get(path)
+        if entry is None:
+            return None
+
+        return entry['dependencies']
+
+    # ....................................................................... #
+    def up_to_date(self, path, dependencies, size):
+        """
+        Record the config as kept if its dependencies did not change since
+        the previous run and the config file on disk is the one recorded in
+        the previous manifest, so it does not need to be rendered.
+
+        :param path: config path relative to the role folder
+        :type path: str/unicode
+
+        :param dependencies: see :meth:`dependencies`.
+        :type dependencies: dict
+
+        :param size: size of the config file on disk or None if missing.
+        :type size: int
+
+        :return: True if the config is up to date.
+        :rtype: bool
+        """
+
+        entry = self.previous_entries.get(path)
+
+        if size is None or entry is None or entry['size'] != size \
+                or entry['dependencies'] is None \
+                or entry['dependencies']['digest'] != dependencies['digest']:
+            return False
+
+        self.entries[path] = entry
+        return True
+
+    # ....................................................................... #
+    def unchanged(self, path, digest, size):
+        """
+        :param path: config path relative to the role folder
+        :type path: str/unicode
+
+        :param digest: content digest of the newly rendered config
+        :type digest: str
+
+        :param size: size of the config file on disk or None if missing.
+        :type size: int
+
+        :return:
+
+            True if the config file on disk is the one recorded in the
+            previous manifest and it has the same content digest.
+
+        :rtype: bool
+        """
+
+        entry = self.previous_entries.get(path)
+
+        if size is None or entry is None:
+            return False
+
+        return entry['hash'] == digest and entry['size'] == size
+
+    # ....................................................................... #
+    def record(self, path, digest, size, dependencies=None):
+        """
+        Record the config file written, or kept, by this run with its
+        dependencies, see :meth:`dependencies`.
+        """
+
+        self.entries[path] = {
+            'hash': digest,
+            'size': size,
+            'dependencies': dependencies,
+            }
+
+    # ....................................................................... #
+    def removed(self):
+        """
+        :return:
+
+            sorted list of config paths recorded by the previous manifest that
+            were not recorded by this run.
+
+        :rtype: list
+        """
+        return sorted(set(self.previous_entries) - set(self.entries))
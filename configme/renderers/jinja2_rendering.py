@@ -4,49 +4,311 @@
 Jinja2 Template Renderer.
 """
 
+import sys
+
+from hashlib import sha1
+
+from io import open as io_open
+
+from json import dumps as json_dumps
+from json import loads as json_loads
+
+from os import chmod
+from os import fdopen
+from os import rename
+from os import unlink
+
+from os.path import isdir
+from os.path import join
+
+from tempfile import mkstemp
+
+from weakref import WeakKeyDictionary
+
 from ..rendering import BaseTemplateRenderer
 
+from jinja2 import __version__ as jinja2_version
 from jinja2 import Environment
+from jinja2 import FileSystemBytecodeCache
 from jinja2 import FileSystemLoader
+from jinja2 import ModuleLoader
 from jinja2 import TemplateError
+from jinja2 import meta
 
+from ..exceptions import TemplateBundleError
 from ..exceptions import TemplateRenderError
 
 
+# --------------------------------------------------------------------------- #
+# name of the manifest file stored in the compiled templates bundle
+BUNDLE_MANIFEST_NAME = 'configme_bundle.json'
+
+
+# --------------------------------------------------------------------------- #
+class Jinja2BytecodeCache(FileSystemBytecodeCache):
+    """
+    Jinja2 filesystem bytecode cache that is safe to share between concurrent
+    runs and between machines using a shared mount.
+
+    Cache entries are keyed by the template name and its full path, and
+    store the template source checksum, so stale entries are never used.
+    Entries are written to a temporary file in the cache folder and then
+    renamed into place, so readers never see a partially written entry.
+
+    :param directory: path to the bytecode cache folder.
+    :type directory: str/unicode
+    """
+
+    # ....................................................................... #
+    def dump_bytecode(self, bucket, _os_rename=rename):
+        """
+        Atomically write the bucket's bytecode to the cache folder. Failing
+        to write the cache entry is not an error, the template simply gets
+        compiled again on the next run.
+        """
+
+        try:
+            fd, temp_file_path = mkstemp(
+                prefix='.tmp', suffix='.cache', dir=self.directory)
+        except EnvironmentError:
+            return
+
+        try:
+            file_handler = fdopen(fd, 'wb')
+            try:
+                bucket.write_bytecode(file_handler)
+            finally:
+                file_handler.close()
+            # mkstemp creates owner only files, make the entry readable by
+            # other users sharing the cache folder
+            chmod(temp_file_path, 0o644)
+            _os_rename(temp_file_path, self._get_cache_filename(bucket))
+        except EnvironmentError:
+            try:
+                unlink(temp_file_path)
+            except EnvironmentError:
+                pass
+
+
 # --------------------------------------------------------------------------- #
 class Jinja2TemplateRenderer(BaseTemplateRenderer):
     """
     Jinja2 Template Renderer.
     """
 
+    name = 'jinja2'
+
     jinja2_env = None
 
     # ....................................................................... #
-    def __init__(
-        self,
+    def __init__(self, config, role_output_folder_path, path, settings):
+
+        BaseTemplateRenderer.__init__(
+            self, config, role_output_folder_path, path, settings)
+
+        # use the jinja2 environment shared by all the renderers of the config
+        self.jinja2_env = self.config.template_environment(self.__class__)
+
+    # ....................................................................... #
+    @classmethod
+    def create_environment(
+        cls,
         config,
-        role_output_folder_path,
-        path,
-        settings,
         _jinja2_filesystem_loader_factory=FileSystemLoader,
-        _jinja2_environment_factory=Environment
+        _jinja2_environment_factory=Environment,
+        _jinja2_bytecode_cache_factory=Jinja2BytecodeCache,
+        _jinja2_module_loader_factory=ModuleLoader
     ):
+        """
+        Create Jinja2 environment loading templates from the config's
+        `templates_path`. The config's `template_environment_options` are
+        passed to the environment as keyword arguments. If the config has a
+        `bytecode_cache_path` compiled templates are cached there.
 
-        BaseTemplateRenderer.__init__(
-            self, config, role_output_folder_path, path, settings)
+        If the config has a `compiled_templates_path` the templates are
+        loaded from that compiled templates bundle instead, after checking
+        the bundle was compiled from the current `templates_path` sources.
+
+        :return: Jinja2 environment
+        :rtype: :class:`jinja2.Environment`
+
+        :raises:
+
+            :class:`TemplateBundleError` if the compiled templates bundle is
+            invalid or stale.
+        """
+
+        options = dict(config.template_environment_options)
+
+        # setup the persistent bytecode cache if requested
+        if config.bytecode_cache_path is not None:
+            options['bytecode_cache'] = _jinja2_bytecode_cache_factory(
+                config.bytecode_cache_path)
 
         # setup jinja2 file system template loading
         loader = _jinja2_filesystem_loader_factory(
-            searchpath=self.config.templates_path)
-        self.jinja2_env = _jinja2_environment_factory(loader=loader)
+            searchpath=config.templates_path)
+
+        if config.compiled_templates_path is not None:
+            # use the source loader to verify the bundle is not stale
+            check_templates_bundle(
+                config.compiled_templates_path,
+                _jinja2_environment_factory(loader=loader, **options))
+            loader = _jinja2_module_loader_factory(
+                config.compiled_templates_path)
+
+        return _jinja2_environment_factory(loader=loader, **options)
+
+    # ....................................................................... #
+    @classmethod
+    def prewarm(cls, config):
+        """
+        Load and compile all the templates in the shared Jinja2 environment.
+        Templates that fail to compile are skipped, their error is raised
+        when they are rendered. Files which are not UTF-8 text, such as the
+        binary files copied by the verbatim renderer, are skipped too.
+        Loaders that can not list their templates, such as the compiled
+        templates bundle loader, are not prewarmed.
+
+        At most the environment's `cache_size` templates are kept.
+        """
+
+        jinja2_env = config.template_environment(cls)
+
+        try:
+            names = jinja2_env.list_templates()
+        except TypeError:
+            return
+
+        for name in names:
+            try:
+                jinja2_env.get_template(name)
+            except (TemplateError, UnicodeDecodeError):
+                pass
+
+    # ....................................................................... #
+    @classmethod
+    def invalidate(cls, config, names=None):
+        """
+        Forget the analysis of the templates with the given names. Compiled
+        templates are reloaded by Jinja2 itself when their sources change, as
+        long as the environment's `auto_reload` option is on, the default,
+        unless all the templates are invalidated.
+        """
+
+        jinja2_env = config.template_environment(cls)
+        analysis = _template_analysis.get(jinja2_env)
+
+        if names is None:
+            if analysis is not None:
+                analysis.clear()
+            if jinja2_env.cache is not None:
+                jinja2_env.cache.clear()
+            return
+
+        if analysis is not None:
+            for name in names:
+                analysis.pop(name, None)
+
+    # ....................................................................... #
+    def template_dependencies(self):
+        """
+        Return the templates this config is rendered from, found following
+        the `extends`, `include` and `import` tags of the template, and the
+        variables they use.
+
+        Dependencies are not known if any of the templates can not be loaded
+        or parsed, its source is not available, such as when templates are
+        loaded from the compiled templates bundle, or it references templates
+        by names computed at render time.
+
+        :return:
+
+            two element tuple of dictionary mapping the names of the
+            templates to the digests of their sources and of list of the
+            variable names used, or None if not known.
+
+        :rtype: tuple
+        """
+
+        templates = {}
+        variables = set()
+        pending = [self.path]
+
+        while pending:
+            name = pending.pop()
+            if name in templates:
+                continue
+
+            analysis = analyze_template(self.jinja2_env, name)
+            if analysis is None:
+                return None
+
+            digest, referenced, used_variables = analysis
+            if referenced is None:
+                return None
+
+            templates[name] = digest
+            variables.update(used_variables)
+            pending.extend(referenced)
+
+        return templates, sorted(variables)
+
+    # ....................................................................... #
+    def template_digests(self, names):
+        """
+        Read the sources of the templates with the given names, without
+        parsing them, see :meth:`BaseTemplateRenderer.template_digests`.
+
+        :return:
+
+            dictionary mapping the names of the templates to the digests of
+            their sources, or None if any source is not available.
+
+        :rtype: dict
+        """
+
+        digests = {}
+
+        for name in names:
+            try:
+                source = self.jinja2_env.loader.get_source(
+                    self.jinja2_env,
+                    name)[0]
+            except (TemplateError, RuntimeError, TypeError):
+                return None
+
+            digests[name] = sha1(source.encode('utf-8')).hexdigest()
+
+        return digests
+
+    # ....................................................................... #
+    def load_template(self):
+        """
+        Load and compile the template, or get it from the environment's
+        cache.
+
+        :return: template
+        :rtype: :class:`jinja2.Template`
+
+        :raises:
+
+            :class:`TemplateRenderError` for any template look up or syntax
+            error.
+        """
+
+        try:
+            return self.jinja2_env.get_template(self.path)
+        except TemplateError as err:
+            raise self._template_render_error(err)
 
     # ....................................................................... #
     def get_rendered_config(self):
         """
-        Render and output config to file at `output_file_path`.
+        Render and return the config.
 
-        :return: path to the the generated config file.
-        :rype: str
+        :return: rendered config
+        :rype: unicode
 
         :raises:
 
@@ -55,12 +317,392 @@ class Jinja2TemplateRenderer(BaseTemplateRenderer):
         """
 
         # retrieve the template and render it
+        template = self.load_template()
         try:
-            template = self.jinja2_env.get_template(self.path)
             output = template.render(**self.settings)
         except TemplateError as err:
-            msg = 'Failed to render config template: %s\n\n%s' \
-                % (self.path, err.message)
-            raise TemplateRenderError(msg)
+            raise self._template_render_error(err)
 
         return output
+
+    # ....................................................................... #
+    def generate_rendered_config(self):
+        """
+        Render the config using Jinja2's generator API, yielding rendered
+        chunks as they are produced.
+
+        :return: generator of rendered config chunks
+        :rype: generator
+
+        :raises:
+
+            :class:`TemplateRenderError` for any template look up or render
+            error, raised while iterating.
+        """
+
+        template = self.load_template()
+        try:
+            for chunk in template.generate(**self.settings):
+                yield chunk
+        except TemplateError as err:
+            raise self._template_render_error(err)
+
+    # ....................................................................... #
+    def _template_render_error(self, err):
+        """
+        Return :class:`TemplateRenderError` for the given Jinja2 error.
+        """
+        msg = 'Failed to render config template: %s\n\n%s' \
+            % (self.path, err.message)
+        return TemplateRenderError(msg)
+
+
+# --------------------------------------------------------------------------- #
+# jinja2 environment of the bytecode cache warming worker process
+_warm_jinja2_env = None
+
+
+# --------------------------------------------------------------------------- #
+def _warm_worker_init(templates_path, bytecode_cache_path):
+    """
+    Setup Jinja2 environment for the bytecode cache warming worker process.
+    """
+
+    global _warm_jinja2_env
+
+    _warm_jinja2_env = Environment(
+        loader=FileSystemLoader(searchpath=templates_path),
+        bytecode_cache=Jinja2BytecodeCache(bytecode_cache_path))
+
+
+# --------------------------------------------------------------------------- #
+def _warm_template(name):
+    """
+    Compile template with the given name into the bytecode cache.
+
+    :return: two element tuple of template name and error message, which is
+             None if the template compiled successfully, or None if the file
+             is not UTF-8 text and so is not a template.
+    :rtype: tuple
+    """
+
+    try:
+        _warm_jinja2_env.get_template(name)
+    except TemplateError as err:
+        return (name, '%s' % err)
+    except UnicodeDecodeError:
+        return None
+
+    return (name, None)
+
+
+# --------------------------------------------------------------------------- #
+def warm_bytecode_cache(
+    templates_path,
+    bytecode_cache_path,
+    processes=None,
+    _pool_factory=None
+):
+    """
+    Compile every template in the templates path into the bytecode cache
+    using a pool of `processes` worker processes. Files which are not UTF-8
+    text, such as the binary files copied by the verbatim renderer, are
+    skipped and left out of the result.
+
+    :param templates_path: path to the templates folder.
+    :type templates_path: str/unicode
+
+    :param bytecode_cache_path: path to the bytecode cache folder.
+    :type bytecode_cache_path: str/unicode
+
+    :param processes:
+
+        Optional, number of worker processes. Defaults to the number of CPUs.
+        If set to 1 templates are compiled in the current process.
+
+    :type processes: int
+
+    :return:
+
+        sorted list of two element tuples of the template name and the error
+        message if it could not be compiled, or None if it compiled.
+
+    :rtype: list
+    """
+
+    _warm_worker_init(templates_path, bytecode_cache_path)
+    names = _warm_jinja2_env.list_templates()
+
+    if processes == 1:
+        result = [_warm_template(name) for name in names]
+        return [item for item in result if item is not None]
+
+    # multiprocessing is only imported when processes are used
+    if _pool_factory is None:
+        from multiprocessing import Pool as _pool_factory
+
+    pool = _pool_factory(
+        processes=processes,
+        initializer=_warm_worker_init,
+        initargs=(templates_path, bytecode_cache_path))
+
+    try:
+        result = pool.map(_warm_template, names)
+    finally:
+        pool.close()
+        pool.join()
+
+    return [item for item in result if item is not None]
+
+
+# --------------------------------------------------------------------------- #
+# template analysis results of each jinja2 environment, by template name
+_template_analysis = WeakKeyDictionary()
+
+
+# --------------------------------------------------------------------------- #
+def analyze_template(jinja2_env, name):
+    """
+    Analyze the template with the given name using Jinja2's meta API. Results
+    are cached for the lifetime of the environment.
+
+    :param jinja2_env: Jinja2 environment loading the template.
+    :type jinja2_env: :class:`jinja2.Environment`
+
+    :param name: template name
+    :type name: str/unicode
+
+    :return:
+
+        three element tuple of the digest of the template source, list of
+        names of the templates it extends, includes and imports, or None if
+        any of them is computed at render time, and set of the names of the
+        variables it uses. None if the template source can not be loaded or
+        parsed.
+
+    :rtype: tuple
+    """
+
+    cache = _template_analysis.setdefault(jinja2_env, {})
+
+    try:
+        return cache[name]
+    except KeyError:
+        pass
+
+    try:
+        source = jinja2_env.loader.get_source(jinja2_env, name)[0]
+        ast = jinja2_env.parse(source)
+    except (TemplateError, RuntimeError, TypeError):
+        analysis = None
+    else:
+        referenced = list(meta.find_referenced_templates(ast))
+        if None in referenced:
+            referenced = None
+
+        analysis = (
+            sha1(source.encode('utf-8')).hexdigest(),
+            referenced,
+            meta.find_undeclared_variables(ast))
+
+    cache[name] = analysis
+    return analysis
+
+
+# --------------------------------------------------------------------------- #
+def _template_sources(jinja2_env):
+    """
+    Generate the name and source of all the templates available to the given
+    Jinja2 environment. Files which are not UTF-8 text, such as the binary
+    files copied by the verbatim renderer, are not templates and skipped.
+    """
+
+    for name in jinja2_env.list_templates():
+        try:
+            source = jinja2_env.loader.get_source(jinja2_env, name)[0]
+        except UnicodeDecodeError:
+            continue
+        yield name, source
+
+
+# --------------------------------------------------------------------------- #
+def templates_checksum(jinja2_env):
+    """
+    Compute checksum of the names and sources of all the templates available
+    to the given Jinja2 environment, files which are not UTF-8 text are left
+    out.
+
+    :param jinja2_env: Jinja2 environment with a source loader.
+    :type jinja2_env: :class:`jinja2.Environment`
+
+    :return: hex digest of the templates checksum
+    :rtype: str
+    """
+
+    checksum = sha1()
+
+    for name, source in _template_sources(jinja2_env):
+        checksum.update(name.encode('utf-8'))
+        checksum.update(b'\0')
+        checksum.update(source.encode('utf-8'))
+        checksum.update(b'\0')
+
+    return checksum.hexdigest()
+
+
+# --------------------------------------------------------------------------- #
+def _bundle_compatibility():
+    """
+    Return manifest information a compiled templates bundle has to match to
+    be loaded by the running interpreter and Jinja2.
+    """
+
+    return {
+        'jinja2_version': jinja2_version,
+        'python_version': '%d.%d' % sys.version_info[:2],
+        }
+
+
+# --------------------------------------------------------------------------- #
+def compile_templates_bundle(
+    templates_path,
+    bundle_path,
+    zip=False,
+    environment_options=None
+):
+    """
+    Compile all the templates in the templates path into importable Python
+    modules, stored in the bundle folder or zip file, to be loaded using
+    Jinja2's module loader. The bundle stores the templates checksum, so a
+    bundle compiled from different template sources is rejected. Files which
+    are not UTF-8 text, such as the binary files copied by the verbatim
+    renderer, are not compiled.
+
+    :param templates_path: path to the templates folder.
+    :type templates_path: str/unicode
+
+    :param bundle_path: path to the bundle folder or zip file.
+    :type bundle_path: str/unicode
+
+    :param zip: Optional, compile into a zip file instead of a folder.
+    :type zip: bool
+
+    :param environment_options:
+
+        Optional, dictionary of Jinja2 environment options the templates are
+        compiled with.
+
+    :type environment_options: dict
+
+    :return: sorted list of the compiled template names.
+    :rtype: list
+
+    :raises:
+
+        :class:`TemplateBundleError` if any template could not be compiled
+        or bundle could not be written.
+    """
+
+    # handle mutable default
+    if environment_options is None:
+        environment_options = {}
+
+    jinja2_env = Environment(
+        loader=FileSystemLoader(searchpath=templates_path),
+        **environment_options)
+
+    names = [name for name, source in _template_sources(jinja2_env)]
+
+    manifest = _bundle_compatibility()
+    manifest['checksum'] = templates_checksum(jinja2_env)
+    manifest['templates'] = len(names)
+    manifest = json_dumps(manifest, sort_keys=True)
+
+    try:
+        jinja2_env.compile_templates(
+            bundle_path,
+            zip='deflated' if zip else None,
+            filter_func=frozenset(names).__contains__,
+            log_function=lambda message: None,
+            ignore_errors=False,
+            py_compile=True)
+
+        if zip:
+            from zipfile import ZipFile
+
+            bundle = ZipFile(bundle_path, 'a')
+            try:
+                bundle.writestr(BUNDLE_MANIFEST_NAME, manifest)
+            finally:
+                bundle.close()
+        else:
+            manifest_path = join(bundle_path, BUNDLE_MANIFEST_NAME)
+            with io_open(manifest_path, 'w', encoding='utf-8') as f:
+                f.write(u'%s' % manifest)
+    except TemplateError as err:
+        raise TemplateBundleError(
+            'Failed to compile templates bundle: %s\n\n%s'
+            % (bundle_path, err))
+    except EnvironmentError as err:
+        raise TemplateBundleError(
+            "[Errno %d] %s: '%s'" % (err.errno, err.strerror, err.filename))
+
+    return names
+
+
+# --------------------------------------------------------------------------- #
+def check_templates_bundle(bundle_path, jinja2_env):
+    """
+    Check the compiled templates bundle can be loaded by the running Python
+    and Jinja2 and that it was compiled from the sources available to the
+    given Jinja2 environment.
+
+    :param bundle_path: path to the bundle folder or zip file.
+    :type bundle_path: str/unicode
+
+    :param jinja2_env: Jinja2 environment loading the template sources.
+    :type jinja2_env: :class:`jinja2.Environment`
+
+    :return: bundle path
+    :rtype: str/unicode
+
+    :raises:
+
+        :class:`TemplateBundleError` if the bundle manifest could not be read,
+        the bundle was compiled by a different Python or Jinja2 version, or
+        the templates sources changed since the bundle was compiled.
+    """
+
+    # zipfile is only imported when bundles are used
+    from zipfile import BadZipfile
+    from zipfile import ZipFile
+
+    try:
+        if isdir(bundle_path):
+            manifest_path = join(bundle_path, BUNDLE_MANIFEST_NAME)
+            with io_open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json_loads(f.read())
+        else:
+            bundle = ZipFile(bundle_path, 'r')
+            try:
+                manifest = json_loads(bundle.read(BUNDLE_MANIFEST_NAME))
+            finally:
+                bundle.close()
+    except (EnvironmentError, BadZipfile, KeyError, ValueError):
+        raise TemplateBundleError(
+            'Could not read compiled templates bundle manifest: %s'
+            % bundle_path)
+
+    for key, value in sorted(_bundle_compatibility().items()):
+        if manifest.get(key) != value:
+            raise TemplateBundleError(
+                'Compiled templates bundle %s is incompatible, it was '
+                'compiled with %s %s instead of %s'
+                % (bundle_path, key, manifest.get(key), value))
+
+    if manifest.get('checksum') != templates_checksum(jinja2_env):
+        raise TemplateBundleError(
+            'Compiled templates bundle is stale, templates changed since it '
+            'was compiled: %s' % bundle_path)
+
+    return bundle_path
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+
+"""
+Template renderer registry. Maps renderer names and glob patterns of config
+paths to template renderer classes, which are imported on first use.
+"""
+
+from fnmatch import fnmatch
+
+from importlib import import_module
+
+from ..compat import string_types
+from ..exceptions import InvalidName
+
+# --------------------------------------------------------------------------- #
+# entry point group external template renderers are registered in, mapping
+# renderer names to template renderer classes
+ENTRY_POINT_GROUP = 'configme.renderers'
+
+# built-in template renderers by name, as `module:class` import paths
+BUILTIN_TEMPLATE_RENDERERS = {
+    'jinja2':
+        'configme.renderers.jinja2_rendering:Jinja2TemplateRenderer',
+    'substitution':
+        'configme.renderers.substitution_rendering:'
+        'SubstitutionTemplateRenderer',
+    'verbatim':
+        'configme.renderers.verbatim_rendering:VerbatimTemplateRenderer',
+    }
+
+# name of the template renderer of the configs matching no pattern
+DEFAULT_TEMPLATE_RENDERER = 'jinja2'
+
+
+# --------------------------------------------------------------------------- #
+def _iter_entry_points(group):
+    """
+    :return: entry points of the given group, none if setuptools is missing.
+    """
+
+    # pkg_resources scans all the installed distributions when imported, so
+    # it is only imported when an unknown renderer is looked up
+    try:
+        from pkg_resources import iter_entry_points
+    except ImportError:  # pragma: no cover
+        return []
+
+    return iter_entry_points(group)
+
+
+# --------------------------------------------------------------------------- #
+class TemplateRendererRegistry(object):
+    """
+    Registry of template renderers by name and of the glob patterns of config
+    paths, such as `*.j2`, selecting them. Renderers are registered as
+    classes or as `module:class` import paths, imported on first use, so
+    the template engines of renderers which are not used are never imported.
+
+    Names which are not registered are looked up in the `configme.renderers`
+    entry point group, so external packages can provide renderers.
+
+    :param patterns:
+
+        Optional, list of two element tuples of a glob pattern and the name
+        or class of the template renderer of the configs whose paths match
+        it. Defaults to no patterns.
+
+    :type patterns: list
+
+    :param default:
+
+        Optional, name or class of the template renderer of the configs
+        matching no pattern. Defaults to `jinja2`.
+
+    :type default: str/class
+    """
+
+    # ....................................................................... #
+    def __init__(self, patterns=None, default=DEFAULT_TEMPLATE_RENDERER,
+                 _import_module=import_module,
+                 _iter_entry_points=_iter_entry_points):
+
+        self._import_module = _import_module
+        self._iter_entry_points = _iter_entry_points
+
+        # template renderer classes or import paths by name
+        self._renderers = dict(BUILTIN_TEMPLATE_RENDERERS)
+
+        self.patterns = []
+        for pattern, renderer in patterns or ():
+            self.register_pattern(pattern, renderer)
+
+        self.default = default
+
+    # ....................................................................... #
+    def register(self, name, renderer):
+        """
+        Register template renderer under the given name, replacing the
+        renderer registered under the name before.
+
+        :param name: template renderer name
+        :type name: str
+
+        :param renderer: template renderer class or `module:class` path.
+        :type renderer: class/str
+        """
+        self._renderers[name] = renderer
+
+    # ....................................................................... #
+    def register_pattern(self, pattern, renderer):
+        """
+        Select the given template renderer for the configs whose paths match
+        the glob pattern. Patterns are matched in the order they are
+        registered, the first matching one is used.
+
+        :param pattern: glob pattern such as `*.pem`.
+        :type pattern: str
+
+        :param renderer: template renderer name or class.
+        :type renderer: str/class
+
+        :raises: :class:`InvalidName` if there is no renderer with the name.
+        """
+
+        self.check(renderer)
+        self.patterns.append((pattern, renderer))
+
+    # ....................................................................... #
+    def check(self, renderer):
+        """
+        Check that the template renderer exists, without importing it.
+
+        :param renderer: template renderer name or class.
+        :type renderer: str/class
+
+        :raises: :class:`InvalidName` if there is no renderer with the name.
+        """
+
+        if isinstance(renderer, string_types) and not self.exists(renderer):
+            raise self._unknown(renderer)
+
+    # ....................................................................... #
+    def names(self):
+        """
+        :return: sorted list of the names of all the template renderers.
+        :rtype: list
+        """
+
+        names = set(self._renderers)
+        names.update(
+            entry_point.name
+            for entry_point in self._iter_entry_points(ENTRY_POINT_GROUP))
+
+        return sorted(names)
+
+    # ....................................................................... #
+    def exists(self, name):
+        """
+        :return:
+
+            True if there is a template renderer with the given name, without
+            importing it.
+
+        :rtype: bool
+        """
+        return name in self._renderers or name in self.names()
+
+    # ....................................................................... #
+    def get(self, name):
+        """
+        Return the template renderer class with the given name, importing it
+        the first time.
+
+        :param name: template renderer name
+        :type name: str
+
+        :return: template renderer class
+        :rtype: :class:`BaseTemplateRenderer`
+
+        :raises:
+
+            :class:`InvalidName` if there is no renderer with the name or it
+            could not be imported.
+        """
+
+        try:
+            renderer = self._renderers[name]
+        except KeyError:
+            renderer = self._load_entry_point(name)
+
+        if isinstance(renderer, string_types):
+            module_name, _, class_name = renderer.partition(':')
+            try:
+                renderer = getattr(
+                    self._import_module(module_name),
+                    class_name)
+            except (ImportError, AttributeError) as err:
+                raise InvalidName(
+                    "Could not import template renderer '%s': %s"
+                    % (name, err))
+
+            self._renderers[name] = renderer
+
+        return renderer
+
+    # ....................................................................... #
+    def _load_entry_point(self, name):
+
+        for entry_point in self._iter_entry_points(ENTRY_POINT_GROUP):
+            if entry_point.name == name:
+                try:
+                    renderer = entry_point.load()
+                except ImportError as err:
+                    raise InvalidName(
+                        "Could not import template renderer '%s': %s"
+                        % (name, err))
+
+                self._renderers[name] = renderer
+                return renderer
+
+        raise self._unknown(name)
+
+    # ....................................................................... #
+    def _unknown(self, name):
+        return InvalidName(
+            "Unknown template renderer '%s', available renderers: %s"
+            % (name, ', '.join(self.names())))
+
+    # ....................................................................... #
+    def resolve(self, renderer):
+        """
+        :param renderer: template renderer name or class.
+        :type renderer: str/class
+
+        :return: template renderer class
+        :rtype: :class:`BaseTemplateRenderer`
+        """
+
+        if isinstance(renderer, string_types):
+            return self.get(renderer)
+
+        return renderer
+
+    # ....................................................................... #
+    def match(self, path, patterns=(), default=None):
+        """
+        Return the template renderer class for the config with the given
+        path: the renderer of the first of the given patterns matching it,
+        or of the first registered pattern matching it, or the default.
+
+        :param path: config path, the section name in the settings file.
+        :type path: str/unicode
+
+        :param patterns:
+
+            Optional, list of two element tuples of a glob pattern and the
+            name or class of the template renderer, checked before the
+            registered patterns.
+
+        :type patterns: list
+
+        :param default:
+
+            Optional, name or class of the template renderer of the configs
+            matching no pattern. Defaults to the registry's `default`.
+
+        :type default: str/class
+
+        :return: template renderer class
+        :rtype: :class:`BaseTemplateRenderer`
+        """
+
+        for pattern, renderer in list(patterns) + self.patterns:
+            if fnmatch(path, pattern):
+                return self.resolve(renderer)
+
+        return self.resolve(self.default if default is None else default)
+
+
+# --------------------------------------------------------------------------- #
+# registry used by configurators by default
+template_renderer_registry = TemplateRendererRegistry()
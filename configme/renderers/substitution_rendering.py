@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+"""
+Substitution Template Renderer. Renders templates which only substitute
+settings into `{{ name }}` placeholders, without Jinja2.
+"""
+
+import re
+
+from hashlib import sha1
+
+from io import open as io_open
+
+from os.path import join
+
+from ..rendering import BaseTemplateRenderer
+
+from ..exceptions import TemplateRenderError
+
+
+# --------------------------------------------------------------------------- #
+# placeholder substituting the setting with the given name, the same syntax
+# as the one of a Jinja2 variable
+_PLACEHOLDER_RE = re.compile(r'\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}')
+
+# Jinja2 syntax the substitution templates do not support
+_UNSUPPORTED_RE = re.compile(r'\{[{%#]')
+
+
+# --------------------------------------------------------------------------- #
+class SubstitutionTemplate(object):
+    """
+    Substitution template compiled into the list of its segments: literal
+    text alternating with the placeholders. Rendering fills the placeholder
+    slots of a copy of the segments and joins them.
+
+    :param source: template source
+    :type source: unicode
+
+    :param keep_trailing_newline:
+
+        Optional, keep the newline ending the source. Defaults to False, the
+        newline is removed like Jinja2 does by default.
+
+    :type keep_trailing_newline: bool
+
+    :raises:
+
+        ValueError if the source contains Jinja2 syntax other than plain
+        variable placeholders.
+    """
+
+    # ....................................................................... #
+    def __init__(self, source, keep_trailing_newline=False):
+
+        self.digest = sha1(source.encode('utf-8')).hexdigest()
+
+        if not keep_trailing_newline and source.endswith(u'\n'):
+            source = source[:-1]
+
+        placeholders = set(
+            match.start() for match in _PLACEHOLDER_RE.finditer(source))
+
+        for match in _UNSUPPORTED_RE.finditer(source):
+            if match.start() not in placeholders:
+                line = source.count(u'\n', 0, match.start()) + 1
+                raise ValueError(
+                    "Unsupported template syntax '%s' on line %d, only "
+                    "'{{ name }}' placeholders are supported"
+                    % (match.group(), line))
+
+        # even items are literal text, odd items placeholder names
+        parts = _PLACEHOLDER_RE.split(source)
+
+        self.segments = parts
+        self.slots = [(index, parts[index])
+                      for index in range(1, len(parts), 2)]
+        self.names = sorted(set(name for _, name in self.slots))
+
+    # ....................................................................... #
+    def render(self, settings):
+        """
+        :param settings: settings to substitute, only the ones used are read.
+        :type settings: dict/:class:`LayeredSettings`
+
+        :return:
+
+            rendered template. Placeholders of missing settings are replaced
+            with an empty string, like Jinja2 renders undefined variables.
+
+        :rtype: unicode
+        """
+
+        parts = list(self.segments)
+        for index, name in self.slots:
+            parts[index] = settings.get(name, u'')
+
+        return u''.join(parts)
+
+
+# --------------------------------------------------------------------------- #
+class SubstitutionEnvironment(object):
+    """
+    Loads and caches compiled substitution templates from the templates
+    folder. Shared by all the substitution renderers of a configurator.
+
+    :param templates_path: templates folder path
+    :type templates_path: str/unicode
+
+    :param keep_trailing_newline: see :class:`SubstitutionTemplate`.
+    :type keep_trailing_newline: bool
+    """
+
+    # ....................................................................... #
+    def __init__(self, templates_path, keep_trailing_newline=False,
+                 _io_open=io_open):
+
+        self.templates_path = templates_path
+        self.keep_trailing_newline = keep_trailing_newline
+        self._io_open = _io_open
+
+        # compiled templates by name
+        self.cache = {}
+
+    # ....................................................................... #
+    def get_template(self, name):
+        """
+        :param name: template name, its path relative to `templates_path`.
+        :type name: str/unicode
+
+        :return: compiled template
+        :rtype: :class:`SubstitutionTemplate`
+
+        :raises:
+
+            EnvironmentError if the template could not be read, ValueError if
+            it is not a valid substitution template.
+        """
+
+        try:
+            return self.cache[name]
+        except KeyError:
+            pass
+
+        file_path = join(self.templates_path, *name.split('/'))
+        with self._io_open(file_path, 'r', encoding='utf-8') as file_handler:
+            template = SubstitutionTemplate(
+                file_handler.read(),
+                self.keep_trailing_newline)
+
+        self.cache[name] = template
+
+        return template
+
+    # ....................................................................... #
+    def invalidate(self, names=None):
+        """
+        Forget the compiled templates with the given names, all of them by
+        default.
+        """
+
+        if names is None:
+            self.cache.clear()
+            return
+
+        for name in names:
+            self.cache.pop(name, None)
+
+
+# --------------------------------------------------------------------------- #
+class SubstitutionTemplateRenderer(BaseTemplateRenderer):
+    """
+    Substitution Template Renderer, a much faster alternative to the Jinja2
+    renderer for templates which only substitute settings into `{{ name }}`
+    placeholders. Templates using any other Jinja2 syntax fail to render.
+    """
+
+    name = 'substitution'
+
+    environment = None
+
+    # ....................................................................... #
+    def __init__(self, config, role_output_folder_path, path, settings):
+
+        BaseTemplateRenderer.__init__(
+            self, config, role_output_folder_path, path, settings)
+
+        self.environment = self.config.template_environment(self.__class__)
+
+    # ....................................................................... #
+    @classmethod
+    def create_environment(cls, config):
+        """
+        Create substitution environment loading templates from the config's
+        `templates_path`. Like Jinja2, the newline ending a template is
+        removed unless the config's `template_environment_options` turn on
+        `keep_trailing_newline`.
+
+        :return: substitution environment
+        :rtype: :class:`SubstitutionEnvironment`
+        """
+
+        options = config.template_environment_options or {}
+
+        return SubstitutionEnvironment(
+            config.templates_path,
+            options.get('keep_trailing_newline', False))
+
+    # ....................................................................... #
+    @classmethod
+    def invalidate(cls, config, names=None):
+        """
+        Forget the compiled templates with the given names.
+        """
+        config.template_environment(cls).invalidate(names)
+
+    # ....................................................................... #
+    def template_dependencies(self):
+        """
+        :return:
+
+            two element tuple of dictionary mapping the template name to the
+            digest of its source and of list of the placeholder names, or
+            None if the template could not be loaded.
+
+        :rtype: tuple
+        """
+
+        try:
+            template = self.environment.get_template(self.path)
+        except (EnvironmentError, ValueError):
+            return None
+
+        return {self.path: template.digest}, template.names
+
+    # ....................................................................... #
+    def get_rendered_config(self):
+        """
+        Render and return the config.
+
+        :return: rendered config
+        :rype: unicode
+
+        :raises:
+
+            :class:`TemplateRenderError` if the template could not be loaded
+            or is not a valid substitution template.
+        """
+
+        return self.load_template().render(self.settings)
+
+    # ....................................................................... #
+    def load_template(self):
+        """
+        Load and compile the template, or get it from the environment's
+        cache.
+
+        :return: template
+        :rtype: :class:`SubstitutionTemplate`
+
+        :raises:
+
+            :class:`TemplateRenderError` if the template could not be loaded
+            or is not a valid substitution template.
+        """
+
+        try:
+            return self.environment.get_template(self.path)
+        except (EnvironmentError, ValueError) as err:
+            raise TemplateRenderError(
+                'Failed to render config template: %s\n\n%s'
+                % (self.path, err))
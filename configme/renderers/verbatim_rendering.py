@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+Verbatim Template Renderer. Copies templates to the output as they are, for
+static and binary files such as certificates and keys.
+"""
+
+from hashlib import sha1
+
+from io import open as io_open
+
+from os.path import join
+
+from ..rendering import BaseTemplateRenderer
+
+from ..exceptions import TemplateRenderError
+
+
+# --------------------------------------------------------------------------- #
+class VerbatimTemplateRenderer(BaseTemplateRenderer):
+    """
+    Verbatim Template Renderer, copies the bytes of the template to the
+    output file without interpolating any settings, so files which are not
+    templates, or are not even text, can live in the templates folder.
+    """
+
+    name = 'verbatim'
+
+    _content = None
+
+    # ....................................................................... #
+    def __init__(self, config, role_output_folder_path, path, settings,
+                 _io_open=io_open):
+
+        BaseTemplateRenderer.__init__(
+            self, config, role_output_folder_path, path, settings)
+
+        self._io_open = _io_open
+
+    # ....................................................................... #
+    def template_dependencies(self):
+        """
+        :return:
+
+            two element tuple of dictionary mapping the template name to the
+            digest of its content and of an empty list, since no settings are
+            used, or None if the template could not be read.
+
+        :rtype: tuple
+        """
+
+        try:
+            content = self.get_rendered_config()
+        except TemplateRenderError:
+            return None
+
+        return {self.path: sha1(content).hexdigest()}, []
+
+    # ....................................................................... #
+    def get_rendered_config(self):
+        """
+        Read and return the template, once per renderer.
+
+        :return: template content
+        :rype: bytes
+
+        :raises:
+
+            :class:`TemplateRenderError` if the template could not be read.
+        """
+
+        if self._content is None:
+            file_path = join(self.config.templates_path, *self.path.split('/'))
+            try:
+                with self._io_open(file_path, 'rb') as file_handler:
+                    self._content = file_handler.read()
+            except EnvironmentError as err:
+                raise TemplateRenderError(
+                    'Failed to render config template: %s\n\n%s'
+                    % (self.path, err))
+
+        return self._content
+
+    # ....................................................................... #
+    def load_template(self):
+        """
+        Read the template, see :meth:`get_rendered_config`.
+        """
+        return self.get_rendered_config()
+
+    # ....................................................................... #
+    def write(self, content=None, manifest=None):
+        """
+        See :meth:`BaseTemplateRenderer.write`. The given `content` is the
+        one read by this renderer, the config is always written out from it
+        in binary mode.
+        """
+        return BaseTemplateRenderer.write(self, manifest=manifest)
+
+    # ....................................................................... #
+    def write_chunks(self, chunks):
+        """
+        Write the template content chunks to the output file as they are.
+        """
+
+        if self.keep_unchanged:
+            self.config._asset_manager.write_chunks_if_changed(
+                self.output_file_path,
+                chunks,
+                binary=True)
+            return self.output_file_path
+
+        return self.config._asset_manager.write_chunks_to_file(
+            self.output_file_path,
+            chunks,
+            binary=True)
+
+    # ....................................................................... #
+    def write_temporary_file(self, chunks):
+        """
+        Write the template content chunks to a temporary file as they are.
+        """
+        return self.config._asset_manager.write_temporary_file(
+            self.output_file_path,
+            chunks,
+            binary=True)
+
+    # ....................................................................... #
+    def unchanged(self):
+        """
+        Compare the template content with the output file as it is.
+        """
+        return self.config._asset_manager.file_matches(
+            self.output_file_path,
+            self.generate_rendered_config(),
+            binary=True)
@@ -6,8 +6,12 @@ Template Renderers
 from abc import ABCMeta
 from abc import abstractmethod
 
+from hashlib import sha1
+
 from .exceptions import InvalidName
 
+from .manifest import Manifest
+
 
 # --------------------------------------------------------------------------- #
 class BaseTemplateRenderer(object):
@@ -46,9 +50,10 @@ class BaseTemplateRenderer(object):
     :param settings:
 
         A dictionary containing parsed and interpolated settings from the
-        settings file for this section.
+        settings file for this section, or a read-only mapping interpolating
+        them on demand.
 
-    :type settings: <dict>
+    :type settings: <dict>/:class:`SectionSettings`
 
     :raises:
 
@@ -62,6 +67,11 @@ class BaseTemplateRenderer(object):
 
     __metaclass__ = ABCMeta
 
+    # ....................................................................... #
+    # name selecting the renderer in the settings, see
+    # :class:`TemplateRendererRegistry`
+    name = None
+
     # ....................................................................... #
     config = None
 
@@ -74,6 +84,20 @@ class BaseTemplateRenderer(object):
     # ....................................................................... #
     settings = None
 
+    # ....................................................................... #
+    _dependencies = None
+
+    # ....................................................................... #
+    # set when the folder of the output file was created ahead of writing it,
+    # such as by the role for all its configs at once, so writing the config
+    # neither checks nor creates it
+    output_folder_exists = False
+
+    # ....................................................................... #
+    # set to write the output file only if its content changed, leaving an
+    # identical file untouched, see AssetManager.write_chunks_if_changed
+    keep_unchanged = False
+
     # ....................................................................... #
     def __init__(self, config, role_output_folder_path, path, settings):
         """
@@ -87,6 +111,52 @@ class BaseTemplateRenderer(object):
 
         self.settings = settings
 
+    # ....................................................................... #
+    @classmethod
+    def create_environment(cls, config):
+        """
+        Create and return the template environment shared by all renderers
+        of this class for the given config. See
+        :meth:`Configurator.template_environment`.
+
+        Renderers that do not need a shared environment do not have to
+        override this method.
+
+        :param config: configurator the environment is created for.
+        :type config: :class:`Configurator`
+
+        :return: template environment or None
+        """
+        return None
+
+    # ....................................................................... #
+    @classmethod
+    def prewarm(cls, config):
+        """
+        Load and compile all the templates available to renderers of this
+        class for the given config ahead of time. Does nothing by default.
+
+        :param config: configurator whose templates to load.
+        :type config: :class:`Configurator`
+        """
+        pass
+
+    # ....................................................................... #
+    @classmethod
+    def invalidate(cls, config, names=None):
+        """
+        Forget anything cached about the templates with the given names in
+        the environment shared by renderers of this class for the given
+        config, since their sources changed. Does nothing by default.
+
+        :param config: configurator whose templates changed.
+        :type config: :class:`Configurator`
+
+        :param names: Optional, template names. Defaults to all templates.
+        :type names: list
+        """
+        pass
+
     # ....................................................................... #
     @property
     def output_file_path(self):
@@ -106,14 +176,29 @@ class BaseTemplateRenderer(object):
             (self.role_output_folder_path, self.path))
 
     # ....................................................................... #
-    def write(self):
+    def write(self, content=None, manifest=None):
         """
         Create the output folder specified in `output_folder_path`.
         If the parents for the folder do not exist they will be created as
         well (same behaviour as mkdir -p).
 
         If there is not the config file path has no folder, then do not create
-        any folder, but simply return the role folder
+        any folder, but simply return the role folder. The folder is neither
+        checked nor created when `output_folder_exists` is set.
+
+        Then render the config streaming it to the output file, or if the
+        `content` is given write it out instead of rendering the config.
+
+        :param content: Optional, already rendered config.
+        :type content: str/unicode
+
+        :param manifest:
+
+            Optional, manifest of the incremental generation. When given the
+            config is written out only if it changed since the run recorded
+            in the manifest, and it is recorded in the manifest.
+
+        :type manifest: :class:`Manifest`
 
         :return: path to the the created output folder.
         :rype: str
@@ -124,23 +209,294 @@ class BaseTemplateRenderer(object):
             at the output_folder path
         """
 
+        if manifest is not None:
+            return self._write_incremental(content, manifest)
+
+        asset_manager = self.config._asset_manager
+
+        if not self.output_folder_exists:
+            # otherwise get the folder path for the output file
+            output_file_folder = asset_manager.path_folder(
+                self.output_file_path)
+
+            # check if the asset or location already exist at this path
+            # fyi, this may raise AssetLocationTaken error
+            asset_manager.asset_or_location_exists(output_file_folder)
+
+            # create folder
+            asset_manager.create_folder(output_file_folder)
+
+        # write out the already rendered config
+        if content is not None:
+            return self.write_chunks([content])
+
+        # stream the rendered config to file
+        return self.write_chunks(self.generate_rendered_config())
+
+    # ....................................................................... #
+    def write_chunks(self, chunks):
+        """
+        Write the rendered config chunks to the output file, whose folder
+        must exist. Renderers producing bytes override this method. With
+        `keep_unchanged` the file is written only if its content changed.
+
+        :param chunks: iterable of rendered config chunks
+        :type chunks: iterable
+
+        :return: path to the the output file.
+        :rype: str
+        """
+
+        if self.keep_unchanged:
+            self.config._asset_manager.write_chunks_if_changed(
+                self.output_file_path,
+                chunks)
+            return self.output_file_path
+
+        return self.config._asset_manager.write_chunks_to_file(
+            self.output_file_path,
+            chunks)
+
+    # ....................................................................... #
+    def unchanged(self):
+        """
+        Render the config and compare it with the output file, without
+        writing anything. Renderers producing bytes override this method.
+
+        :return: True if the output file has the rendered config as content.
+        :rtype: bool
+
+        :raises:
+
+            :class:`TemplateRenderError` for any template look up or render
+            error.
+        """
+        return self.config._asset_manager.file_matches(
+            self.output_file_path,
+            self.generate_rendered_config())
+
+    # ....................................................................... #
+    def write_temporary_file(self, chunks):
+        """
+        Write the rendered config chunks to a temporary file in the folder of
+        the output file, which must exist. Renderers producing bytes override
+        this method.
+
+        :param chunks: iterable of rendered config chunks
+        :type chunks: iterable
+
+        :return:
+
+            path of the temporary file, see
+            :meth:`AssetManager.write_temporary_file`.
+
+        :rype: str
+        """
+        return self.config._asset_manager.write_temporary_file(
+            self.output_file_path,
+            chunks)
+
+    # ....................................................................... #
+    def _write_incremental(self, content, manifest):
+        """
+        Write out the config only if its content digest or the size of the
+        file on disk differ from the ones recorded in the manifest of the
+        previous run, and record the config in the manifest.
+
+        The config is streamed to a temporary file and digested as it is
+        rendered, then renamed over the output file if it changed or
+        discarded, so it is never held in memory. With `keep_unchanged` a
+        config the manifest shows as changed is discarded too if it is
+        identical to the file on disk.
+
+        :return: path to the the output file.
+        :rype: str
+        """
+
         asset_manager = self.config._asset_manager
 
-        # otherwise get the folder path for the output file
-        output_file_folder = asset_manager.path_folder(self.output_file_path)
+        # nothing the config depends on changed, do not even render it
+        if content is None and self.up_to_date(manifest):
+            return self.output_file_path
+
+        if content is None:
+            chunks = self.generate_rendered_config()
+        else:
+            chunks = [content]
+
+        if not self.output_folder_exists:
+            output_file_folder = asset_manager.path_folder(
+                self.output_file_path)
+
+            # fyi, this may raise AssetLocationTaken error
+            asset_manager.asset_or_location_exists(output_file_folder)
+            asset_manager.create_folder(output_file_folder, exist_ok=True)
+
+        dependencies = self.dependencies()
+
+        content_hash = sha1()
+        temporary_path = self.write_temporary_file(
+            manifest.digesting(chunks, content_hash))
+
+        digest = content_hash.hexdigest()
+        size = asset_manager.file_size(self.output_file_path)
+
+        # the file on disk is the one the manifest recorded, or is identical
+        if manifest.unchanged(self.path, digest, size) or (
+                self.keep_unchanged and
+                size == asset_manager.file_size(temporary_path) and
+                asset_manager.file_digest(self.output_file_path) ==
+                asset_manager.file_digest(temporary_path)):
+            asset_manager.remove_file(temporary_path)
+            manifest.record(self.path, digest, size, dependencies)
+            return self.output_file_path
 
-        # check if the asset or location already exist at this path
-        # fyi, this may raise AssetLocationTaken error
-        asset_manager.asset_or_location_exists(output_file_folder)
+        size = asset_manager.file_size(temporary_path)
+        asset_manager.replace_file(temporary_path, self.output_file_path)
+        manifest.record(self.path, digest, size, dependencies)
 
-        # create folder
-        asset_manager.create_folder(output_file_folder)
+        return self.output_file_path
 
-        # get the rendered config
-        content = self.get_rendered_config()
+    # ....................................................................... #
+    def up_to_date(self, manifest):
+        """
+        Check whether the templates and the settings the config depends on
+        changed since the run recorded in the given manifest. If they did not
+        and the config file on disk is the one the manifest recorded, the
+        config is recorded in the manifest as kept and does not need to be
+        rendered.
+
+        :param manifest: manifest of the incremental generation.
+        :type manifest: :class:`Manifest`
+
+        :return: True if the config is up to date.
+        :rtype: bool
+        """
 
-        # write to file
-        return asset_manager.write_to_file(self.output_file_path, content)
+        dependencies = self.recorded_dependencies(manifest)
+        if dependencies is None:
+            dependencies = self.dependencies()
+            if dependencies is None:
+                return False
+
+        asset_manager = self.config._asset_manager
+
+        return manifest.up_to_date(
+            self.path,
+            dependencies,
+            asset_manager.file_size(self.output_file_path))
+
+    # ....................................................................... #
+    def recorded_dependencies(self, manifest):
+        """
+        Compute the dependencies of the config from the current sources of
+        the templates and the current values of the settings the given
+        manifest recorded for it, without analyzing the templates. The same
+        template sources use the same templates and settings, so their digest
+        is the recorded one only if none of them changed.
+
+        :param manifest: manifest of the incremental generation.
+        :type manifest: :class:`Manifest`
+
+        :return:
+
+            dependencies of the config, see :meth:`dependencies`, or None if
+            none were recorded or the `template_digests` are not known.
+
+        :rtype: dict
+        """
+
+        recorded = manifest.recorded_dependencies(self.path)
+        if recorded is None:
+            return None
+
+        templates = self.template_digests(recorded['templates'])
+        if templates is None:
+            return None
+
+        settings = dict(
+            (key, self.settings.get(key)) for key in recorded['settings'])
+
+        return Manifest.dependencies(templates, settings)
+
+    # ....................................................................... #
+    def dependencies(self):
+        """
+        :return:
+
+            dependencies of the config, as returned by
+            :meth:`Manifest.dependencies` for the `template_dependencies`,
+            or None if they are not known. Computed once per renderer.
+
+        :rtype: dict
+        """
+
+        if self._dependencies is None:
+            template_dependencies = self.template_dependencies()
+            if template_dependencies is None:
+                return None
+
+            templates, keys = template_dependencies
+
+            # only the settings used are interpolated
+            self._dependencies = Manifest.dependencies(
+                templates,
+                dict((key, self.settings.get(key)) for key in keys))
+
+        return self._dependencies
+
+    # ....................................................................... #
+    def template_dependencies(self):
+        """
+        Return the templates this config is rendered from and the settings
+        keys they use. Renderers that can not tell do not have to override
+        this method, their configs are always rendered.
+
+        :return:
+
+            two element tuple of dictionary mapping the names of the
+            templates to the digests of their sources and of list of the
+            settings keys used, or None if not known.
+
+        :rtype: tuple
+        """
+        return None
+
+    # ....................................................................... #
+    def template_digests(self, names):
+        """
+        Return the digests of the sources of the templates with the given
+        names, as returned by `template_dependencies`, without analyzing
+        them. Renderers that can not tell do not have to override this
+        method, the templates of their configs are always analyzed.
+
+        :param names: names of the templates
+        :type names: list
+
+        :return:
+
+            dictionary mapping the names of the templates to the digests of
+            their sources, or None if not known.
+
+        :rtype: dict
+        """
+        return None
+
+    # ....................................................................... #
+    def load_template(self):
+        """
+        Load the template of the config ahead of rendering it, so loading
+        and rendering can be timed separately. Renderers keep loaded
+        templates, rendering does not load them again. Renderers that do not
+        load templates do not have to override this method.
+
+        :return: template or None
+
+        :raises:
+
+            :class:`TemplateRenderError` if the template could not be loaded.
+        """
+        return None
 
     # ....................................................................... #
     @abstractmethod
@@ -163,6 +519,27 @@ class BaseTemplateRenderer(object):
         """
         pass  # pragma: no cover
 
+    # ....................................................................... #
+    def generate_rendered_config(self):
+        """
+        Return an iterable of rendered template chunks, which joined together
+        make up the rendered template. Used to stream large configs to file
+        without holding the whole of them in memory.
+
+        By default the whole rendered template returned by
+        `get_rendered_config` is the only chunk. Renderers able to render
+        incrementally should override this method.
+
+        :return: iterable of rendered template chunks
+        :rtype: iterable
+
+        :raises:
+
+            :class:`TemplateRenderError` for any template look up or render
+            error. The error may be raised while iterating.
+        """
+        return [self.get_rendered_config()]
+
     # ....................................................................... #
     @classmethod
     def validate_path(cls, path):
@@ -4,7 +4,23 @@
 Role Generator module.
 """
 
+from threading import Lock
+from threading import Thread
+
+from .compat import Queue
+
+from .exceptions import ConfigMeException
 from .exceptions import InvalidName
+from .exceptions import LocationNotFound
+
+from .manifest import MANIFEST_FILE_NAME_FORMAT
+from .manifest import Manifest
+
+from .rendering import BaseTemplateRenderer
+
+from .timings import NULL_TIMINGS
+from .timings import TOTAL_PHASE
+from .timings import Timings
 
 
 # --------------------------------------------------------------------------- #
@@ -132,14 +148,33 @@ class Role(object):
         :return:
 
             Path to the output role folder. The path is computed by
-            combining role's output path with the `suffixed_name`.
+            combining role's output path with the `suffixed_name`. Without
+            an output path it is the `suffixed_name`, the folder of the role
+            in a :class:`MemoryAssetManager`.
 
             This is computed readonly property.
 
         :rtype: str/unicode
         """
         path_join = self.config._asset_manager.path_join
-        return path_join((self.config.output_path, self.suffixed_name))
+        return path_join((self.config.output_path or '', self.suffixed_name))
+
+    # ....................................................................... #
+    @property
+    def manifest_file_path(self):
+        """
+        :return:
+
+            Path to the role's manifest file used by incremental generation,
+            stored next to the role folder in the output path.
+
+            This is computed readonly property.
+
+        :rtype: str/unicode
+        """
+        path_join = self.config._asset_manager.path_join
+        file_name = MANIFEST_FILE_NAME_FORMAT % self.suffixed_name
+        return path_join((self.config.output_path or '', file_name))
 
     # ....................................................................... #
     @property
@@ -171,12 +206,55 @@ class Role(object):
         self.variables = variables
 
     # ....................................................................... #
-    def write_configs(self):
+    def write_configs(self, workers=1, incremental=False, timings=None,
+                      keep_unchanged=False):
         """
         Create role folder. Then go over each config file creating parent
         folders. Interpolate settings into a config file and write it
         out to a file
 
+        :param workers:
+
+            Optional, number of threads rendering configs and as many threads
+            writing them out, so rendering overlaps with file system I/O.
+            At most `workers` rendered configs wait in memory to be written.
+            Defaults to 1, configs are rendered and written out one at a time
+            in the current thread.
+
+        :type workers: int
+
+        :param incremental:
+
+            Optional, instead of removing and rebuilding the role folder only
+            write out configs which changed since the previous run and remove
+            configs of the sections removed from the settings file. The
+            content hash and size of each config are recorded in the role's
+            manifest file, see `manifest_file_path`. When there is no valid
+            manifest the role folder is rebuilt. Defaults to False.
+
+        :type incremental: bool
+
+        :param timings:
+
+            Optional, timings the time spent in each phase of the role
+            generation and in each section is added to. When given, configs
+            are rendered before they are written out instead of being
+            streamed to disk, so rendering and writing are timed separately.
+            Defaults to None, nothing is timed.
+
+        :type timings: :class:`Timings`
+
+        :param keep_unchanged:
+
+            Optional, instead of removing and rebuilding the role folder
+            compare each rendered config with the existing file and leave it
+            untouched if it is identical, keeping its modification time.
+            Changed configs are replaced atomically, and the files of the
+            role folder which are not configs of the role are removed.
+            Defaults to False.
+
+        :type keep_unchanged: bool
+
         :return: sorted list of all the folders and files created.
         :rtype: list
 
@@ -185,52 +263,541 @@ class Role(object):
             :class:`LocationRemovalError` if old role folder could not be
             removed. This exception bubbled up from AssetsManager.
 
-            :class:`LocationCreationError` if role folder could not be created.
-            This exception bubbled up from AssetsManager.
+            :class:`LocationCreationError` if role folder or the folders of
+            the configs could not be created. This exception bubbled up from
+            AssetsManager.
+
+            :class:`InvalidName` if a section name is not a valid config
+            path, before any config is written.
 
             :class:`SettingsParsingError`: if could not load parse the given
             config file or variables for any section could not be interpolated.
-            This exception bubbled up from SettingsParser.
-        """
+            This exception bubbled up from SettingsParser. Sections are
+            interpolated as their configs are rendered, the configs of the
+            sections before a failing one are written out.
 
-        # list used to record folders and files created
-        output_list = []
+            When `workers` is more than 1 and several configs fail, the error
+            of the first failing section in the settings file is raised.
+        """
 
         asset_manager = self.config._asset_manager
 
+        if timings is None:
+            timings = NULL_TIMINGS
+
+        first = start = timings.start()
+
         # load and parse the settings files and return the the template
         # renderer instances generator.
         # fyi, this may raise SettingsParsingError
-        settings_parser = self.config._settings_parser_factory(
+        settings_parser = self.config.settings_parser(
             file_path=self.settings_file_path,
             variables=self.variables)
 
-        # read() may raise SettingsParsingError exception
-        files = settings_parser.read()
-
-        # create the top level folder which will contain all the configs
-        # this may raise LocationRemovalError or LocationCreationError
-        asset_manager.remove_folder(self.output_folder_path)
-        asset_manager.create_folder(self.output_folder_path)
+        # read() may raise SettingsParsingError exception, sections are
+        # interpolated when their configs are rendered, one at a time
+        files = settings_parser.read(lazy=True)
+        start = timings.since('settings', start)
+
+        manifest = None
+        if incremental:
+            manifest = self._read_manifest()
+
+        # the manifest is stale once configs are written, it is written out
+        # again only if all the configs are
+        # fyi, this may raise LocationRemovalError
+        asset_manager.remove_file(self.manifest_file_path)
+        start = timings.since('manifest', start)
+
+        # without a manifest the role folder is rebuilt, unless the files
+        # which did not change are kept, then the other files are removed
+        # once all the configs are written
+        rebuild = manifest is None
+        remove_others = rebuild and keep_unchanged
+
+        if rebuild and not keep_unchanged:
+            # create the top level folder which will contain all the configs
+            # this may raise LocationRemovalError or LocationCreationError
+            asset_manager.remove_folder(self.output_folder_path)
+            start = timings.since('remove_folder', start)
+            asset_manager.create_folder(self.output_folder_path)
+        else:
+            asset_manager.create_folder(
+                self.output_folder_path,
+                exist_ok=True)
+
+        if rebuild and incremental:
+            manifest = Manifest()
+
+        # this may raise InvalidName
+        section_names = settings_parser.section_names()
+        folders = self._output_folders(section_names)
+
+        # configs and folders of the previous run may be where folders and
+        # configs go now, they make way for them
+        # this may raise LocationRemovalError
+        replace = not rebuild or keep_unchanged
+        if replace:
+            for section_name in section_names:
+                asset_manager.remove_folder(asset_manager.path_join(
+                    (self.output_folder_path, section_name)))
+
+        # create the folders of all the configs up front, once each, so
+        # configs are written without checking nor creating their folders
+        # this may raise AssetLocationTaken or LocationCreationError
+        asset_manager.create_folders(
+            folders,
+            exist_ok=replace,
+            replace_files=replace)
+
+        timings.since('create_folder', start)
+
+        # create renderers, each config may use a different renderer
+        template_renderers = (
+            self._template_renderer(
+                relative_file_path,
+                settings,
+                keep_unchanged)
+            for relative_file_path, settings in files)
 
-        # iterate over file generators, creating their parent folders and
+        # iterate over template renderers, creating their parent folders and
         # then rendering templates to file record folder and file creation
-        for relative_file_path, settings in files:
-            # create renderer
-            template_renderer = self.config._template_renderer_factory(
-                self.config,
+        if workers > 1:
+            output_list = self._write_in_threads(
+                template_renderers,
+                workers,
+                manifest,
+                timings)
+        elif timings.enabled:
+            output_list = [
+                self._write_timed(template_renderer, manifest, timings)
+                for template_renderer in template_renderers]
+        else:
+            output_list = [template_renderer.write(manifest=manifest)
+                           for template_renderer in template_renderers]
+
+        if remove_others:
+            start = timings.start()
+            asset_manager.remove_files_except(
                 self.output_folder_path,
-                relative_file_path,
-                settings)
+                output_list)
+            timings.since('remove_folder', start)
 
-            # create renderer parent folder (recursively)
-            output_file_path = template_renderer.write()
-            # record the rendered config location
-            output_list.append(output_file_path)
+        if manifest is not None:
+            start = timings.start()
+            self._write_manifest(manifest, folders)
+            timings.since('manifest', start)
 
         # sort the output list
         output_list.sort()
 
+        timings.since(TOTAL_PHASE, first)
+
+        return output_list
+
+    # ....................................................................... #
+    def render(self):
+        """
+        Render the configs of the role without writing anything out, not
+        even the role folder. An output path is not needed.
+
+        :return:
+
+            generator of `(relative_path, content)` pairs, the path of the
+            config relative to the role folder, which is its section name,
+            and the rendered config, in the order of the sections in the
+            settings file. The configs of the renderers producing bytes, such
+            as the verbatim renderer, are bytes, the others unicode.
+
+        :rtype: generator
+
+        :raises:
+
+            :class:`InvalidName` if a section name is not a valid config
+            path.
+
+            :class:`SettingsParsingError` if the settings file could not be
+            parsed or the settings of a section could not be interpolated.
+
+            :class:`TemplateRenderError` if a template could not be rendered.
+
+            Sections are parsed and interpolated as their configs are
+            rendered, so errors are raised by the generator, once the
+            configs of the sections before the failing one were generated.
+        """
+
+        settings_parser = self.config.settings_parser(
+            file_path=self.settings_file_path,
+            variables=self.variables)
+
+        for relative_file_path, settings in settings_parser.read(lazy=True):
+            template_renderer = self._template_renderer(
+                relative_file_path,
+                settings)
+
+            yield relative_file_path, template_renderer.get_rendered_config()
+
+    # ....................................................................... #
+    def check_configs(self):
+        """
+        Render the configs of the role and compare them with the files in
+        the role folder, without writing nor removing anything. Configs
+        without a file are not rendered. The sizes are compared first, files
+        are read and hashed only when they are equal.
+
+        When the role was written with incremental generation, the configs
+        whose templates and settings did not change since are not rendered
+        either, their files are compared with the size and the content hash
+        recorded in the role's manifest instead.
+
+        :return:
+
+            three element tuple of the sorted lists of the paths of the files
+            which would be added, changed and removed by writing out the
+            role. All empty if the role folder is up to date.
+
+        :rtype: tuple
+
+        :raises:
+
+            :class:`InvalidName` if a section name is not a valid config
+            path.
+
+            :class:`SettingsParsingError` if the settings file could not be
+            parsed or the settings of a section could not be interpolated.
+
+            :class:`TemplateRenderError` if a template could not be rendered.
+        """
+
+        asset_manager = self.config._asset_manager
+
+        settings_parser = self.config.settings_parser(
+            file_path=self.settings_file_path,
+            variables=self.variables)
+
+        # the manifest is only read, it is not written out
+        manifest = self._read_manifest()
+
+        added = []
+        changed = []
+        output_paths = set()
+
+        for relative_file_path, settings in settings_parser.read(lazy=True):
+            template_renderer = self._template_renderer(
+                relative_file_path,
+                settings)
+
+            output_file_path = template_renderer.output_file_path
+            output_paths.add(output_file_path)
+
+            size = asset_manager.file_size(output_file_path)
+            if size is None:
+                added.append(output_file_path)
+                continue
+
+            # nothing the config depends on changed, the file must have the
+            # content recorded in the manifest
+            if manifest is not None and template_renderer.up_to_date(manifest):
+                unchanged = manifest.unchanged(
+                    template_renderer.path,
+                    asset_manager.file_digest(output_file_path),
+                    size)
+            else:
+                unchanged = template_renderer.unchanged()
+
+            if not unchanged:
+                changed.append(output_file_path)
+
+        removed = [
+            file_path
+            for file_path in asset_manager.list_files(self.output_folder_path)
+            if file_path not in output_paths]
+
+        added.sort()
+        changed.sort()
+
+        return added, changed, removed
+
+    # ....................................................................... #
+    def _template_renderer(self, relative_file_path, settings,
+                           keep_unchanged=False):
+        """
+        :return:
+
+            template renderer for the config, created by the template
+            renderer factory the config selects for it, writing the config
+            only if it changed when `keep_unchanged` is set.
+
+        :rtype: :class:`BaseTemplateRenderer`
+        """
+
+        template_renderer_factory = self.config.template_renderer_factory(
+            relative_file_path,
+            settings)
+
+        template_renderer = template_renderer_factory(
+            self.config,
+            self.output_folder_path,
+            relative_file_path,
+            settings)
+
+        # the folders of the configs are created by write_configs
+        template_renderer.output_folder_exists = True
+        template_renderer.keep_unchanged = keep_unchanged
+
+        return template_renderer
+
+    # ....................................................................... #
+    def _output_folders(self, paths):
+        """
+        :param paths: paths of the configs, the section names.
+        :type paths: list
+
+        :return:
+
+            sorted list of the folders of the configs and of their parent
+            folders in the role folder, parents first.
+
+        :rtype: list
+
+        :raises: :class:`InvalidName` if a path is invalid.
+        """
+
+        asset_manager = self.config._asset_manager
+        output_folder_path = self.output_folder_path
+
+        folders = set()
+        for path in paths:
+            # paths are validated before any folder is created for them
+            BaseTemplateRenderer.validate_path(path)
+
+            folder_path = asset_manager.path_folder(
+                asset_manager.path_join((output_folder_path, path)))
+
+            while (len(folder_path) > len(output_folder_path) and
+                   folder_path not in folders):
+                folders.add(folder_path)
+                folder_path = asset_manager.path_folder(folder_path)
+
+        return sorted(folders)
+
+    # ....................................................................... #
+    def _write_timed(self, template_renderer, manifest, timings):
+        """
+        Write out the config like :meth:`BaseTemplateRenderer.write`, timing
+        the up to date check of incremental generation, the template
+        loading, the rendering and the writing separately.
+
+        :return: path to the the output file.
+        :rtype: str
+        """
+
+        path = template_renderer.output_file_path
+
+        start = timings.start()
+        if manifest is not None:
+            up_to_date = template_renderer.up_to_date(manifest)
+            start = timings.since('check', start, path)
+            if up_to_date:
+                return path
+
+        template_renderer.load_template()
+        start = timings.since('load', start, path)
+
+        content = template_renderer.get_rendered_config()
+        start = timings.since('render', start, path)
+
+        output_file_path = template_renderer.write(content, manifest)
+        timings.since('write', start, path)
+
+        return output_file_path
+
+    # ....................................................................... #
+    def _read_manifest(self):
+        """
+        :return:
+
+            manifest of the previous run or None if there is no valid
+            manifest or the role folder is missing.
+
+        :rtype: :class:`Manifest`
+        """
+
+        asset_manager = self.config._asset_manager
+
+        try:
+            content = asset_manager.read_file(self.manifest_file_path)
+            asset_manager.location(self.output_folder_path, "role folder")
+        except LocationNotFound:
+            return None
+
+        return Manifest.loads(content)
+
+    # ....................................................................... #
+    def _write_manifest(self, manifest, folders=()):
+        """
+        Remove the configs of sections removed since the previous run, with
+        the folders they leave empty, and write out the manifest. Configs
+        replaced by the given folders of this run's configs are already
+        removed.
+        """
+
+        asset_manager = self.config._asset_manager
+        folders = set(folders)
+
+        for path in manifest.removed():
+            file_path = asset_manager.path_join(
+                (self.output_folder_path, path))
+            if file_path not in folders:
+                asset_manager.remove_file(
+                    file_path,
+                    stop_folder_path=self.output_folder_path)
+
+        asset_manager.write_to_file(self.manifest_file_path, manifest.dumps())
+
+    # ....................................................................... #
+    def _write_in_threads(self, template_renderers, workers, manifest=None,
+                          timings=NULL_TIMINGS, _thread_factory=Thread):
+        """
+        Render configs using `workers` threads and pass them through a queue
+        bounded to `workers` rendered configs to as many threads writing them
+        out.
+
+        Once a section fails, only the sections before it are still processed
+        so the error raised is always the one of the first failing section.
+
+        :return: list of all the files created.
+        :rtype: list
+        """
+
+        # sections to render, in settings file order, created as threads
+        # pick them up so only the sections being processed are in memory
+        tasks = iter(template_renderers)
+        tasks_lock = Lock()
+        taken = [0]
+
+        # rendered configs waiting to be written
+        rendered = Queue(maxsize=workers)
+
+        output_list = []
+        errors = {}
+        lock = Lock()
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def skip(index):
+            # skip sections following a failed one
+            with lock:
+                return len(errors) > 0 and min(errors) < index
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def fail(index, err):
+            with lock:
+                errors[index] = err
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def take():
+            with tasks_lock:
+                index = taken[0]
+                try:
+                    template_renderer = next(tasks)
+                except StopIteration:
+                    return None
+                except BaseException as err:
+                    # creating the renderer failed, the sections following
+                    # it are not processed
+                    fail(index, err)
+                    return None
+
+                taken[0] += 1
+                return index, template_renderer
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def render():
+            while True:
+                task = take()
+                if task is None:
+                    return
+
+                index, template_renderer = task
+
+                if skip(index):
+                    continue
+
+                start = timings.start()
+
+                try:
+                    path = None
+                    if timings.enabled:
+                        path = template_renderer.output_file_path
+
+                    # up to date configs are not rendered at all
+                    if manifest is not None:
+                        up_to_date = template_renderer.up_to_date(manifest)
+                        start = timings.since('check', start, path)
+                        if up_to_date:
+                            with lock:
+                                output_list.append(
+                                    template_renderer.output_file_path)
+                            continue
+
+                    if timings.enabled:
+                        template_renderer.load_template()
+                        start = timings.since('load', start, path)
+
+                    content = template_renderer.get_rendered_config()
+                    timings.since('render', start, path)
+                except BaseException as err:
+                    fail(index, err)
+                    continue
+
+                rendered.put((index, template_renderer, content))
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def write():
+            while True:
+                item = rendered.get()
+                if item is None:
+                    return
+
+                index, template_renderer, content = item
+                if skip(index):
+                    continue
+
+                start = timings.start()
+
+                try:
+                    output_file_path = template_renderer.write(
+                        content,
+                        manifest)
+                    timings.since('write', start, output_file_path)
+                except BaseException as err:
+                    fail(index, err)
+                    continue
+
+                with lock:
+                    output_list.append(output_file_path)
+
+        render_threads = [_thread_factory(target=render)
+                          for _ in range(workers)]
+        write_threads = [_thread_factory(target=write)
+                         for _ in range(workers)]
+
+        for thread in render_threads + write_threads:
+            thread.start()
+
+        for thread in render_threads:
+            thread.join()
+
+        # all configs are rendered, tell writers to stop once done
+        for thread in write_threads:
+            rendered.put(None)
+
+        for thread in write_threads:
+            thread.join()
+
+        if errors:
+            raise errors[min(errors)]
+
         return output_list
 
     # ....................................................................... #
@@ -262,3 +829,211 @@ class Role(object):
                     % (char, name))
 
         return name
+
+
+# --------------------------------------------------------------------------- #
+# role generation arguments shared with the forked role worker processes
+_role_worker_arguments = None
+
+
+# --------------------------------------------------------------------------- #
+def _write_role(name):
+    """
+    Write configs of the role with the given name, using the arguments in
+    `_role_worker_arguments`, see :func:`_write_role_with_arguments`.
+    """
+    return _write_role_with_arguments(_role_worker_arguments, name)
+
+
+# --------------------------------------------------------------------------- #
+def _write_role_timed(name):
+    """
+    Write configs of the role with the given name in a worker process, like
+    :func:`_write_role`, timing it.
+
+    :return:
+
+        two element tuple of the result of :func:`_write_role` and the
+        dictionary of the role timings, see :meth:`Timings.as_dict`.
+
+    :rtype: tuple
+    """
+
+    timings = Timings()
+    arguments = _role_worker_arguments[:-1] + (timings,)
+
+    return _write_role_with_arguments(arguments, name), timings.as_dict()
+
+
+# --------------------------------------------------------------------------- #
+def _write_role_with_arguments(arguments, name):
+    """
+    Write configs of the role with the given name. Errors are returned
+    instead of raised, so one failing role does not stop the others.
+
+    :param arguments:
+
+        tuple of the configurator, role suffix, role variables, number of
+        workers, incremental flag, keep unchanged flag, role factory and
+        timings or None.
+
+    :type arguments: tuple
+
+    :return:
+
+        three element tuple of role name, sorted list of files created and
+        the error message or None if role configs were written.
+
+    :rtype: tuple
+    """
+
+    (config, suffix, variables, workers, incremental, keep_unchanged,
+     role_factory, timings) = arguments
+
+    try:
+        role = role_factory(
+            config=config,
+            name=name,
+            suffix=suffix,
+            variables=variables)
+        output_list = role.write_configs(
+            workers=workers,
+            incremental=incremental,
+            timings=timings,
+            keep_unchanged=keep_unchanged)
+        return (name, output_list, None)
+    except ConfigMeException as err:
+        return (name, [], err.message)
+    except Exception as err:
+        return (name, [], 'Unknown Error: %s' % err)
+
+
+# --------------------------------------------------------------------------- #
+def write_roles(config, names, suffix='', variables=None, processes=1,
+                workers=1, incremental=False, timings=None,
+                keep_unchanged=False, _pool_factory=None, _role_factory=Role):
+    """
+    Write configs of all the roles with the given names. See :class:`Role`
+    for the arguments.
+
+    When `processes` is more than 1 the roles are spread across a pool of
+    worker processes. All the templates are compiled before the worker
+    processes are forked, so they share the compiled templates copy-on-write.
+
+    :param config: configurator shared by all the roles.
+    :type config: :class:`Configurator`
+
+    :param names: list of role names
+    :type names: list
+
+    :param processes: Optional, number of worker processes. Defaults to 1.
+    :type processes: int
+
+    :param workers: Optional, passed to :meth:`Role.write_configs`.
+    :type workers: int
+
+    :param incremental: Optional, passed to :meth:`Role.write_configs`.
+    :type incremental: bool
+
+    :param keep_unchanged: Optional, passed to :meth:`Role.write_configs`.
+    :type keep_unchanged: bool
+
+    :param timings:
+
+        Optional, timings of all the roles, see :meth:`Role.write_configs`.
+        The timings of roles written in worker processes are added to it
+        once they are done.
+
+    :type timings: :class:`Timings`
+
+    :return:
+
+        list of three element tuples, one per role in the given order, of the
+        role name, sorted list of files created and the error message or
+        None if role configs were written.
+
+    :rtype: list
+    """
+
+    global _role_worker_arguments
+
+    # handle mutable defaults
+    if variables is None:
+        variables = {}
+
+    _role_worker_arguments = (config, suffix, variables, workers,
+                              incremental, keep_unchanged, _role_factory,
+                              timings)
+
+    try:
+        if processes <= 1 or len(names) <= 1:
+            return [_write_role(name) for name in names]
+
+        # multiprocessing is only imported when processes are used
+        if _pool_factory is None:
+            from multiprocessing import Pool as _pool_factory
+
+        # compile templates once, before forking
+        config.prewarm_templates()
+
+        pool = _pool_factory(processes=processes)
+        try:
+            if timings is None:
+                return pool.map(_write_role, names, chunksize=1)
+
+            results = pool.map(_write_role_timed, names, chunksize=1)
+            for _, role_timings in results:
+                timings.merge(role_timings)
+
+            return [result for result, _ in results]
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        _role_worker_arguments = None
+
+
+# --------------------------------------------------------------------------- #
+def check_roles(config, names, suffix='', variables=None, _role_factory=Role):
+    """
+    Compare the configs of all the roles with the given names with their
+    role folders, one role at a time, see :meth:`Role.check_configs`.
+    Errors are returned instead of raised, so one failing role does not stop
+    the others.
+
+    :param config: configurator shared by all the roles.
+    :type config: :class:`Configurator`
+
+    :param names: list of role names
+    :type names: list
+
+    :return:
+
+        list of five element tuples, one per role in the given order, of the
+        role name, the sorted lists of files which would be added, changed
+        and removed, and the error message or None if the role was checked.
+
+    :rtype: list
+    """
+
+    # handle mutable defaults
+    if variables is None:
+        variables = {}
+
+    result = []
+
+    for name in names:
+        try:
+            role = _role_factory(
+                config=config,
+                name=name,
+                suffix=suffix,
+                variables=variables)
+            added, changed, removed = role.check_configs()
+            result.append((name, added, changed, removed, None))
+        except ConfigMeException as err:
+            result.append((name, [], [], [], err.message))
+        except Exception as err:
+            result.append((name, [], [], [], 'Unknown Error: %s' % err))
+
+    return result
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+"""
+Render server module. A long running `configme serve` daemon keeps
+configurators and their compiled templates in memory and generates roles on
+requests sent over a local UNIX socket, so clients do not pay for the startup,
+template compilation and imports on every call.
+
+Requests and responses are JSON objects, one per line.
+"""
+
+import socket
+
+from json import dumps
+from json import loads
+
+from os import unlink
+
+from os.path import abspath
+
+# SocketServer module was renamed to socketserver in py3, it is imported here
+# rather than in the compat module as only the render server needs it
+try:
+    from SocketServer import StreamRequestHandler
+    from SocketServer import UnixStreamServer
+except ImportError:  # pragma: no cover
+    from socketserver import StreamRequestHandler  # NOQA
+    from socketserver import UnixStreamServer  # NOQA
+
+from .config import Configurator
+from .exceptions import ConfigMeException
+from .exceptions import RenderServerError
+from .role import write_roles
+from .watch import PollingWatcher
+from .watch import changed_template_names
+
+
+# --------------------------------------------------------------------------- #
+class RenderService(object):
+    """
+    Generates roles for render requests, keeping a configurator per set of
+    paths across requests. Before a configurator is reused the modification
+    times of its templates are checked and the templates that changed are
+    invalidated.
+
+    A render request is a dictionary with the keys:
+
+        - templates_path, settings_path, output_path - absolute paths.
+        - bytecode_cache_path, compiled_templates_path, settings_cache_path -
+          optional paths.
+        - template_renderers - optional list of glob pattern and template
+          renderer name pairs.
+        - roles - list of role names and glob patterns, or None for all the
+          roles.
+        - suffix, variables, processes, workers, incremental,
+          keep_unchanged - see :func:`write_roles`.
+    """
+
+    # ....................................................................... #
+    def __init__(self, _configurator_factory=Configurator,
+                 _write_roles=write_roles, _watcher_factory=PollingWatcher):
+
+        self._configurator_factory = _configurator_factory
+        self._write_roles = _write_roles
+        self._watcher_factory = _watcher_factory
+
+        # configurators and their template watchers by paths
+        self._configurators = {}
+
+    # ....................................................................... #
+    def configurator(self, request):
+        """
+        :return: configurator for the paths of the given request.
+        :rtype: :class:`Configurator`
+        """
+
+        template_renderers = [
+            tuple(pair) for pair in request.get('template_renderers') or ()]
+
+        key = (
+            request['templates_path'],
+            request['settings_path'],
+            request['output_path'],
+            request.get('bytecode_cache_path'),
+            request.get('compiled_templates_path'),
+            request.get('settings_cache_path'),
+            tuple(template_renderers),
+            )
+
+        try:
+            config, watcher = self._configurators[key]
+        except KeyError:
+            config = self._configurator_factory(
+                templates_path=request['templates_path'],
+                settings_path=request['settings_path'],
+                output_path=request['output_path'],
+                bytecode_cache_path=request.get('bytecode_cache_path'),
+                compiled_templates_path=request.get('compiled_templates_path'),
+                settings_cache_path=request.get('settings_cache_path'),
+                template_renderers=template_renderers)
+
+            watcher = self._watcher_factory([config.templates_path])
+            self._configurators[key] = (config, watcher)
+
+            return config
+
+        # a single scan, templates that changed since the last request are
+        # not served from the caches
+        changed = watcher.changes(0)
+        if changed:
+            config.invalidate_templates(
+                changed_template_names(config.templates_path, changed))
+
+        return config
+
+    # ....................................................................... #
+    def handle(self, request):
+        """
+        Generate the roles of the render request.
+
+        :return:
+
+            response dictionary with the `results` of :func:`write_roles`,
+            or the `error` message if the roles could not be generated.
+
+        :rtype: dict
+        """
+
+        try:
+            config = self.configurator(request)
+
+            names = config.role_names(request.get('roles'))
+
+            results = self._write_roles(
+                config=config,
+                names=names,
+                suffix=request.get('suffix') or '',
+                variables=request.get('variables') or {},
+                processes=request.get('processes', 1),
+                workers=request.get('workers', 1),
+                incremental=request.get('incremental', False),
+                keep_unchanged=request.get('keep_unchanged', False))
+        except ConfigMeException as err:
+            return {'error': err.message}
+        except Exception as err:
+            return {'error': 'Unknown Error: %s' % err}
+
+        return {'results': results}
+
+
+# --------------------------------------------------------------------------- #
+class RenderRequestHandler(StreamRequestHandler):
+    """
+    Handles the render requests of a connection, one JSON request per line.
+    """
+
+    # ....................................................................... #
+    def handle(self):
+
+        for line in iter(self.rfile.readline, b''):
+            try:
+                request = loads(line.decode('utf-8'))
+            except ValueError:
+                response = {'error': 'Invalid request'}
+            else:
+                response = self.server.service.handle(request)
+
+            self.wfile.write(dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+# --------------------------------------------------------------------------- #
+def serve(socket_path, service=None, _server_factory=UnixStreamServer,
+          _os_unlink=unlink):
+    """
+    Serve render requests on the UNIX socket at the given path until
+    interrupted. A socket file left behind by a daemon which is not running
+    anymore is replaced.
+
+    :param socket_path: path of the UNIX socket.
+    :type socket_path: str/unicode
+
+    :param service: Optional, render service. Defaults to a new one.
+    :type service: :class:`RenderService`
+
+    :raises:
+
+        :class:`RenderServerError` if another daemon is listening on the
+        socket or the socket could not be created.
+    """
+
+    if service is None:
+        service = RenderService()
+
+    try:
+        ping(socket_path)
+    except EnvironmentError:
+        # nobody is listening, remove the stale socket file if any
+        try:
+            _os_unlink(socket_path)
+        except EnvironmentError:
+            pass
+    else:
+        raise RenderServerError(
+            "Render server is already running: %s" % socket_path)
+
+    try:
+        server = _server_factory(socket_path, RenderRequestHandler)
+    except EnvironmentError as err:
+        raise RenderServerError(
+            "Could not listen on %s: %s" % (socket_path, err))
+
+    server.service = service
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            _os_unlink(socket_path)
+        except EnvironmentError:  # pragma: no cover
+            pass
+
+
+# --------------------------------------------------------------------------- #
+def send_request(socket_path, request, timeout=None,
+                 _socket_factory=socket.socket):
+    """
+    Send the request to the daemon listening on the given UNIX socket.
+
+    :return: response dictionary
+    :rtype: dict
+
+    :raises:
+
+        EnvironmentError if the daemon is not running or the connection
+        failed.
+    """
+
+    client = _socket_factory(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(dumps(request).encode('utf-8') + b'\n')
+
+        response_file = client.makefile('rb')
+        try:
+            line = response_file.readline()
+        finally:
+            response_file.close()
+    finally:
+        client.close()
+
+    if not line:
+        raise EnvironmentError('Render server closed the connection')
+
+    return loads(line.decode('utf-8'))
+
+
+# --------------------------------------------------------------------------- #
+def ping(socket_path, _socket_factory=socket.socket):
+    """
+    :raises: EnvironmentError if no daemon is listening on the socket.
+    """
+
+    client = _socket_factory(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        client.connect(socket_path)
+    finally:
+        client.close()
+
+
+# --------------------------------------------------------------------------- #
+def remote_write_roles(socket_path, templates_path, settings_path,
+                       output_path, roles=None, suffix='', variables=None,
+                       bytecode_cache_path=None, compiled_templates_path=None,
+                       settings_cache_path=None, template_renderers=None,
+                       processes=1, workers=1, incremental=False,
+                       keep_unchanged=False, _send_request=send_request):
+    """
+    Generate roles using the daemon listening on the given UNIX socket. See
+    :func:`write_roles`, :class:`Configurator` and
+    :meth:`Configurator.role_names` for arguments.
+
+    Paths are sent to the daemon as absolute paths, paths of the generated
+    files are returned relative to the given `output_path`, just like when
+    generating roles in-process.
+
+    :return: see :func:`write_roles`.
+    :rtype: list
+
+    :raises:
+
+        EnvironmentError if the daemon is not running, so roles can be
+        generated in-process instead.
+
+        :class:`RenderServerError` if the daemon could not generate roles.
+    """
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    def absolute(path):
+        return None if path is None else abspath(path)
+
+    absolute_output_path = absolute(output_path)
+
+    response = _send_request(socket_path, {
+        'templates_path': absolute(templates_path),
+        'settings_path': absolute(settings_path),
+        'output_path': absolute_output_path,
+        'bytecode_cache_path': absolute(bytecode_cache_path),
+        'compiled_templates_path': absolute(compiled_templates_path),
+        'settings_cache_path': absolute(settings_cache_path),
+        'template_renderers': template_renderers,
+        'roles': roles,
+        'suffix': suffix,
+        'variables': variables,
+        'processes': processes,
+        'workers': workers,
+        'incremental': incremental,
+        'keep_unchanged': keep_unchanged,
+        })
+
+    if 'error' in response:
+        raise RenderServerError(response['error'])
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    def relative(path):
+        if path.startswith(absolute_output_path):
+            return output_path + path[len(absolute_output_path):]
+        return path  # pragma: no cover
+
+    return [(name, [relative(path) for path in output_list], error)
+            for name, output_list, error in response['results']]
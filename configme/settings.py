@@ -5,11 +5,525 @@ Module is responsible for parsing settings files and providing access to
 settings.
 """
 
+import marshal
+import sys
+
+from collections import OrderedDict
+
+from ConfigParser import DEFAULTSECT
 from ConfigParser import Error as ConfigParserError
 from ConfigParser import SafeConfigParser
 
+from hashlib import sha1
+
+from io import BytesIO
+from io import open as io_open
+
+from os import chmod
+from os import fdopen
+from os import rename
+from os import unlink
+
+from os.path import abspath
+from os.path import basename
+from os.path import dirname
+from os.path import join
+from os.path import splitext
+
+from re import compile as re_compile
+
+from tempfile import mkstemp
+
+from .compat import Mapping
+from .compat import string_types
 from .exceptions import SettingsParsingError
 
+# --------------------------------------------------------------------------- #
+# bumped whenever the parsed settings cache entries change in an incompatible
+# way
+SETTINGS_CACHE_VERSION = 3
+
+# --------------------------------------------------------------------------- #
+# section of a settings file configuring configme itself, it is not a config
+CONFIGME_SECTION = 'configme'
+
+# setting of the configme section naming the role whose settings the
+# settings file extends
+EXTENDS_SETTING = 'extends'
+
+# lines of the configme sections of a settings file, read ahead of parsing
+# the whole file to find the settings file it extends
+CONFIGME_SECTION_RE = re_compile(
+    (r'(?m)^\[%s\].*\n?(?:(?!\[).*\n?)*' % CONFIGME_SECTION).encode('utf-8'))
+
+
+# --------------------------------------------------------------------------- #
+def settings_cache_key(files, variables):
+    """
+    :param files:
+
+        list of two element tuples of the path and the content of the
+        settings file and of the files it extends, in the order they are
+        read.
+
+    :type files: list
+
+    :param variables: variables interpolated into the settings.
+    :type variables: dict
+
+    :return:
+
+        key of the parsed settings cache entry, a digest of the absolute
+        paths and the contents of the files, the variables, the cache format
+        and the Python version, whose marshal format the entries are stored
+        in.
+
+    :rtype: str
+    """
+
+    digest = sha1()
+    digest.update(('%d %d.%d %d\n' % (
+        (SETTINGS_CACHE_VERSION,) + tuple(sys.version_info[:2]) +
+        (marshal.version,))).encode('utf-8'))
+
+    # paths and contents are length prefixed, so their boundaries are part
+    # of the key
+    for file_path, content in files:
+        file_path = abspath(file_path)
+        if not isinstance(file_path, bytes):
+            file_path = file_path.encode('utf-8')
+
+        for value in (file_path, content):
+            digest.update(('%d\n' % len(value)).encode('utf-8'))
+            digest.update(value)
+
+    digest.update(repr(sorted(variables.items())).encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+# --------------------------------------------------------------------------- #
+def _interpolation_error(file_path, err):
+    """
+    :return: error raised when variables could not be interpolated.
+    :rtype: :class:`SettingsParsingError`
+    """
+    return SettingsParsingError(
+        "Bad variable interpolation for file: %s\n\n%s"
+        % (file_path, err.message))
+
+
+# --------------------------------------------------------------------------- #
+class LayeredSettings(Mapping):
+    """
+    Read-only mapping of settings looked up in a list of layers, the first
+    layer having the setting wins. Layers are not copied, layers shared by
+    several sections are stored once.
+
+    :param layers: dictionaries of settings, in look up order.
+    :type layers: tuple
+    """
+
+    # ....................................................................... #
+    def __init__(self, layers):
+        self.layers = layers
+
+    # ....................................................................... #
+    def __getitem__(self, key):
+
+        for layer in self.layers:
+            if key in layer:
+                return layer[key]
+
+        raise KeyError(key)
+
+    # ....................................................................... #
+    def __contains__(self, key):
+        return any(key in layer for layer in self.layers)
+
+    # ....................................................................... #
+    def __iter__(self):
+
+        seen = set()
+        for layer in self.layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    # ....................................................................... #
+    def __len__(self):
+
+        keys = set()
+        for layer in self.layers:
+            keys.update(layer)
+
+        return len(keys)
+
+    # ....................................................................... #
+    def __repr__(self):
+        return '<%s %r>' % (self.__class__.__name__, dict(self))
+
+
+# --------------------------------------------------------------------------- #
+class SharedSettings(object):
+    """
+    Settings every section of a settings file inherits, interpolated once:
+    the settings of the DEFAULT section and the role variables.
+
+    A default setting referencing, directly or through other default
+    settings, a setting a section overrides has a different value in that
+    section, it is interpolated for the section instead. So are default
+    settings which can only be interpolated in sections, referencing
+    settings missing from the DEFAULT section.
+
+    :param parser: config parser which parsed the settings file.
+    :type parser: :class:`ConfigParser.SafeConfigParser`
+
+    :param variables: role variables, the defaults of the parser.
+    :type variables: dict
+    """
+
+    # ....................................................................... #
+    # interpolated settings of the DEFAULT section
+    defaults = None
+
+    # ....................................................................... #
+    # interpolated role variables not overridden by the DEFAULT section
+    variables = None
+
+    # ....................................................................... #
+    # default settings interpolated for every section
+    unshared = None
+
+    # ....................................................................... #
+    # settings mapped to the default settings referencing them
+    dependents = None
+
+    # ....................................................................... #
+    def __init__(self, parser, variables):
+
+        raw = parser.defaults()
+
+        variable_keys = set()
+        for key, value in variables.items():
+            key = parser.optionxform(key)
+            if raw.get(key) is value:
+                variable_keys.add(key)
+
+        self.defaults = {}
+        self.variables = {}
+        self.unshared = set()
+
+        for key in raw:
+            try:
+                value = parser.get(DEFAULTSECT, key)
+            except ConfigParserError:
+                self.unshared.add(key)
+                continue
+
+            if key in variable_keys:
+                self.variables[key] = value
+            else:
+                self.defaults[key] = value
+
+        self.dependents = {}
+        for key in raw:
+            for reference in _references(parser, raw, key):
+                self.dependents.setdefault(reference, set()).add(key)
+
+    # ....................................................................... #
+    def section_keys(self, own_keys):
+        """
+        :param own_keys: settings set by the section itself.
+        :type own_keys: iterable
+
+        :return:
+
+            set of the settings which have to be interpolated for the
+            section, its own and the default settings depending on them.
+
+        :rtype: set
+        """
+
+        keys = set(self.unshared)
+        for key in own_keys:
+            keys.add(key)
+            keys.update(self.dependents.get(key, ()))
+
+        # the parser keeps the section name with its settings
+        keys.discard('__name__')
+
+        return keys
+
+
+# --------------------------------------------------------------------------- #
+_INTERPOLATION_REFERENCE = re_compile(r"%\(([^)]+)\)s")
+
+
+# --------------------------------------------------------------------------- #
+def _references(parser, raw, key):
+    """
+    :return:
+
+        set of the settings the default setting references, directly or
+        through other default settings.
+
+    :rtype: set
+    """
+
+    references = set()
+    pending = [key]
+
+    while pending:
+        value = raw.get(pending.pop())
+        if not isinstance(value, string_types) or '%' not in value:
+            continue
+
+        for name in _INTERPOLATION_REFERENCE.findall(value):
+            name = parser.optionxform(name)
+            if name not in references:
+                references.add(name)
+                pending.append(name)
+
+    return references
+
+
+# --------------------------------------------------------------------------- #
+class SectionSettings(LayeredSettings):
+    """
+    Read-only mapping of the settings of a section, interpolated on demand.
+    Settings are looked up in the section's own settings, interpolated when
+    first looked up, then in the settings of the DEFAULT section and in the
+    role variables, shared by all the sections, see :class:`SharedSettings`.
+
+    :param parser: config parser which parsed the settings file.
+    :type parser: :class:`ConfigParser.SafeConfigParser`
+
+    :param section_name: name of the section.
+    :type section_name: str/unicode
+
+    :param file_path: path to the settings file, for error messages.
+    :type file_path: str/unicode
+
+    :param shared: settings shared by the sections of the settings file.
+    :type shared: :class:`SharedSettings`
+
+    :param own_keys: settings set by the section itself.
+    :type own_keys: iterable
+    """
+
+    # ....................................................................... #
+    def __init__(self, parser, section_name, file_path, shared, own_keys):
+
+        self.parser = parser
+        self.section_name = section_name
+        self.file_path = file_path
+
+        # settings interpolated for the section, computed on first access
+        self._keys = None
+        self._own_keys = own_keys
+        self._shared = shared
+
+        # own settings interpolated so far
+        self._own = {}
+
+        LayeredSettings.__init__(
+            self, (self._own, shared.defaults, shared.variables))
+
+        self._shared_layers = self.layers[1:]
+
+    # ....................................................................... #
+    @property
+    def keys_interpolated(self):
+        """
+        :return: set of the settings interpolated for the section.
+        :rtype: set
+        """
+
+        if self._keys is None:
+            self._keys = self._shared.section_keys(self._own_keys)
+            self._own_keys = None
+
+        return self._keys
+
+    # ....................................................................... #
+    def __getitem__(self, key):
+
+        if key in self._own:
+            return self._own[key]
+
+        if key not in self.keys_interpolated:
+            for layer in self._shared_layers:
+                if key in layer:
+                    return layer[key]
+            raise KeyError(key)
+
+        try:
+            value = self.parser.get(self.section_name, key)
+        except ConfigParserError as err:
+            raise _interpolation_error(self.file_path, err)
+
+        self._own[key] = value
+        return value
+
+    # ....................................................................... #
+    def __contains__(self, key):
+        return (key in self.keys_interpolated or
+                LayeredSettings.__contains__(self, key))
+
+    # ....................................................................... #
+    def __iter__(self):
+
+        keys = self.keys_interpolated
+        for key in keys:
+            yield key
+
+        for key in LayeredSettings.__iter__(self):
+            if key not in keys:
+                yield key
+
+    # ....................................................................... #
+    def __len__(self):
+        return len(self.keys_interpolated.union(
+            self._shared.defaults, self._shared.variables))
+
+    # ....................................................................... #
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, self.section_name)
+
+
+# --------------------------------------------------------------------------- #
+class BaseSettings(object):
+    """
+    Raw, not interpolated, settings of a settings file extended by other
+    settings files, merged over the settings of the file it extends itself
+    if any. Resolved once and shared by all the settings files extending it,
+    which only parse their own settings.
+
+    :param file_path: path to the settings file.
+    :type file_path: str/unicode
+
+    :param content: content of the settings file.
+    :type content: bytes
+
+    :param extends: name of the role the settings file extends, or None.
+    :type extends: str
+
+    :param parent: resolved settings of the role it extends, or None.
+    :type parent: :class:`BaseSettings`
+
+    :param own_defaults: settings of the DEFAULT section of the file.
+    :type own_defaults: dict
+
+    :param own_sections: settings of the sections of the file, by name.
+    :type own_sections: OrderedDict
+    """
+
+    # ....................................................................... #
+    def __init__(self, file_path, content, extends, parent, own_defaults,
+                 own_sections):
+
+        self.file_path = file_path
+        self.content = content
+        self.extends = extends
+        self.parent = parent
+        self.own_defaults = own_defaults
+        self.own_sections = own_sections
+
+        if parent is None:
+            self.defaults = own_defaults
+            self.sections = own_sections
+        else:
+            self.defaults = dict(parent.defaults)
+            self.defaults.update(own_defaults)
+            self.sections = merge_sections(parent.sections, own_sections)
+
+
+# --------------------------------------------------------------------------- #
+def merge_sections(base_sections, sections, _dict_factory=OrderedDict):
+    """
+    :param base_sections: raw settings of the sections of the base, by name.
+    :type base_sections: OrderedDict
+
+    :param sections: raw settings of the sections extending them, by name.
+    :type sections: OrderedDict
+
+    :return:
+
+        sections of the base in their order followed by the new sections.
+        Sections of the base which are not extended are not copied, the
+        settings of extended ones are updated with the extending settings.
+
+    :rtype: OrderedDict
+    """
+
+    result = _dict_factory()
+
+    for section_name, settings in base_sections.items():
+        extending = sections.get(section_name)
+        if extending is not None:
+            settings = settings.copy()
+            settings.update(extending)
+        result[section_name] = settings
+
+    for section_name, settings in sections.items():
+        if section_name not in result:
+            result[section_name] = settings
+
+    return result
+
+
+# --------------------------------------------------------------------------- #
+def extended_role_name(file_path, _config_parser_factory=SafeConfigParser,
+                       _io_open=io_open):
+    """
+    :param file_path: path to the settings file.
+    :type file_path: str/unicode
+
+    :return:
+
+        name of the role the settings file extends, see
+        :class:`SettingsParser`, or None if it does not extend one or if it
+        could not be read or parsed.
+
+    :rtype: str
+    """
+
+    try:
+        with _io_open(file_path, 'rb') as file_handler:
+            content = file_handler.read()
+    except EnvironmentError:
+        return None
+
+    return _extends_setting(file_path, content, _config_parser_factory)
+
+
+# --------------------------------------------------------------------------- #
+def _extends_setting(file_path, content, config_parser_factory):
+    """
+    :return:
+
+        name of the role the settings file with the given content extends,
+        or None if it does not extend one or if it could not be parsed. Only
+        its configme sections are parsed.
+
+    :rtype: str
+    """
+
+    sections = b''.join(CONFIGME_SECTION_RE.findall(content))
+    if not sections:
+        return None
+
+    parser = config_parser_factory()
+    try:
+        parser.readfp(BytesIO(sections), file_path)
+    except ConfigParserError:
+        return None
+
+    # the parser has no public access to the raw settings of a section
+    return parser._sections.get(CONFIGME_SECTION, {}).get(EXTENDS_SETTING)
+
 
 # --------------------------------------------------------------------------- #
 class SettingsParser(object):
@@ -22,17 +536,68 @@ class SettingsParser(object):
 
     :param variables: optional, variables to interpolate into settings file.
     :type variables: dict
+
+    :param cache_path:
+
+        Optional, path to the folder where parsed settings are cached
+        between runs, keyed by the paths and the contents of the settings
+        file and of the files it extends, and by the variables. A settings
+        file which did not change is not parsed nor interpolated again. The
+        folder may be shared between concurrent runs. Defaults to None, no
+        cache.
+
+    :type cache_path: str/unicode
+
+    :param bases:
+
+        Optional, dictionary of the resolved :class:`BaseSettings` of the
+        settings files extended by others, by file path, shared by the
+        settings parsers of a run so each base is parsed once. Bases are
+        parsed again if their content changed. Defaults to None, bases are
+        parsed for every settings file extending them.
+
+    :type bases: dict
+
+    A settings file extends the settings of another role when its
+    `configme` section sets `extends` to the name of the role::
+
+        [configme]
+        extends = base
+
+    Its DEFAULT section and its sections update the ones of the base role's
+    settings file, found next to it, which may extend another one. The
+    `configme` section is not a config.
     """
 
     file_path = None
+    variables = None
     parser = None
+    cache_path = None
+    bases = None
+
+    # ....................................................................... #
+    # list of two element tuples of the file path and the content of the
+    # settings files extended, in the order they are read
+    files = None
+
+    # ....................................................................... #
+    # cache entry the settings were read from, if any
+    _cache_entry = None
+
+    # ....................................................................... #
+    # raw settings of the DEFAULT section of the settings file itself
+    _own_defaults = None
 
     # ....................................................................... #
     def __init__(
         self,
         file_path,
         variables=None,
-        _config_parser_factory=SafeConfigParser
+        cache_path=None,
+        bases=None,
+        _config_parser_factory=SafeConfigParser,
+        _io_open=io_open,
+        _os_rename=rename
     ):
 
         # handle mutable default for variables paramater
@@ -40,10 +605,18 @@ class SettingsParser(object):
             variables = {}
 
         self.file_path = file_path
+        self.variables = variables
+        self.cache_path = cache_path
+        self.bases = bases
+        self.files = []
         self.parser = _config_parser_factory(defaults=variables)
 
+        self._config_parser_factory = _config_parser_factory
+        self._io_open = _io_open
+        self._os_rename = _os_rename
+
     # ....................................................................... #
-    def read(self):
+    def read(self, lazy=False):
         """
         Read and parse settings file for the given file path.
 
@@ -53,15 +626,32 @@ class SettingsParser(object):
 
         (Section named "DEFAULT" is not included in the list)
 
+        When the `cache_path` is given, the settings are read from the cache
+        if the settings file, the settings files it extends and the
+        variables did not change since they were cached.
+
+        :param lazy:
+
+            Optional, return a generator of the tuples instead, whose
+            settings are :class:`SectionSettings` interpolated when they are
+            accessed, so sections are only interpolated if and when they are
+            used. Settings read from the cache are built one section at a
+            time. Defaults to False.
+
+        :type lazy: bool
+
         :raises:
-            SettingsParsingError if file could not be found, read, parsed
-            or if variables could not be interpolated.
+            SettingsParsingError if file or a file it extends could not be
+            found, read, parsed, if the files extend each other or if
+            variables could not be interpolated. With `lazy`, interpolation
+            errors are raised when the settings of the section are accessed.
         """
 
-        result = []
+        if self.cache_path is not None:
+            return self._read_cached(lazy)
 
         try:
-            loaded_files = self.parser.read(self.file_path)
+            loaded_files = self._parse(self.parser.read, self.file_path)
         except ConfigParserError as err:
             raise SettingsParsingError(
                 'Could not parse file: %s.\n\nMore Info:\n%s'
@@ -71,13 +661,433 @@ class SettingsParser(object):
             raise SettingsParsingError('Could not load file: %s'
                 % self.file_path)
 
+        self._extend()
+
+        if lazy:
+            return self._lazy_items()
+
+        return self._items()
+
+    # ....................................................................... #
+    def section_names(self):
+        """
+        :return:
+
+            list of the names of the sections read by :meth:`read`, in
+            order, without interpolating nor building their settings.
+
+        :rtype: list
+        """
+
+        if self._cache_entry is not None:
+            return [section_name for section_name, _ in self._cache_entry[1]]
+
+        return self.parser.sections()
+
+    # ....................................................................... #
+    def _parse(self, parse, *args):
+        """
+        Parse the settings file with the given parser method. The settings of
+        its DEFAULT section are parsed apart from the variables, the parser
+        defaults, and kept as its own defaults before updating them.
+
+        :return: result of the parser method.
+        """
+
+        # the parser has no public access to replace its defaults
+        parser = self.parser
+        variables = parser._defaults
+        parser._defaults = parser._dict()
+
+        try:
+            return parse(*args)
+        finally:
+            self._own_defaults = parser._defaults
+            parser._defaults = variables
+            variables.update(self._own_defaults)
+
+    # ....................................................................... #
+    def _extend(self):
+        """
+        Remove the `configme` section of the parsed settings file, and merge
+        the settings of the settings file it extends, if any, under its own.
+        """
+
+        if CONFIGME_SECTION not in self.parser.sections():
+            return
+
+        # the parser has no public access to the raw settings of a section
+        # or to replace them
+        parser = self.parser
+        extends = parser._sections.pop(CONFIGME_SECTION).get(EXTENDS_SETTING)
+        if extends is None:
+            return
+
+        base = self._base(extends, self.file_path, [self.file_path])
+
+        # the parser defaults are the variables updated with the settings
+        # of the DEFAULT section, the base defaults go in between
+        parser._defaults.update(base.defaults)
+        parser._defaults.update(self._own_defaults)
+        parser._sections = merge_sections(
+            base.sections,
+            parser._sections,
+            parser._dict)
+
+    # ....................................................................... #
+    def _base(self, name, extended_by, seen):
+        """
+        :param name: name of the role extended.
+        :type name: str
+
+        :param extended_by: path to the settings file extending it.
+        :type extended_by: str/unicode
+
+        :param seen: paths to the settings files extending it, in order.
+        :type seen: list
+
+        :return: resolved settings of the role extended.
+        :rtype: :class:`BaseSettings`
+
+        :raises:
+            SettingsParsingError if the settings file could not be found,
+            read or parsed, or if the files extend each other.
+        """
+
+        if not name.strip() or basename(name) != name:
+            raise SettingsParsingError(
+                "Invalid role name to extend: '%s', in file: %s"
+                % (name, extended_by))
+
+        file_path = self._base_file_path(name, extended_by)
+
+        if file_path in seen:
+            raise SettingsParsingError(
+                'Settings files extend each other: %s'
+                % ' -> '.join(seen + [file_path]))
+
+        try:
+            with self._io_open(file_path, 'rb') as file_handler:
+                content = file_handler.read()
+        except EnvironmentError:
+            raise SettingsParsingError(
+                'Could not load file: %s, extended by: %s'
+                % (file_path, extended_by))
+
+        self.files.append((file_path, content))
+
+        base = None
+        if self.bases is not None:
+            base = self.bases.get(file_path)
+
+        if base is not None and base.content == content:
+            own_defaults = base.own_defaults
+            own_sections = base.own_sections
+            extends = base.extends
+        else:
+            parser = self._config_parser_factory()
+            try:
+                parser.readfp(BytesIO(content), file_path)
+            except ConfigParserError as err:
+                raise SettingsParsingError(
+                    'Could not parse file: %s.\n\nMore Info:\n%s'
+                    % (file_path, err.message))
+
+            own_defaults = parser.defaults()
+            own_sections = parser._sections
+            extends = own_sections.pop(CONFIGME_SECTION, {}).get(
+                EXTENDS_SETTING)
+            base = None
+
+        parent = None
+        if extends is not None:
+            parent = self._base(extends, file_path, seen + [file_path])
+
+        # the resolved base is reused as long as the bases it extends are
+        if base is None or base.parent is not parent:
+            base = BaseSettings(
+                file_path,
+                content,
+                extends,
+                parent,
+                own_defaults,
+                own_sections)
+
+            if self.bases is not None:
+                self.bases[file_path] = base
+
+        return base
+
+    # ....................................................................... #
+    def _base_file_path(self, name, extended_by):
+        """
+        :return:
+
+            path to the settings file of the role extended, next to the
+            settings file extending it.
+
+        :rtype: str/unicode
+        """
+        return join(dirname(extended_by), name + splitext(self.file_path)[1])
+
+    # ....................................................................... #
+    def _extended_files(self, content):
+        """
+        Read the settings files the settings file extends ahead of parsing
+        it, only their configme sections are parsed. The files end at the
+        first one which could not be read or parsed, or at an invalid role
+        name or a file extending another one again: parsing the settings
+        file reports the error.
+
+        :param content: content of the settings file.
+        :type content: str
+
+        :return:
+
+            list of two element tuples of the path and the content of the
+            settings files extended, in the order they are read.
+
+        :rtype: list
+        """
+
+        files = []
+        seen = [self.file_path]
+        file_path = self.file_path
+
+        while True:
+            name = _extends_setting(file_path, content, SafeConfigParser)
+            if name is None or not name.strip() or basename(name) != name:
+                return files
+
+            file_path = self._base_file_path(name, file_path)
+            if file_path in seen:
+                return files
+
+            seen.append(file_path)
+
+            try:
+                with self._io_open(file_path, 'rb') as file_handler:
+                    content = file_handler.read()
+            except EnvironmentError:
+                return files
+
+            files.append((file_path, content))
+
+    # ....................................................................... #
+    def _lazy_items(self):
+        """
+        :return:
+
+            generator of the sections and their settings, interpolated on
+            demand.
+
+        :rtype: generator
+        """
+
+        shared = SharedSettings(self.parser, self.variables)
+
+        for section_name in self.parser.sections():
+            yield section_name, SectionSettings(
+                self.parser,
+                section_name,
+                self.file_path,
+                shared,
+                self._own_keys(section_name))
+
+    # ....................................................................... #
+    def _own_keys(self, section_name):
+        """
+        :return:
+
+            settings set by the section itself, not copied, they are only
+            listed if the section is used.
+
+        :rtype: iterable
+        """
+
+        # the parser has no public access to the options of a section
+        # without the defaults
+        return self.parser._sections[section_name]
+
+    # ....................................................................... #
+    def _items(self):
+        """
+        :return: list of the sections and their interpolated settings.
+        :rtype: list
+
+        :raises:
+            SettingsParsingError if variables could not be interpolated.
+        """
+
         try:
             # ConfigParserError may be thrown on .items() call
-            result = [(section_name, dict(self.parser.items(section_name)))
+            return [(section_name, dict(self.parser.items(section_name)))
                 for section_name in self.parser.sections()]
+        except ConfigParserError as err:
+            raise _interpolation_error(self.file_path, err)
+
+    # ....................................................................... #
+    def _read_cached(self, lazy=False):
+        """
+        Read the settings from the cache, or parse the settings file and
+        cache them. The cache entry is keyed by the paths and the contents
+        of the settings file and of the settings files it extends, so
+        settings files of other folders never share entries. A missing entry
+        is written under the key of the contents actually parsed. All the
+        sections are interpolated to write a missing entry, even if `lazy`.
+
+        :return: see :meth:`read`.
+        :rtype: list/generator
+        """
+
+        try:
+            with self._io_open(self.file_path, 'rb') as file_handler:
+                content = file_handler.read()
+        except EnvironmentError:
+            raise SettingsParsingError('Could not load file: %s'
+                % self.file_path)
+
+        files = [(self.file_path, content)]
+
+        cache_file_path = join(self.cache_path, '%s.settings' % (
+            settings_cache_key(
+                files + self._extended_files(content),
+                self.variables),))
+
+        entry = self._load_cache(cache_file_path)
+        if entry is not None:
+            self._cache_entry = entry
+            result = self._expand(entry, lazy)
+            return result if lazy else list(result)
+
+        try:
+            self._parse(self.parser.readfp, BytesIO(content), self.file_path)
         except ConfigParserError as err:
             raise SettingsParsingError(
-                "Bad variable interpolation for file: %s\n\n%s"
+                'Could not parse file: %s.\n\nMore Info:\n%s'
                 % (self.file_path, err.message))
 
-        return result
+        self._extend()
+
+        result = self._items()
+        entry = self._compact(result)
+
+        # the settings files extended may have changed since they were read
+        cache_file_path = join(self.cache_path, '%s.settings' % (
+            settings_cache_key(files + self.files, self.variables),))
+        self._dump_cache(cache_file_path, entry)
+
+        return self._expand(entry, lazy) if lazy else result
+
+    # ....................................................................... #
+    def _compact(self, result):
+        """
+        :return:
+
+            two element tuple of the interpolated DEFAULT section settings
+            and role variables shared by the sections and of the list of the
+            sections and their settings differing from the shared ones, so
+            the shared settings are cached once instead of once per section.
+
+        :rtype: tuple
+        """
+
+        # defaults which can only be interpolated in sections differ per
+        # section, they are not shared
+        shared_settings = SharedSettings(self.parser, self.variables)
+        shared = dict(shared_settings.variables)
+        shared.update(shared_settings.defaults)
+
+        missing = object()
+
+        return shared, [
+            (section_name, dict(
+                (key, value) for key, value in settings.items()
+                if shared.get(key, missing) != value))
+            for section_name, settings in result]
+
+    # ....................................................................... #
+    def _expand(self, entry, lazy=False):
+        """
+        :param entry: cache entry, see :meth:`_compact`.
+        :type entry: tuple
+
+        :param lazy:
+
+            Optional, settings are :class:`LayeredSettings` of the section's
+            own settings and the shared ones instead of dictionaries.
+            Defaults to False.
+
+        :type lazy: bool
+
+        :return: generator of the sections and their settings.
+        :rtype: generator
+        """
+
+        shared, sections = entry
+
+        for section_name, own in sections:
+            if lazy:
+                yield section_name, LayeredSettings((own, shared))
+                continue
+
+            settings = shared.copy()
+            settings.update(own)
+            yield section_name, settings
+
+    # ....................................................................... #
+    def _load_cache(self, cache_file_path):
+        """
+        :return:
+
+            two element tuple of the cached shared settings and sections, see
+            :meth:`_compact`, or None if the entry is missing or can not be
+            loaded.
+
+        :rtype: tuple
+        """
+
+        try:
+            with self._io_open(cache_file_path, 'rb') as file_handler:
+                shared, sections = marshal.loads(file_handler.read())
+
+            # entries are checked before any section is used
+            if not isinstance(shared, dict) or not all(
+                    isinstance(own, dict) for _, own in sections):
+                return None
+        except (EnvironmentError, EOFError, ValueError, TypeError,
+                AttributeError):
+            return None
+
+        return shared, sections
+
+    # ....................................................................... #
+    def _dump_cache(self, cache_file_path, result):
+        """
+        Atomically write the cache entry, a temporary file in the cache
+        folder is renamed into place so readers never see a partially
+        written entry. Failing to write the entry is not an error, the
+        settings file simply gets parsed again on the next run.
+        """
+
+        try:
+            fd, temp_file_path = mkstemp(
+                prefix='.tmp', suffix='.settings', dir=self.cache_path)
+        except EnvironmentError:
+            return
+
+        try:
+            file_handler = fdopen(fd, 'wb')
+            try:
+                file_handler.write(marshal.dumps(result))
+            finally:
+                file_handler.close()
+            # mkstemp creates owner only files, make the entry readable by
+            # other users sharing the cache folder
+            chmod(temp_file_path, 0o644)
+            self._os_rename(temp_file_path, cache_file_path)
+        except EnvironmentError:
+            try:
+                unlink(temp_file_path)
+            except EnvironmentError:
+                pass
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test archive output.
+"""
+
+import os
+import tarfile
+
+from io import BytesIO
+
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from unittest import TestCase
+
+from ...exceptions import AssetCreationError
+from ...exceptions import LocationCreationError
+
+
+# --------------------------------------------------------------------------- #
+class Test_ArchiveAssetManager(TestCase):
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        from ...archive import ArchiveAssetManager
+        return ArchiveAssetManager(*args, **kwargs)
+
+    # ....................................................................... #
+    def _path(self, *path_parts):
+        return os.path.join('out', *path_parts)
+
+    # ....................................................................... #
+    def _members(self, content, mode='r'):
+        archive = tarfile.open(fileobj=BytesIO(content), mode=mode)
+        try:
+            return [(member.name, member.type, member.mode, member.mtime,
+                     archive.extractfile(member).read()
+                     if member.isfile() else None)
+                    for member in archive.getmembers()]
+        finally:
+            archive.close()
+
+    # ....................................................................... #
+    def _write(self, paths, compress=False):
+        file_object = BytesIO()
+
+        archive = self._makeOne('out')
+        archive.open(file_object, compress=compress)
+        archive.create_folder(self._path('role'))
+
+        for path in paths:
+            archive.write_chunks_to_file(
+                self._path('role', *path.split('/')),
+                [u'content of ', path])
+
+        return archive.close(), file_object.getvalue()
+
+    # ....................................................................... #
+    def test_close(self):
+        from tarfile import DIRTYPE
+        from tarfile import REGTYPE
+
+        names, content = self._write(['b/b.conf', 'a.conf', 'b/a.conf'])
+
+        self.assertListEqual(
+            names,
+            ['role', 'role/a.conf', 'role/b', 'role/b/a.conf',
+             'role/b/b.conf'])
+
+        self.assertListEqual(self._members(content), [
+            ('role', DIRTYPE, 0o755, 0, None),
+            ('role/a.conf', REGTYPE, 0o644, 0, b'content of a.conf'),
+            ('role/b', DIRTYPE, 0o755, 0, None),
+            ('role/b/a.conf', REGTYPE, 0o644, 0, b'content of b/a.conf'),
+            ('role/b/b.conf', REGTYPE, 0o644, 0, b'content of b/b.conf'),
+            ])
+
+    # ....................................................................... #
+    def test_flush(self):
+        from tarfile import DIRTYPE
+        from tarfile import REGTYPE
+
+        file_object = BytesIO()
+
+        archive = self._makeOne('out')
+        archive.open(file_object)
+
+        archive.write_to_file(self._path('b', 'b.conf'), u'b')
+        archive.write_to_file(self._path('b', 'a.conf'), u'a')
+        self.assertListEqual(
+            archive.flush(),
+            ['b', 'b/a.conf', 'b/b.conf'])
+
+        # the content of the files written out is not kept
+        self.assertListEqual(archive.member_names(), ['b'])
+        self.assertIsNone(archive.file_size(self._path('b', 'a.conf')))
+
+        # folders are only written out once
+        archive.write_to_file(self._path('b', 'c.conf'), u'c')
+        archive.write_to_file(self._path('a', 'a.conf'), u'a')
+        archive.create_folder(self._path('c'))
+        archive.write_to_file(self._path('c', 'a.conf'), u'c')
+        archive.remove_folder(self._path('c'))
+        self.assertListEqual(
+            archive.flush(),
+            ['a', 'a/a.conf', 'b/c.conf'])
+
+        self.assertListEqual(
+            archive.close(),
+            ['a', 'a/a.conf', 'b', 'b/a.conf', 'b/b.conf', 'b/c.conf'])
+
+        self.assertListEqual(self._members(file_object.getvalue()), [
+            ('b', DIRTYPE, 0o755, 0, None),
+            ('b/a.conf', REGTYPE, 0o644, 0, b'a'),
+            ('b/b.conf', REGTYPE, 0o644, 0, b'b'),
+            ('a', DIRTYPE, 0o755, 0, None),
+            ('a/a.conf', REGTYPE, 0o644, 0, b'a'),
+            ('b/c.conf', REGTYPE, 0o644, 0, b'c'),
+            ])
+
+    # ....................................................................... #
+    def test_close_reproducible(self):
+
+        for compress in (False, True):
+            _, first = self._write(['a.conf', 'b/a.conf'], compress)
+            _, second = self._write(['b/a.conf', 'a.conf'], compress)
+
+            # the same archive whatever order configs are written in
+            self.assertEqual(first, second)
+
+        # the gzip header has no time nor file name
+        self.assertEqual(first[4:8], b'\x00\x00\x00\x00')
+        self.assertEqual(len(self._members(first, 'r:gz')), 4)
+
+    # ....................................................................... #
+    def test_close_file(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyFile(BytesIO):
+
+            def close(self):
+                self.closed_file = True
+
+        file_object = DummyFile()
+        archive = self._makeOne('out')
+        archive.open(file_object, close_file=True)
+        archive.close()
+
+        self.assertTrue(file_object.closed_file)
+        self.assertEqual(self._members(file_object.getvalue()), [])
+
+    # ....................................................................... #
+    def test_close_for_exceptions(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyFile(object):
+
+            def write(self, content):
+                error = EnvironmentError(32, 'Broken pipe')
+                error.filename = '<stdout>'
+                raise error
+
+        archive = self._makeOne('out')
+        archive.open(DummyFile())
+
+        # the archive is written out by records of 20 blocks
+        archive.write_to_file(
+            self._path('a.conf'),
+            u'a' * tarfile.RECORDSIZE)
+
+        for method in (archive.flush, archive.close):
+            self.assertRaisesRegexp(
+                AssetCreationError,
+                "\\[Errno 32\\] Broken pipe: '<stdout>'",
+                method)
+
+        # the gzip header is written when the archive is opened
+        self.assertRaisesRegexp(
+            AssetCreationError,
+            "\\[Errno 32\\] Broken pipe: '<stdout>'",
+            self._makeOne('out').open,
+            DummyFile(),
+            compress=True)
+
+    # ....................................................................... #
+    def test_role(self):
+        from ...bench import generate_project
+        from ...config import Configurator
+        from ...role import Role
+
+        path = mkdtemp()
+        try:
+            paths = generate_project(path, roles=1, sections=4, settings=2)
+
+            config = Configurator(**paths)
+            Role(config, 'role-000').write_configs()
+
+            file_object = BytesIO()
+            archive = self._makeOne(paths['output_path'])
+            archive.open(file_object)
+
+            config = Configurator(
+                _asset_manager_factory=lambda: archive,
+                **paths)
+            output_list = Role(config, 'role-000').write_configs(workers=4)
+            archive.close()
+
+            # the output folder is left untouched
+            self.assertListEqual(
+                os.listdir(paths['output_path']),
+                ['role-000'])
+
+            # the archive has the same configs as the output folder
+            for name, _, _, _, content in self._members(
+                    file_object.getvalue()):
+                file_path = os.path.join(paths['output_path'], name)
+                if content is None:
+                    self.assertTrue(os.path.isdir(file_path))
+                    continue
+
+                self.assertIn(file_path, output_list)
+                with open(file_path, 'rb') as file_handler:
+                    self.assertEqual(content, file_handler.read())
+
+            self.assertEqual(len(output_list), 4)
+        finally:
+            rmtree(path)
+
+
+# --------------------------------------------------------------------------- #
+class Test_open_archive(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...archive import open_archive
+        return open_archive(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_open_archive(self):
+        from ...archive import ArchiveAssetManager
+
+        stdout = BytesIO()
+
+        archive = ArchiveAssetManager('out')
+        self.assertIs(self._callFUT(archive, '-', _stdout=stdout), archive)
+        self.assertIs(archive.file_object, stdout)
+        self.assertFalse(archive.compress)
+        self.assertFalse(archive.close_file)
+
+        path = mkdtemp()
+        try:
+            archive = self._callFUT(
+                ArchiveAssetManager('out'),
+                os.path.join(path, 'out.tgz'))
+            self.assertTrue(archive.compress)
+            self.assertTrue(archive.close_file)
+            archive.close()
+
+            archive = self._callFUT(
+                ArchiveAssetManager('out'),
+                os.path.join(path, 'out.tar'),
+                compress=True)
+            self.assertTrue(archive.compress)
+            archive.close()
+
+            self.assertListEqual(
+                sorted(os.listdir(path)),
+                ['out.tar', 'out.tgz'])
+        finally:
+            rmtree(path)
+
+    # ....................................................................... #
+    def test_open_archive_for_exceptions(self):
+        from ...archive import ArchiveAssetManager
+
+        self.assertRaisesRegexp(
+            LocationCreationError,
+            "No such file or directory",
+            self._callFUT,
+            ArchiveAssetManager('out'),
+            os.path.join('missing', 'folder', 'out.tar'))
@@ -4,6 +4,18 @@
 Test asset management.
 """
 
+from errno import EEXIST
+from errno import ENOENT
+
+from hashlib import sha1
+
+from io import open as io_open
+
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
+
 from unittest import TestCase
 
 from ...compat import StringIO
@@ -75,6 +87,44 @@ class Test_AssetManager(TestCase):
             test_subject,
             _os_path_isdir=dummy_os_path_isdir)
 
+    # ....................................................................... #
+    def test_asset_location(self):
+
+        test_location = 'test_location'
+
+        def dummy_os_path_exists(path):
+            return True
+
+        asset_manager = self._makeOne()
+
+        self.assertEqual(
+            asset_manager.asset_location(
+                test_location, 'some_subject',
+                _os_path_exists=dummy_os_path_exists),
+            test_location)
+
+    # ....................................................................... #
+    def test_asset_location_for_exceptions(self):
+
+        test_location = 'test_location'
+        test_subject = 'test_subject'
+
+        def dummy_os_path_exists(path):
+            return False
+
+        desired_error_message = "%s does not exist or is not accessible: %s" \
+            % (test_subject.capitalize(), test_location)
+
+        asset_manager = self._makeOne()
+
+        self.assertRaisesRegexp(
+            LocationNotFound,
+            desired_error_message,
+            asset_manager.asset_location,
+            test_location,
+            test_subject,
+            _os_path_exists=dummy_os_path_exists)
+
     # ....................................................................... #
     def test_path_join(self):
 
@@ -249,6 +299,94 @@ class Test_AssetManager(TestCase):
                 _os_makedirs=dummy_os_makedirs),
             test_folder_path)
 
+    # ....................................................................... #
+    def test_create_folder_exist_ok(self):
+
+        test_folder_path = 'test_folder_path'
+
+        def dummy_os_makedirs(folder_path):  # pragma: no cover
+            raise AssertionError('existing folder should not be created')
+
+        def dummy_os_path_isdir(folder_path):
+            return True
+
+        asset_manager = self._makeOne()
+
+        self.assertEqual(
+            asset_manager.create_folder(
+                test_folder_path,
+                exist_ok=True,
+                _os_makedirs=dummy_os_makedirs,
+                _os_path_isdir=dummy_os_path_isdir),
+            test_folder_path)
+
+    # ....................................................................... #
+    def test_create_folders(self):
+
+        created = []
+        existing = set(['test/a'])
+
+        def dummy_os_mkdir(folder_path):
+            if folder_path in existing:
+                raise DummyEnvironmentError(
+                    errno=EEXIST,
+                    strerror='File exists',
+                    filename=folder_path)
+            created.append(folder_path)
+
+        def dummy_os_path_isdir(folder_path):
+            return True
+
+        asset_manager = self._makeOne()
+
+        folder_paths = ['test/a', 'test/a/b', 'test/c']
+
+        self.assertListEqual(
+            asset_manager.create_folders(
+                folder_paths,
+                exist_ok=True,
+                _os_mkdir=dummy_os_mkdir,
+                _os_path_isdir=dummy_os_path_isdir),
+            folder_paths)
+        self.assertListEqual(created, ['test/a/b', 'test/c'])
+
+        self.assertRaisesRegexp(
+            LocationCreationError,
+            "File exists: 'test/a'",
+            asset_manager.create_folders,
+            folder_paths,
+            _os_mkdir=dummy_os_mkdir,
+            _os_path_isdir=dummy_os_path_isdir)
+
+        # there is a file at the folder path
+        self.assertRaisesRegexp(
+            AssetLocationTaken,
+            'test/a',
+            asset_manager.create_folders,
+            folder_paths,
+            exist_ok=True,
+            _os_mkdir=dummy_os_mkdir,
+            _os_path_isdir=lambda folder_path: False)
+
+    # ....................................................................... #
+    def test_create_folders_replace_files(self):
+
+        folder_path = mkdtemp()
+        self.addCleanup(rmtree, folder_path)
+
+        file_path = os.path.join(folder_path, 'a')
+        with open(file_path, 'w') as file_handler:
+            file_handler.write('config of a previous run')
+
+        folder_paths = [file_path, os.path.join(file_path, 'b')]
+
+        self._makeOne().create_folders(
+            folder_paths,
+            exist_ok=True,
+            replace_files=True)
+
+        self.assertTrue(os.path.isdir(folder_paths[1]))
+
     # ....................................................................... #
     def test_create_folder_for_exceptions(self):
 
@@ -352,3 +490,698 @@ class Test_AssetManager(TestCase):
             test_file_path,
             'some_content',
             _io_open=dummy_io_open)
+
+    # ....................................................................... #
+    def _makeFolder(self):
+        folder_path = mkdtemp()
+        self.addCleanup(rmtree, folder_path)
+        return folder_path
+
+    # ....................................................................... #
+    def test_write_chunks_to_file(self):
+
+        folder_path = self._makeFolder()
+        test_file_path = os.path.join(folder_path, 'test.conf')
+        test_chunks = [u'ab', u'cd', u'e', u'fghi', u'j']
+
+        writes = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyFileStream(object):
+
+            def __init__(self, file_descriptor, mode):
+                self._file_handler = io_open(file_descriptor, mode)
+
+            def write(self, content):
+                writes.append(content)
+                self._file_handler.write(content)
+
+            def close(self):
+                self._file_handler.close()
+
+        asset_manager = self._makeOne()
+
+        self.assertEqual(
+            asset_manager.write_chunks_to_file(
+                file_path=test_file_path,
+                chunks=iter(test_chunks),
+                buffer_size=4,
+                _io_open=DummyFileStream),
+            test_file_path)
+
+        # chunks are encoded and written in batches of at least buffer_size
+        self.assertListEqual(writes, [b'abcd', b'efghi', b'j'])
+
+        with open(test_file_path) as file_handler:
+            self.assertEqual(file_handler.read(), 'abcdefghij')
+
+        # a replaced file keeps its permissions
+        os.chmod(test_file_path, 0o640)
+
+        asset_manager.write_chunks_to_file(test_file_path, [u'new'])
+
+        self.assertEqual(os.stat(test_file_path).st_mode & 0o777, 0o640)
+        self.assertListEqual(os.listdir(folder_path), ['test.conf'])
+
+    # ....................................................................... #
+    def test_write_chunks_to_file_binary(self):
+
+        folder_path = self._makeFolder()
+        test_file_path = os.path.join(folder_path, 'test.bin')
+
+        asset_manager = self._makeOne()
+
+        asset_manager.write_chunks_to_file(
+            file_path=test_file_path,
+            chunks=[b'\x00\x01', b'\xff'],
+            binary=True)
+
+        with open(test_file_path, 'rb') as file_handler:
+            self.assertEqual(file_handler.read(), b'\x00\x01\xff')
+
+    # ....................................................................... #
+    def test_write_chunks_to_file_chunks_exception(self):
+
+        folder_path = self._makeFolder()
+        test_file_path = os.path.join(folder_path, 'test.conf')
+        test_error_message = 'test_error_message'
+
+        with open(test_file_path, 'w') as file_handler:
+            file_handler.write('old')
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_chunks():
+            yield u'test'
+            raise ValueError(test_error_message)
+
+        asset_manager = self._makeOne()
+
+        self.assertRaisesRegexp(
+            ValueError,
+            test_error_message,
+            asset_manager.write_chunks_to_file,
+            test_file_path,
+            dummy_chunks(),
+            buffer_size=1)
+
+        # the existing file is kept and the temporary file removed
+        self.assertListEqual(os.listdir(folder_path), ['test.conf'])
+        with open(test_file_path) as file_handler:
+            self.assertEqual(file_handler.read(), 'old')
+
+    # ....................................................................... #
+    def test_write_chunks_to_file_for_exceptions(self):
+
+        folder_path = self._makeFolder()
+        test_file_path = os.path.join(folder_path, 'test.conf')
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_rename(source, destination):
+            raise DummyEnvironmentError(
+                errno=13,
+                strerror='Permission denied',
+                filename=destination)
+
+        asset_manager = self._makeOne()
+
+        self.assertRaisesRegexp(
+            AssetCreationError,
+            "\\[Errno 13\\] Permission denied: '%s'" % test_file_path,
+            asset_manager.write_chunks_to_file,
+            test_file_path,
+            [u'some_content'],
+            _os_rename=dummy_os_rename)
+
+        self.assertListEqual(os.listdir(folder_path), [])
+
+        # the temporary file can not be created in a missing folder
+        self.assertRaises(
+            AssetCreationError,
+            asset_manager.write_chunks_to_file,
+            os.path.join(folder_path, 'missing', 'test.conf'),
+            [u'some_content'])
+
+    # ....................................................................... #
+    def test_write_chunks_if_changed(self):
+
+        folder_path = mkdtemp()
+        try:
+            file_path = os.path.join(folder_path, 'test.conf')
+
+            asset_manager = self._makeOne()
+
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+            def write(*chunks):
+                return asset_manager.write_chunks_if_changed(
+                    file_path,
+                    iter(chunks))
+
+            self.assertTrue(write(u'one', u'\n'))
+            os.chmod(file_path, 0o640)
+            file_stat = os.stat(file_path)
+
+            # identical content, the file is not touched
+            self.assertFalse(write(u'one\n'))
+            self.assertEqual(os.stat(file_path).st_ino, file_stat.st_ino)
+            self.assertEqual(os.stat(file_path).st_mtime, file_stat.st_mtime)
+
+            # same size, different content, the file is replaced
+            self.assertTrue(write(u'two\n'))
+            self.assertNotEqual(os.stat(file_path).st_ino, file_stat.st_ino)
+            self.assertEqual(os.stat(file_path).st_mode, file_stat.st_mode)
+
+            self.assertTrue(write(u'three\n'))
+
+            with open(file_path, 'rb') as file_handler:
+                self.assertEqual(file_handler.read(), b'three\n')
+
+            # binary content is compared as is
+            self.assertFalse(asset_manager.write_chunks_if_changed(
+                file_path,
+                [b'thr', b'ee\n'],
+                binary=True))
+
+            # no temporary files are left behind
+            self.assertListEqual(os.listdir(folder_path), ['test.conf'])
+        finally:
+            rmtree(folder_path)
+
+    # ....................................................................... #
+    def test_write_chunks_if_changed_for_exceptions(self):
+
+        folder_path = mkdtemp()
+        try:
+            file_path = os.path.join(folder_path, 'test.conf')
+
+            with open(file_path, 'w') as file_handler:
+                file_handler.write('old')
+
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+            def dummy_os_rename(source, destination):
+                raise DummyEnvironmentError(
+                    errno=13,
+                    strerror='Permission denied',
+                    filename=destination)
+
+            asset_manager = self._makeOne()
+
+            self.assertRaisesRegexp(
+                AssetCreationError,
+                "\\[Errno 13\\] Permission denied: '%s'" % file_path,
+                asset_manager.write_chunks_if_changed,
+                file_path,
+                [u'new'],
+                _os_rename=dummy_os_rename)
+
+            # the existing file is kept and the temporary file removed
+            self.assertListEqual(os.listdir(folder_path), ['test.conf'])
+            with open(file_path) as file_handler:
+                self.assertEqual(file_handler.read(), 'old')
+
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+            def dummy_chunks():
+                yield u'new'
+                # the chunks already consumed are written out
+                self.assertEqual(len(os.listdir(folder_path)), 2)
+                raise ValueError('test_error_message')
+
+            # chunks are streamed to a temporary file, new files too, so a
+            # failing render leaves nothing behind
+            for path in (file_path, os.path.join(folder_path, 'new.conf')):
+                self.assertRaisesRegexp(
+                    ValueError,
+                    'test_error_message',
+                    asset_manager.write_chunks_if_changed,
+                    path,
+                    dummy_chunks(),
+                    buffer_size=1)
+
+            self.assertListEqual(os.listdir(folder_path), ['test.conf'])
+            with open(file_path) as file_handler:
+                self.assertEqual(file_handler.read(), 'old')
+        finally:
+            rmtree(folder_path)
+
+    # ....................................................................... #
+    def test_remove_files_except(self):
+
+        folder_path = mkdtemp()
+        try:
+            for path in ('a/keep.conf', 'a/old.conf', 'b/c/old.conf'):
+                file_path = os.path.join(folder_path, *path.split('/'))
+                if not os.path.isdir(os.path.dirname(file_path)):
+                    os.makedirs(os.path.dirname(file_path))
+                open(file_path, 'w').close()
+
+            asset_manager = self._makeOne()
+
+            self.assertListEqual(
+                asset_manager.remove_files_except(
+                    folder_path,
+                    [os.path.join(folder_path, 'a', 'keep.conf')]),
+                [os.path.join(folder_path, 'a', 'old.conf'),
+                 os.path.join(folder_path, 'b', 'c', 'old.conf')])
+
+            # the folders left empty are removed, the top one is kept
+            self.assertListEqual(os.listdir(folder_path), ['a'])
+            self.assertListEqual(
+                os.listdir(os.path.join(folder_path, 'a')),
+                ['keep.conf'])
+        finally:
+            rmtree(folder_path)
+
+    # ....................................................................... #
+    def test_list_files(self):
+
+        folder_path = mkdtemp()
+        try:
+            for path in ('b.conf', 'a/c.conf', 'a/d/e.conf'):
+                file_path = os.path.join(folder_path, *path.split('/'))
+                if not os.path.isdir(os.path.dirname(file_path)):
+                    os.makedirs(os.path.dirname(file_path))
+                open(file_path, 'w').close()
+
+            asset_manager = self._makeOne()
+
+            self.assertListEqual(
+                asset_manager.list_files(folder_path),
+                [os.path.join(folder_path, 'a', 'c.conf'),
+                 os.path.join(folder_path, 'a', 'd', 'e.conf'),
+                 os.path.join(folder_path, 'b.conf')])
+
+            # nothing is listed in a missing folder
+            self.assertListEqual(
+                asset_manager.list_files(os.path.join(folder_path, 'x')),
+                [])
+        finally:
+            rmtree(folder_path)
+
+    # ....................................................................... #
+    def test_file_matches(self):
+
+        folder_path = mkdtemp()
+        try:
+            file_path = os.path.join(folder_path, 'test.conf')
+
+            with open(file_path, 'wb') as file_handler:
+                file_handler.write(b'one\n')
+
+            opened = []
+
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+            def dummy_io_open(path, mode):
+                opened.append(path)
+                return open(path, mode)
+
+            asset_manager = self._makeOne()
+
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+            def matches(file_path, *chunks, **kwargs):
+                return asset_manager.file_matches(
+                    file_path,
+                    iter(chunks),
+                    _io_open=dummy_io_open,
+                    **kwargs)
+
+            self.assertTrue(matches(file_path, u'one', u'\n'))
+            self.assertTrue(matches(file_path, b'one\n', binary=True))
+            self.assertFalse(matches(file_path, u'two\n'))
+            self.assertEqual(len(opened), 3)
+
+            # files of a different size are not read
+            self.assertFalse(matches(file_path, u'three\n'))
+            self.assertFalse(matches(
+                os.path.join(folder_path, 'missing.conf'),
+                u'one\n'))
+            self.assertEqual(len(opened), 3)
+
+            self.assertEqual(
+                asset_manager.file_digest(file_path),
+                sha1(b'one\n').hexdigest())
+            self.assertIsNone(asset_manager.file_digest(
+                os.path.join(folder_path, 'missing.conf')))
+
+            # content spanning several batches is hashed batch by batch
+            from ...assets import WRITE_BUFFER_SIZE
+
+            with io_open(file_path, 'w') as file_handler:
+                file_handler.write(u'line\n' * WRITE_BUFFER_SIZE)
+
+            self.assertTrue(asset_manager.file_matches(
+                file_path,
+                (u'line\n' for _ in range(WRITE_BUFFER_SIZE))))
+            self.assertFalse(asset_manager.file_matches(
+                file_path,
+                (u'lime\n' for _ in range(WRITE_BUFFER_SIZE))))
+
+            # nothing is written
+            self.assertListEqual(os.listdir(folder_path), ['test.conf'])
+        finally:
+            rmtree(folder_path)
+
+    # ....................................................................... #
+    def test_list_folder(self):
+
+        test_folder_path = 'test_folder_path'
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_listdir(path):
+            self.assertEqual(path, test_folder_path)
+            return ['b', 'c', 'a']
+
+        asset_manager = self._makeOne()
+
+        self.assertListEqual(
+            asset_manager.list_folder(
+                test_folder_path,
+                _os_listdir=dummy_os_listdir),
+            ['a', 'b', 'c'])
+
+    # ....................................................................... #
+    def test_list_folder_for_exceptions(self):
+
+        test_folder_path = 'test_folder_path'
+        test_errno = 2
+        test_strerror = 'test_strerror'
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_listdir(path):
+            raise DummyEnvironmentError(
+                errno=test_errno,
+                strerror=test_strerror,
+                filename=test_folder_path)
+
+        desired_error_message = "\\[Errno %d\\] %s: '%s'" \
+            % (test_errno, test_strerror, test_folder_path)
+
+        asset_manager = self._makeOne()
+
+        self.assertRaisesRegexp(
+            LocationNotFound,
+            desired_error_message,
+            asset_manager.list_folder,
+            test_folder_path,
+            _os_listdir=dummy_os_listdir)
+
+    # ....................................................................... #
+    def test_remove_file(self):
+
+        removed = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_remove(path):
+            removed.append(path)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_rmdir(path):
+            if path == 'role/a':
+                raise DummyEnvironmentError(
+                    errno=39,
+                    strerror='Directory not empty',
+                    filename=path)
+            removed.append(path)
+
+        asset_manager = self._makeOne()
+
+        self.assertEqual(
+            asset_manager.remove_file(
+                'role/a/b/c/test.conf',
+                stop_folder_path='role',
+                _os_remove=dummy_os_remove,
+                _os_rmdir=dummy_os_rmdir),
+            'role/a/b/c/test.conf')
+
+        self.assertListEqual(
+            removed,
+            ['role/a/b/c/test.conf', 'role/a/b/c', 'role/a/b'])
+
+    # ....................................................................... #
+    def test_remove_file_missing(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_remove(path):
+            raise DummyEnvironmentError(
+                errno=ENOENT,
+                strerror='No such file or directory',
+                filename=path)
+
+        asset_manager = self._makeOne()
+
+        self.assertEqual(
+            asset_manager.remove_file(
+                'test.conf',
+                _os_remove=dummy_os_remove),
+            'test.conf')
+
+    # ....................................................................... #
+    def test_remove_file_for_exceptions(self):
+
+        test_file_path = 'test_file_path'
+        test_errno = 13
+        test_strerror = 'test_strerror'
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_remove(path):
+            raise DummyEnvironmentError(
+                errno=test_errno,
+                strerror=test_strerror,
+                filename=test_file_path)
+
+        desired_error_message = "\\[Errno %d\\] %s: '%s'" \
+            % (test_errno, test_strerror, test_file_path)
+
+        asset_manager = self._makeOne()
+
+        self.assertRaisesRegexp(
+            LocationRemovalError,
+            desired_error_message,
+            asset_manager.remove_file,
+            test_file_path,
+            _os_remove=dummy_os_remove)
+
+    # ....................................................................... #
+    def test_file_size(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_path_getsize(path):
+            if path == 'missing':
+                raise DummyEnvironmentError(
+                    errno=ENOENT,
+                    strerror='No such file or directory',
+                    filename=path)
+            return 10
+
+        asset_manager = self._makeOne()
+
+        self.assertEqual(
+            asset_manager.file_size(
+                'test_file_path',
+                _os_path_getsize=dummy_os_path_getsize),
+            10)
+        self.assertIsNone(
+            asset_manager.file_size(
+                'missing',
+                _os_path_getsize=dummy_os_path_getsize))
+
+    # ....................................................................... #
+    def test_read_file(self):
+
+        test_file_path = 'test_file_path'
+        test_content = u'test_content'
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_io_open(path, mode):
+            self.assertEqual(path, test_file_path)
+            self.assertEqual(mode, 'r')
+            return StringIO(test_content)
+
+        asset_manager = self._makeOne()
+
+        self.assertEqual(
+            asset_manager.read_file(
+                test_file_path,
+                _io_open=dummy_io_open),
+            test_content)
+
+    # ....................................................................... #
+    def test_read_file_for_exceptions(self):
+
+        test_file_path = 'test_file_path'
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_io_open(path, mode):
+            raise DummyEnvironmentError(
+                errno=ENOENT,
+                strerror='No such file or directory',
+                filename=test_file_path)
+
+        asset_manager = self._makeOne()
+
+        self.assertRaises(
+            LocationNotFound,
+            asset_manager.read_file,
+            test_file_path,
+            _io_open=dummy_io_open)
+
+
+# --------------------------------------------------------------------------- #
+class Test_MemoryAssetManager(TestCase):
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        from ...assets import MemoryAssetManager
+        return MemoryAssetManager(*args, **kwargs)
+
+    # ....................................................................... #
+    def _path(self, *path_parts):
+        return os.path.join('out', *path_parts)
+
+    # ....................................................................... #
+    def test_files(self):
+
+        asset_manager = self._makeOne('out')
+
+        path = self._path('role', 'a.conf')
+
+        self.assertIsNone(asset_manager.file_size(path))
+        self.assertTrue(asset_manager.write_chunks_if_changed(path, [u'abc']))
+        self.assertFalse(asset_manager.write_chunks_if_changed(path, [u'abc']))
+        self.assertTrue(asset_manager.write_chunks_if_changed(
+            path, [b'\xff'], binary=True))
+        self.assertEqual(asset_manager.file_size(path), 1)
+
+        asset_manager.write_to_file(path, u'text\n')
+        self.assertEqual(asset_manager.read_file(path), u'text\n')
+
+        asset_manager.remove_file(path)
+        self.assertIsNone(asset_manager.file_size(path))
+        self.assertRaises(LocationNotFound, asset_manager.read_file, path)
+
+        # the folders of the files are kept
+        self.assertListEqual(asset_manager.member_names(), ['role'])
+
+        temporary_path = asset_manager.write_temporary_file(path, [u'new'])
+        self.assertEqual(
+            asset_manager.replace_file(temporary_path, path),
+            path)
+        self.assertEqual(asset_manager.read_file(path), u'new')
+        self.assertListEqual(
+            asset_manager.member_names(),
+            ['role', 'role/a.conf'])
+        asset_manager.remove_file(path)
+
+        self.assertRaisesRegexp(
+            AssetCreationError,
+            "Path is not in the output path: other/a.conf",
+            asset_manager.write_to_file,
+            os.path.join('other', 'a.conf'),
+            u'a')
+
+    # ....................................................................... #
+    def test_create_folders_replace_files(self):
+
+        asset_manager = self._makeOne('out')
+
+        asset_manager.write_to_file(self._path('role', 'a'), u'a')
+        asset_manager.create_folders(
+            [self._path('role', 'a'), self._path('role', 'a', 'b')],
+            replace_files=True)
+
+        self.assertListEqual(
+            asset_manager.member_names(),
+            ['role', 'role/a', 'role/a/b'])
+
+    # ....................................................................... #
+    def test_folders(self):
+
+        asset_manager = self._makeOne('out')
+
+        asset_manager.create_folders([self._path('role', 'a', 'b')])
+        asset_manager.write_to_file(
+            self._path('role', 'a', 'b', 'c.conf'),
+            u'c')
+        asset_manager.write_to_file(self._path('role', 'a', 'd.conf'), u'd')
+        asset_manager.write_to_file(self._path('role-2', 'e.conf'), u'e')
+
+        self.assertListEqual(
+            asset_manager.remove_files_except(
+                self._path('role'),
+                [self._path('role', 'a', 'd.conf')]),
+            [self._path('role', 'a', 'b', 'c.conf')])
+
+        asset_manager.remove_folder(self._path('role'))
+
+        self.assertListEqual(
+            asset_manager.member_names(),
+            ['role-2', 'role-2/e.conf'])
+
+        # files and folders can not take each other's place
+        self.assertRaises(
+            AssetLocationTaken,
+            asset_manager.create_folder,
+            self._path('role-2', 'e.conf'))
+        self.assertRaises(
+            AssetLocationTaken,
+            asset_manager.asset_or_location_exists,
+            self._path('role-2', 'e.conf'))
+        self.assertRaises(
+            AssetCreationError,
+            asset_manager.write_to_file,
+            self._path('role-2'),
+            u'role')
+
+    # ....................................................................... #
+    def test_check(self):
+
+        asset_manager = self._makeOne('out')
+
+        path = self._path('role', 'a', 'b.conf')
+
+        self.assertFalse(asset_manager.file_matches(path, [u'b']))
+        self.assertIsNone(asset_manager.file_digest(path))
+
+        asset_manager.write_to_file(path, u'b')
+        asset_manager.write_to_file(self._path('role', 'c.conf'), u'c')
+        asset_manager.write_to_file(self._path('role-2', 'd.conf'), u'd')
+
+        self.assertTrue(asset_manager.file_matches(path, [u'b']))
+        self.assertTrue(asset_manager.file_matches(path, [b'b'], binary=True))
+        self.assertFalse(asset_manager.file_matches(path, [u'c']))
+        self.assertEqual(
+            asset_manager.file_digest(path),
+            sha1(b'b').hexdigest())
+
+        self.assertListEqual(
+            asset_manager.list_files(self._path('role')),
+            [path, self._path('role', 'c.conf')])
+
+    # ....................................................................... #
+    def test_files_without_root_path(self):
+
+        asset_manager = self._makeOne()
+
+        asset_manager.create_folder('role')
+        asset_manager.write_chunks_to_file(
+            os.path.join('role', 'a.conf'),
+            [u'a', u'\n'])
+        asset_manager.write_chunks_to_file(
+            os.path.join('role', 'b.bin'),
+            [b'\xff'],
+            binary=True)
+
+        self.assertListEqual(
+            asset_manager.files(),
+            [('role/a.conf', b'a\n'), ('role/b.bin', b'\xff')])
+
+        # folders in memory are found, then the ones on the file system
+        self.assertEqual(
+            asset_manager.location('role', 'role folder'),
+            'role')
+        self.assertEqual(
+            asset_manager.location(os.path.dirname(__file__), 'templates'),
+            os.path.dirname(__file__))
+        self.assertRaises(
+            LocationNotFound,
+            asset_manager.location,
+            'other',
+            'role folder')
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test benchmark module.
+"""
+
+import io
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from unittest import TestCase
+
+
+# --------------------------------------------------------------------------- #
+class Test_generate_project(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.path = mkdtemp()
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...bench import generate_project
+        return generate_project(*args, **kwargs)
+
+    # ....................................................................... #
+    def _read(self, *path):
+        with io.open(os.path.join(*path), 'r', encoding='utf-8') as handler:
+            return handler.read()
+
+    # ....................................................................... #
+    def test_generate_project(self):
+        from ...config import Configurator
+        from ...role import Role
+
+        paths = self._callFUT(
+            self.path,
+            roles=2,
+            sections=3,
+            depth=2,
+            settings=2,
+            template_size=40)
+
+        self.assertListEqual(
+            sorted(os.listdir(paths['settings_path'])),
+            ['role-000.configme', 'role-001.configme'])
+
+        config = Configurator(**paths)
+        output_list = Role(config, 'role-001').write_configs()
+
+        self.assertEqual(len(output_list), 3)
+        self.assertEqual(
+            self._read(output_list[2]),
+            u'# generated for role-001\n'
+            u'# layout 1\n'
+            u'key_0 = role-001-2-0\n'
+            u'key_1 = role-001-2-1\n')
+
+    # ....................................................................... #
+    def test_generate_project_substitution(self):
+        from ...config import Configurator
+        from ...role import Role
+
+        paths = self._callFUT(
+            self.path,
+            roles=1,
+            sections=1,
+            depth=0,
+            settings=1,
+            template_size=10)
+
+        config = Configurator(
+            template_renderers=[('*', 'substitution')],
+            **paths)
+
+        output_list = Role(config, 'role-000').write_configs()
+
+        self.assertEqual(self._read(output_list[0]), u'key_0 = role-000-0-0')
+
+    # ....................................................................... #
+    def test_generate_project_for_exceptions(self):
+        from ...exceptions import LocationCreationError
+
+        self._callFUT(self.path, roles=1, sections=1)
+
+        self.assertRaisesRegexp(
+            LocationCreationError,
+            "File exists",
+            self._callFUT,
+            self.path)
+
+
+# --------------------------------------------------------------------------- #
+class Test_peak_rss(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...bench import peak_rss
+        return peak_rss(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_peak_rss(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyResource(object):
+
+            RUSAGE_SELF = 'self'
+
+            class DummyUsage(object):
+                ru_maxrss = 2048
+
+            def getrusage(self, who):
+                return self.DummyUsage()
+
+        self.assertEqual(
+            self._callFUT(_resource=DummyResource(), _platform='linux2'),
+            2048 * 1024)
+        self.assertEqual(
+            self._callFUT(_resource=DummyResource(), _platform='darwin'),
+            2048)
+
+
+# --------------------------------------------------------------------------- #
+class Test_run_benchmark(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...bench import run_benchmark
+        return run_benchmark(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_run_benchmark(self):
+
+        ticks = iter(range(100))
+
+        result = self._callFUT(
+            roles=2,
+            sections=5,
+            settings=3,
+            template_size=100,
+            incremental=True,
+            repeat=2,
+            _timer=lambda: next(ticks),
+            _peak_rss=lambda: 1024)
+
+        self.assertEqual(result['files'], 10)
+        self.assertGreater(result['bytes'], 10 * 100)
+        self.assertEqual(result['peak_rss'], 1024)
+        self.assertEqual(result['parameters']['repeat'], 2)
+
+        # every phase and run takes a tick
+        self.assertDictEqual(
+            result['phases'],
+            {'generate': 1, 'configure': 1, 'write': 2})
+        self.assertListEqual(
+            [run['elapsed'] for run in result['runs']],
+            [1, 1])
+        self.assertEqual(result['files_per_second'], 10)
+        self.assertEqual(
+            result['mb_per_second'],
+            result['bytes'] / 1048576.0)
+
+    # ....................................................................... #
+    def test_run_benchmark_path(self):
+
+        path = mkdtemp()
+        try:
+            result = self._callFUT(
+                path=path,
+                roles=1,
+                sections=2,
+                timings=True)
+
+            # the project is kept
+            self.assertListEqual(
+                sorted(os.listdir(path)),
+                ['output', 'settings', 'templates'])
+
+            self.assertIn('render', result['role_phases'])
+            self.assertNotIn('role_phases', self._callFUT(roles=1))
+        finally:
+            rmtree(path)
@@ -4,6 +4,8 @@
 Test CLI initialization and configuration.
 """
 
+import os
+
 from unittest import TestCase
 
 from ...compat import StringIO
@@ -16,13 +18,17 @@ from ...exceptions import ScriptHelpArgumentError
 class DummyCliArgumentParser(object):
 
     description = ''
+    prog = None
+    epilog = None
 
     _arguments = []
 
     # ....................................................................... #
-    def __init__(self, description):
+    def __init__(self, description, prog=None, epilog=None):
         self._arguments = []
         self.description = description
+        self.prog = prog
+        self.epilog = epilog
 
     # ....................................................................... #
     def add_argument(
@@ -34,7 +40,9 @@ class DummyCliArgumentParser(object):
         action='store',
         nargs=None,
         default=None,
-        type=None
+        type=None,
+        const=None,
+        metavar=None
     ):
 
         argument = {
@@ -101,13 +109,23 @@ class Test_cli_configured_argument_parser(TestCase):
             },
             {'short_opt': '-r',
              'long_opt': '--role-name',
-             'required': True,
-             'help': 'Role name.',
+             'required': False,
+             'help': "Role names or glob patterns matching role settings "
+                     "files, such as 'prod-*'.",
              'action': 'store',
-             'nargs': None,
+             'nargs': '+',
              'default': None,
              'type': None,
             },
+            {'short_opt': '-a',
+             'long_opt': '--all-roles',
+             'required': False,
+             'help': 'Generate all the roles in the settings folder.',
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
             {'short_opt': '-u',
              'long_opt': '--role-suffix',
              'required': False,
@@ -127,11 +145,463 @@ class Test_cli_configured_argument_parser(TestCase):
              'default': {},
              'type': DummyCliArgumentParser.split_argument,
             },
+            {'short_opt': '-c',
+             'long_opt': '--bytecode-cache',
+             'required': False,
+             'help': 'Path to folder used to cache compiled templates '
+                     'between runs.',
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-m',
+             'long_opt': '--compiled-templates',
+             'required': False,
+             'help': "Path to compiled templates bundle folder or zip file "
+                     "created by the 'compile' command.",
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-C',
+             'long_opt': '--settings-cache',
+             'required': False,
+             'help': "Path to folder used to cache parsed settings files "
+                     "between runs.",
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-j',
+             'long_opt': '--jobs',
+             'required': False,
+             'help': 'Number of threads rendering configs and as many '
+                     'threads writing them out. Defaults to 1.',
+             'action': 'store',
+             'nargs': None,
+             'default': 1,
+             'type': int,
+            },
+            {'short_opt': '-p',
+             'long_opt': '--processes',
+             'required': False,
+             'help': 'Number of processes generating roles in parallel. '
+                     'Defaults to 1.',
+             'action': 'store',
+             'nargs': None,
+             'default': 1,
+             'type': int,
+            },
+            {'short_opt': '-i',
+             'long_opt': '--incremental',
+             'required': False,
+             'help': 'Only write out configs that changed since the previous '
+                     'run and remove configs of removed sections, instead of '
+                     'rebuilding the role folder.',
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
+            {'short_opt': '-K',
+             'long_opt': '--keep-unchanged',
+             'required': False,
+             'help': 'Leave configs identical to the existing files '
+                     'untouched, keeping their modification times, and '
+                     'replace changed configs atomically, instead of '
+                     'rebuilding the role folder.',
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
+            {'short_opt': '-w',
+             'long_opt': '--watch',
+             'required': False,
+             'help': 'Keep running, regenerating the roles affected by '
+                     'template and settings changes. Implies --incremental.',
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
+            {'short_opt': '-e',
+             'long_opt': '--renderers',
+             'required': False,
+             'help': "Template renderers of the configs matching glob "
+                     "patterns, such as '*.conf=substitution'. Renderers: "
+                     "jinja2, substitution, verbatim and installed plugins. "
+                     "Defaults to jinja2.",
+             'action': 'store',
+             'nargs': '+',
+             'default': [],
+             'type': DummyCliArgumentParser.split_argument,
+            },
+            {'short_opt': '-S',
+             'long_opt': '--socket',
+             'required': False,
+             'help': "Path to the UNIX socket of a render server started by "
+                     "the 'serve' command. Roles are generated in-process "
+                     "when the server is not running.",
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-A',
+             'long_opt': '--archive',
+             'required': False,
+             'help': "Write the configs into a tar archive at this path "
+                     "instead of the output folder, '-' for stdout. Member "
+                     "names are relative to the output path. Roles are "
+                     "generated in-process.",
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-z',
+             'long_opt': '--gzip',
+             'required': False,
+             'help': 'Compress the archive with gzip, the default for '
+                     'archive paths ending with .gz or .tgz.',
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
+            {'short_opt': '-n',
+             'long_opt': '--check',
+             'required': False,
+             'help': "Compare the rendered configs with the files in the "
+                     "role folders and list the files which would be added, "
+                     "changed and removed, without writing nor removing "
+                     "anything. Exits with 3 when they differ. Roles are "
+                     "checked in-process.",
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
+            {'short_opt': '-T',
+             'long_opt': '--timings',
+             'required': False,
+             'help': "Write out the time spent in each phase of the role "
+                     "generation and the COUNT slowest templates, 10 unless "
+                     "given, after the list of files. Roles are generated "
+                     "in-process.",
+             'action': 'store',
+             'nargs': '?',
+             'default': None,
+             'type': int,
+            },
+        ]
+
+        parser = self._callFUT(_argument_parser_factory=DummyCliArgumentParser)
+
+        self.assertListEqual(test_configuration, parser._arguments)
+        self.assertEqual(parser.prog, 'configme')
+        self.assertIn("'bench', 'compile', 'serve', 'warm'", parser.epilog)
+
+
+# --------------------------------------------------------------------------- #
+class Test_cli_configured_compile_argument_parser(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...cli import configured_compile_argument_parser
+        return configured_compile_argument_parser(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_configuration(self):
+
+        test_configuration = [
+            {'short_opt': '-t',
+             'long_opt': '--templates-path',
+             'required': True,
+             'help': 'Path to configuration templates folder.',
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-m',
+             'long_opt': '--compiled-templates',
+             'required': True,
+             'help': 'Path to compiled templates bundle folder or zip file.',
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-z',
+             'long_opt': '--zip',
+             'required': False,
+             'help': 'Compile templates into a zip file instead of a folder.',
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
+        ]
+
+        parser = self._callFUT(_argument_parser_factory=DummyCliArgumentParser)
+
+        self.assertListEqual(test_configuration, parser._arguments)
+        self.assertEqual(parser.prog, 'configme compile')
+
+
+# --------------------------------------------------------------------------- #
+class Test_cli_configured_warm_argument_parser(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...cli import configured_warm_argument_parser
+        return configured_warm_argument_parser(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_configuration(self):
+
+        test_configuration = [
+            {'short_opt': '-t',
+             'long_opt': '--templates-path',
+             'required': True,
+             'help': 'Path to configuration templates folder.',
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-c',
+             'long_opt': '--bytecode-cache',
+             'required': True,
+             'help': 'Path to folder used to cache compiled templates '
+                     'between runs.',
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            {'short_opt': '-j',
+             'long_opt': '--jobs',
+             'required': False,
+             'help': 'Number of processes compiling templates. Defaults to '
+                     'the number of CPUs.',
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': int,
+            },
+        ]
+
+        parser = self._callFUT(_argument_parser_factory=DummyCliArgumentParser)
+
+        self.assertListEqual(test_configuration, parser._arguments)
+        self.assertEqual(parser.prog, 'configme warm')
+
+
+# --------------------------------------------------------------------------- #
+class Test_cli_configured_serve_argument_parser(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...cli import configured_serve_argument_parser
+        return configured_serve_argument_parser(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_configuration(self):
+
+        test_configuration = [
+            {'short_opt': '-S',
+             'long_opt': '--socket',
+             'required': True,
+             'help': 'Path to the UNIX socket to listen on.',
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+        ]
+
+        parser = self._callFUT(_argument_parser_factory=DummyCliArgumentParser)
+
+        self.assertListEqual(test_configuration, parser._arguments)
+        self.assertEqual(parser.prog, 'configme serve')
+
+
+# --------------------------------------------------------------------------- #
+class Test_cli_configured_bench_argument_parser(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...cli import configured_bench_argument_parser
+        return configured_bench_argument_parser(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_configuration(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def integer(short_opt, long_opt, help, default):
+            return {
+                'short_opt': short_opt,
+                'long_opt': long_opt,
+                'required': False,
+                'help': help,
+                'action': 'store',
+                'nargs': None,
+                'default': default,
+                'type': int,
+                }
+
+        test_configuration = [
+            {'short_opt': '-d',
+             'long_opt': '--path',
+             'required': False,
+             'help': 'Folder to generate the project in, it is kept. '
+                     'Defaults to a temporary folder.',
+             'action': 'store',
+             'nargs': None,
+             'default': None,
+             'type': None,
+            },
+            integer('-n', '--roles', 'Number of roles. Defaults to 4.', 4),
+            integer('-k', '--sections', 'Number of sections, and templates, '
+                    'per role. Defaults to 100.', 100),
+            integer('-x', '--depth', 'Number of layout templates each '
+                    'template extends. 0 for templates which only substitute '
+                    'settings. Defaults to 1.', 1),
+            integer('-y', '--settings', 'Number of settings per section. '
+                    'Defaults to 10.', 10),
+            integer('-z', '--template-size', 'Size of each template in '
+                    'bytes. Defaults to 1024.', 1024),
+            integer('-R', '--repeat', 'Number of times the roles are '
+                    'written. Defaults to 1.', 1),
+            integer('-j', '--jobs', 'Number of threads rendering configs and '
+                    'as many writing them out. Defaults to 1.', 1),
+            {'short_opt': '-i',
+             'long_opt': '--incremental',
+             'required': False,
+             'help': 'Only write out configs which changed since the '
+                     'previous run.',
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
+            {'short_opt': '-K',
+             'long_opt': '--keep-unchanged',
+             'required': False,
+             'help': 'Only write out configs which differ from the existing '
+                     'files.',
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
+            {'short_opt': '-e',
+             'long_opt': '--renderers',
+             'required': False,
+             'help': "Template renderers of the configs matching glob "
+                     "patterns, such as '*.conf=substitution'. Defaults to "
+                     "jinja2.",
+             'action': 'store',
+             'nargs': '+',
+             'default': [],
+             'type': DummyCliArgumentParser.split_argument,
+            },
+            {'short_opt': '-T',
+             'long_opt': '--timings',
+             'required': False,
+             'help': "Also report the time spent in each phase of the role "
+                     "generation, summed over all the roles and runs.",
+             'action': 'store_true',
+             'nargs': None,
+             'default': False,
+             'type': None,
+            },
         ]
 
         parser = self._callFUT(_argument_parser_factory=DummyCliArgumentParser)
 
         self.assertListEqual(test_configuration, parser._arguments)
+        self.assertEqual(parser.prog, 'configme bench')
+
+
+# --------------------------------------------------------------------------- #
+class DummyGenerateArgumentParser(object):
+
+    # ....................................................................... #
+    class DummyParsedArgs(object):
+
+        templates_path = None
+        settings_path = None
+        output_path = None
+        role_name = ['test_role']
+        all_roles = False
+        role_suffix = None
+        role_variables = None
+        bytecode_cache = None
+        compiled_templates = None
+        settings_cache = None
+        jobs = 1
+        processes = 1
+        incremental = False
+        keep_unchanged = False
+        watch = False
+        renderers = []
+        socket = None
+        archive = None
+        gzip = False
+        check = False
+        timings = None
+
+    # ....................................................................... #
+    def __init__(self, **parsed_args):
+        self.parsed_args = self.DummyParsedArgs()
+
+        for key, value in parsed_args.items():
+            setattr(self.parsed_args, key, value)
+
+    # ....................................................................... #
+    def parse(self, *args, **kwargs):
+        return self.parsed_args
+
+
+# --------------------------------------------------------------------------- #
+class DummyConfigurator(object):
+
+    templates_path = 'test_templates'
+    settings_path = 'test_settings'
+    settings_file_extension = 'configme'
+
+    # ....................................................................... #
+    def __init__(self, *args, **kwargs):
+        self.invalidated = []
+        self.settings_bases = {}
+
+    # ....................................................................... #
+    def invalidate_templates(self, names=None):
+        self.invalidated.append(names)
+
+    # ....................................................................... #
+    def role_names(self, patterns=None):
+
+        if patterns is None:
+            return ['all']
+
+        names = []
+
+        for pattern in patterns:
+            if '*' in pattern:
+                names.extend(pattern.replace('*', suffix)
+                             for suffix in ('a', 'b'))
+            else:
+                names.append(pattern)
+
+        return names
 
 
 # --------------------------------------------------------------------------- #
@@ -162,67 +632,693 @@ class Test_cli_run(TestCase):
         test_output_list = [test_file1, test_file2]
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-        class DummyObject(object):
-            def __init__(self, *args, **kwargs):
-                pass
+        class DummyObject(object):
+            def __init__(self, *args, **kwargs):
+                pass
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            logger_err = None
+
+            def __init__(self, out, *args, **kwargs):
+                self.logger_out = out
+
+            def info(self, message):
+                self.logger_out.write(message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyRole(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def write_configs(self, *args, **kwargs):
+                return test_output_list
+
+        desired_return_code = 0
+        desired_logger_out_output = "%s%s" % (test_file1, test_file2)
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=DummyObject(),
+            logger_fatal=DummyObject(),
+            _logger_factory=DummyLogger,
+            _configurator_factory=DummyConfigurator,
+            _role_factory=DummyRole)
+
+        logger_out_output = self.logger_out.getvalue()
+
+        self.assertEqual(return_code, desired_return_code)
+        self.assertEqual(logger_out_output, desired_logger_out_output)
+
+    # ....................................................................... #
+    def test_cli_run_roles(self):
+
+        write_roles_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, out, err, *args, **kwargs):
+                self.logger_out = out
+                self.logger_err = err
+
+            def info(self, message):
+                self.logger_out.write(message)
+
+            def error(self, message):
+                self.logger_err.write(message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, processes, **kwargs):
+            write_roles_calls.append((names, processes))
+            return [
+                ('prod-a', ['prod-a/test_file'], None),
+                ('prod-b', [], 'test_error_message'),
+                ]
+
+        desired_return_code = 1
+        desired_write_roles_calls = [(['prod-a', 'prod-b'], 2)]
+        desired_logger_err_output = \
+            "Error: role 'prod-b': test_error_message"
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                role_name=['prod-*'],
+                processes=2),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _configurator_factory=DummyConfigurator,
+            _write_roles=dummy_write_roles)
+
+        self.assertEqual(return_code, desired_return_code)
+        self.assertListEqual(write_roles_calls, desired_write_roles_calls)
+        self.assertEqual(self.logger_out.getvalue(), 'prod-a/test_file')
+        self.assertEqual(self.logger_err.getvalue(), desired_logger_err_output)
+
+    # ....................................................................... #
+    def test_cli_run_all_roles(self):
+
+        write_roles_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, **kwargs):
+            write_roles_calls.append(names)
+            return []
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                role_name=None,
+                all_roles=True),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _configurator_factory=DummyConfigurator,
+            _write_roles=dummy_write_roles)
+
+        self.assertEqual(return_code, 0)
+        self.assertListEqual(write_roles_calls, [['all']])
+
+    # ....................................................................... #
+    def test_cli_run_watch(self):
+
+        write_roles_calls = []
+        configs = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, out, err, *args, **kwargs):
+                self.logger_out = out
+                self.logger_err = err
+
+            def info(self, message):
+                self.logger_out.write(message + '\n')
+
+            def error(self, message):  # pragma: no cover
+                self.logger_err.write(message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyWatchConfigurator(DummyConfigurator):
+
+            def __init__(self, *args, **kwargs):
+                DummyConfigurator.__init__(self)
+                configs.append(self)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, incremental, **kwargs):
+            write_roles_calls.append((names, incremental))
+            return [(name, ['%s/test.conf' % name], None) for name in names]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_watch_changes(paths):
+            self.assertListEqual(paths, ['test_templates', 'test_settings'])
+            yield set([os.path.join('test_settings', 'prod-b.configme')])
+            yield set([os.path.join('test_templates', 'test.conf')])
+            raise KeyboardInterrupt()
+
+        desired_write_roles_calls = [
+            (['prod-a', 'prod-b'], True),
+            (['prod-b'], True),
+            (['prod-a', 'prod-b'], True),
+            ]
+        desired_logger_out_output = \
+            'prod-a/test.conf\nprod-b/test.conf\n' \
+            'prod-b/test.conf\n' \
+            'prod-a/test.conf\nprod-b/test.conf\n'
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                role_name=['prod-*'],
+                watch=True),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _configurator_factory=DummyWatchConfigurator,
+            _write_roles=dummy_write_roles,
+            _watch_changes=dummy_watch_changes)
+
+        self.assertEqual(return_code, 0)
+        self.assertListEqual(write_roles_calls, desired_write_roles_calls)
+        self.assertListEqual(configs[0].invalidated, [[], ['test.conf']])
+        self.assertEqual(self.logger_out.getvalue(), desired_logger_out_output)
+
+    # ....................................................................... #
+    def test_cli_run_socket(self):
+
+        remote_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, out, *args, **kwargs):
+                self.logger_out = out
+
+            def info(self, message):
+                self.logger_out.write(message + '\n')
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_remote_write_roles(socket_path, roles, **kwargs):
+            remote_calls.append((socket_path, roles))
+            return [(name, ['%s/test.conf' % name], None) for name in roles]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_configurator_factory(*args, **kwargs):  # pragma: no cover
+            self.fail('Roles should be generated by the render server')
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                role_name=['dev'],
+                socket='test.sock'),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _configurator_factory=dummy_configurator_factory,
+            _remote_write_roles=dummy_remote_write_roles)
+
+        self.assertEqual(return_code, 0)
+        self.assertListEqual(remote_calls, [('test.sock', ['dev'])])
+        self.assertEqual(self.logger_out.getvalue(), 'dev/test.conf\n')
+
+    # ....................................................................... #
+    def test_cli_run_socket_fallback(self):
+
+        write_roles_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_remote_write_roles(*args, **kwargs):
+            raise EnvironmentError('Connection refused')
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, **kwargs):
+            write_roles_calls.append(names)
+            return []
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                role_name=None,
+                all_roles=True,
+                socket='test.sock'),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _configurator_factory=DummyConfigurator,
+            _write_roles=dummy_write_roles,
+            _remote_write_roles=dummy_remote_write_roles)
+
+        self.assertEqual(return_code, 0)
+        self.assertListEqual(write_roles_calls, [['all']])
+
+    # ....................................................................... #
+    def test_cli_run_archive(self):
+
+        logged = []
+        archives = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def info(self, message):
+                logged.append(message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyArchive(object):
+
+            path = None
+            compress = None
+            closed = False
+
+            def __init__(self, root_path):
+                self.root_path = root_path
+                self.flushed = []
+                archives.append(self)
+
+            def flush(self):
+                self.flushed.append(self.written)
+
+            def close(self):
+                self.closed = True
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_open_archive(archive, path, compress):
+            archive.path = path
+            archive.compress = compress
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyArchiveConfigurator(DummyConfigurator):
+
+            def __init__(self, _asset_manager_factory, **kwargs):
+                DummyConfigurator.__init__(self)
+                self._asset_manager = _asset_manager_factory()
+
+            def role_names(self, names=None):
+                return ['one', 'two']
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_remote_write_roles(*args, **kwargs):  # pragma: no cover
+            raise AssertionError('archives are only written in-process')
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, **kwargs):
+            # the configs are written by the archive asset manager, which
+            # was opened before
+            archive = archives[-1]
+            self.assertIs(config._asset_manager, archive)
+            self.assertIsNotNone(archive.path)
+            self.assertFalse(archive.closed)
+
+            archive.written = names
+            return [
+                (name, ['out/%s/a.conf' % name], None) for name in names]
+
+        for archive, compress, files in (
+                ('test.tar', None, ['out/one/a.conf', 'out/two/a.conf']),
+                ('-', True, [])):
+            del logged[:]
+
+            return_code = self._callFUT(
+                script_args=(),
+                argument_parser=DummyGenerateArgumentParser(
+                    role_name=None,
+                    all_roles=True,
+                    output_path='out',
+                    socket='test.sock',
+                    archive=archive,
+                    gzip=bool(compress)),
+                logger_name='some_logger_name',
+                logger_out=self.logger_out,
+                logger_err=self.logger_err,
+                _logger_factory=DummyLogger,
+                _configurator_factory=DummyArchiveConfigurator,
+                _write_roles=dummy_write_roles,
+                _remote_write_roles=dummy_remote_write_roles,
+                _archive_factory=DummyArchive,
+                _open_archive=dummy_open_archive)
+
+            self.assertEqual(return_code, 0)
+            self.assertEqual(archives[-1].path, archive)
+            self.assertEqual(archives[-1].root_path, 'out')
+            self.assertEqual(archives[-1].compress, compress)
+            self.assertTrue(archives[-1].closed)
+
+            # the archive is written out one role at a time
+            self.assertListEqual(archives[-1].flushed, [['one'], ['two']])
+
+            # nothing is mixed into the archive written to stdout
+            self.assertListEqual(logged, files)
+
+    # ....................................................................... #
+    def test_cli_run_archive_failed_roles(self):
+
+        removed = []
+        archives = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def info(self, message):
+                pass
+
+            def error(self, message):
+                pass
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyArchive(object):
+
+            closed = False
+
+            def __init__(self, root_path):
+                archives.append(self)
+
+            def path_join(self, path_parts):
+                return '/'.join(path_parts)
+
+            def remove_folder(self, folder_path):
+                removed.append(folder_path)
+
+            def flush(self):
+                removed.append('flush')
+
+            def close(self):
+                self.closed = True
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyArchiveConfigurator(DummyConfigurator):
+
+            output_path = 'out'
+
+            def __init__(self, _asset_manager_factory, **kwargs):
+                DummyConfigurator.__init__(self)
+                self._asset_manager = _asset_manager_factory()
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+            def role_names(self, names=None):
+                return ['good', 'bad']
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, **kwargs):
+            if names == ['bad']:
+                return [('bad', [], 'test_error')]
+            return [('good', ['out/good-x/a.conf'], None)]
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                role_name=None,
+                all_roles=True,
+                role_suffix='-x',
+                output_path='out',
+                archive='test.tar'),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _configurator_factory=DummyArchiveConfigurator,
+            _write_roles=dummy_write_roles,
+            _archive_factory=DummyArchive,
+            _open_archive=lambda archive, path, compress: None)
+
+        # the partial configs of the failed role are left out of the archive
+        self.assertEqual(return_code, 1)
+        self.assertListEqual(removed, ['flush', 'out/bad-x', 'flush'])
+        self.assertTrue(archives[-1].closed)
+
+    # ....................................................................... #
+    def test_cli_run_archive_configuration_error(self):
+        from ...exceptions import ConfigMeException
+
+        logged = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def error(self, message):
+                logged.append(message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_configurator_factory(**kwargs):
+            raise ConfigMeException('test_error')
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_open_archive(*args, **kwargs):  # pragma: no cover
+            raise AssertionError('no archive is created for invalid configs')
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                output_path='out',
+                archive='test.tar'),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _configurator_factory=dummy_configurator_factory,
+            _archive_factory=lambda root_path: None,
+            _open_archive=dummy_open_archive)
+
+        self.assertEqual(return_code, 1)
+        self.assertListEqual(logged, ['Error: test_error'])
+
+    # ....................................................................... #
+    def test_cli_run_archive_for_exceptions(self):
+
+        logged = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def error(self, message):
+                logged.append(message)
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                archive='-',
+                incremental=True),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger)
+
+        self.assertEqual(return_code, 1)
+        self.assertListEqual(logged, [
+            'Error: --archive can not be combined with --incremental, '
+            '--keep-unchanged, --watch or --processes'])
+
+    # ....................................................................... #
+    def test_cli_run_check(self):
+
+        logged = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def info(self, message):
+                logged.append(('info', message))
+
+            def error(self, message):
+                logged.append(('error', message))
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_remote_write_roles(*args, **kwargs):  # pragma: no cover
+            raise AssertionError('roles are only checked in-process')
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-        class DummyParsedArgs(object):
+        def dummy_write_roles(*args, **kwargs):  # pragma: no cover
+            raise AssertionError('nothing is written in the check mode')
+
+        for results, desired_return_code, desired_logged in (
+                ([('all', [], [], [], None)], 0, []),
+                ([('all', ['out/all/a.conf'], ['out/all/b.conf'],
+                   ['out/all/c.conf', 'out/all/d.conf'], None)],
+                 3,
+                 [('info', 'added: out/all/a.conf'),
+                  ('info', 'changed: out/all/b.conf'),
+                  ('info', 'removed: out/all/c.conf'),
+                  ('info', 'removed: out/all/d.conf')]),
+                ([('bad', [], [], [], 'test_error'),
+                  ('all', ['out/all/a.conf'], [], [], None)],
+                 1,
+                 [('error', "Error: role 'bad': test_error"),
+                  ('info', 'added: out/all/a.conf')]),
+                ):
+            del logged[:]
+
+            # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+            def dummy_check_roles(config, names, suffix, variables,
+                                  _role_factory):
+                self.assertListEqual(names, ['all'])
+                self.assertEqual(suffix, '-x')
+                return results
+
+            return_code = self._callFUT(
+                script_args=(),
+                argument_parser=DummyGenerateArgumentParser(
+                    role_name=None,
+                    all_roles=True,
+                    role_suffix='-x',
+                    socket='test.sock',
+                    check=True),
+                logger_name='some_logger_name',
+                logger_out=self.logger_out,
+                logger_err=self.logger_err,
+                _logger_factory=DummyLogger,
+                _configurator_factory=DummyConfigurator,
+                _write_roles=dummy_write_roles,
+                _remote_write_roles=dummy_remote_write_roles,
+                _check_roles=dummy_check_roles)
+
+            self.assertEqual(return_code, desired_return_code)
+            self.assertListEqual(logged, desired_logged)
+
+    # ....................................................................... #
+    def test_cli_run_check_for_exceptions(self):
 
-            templates_path = None
-            settings_path = None
-            output_path = None
-            role_name = None
-            role_suffix = None
-            role_variables = None
+        logged = []
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-        class DummyArgumentParser(object):
+        class DummyLogger(object):
 
             def __init__(self, *args, **kwargs):
                 pass
 
-            def parse(self, *args, **kwargs):
-                return DummyParsedArgs()
+            def error(self, message):
+                logged.append(message)
+
+        for parsed_args in ({'archive': '-'},
+                            {'keep_unchanged': True},
+                            {'timings': 10}):
+            del logged[:]
+
+            return_code = self._callFUT(
+                script_args=(),
+                argument_parser=DummyGenerateArgumentParser(
+                    check=True,
+                    **parsed_args),
+                logger_name='some_logger_name',
+                logger_out=self.logger_out,
+                logger_err=self.logger_err,
+                _logger_factory=DummyLogger)
+
+            self.assertEqual(return_code, 1)
+            self.assertListEqual(logged, [
+                'Error: --check can not be combined with --archive, '
+                '--incremental, --keep-unchanged, --watch or --timings'])
+
+    # ....................................................................... #
+    def test_cli_run_timings(self):
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
         class DummyLogger(object):
 
-            logger_err = None
-
             def __init__(self, out, *args, **kwargs):
                 self.logger_out = out
 
             def info(self, message):
-                self.logger_out.write(message)
+                self.logger_out.write(message + '\n')
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-        class DummyRole(object):
+        def dummy_remote_write_roles(*args, **kwargs):  # pragma: no cover
+            raise AssertionError('timings are only collected in-process')
 
-            def __init__(self, *args, **kwargs):
-                pass
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, timings, **kwargs):
+            timings.add('render', 0.5, 'dev/a.conf')
+            timings.add('render', 0.25, 'dev/b.conf')
+            return [('dev', ['dev/a.conf', 'dev/b.conf'], None)]
 
-            def write_configs(self, *args, **kwargs):
-                return test_output_list
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyGenerateArgumentParser(
+                role_name=['dev'],
+                socket='test.sock',
+                timings=1),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _configurator_factory=DummyConfigurator,
+            _write_roles=dummy_write_roles,
+            _remote_write_roles=dummy_remote_write_roles)
 
-        desired_return_code = 0
-        desired_logger_out_output = "%s%s" % (test_file1, test_file2)
+        self.assertEqual(return_code, 0)
+        self.assertEqual(
+            self.logger_out.getvalue(),
+            'dev/a.conf\n'
+            'dev/b.conf\n'
+            'Timings:\n'
+            '  render             0.750s\n'
+            'Slowest templates:\n'
+            '      0.500s dev/a.conf (render 0.500s)\n')
+
+    # ....................................................................... #
+    def test_cli_run_no_roles_for_exceptions(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, err, *args, **kwargs):
+                self.logger_err = err
+
+            def error(self, message):
+                self.logger_err.write(message)
+
+        desired_logger_err_output = "Error: Either --role-name or " \
+            "--all-roles has to be specified"
 
         return_code = self._callFUT(
             script_args=(),
-            argument_parser=DummyArgumentParser(),
+            argument_parser=DummyGenerateArgumentParser(role_name=None),
             logger_name='some_logger_name',
             logger_out=self.logger_out,
-            logger_err=DummyObject(),
-            logger_fatal=DummyObject(),
+            logger_err=self.logger_err,
             _logger_factory=DummyLogger,
-            _configurator_factory=DummyObject,
-            _role_factory=DummyRole)
-
-        logger_out_output = self.logger_out.getvalue()
+            _configurator_factory=DummyConfigurator)
 
-        self.assertEqual(return_code, desired_return_code)
-        self.assertEqual(logger_out_output, desired_logger_out_output)
+        self.assertEqual(return_code, 1)
+        self.assertEqual(self.logger_err.getvalue(), desired_logger_err_output)
 
     # ....................................................................... #
     def test_cli_run_fatal_exception(self):
@@ -407,6 +1503,318 @@ class Test_cli_run(TestCase):
         self.assertEqual(logger_err_output, desired_logger_err_output)
 
 
+# --------------------------------------------------------------------------- #
+class Test_cli_warm_run(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.logger_out = StringIO()
+        self.logger_err = StringIO()
+
+    # ....................................................................... #
+    def tearDown(self):
+        self.logger_out.close()
+        self.logger_err.close()
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...cli import cli_warm_run
+        return cli_warm_run(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_cli_warm_run(self):
+
+        test_templates_path = 'test_templates_path'
+        test_bytecode_cache = 'test_bytecode_cache'
+        test_jobs = 3
+        warm_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyParsedArgs(object):
+
+            templates_path = test_templates_path
+            bytecode_cache = test_bytecode_cache
+            jobs = test_jobs
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyArgumentParser(object):
+
+            def parse(self, *args, **kwargs):
+                return DummyParsedArgs()
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, out, err, *args, **kwargs):
+                self.logger_out = out
+                self.logger_err = err
+
+            def info(self, message):
+                self.logger_out.write(message)
+
+            def error(self, message):
+                self.logger_err.write(message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_warm_bytecode_cache(**kwargs):
+            warm_calls.append(kwargs)
+            return [('a.conf', None), ('b.conf', 'bad syntax')]
+
+        desired_warm_calls = [{
+            'templates_path': test_templates_path,
+            'bytecode_cache_path': test_bytecode_cache,
+            'processes': test_jobs}]
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyArgumentParser(),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=self.logger_err,
+            _logger_factory=DummyLogger,
+            _warm_bytecode_cache=dummy_warm_bytecode_cache)
+
+        self.assertEqual(return_code, 1)
+        self.assertListEqual(warm_calls, desired_warm_calls)
+        self.assertEqual(self.logger_out.getvalue(), 'a.conf')
+        self.assertEqual(
+            self.logger_err.getvalue(),
+            'Error: could not compile b.conf: bad syntax')
+
+
+# --------------------------------------------------------------------------- #
+class Test_cli_compile_run(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.logger_out = StringIO()
+
+    # ....................................................................... #
+    def tearDown(self):
+        self.logger_out.close()
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...cli import cli_compile_run
+        return cli_compile_run(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_cli_compile_run(self):
+
+        compile_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyParsedArgs(object):
+
+            templates_path = 'test_templates_path'
+            compiled_templates = 'test_bundle_path'
+            zip = True
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyArgumentParser(object):
+
+            def parse(self, *args, **kwargs):
+                return DummyParsedArgs()
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, out, *args, **kwargs):
+                self.logger_out = out
+
+            def info(self, message):
+                self.logger_out.write(message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_compile_templates_bundle(**kwargs):
+            compile_calls.append(kwargs)
+            return ['a.conf', 'b.conf']
+
+        desired_compile_calls = [{
+            'templates_path': 'test_templates_path',
+            'bundle_path': 'test_bundle_path',
+            'zip': True}]
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyArgumentParser(),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=None,
+            _logger_factory=DummyLogger,
+            _compile_templates_bundle=dummy_compile_templates_bundle)
+
+        self.assertEqual(return_code, 0)
+        self.assertListEqual(compile_calls, desired_compile_calls)
+        self.assertEqual(self.logger_out.getvalue(), 'a.confb.conf')
+
+
+# --------------------------------------------------------------------------- #
+class Test_cli_serve_run(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.logger_out = StringIO()
+
+    # ....................................................................... #
+    def tearDown(self):
+        self.logger_out.close()
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...cli import cli_serve_run
+        return cli_serve_run(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_cli_serve_run(self):
+
+        serve_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyParsedArgs(object):
+
+            socket = 'test.sock'
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyArgumentParser(object):
+
+            def parse(self, *args, **kwargs):
+                return DummyParsedArgs()
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, out, *args, **kwargs):
+                self.logger_out = out
+
+            def info(self, message):
+                self.logger_out.write(message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_serve(socket_path, service):
+            serve_calls.append((socket_path, service))
+            raise KeyboardInterrupt()
+
+        return_code = self._callFUT(
+            script_args=(),
+            argument_parser=DummyArgumentParser(),
+            logger_name='some_logger_name',
+            logger_out=self.logger_out,
+            logger_err=None,
+            _logger_factory=DummyLogger,
+            _serve=dummy_serve,
+            _service_factory=lambda: 'test_service')
+
+        self.assertEqual(return_code, 0)
+        self.assertListEqual(serve_calls, [('test.sock', 'test_service')])
+        self.assertEqual(self.logger_out.getvalue(), 'Serving on test.sock')
+
+
+# --------------------------------------------------------------------------- #
+class Test_cli_bench_run(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...cli import cli_bench_run
+        return cli_bench_run(*args, **kwargs)
+
+    # ....................................................................... #
+    def _run(self, **kwargs):
+
+        self.logged = []
+        self.bench_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyParsedArgs(object):
+
+            path = None
+            roles = 2
+            sections = 3
+            depth = 1
+            settings = 4
+            template_size = 100
+            repeat = 1
+            jobs = 1
+            incremental = False
+            keep_unchanged = False
+            renderers = []
+            timings = False
+
+        parsed_args = DummyParsedArgs()
+        for name, value in kwargs.items():
+            setattr(parsed_args, name, value)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyArgumentParser(object):
+
+            def parse(self, *args, **kwargs):
+                return parsed_args
+
+        logged = self.logged
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyLogger(object):
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def info(self, message):
+                logged.append(('info', message))
+
+            def error(self, message):
+                logged.append(('error', message))
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_run_benchmark(**kwargs):
+            self.bench_calls.append(kwargs)
+            return {'files': 6, 'files_per_second': 10.5}
+
+        return self._callFUT(
+            script_args=(),
+            argument_parser=DummyArgumentParser(),
+            logger_name='some_logger_name',
+            logger_out=None,
+            logger_err=None,
+            _logger_factory=DummyLogger,
+            _run_benchmark=dummy_run_benchmark)
+
+    # ....................................................................... #
+    def test_cli_bench_run(self):
+        import json
+
+        self.assertEqual(self._run(renderers=[('*', 'substitution')]), 0)
+
+        self.assertDictEqual(self.bench_calls[0], {
+            'path': None,
+            'roles': 2,
+            'sections': 3,
+            'depth': 1,
+            'settings': 4,
+            'template_size': 100,
+            'workers': 1,
+            'incremental': False,
+            'keep_unchanged': False,
+            'template_renderers': [('*', 'substitution')],
+            'repeat': 1,
+            'timings': False,
+            })
+
+        level, message = self.logged[0]
+        self.assertEqual(level, 'info')
+        self.assertDictEqual(
+            json.loads(message),
+            {'files': 6, 'files_per_second': 10.5})
+
+    # ....................................................................... #
+    def test_cli_bench_run_for_exceptions(self):
+
+        self.assertEqual(self._run(sections=0), 1)
+        self.assertListEqual(
+            self.logged,
+            [('error', 'Error: --sections has to be at least 1')])
+        self.assertListEqual(self.bench_calls, [])
+
+
 # --------------------------------------------------------------------------- #
 class Test_cli_logger_factory(TestCase):
 
@@ -490,5 +1898,33 @@ class Test_main(TestCase):
             return test_return
 
         self.assertEqual(
-            self._callFUT(_cli_run=dummy_cli_run),
+            self._callFUT(_cli_run=dummy_cli_run, _script_args=[]),
+            test_return)
+
+    # ....................................................................... #
+    def test_main_command(self):
+
+        test_return = 'test_command_run_return'
+        test_parser = 'test_parser'
+        command_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_cli_run(*args, **kwargs):  # pragma: no cover
+            raise AssertionError("generation should not run")
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_command_run(script_args, argument_parser, *args):
+            command_calls.append((script_args, argument_parser))
+            return test_return
+
+        test_cli_commands = {
+            'test_command': (dummy_command_run, lambda: test_parser)}
+
+        self.assertEqual(
+            self._callFUT(
+                _cli_run=dummy_cli_run,
+                _script_args=['test_command', '-t', 'x'],
+                _cli_commands=test_cli_commands),
             test_return)
+
+        self.assertListEqual(command_calls, [(['-t', 'x'], test_parser)])
@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import os
+
 from unittest import TestCase
 
 
 from ...exceptions import LocationNotFound
+from ...exceptions import RoleNotFound
 
 
 # --------------------------------------------------------------------------- #
-def dummy_asset_manager_maker(bad_path=None):
+def dummy_asset_manager_maker(bad_path=None, folder_names=()):
 
     # ....................................................................... #
     class DummyAssetManager(object):
@@ -25,6 +28,14 @@ def dummy_asset_manager_maker(bad_path=None):
 
             return location
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def asset_location(self, location, location_subject):
+            return self.location(location, location_subject)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def list_folder(self, folder_path):
+            return sorted(folder_names)
+
     return DummyAssetManager
 
 
@@ -134,6 +145,30 @@ class Test_Config(TestCase):
         config.output_path = good_path
         self.assertEqual(config.output_path, good_path)
 
+    # ....................................................................... #
+    def test_output_path_default(self):
+        from ...assets import AssetManager
+        from ...assets import MemoryAssetManager
+
+        # any existing folder
+        path = os.path.dirname(__file__)
+
+        config = self._makeOne(
+            templates_path=path,
+            settings_path=path)
+
+        # the configs are kept in memory without an output path
+        self.assertIsNone(config.output_path)
+        self.assertIsInstance(config._asset_manager, MemoryAssetManager)
+
+        config = self._makeOne(
+            templates_path=path,
+            settings_path=path,
+            output_path=path)
+
+        self.assertNotIsInstance(config._asset_manager, MemoryAssetManager)
+        self.assertIsInstance(config._asset_manager, AssetManager)
+
     # ....................................................................... #
     def test_init_with_bad_templates_path_for_exceptions(self):
 
@@ -226,3 +261,318 @@ class Test_Config(TestCase):
 
         self.assertRaises(LocationNotFound, setattr, config, "output_path",
                           bad_path)
+
+    # ....................................................................... #
+    def test_template_environment_options_default(self):
+
+        dummy_asset_manager_factory = dummy_asset_manager_maker()
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            _asset_manager_factory=dummy_asset_manager_factory)
+
+        self.assertDictEqual(config.template_environment_options, {})
+
+    # ....................................................................... #
+    def test_template_environment_created_once(self):
+
+        test_options = {'cache_size': 1000}
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyTemplateRenderer(object):
+
+            created = []
+
+            @classmethod
+            def create_environment(cls, config):
+                environment = {'options': config.template_environment_options}
+                cls.created.append(environment)
+                return environment
+
+        dummy_asset_manager_factory = dummy_asset_manager_maker()
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            template_environment_options=test_options,
+            _asset_manager_factory=dummy_asset_manager_factory)
+
+        environment1 = config.template_environment(DummyTemplateRenderer)
+        environment2 = config.template_environment(DummyTemplateRenderer)
+
+        self.assertIs(environment1, environment2)
+        self.assertEqual(len(DummyTemplateRenderer.created), 1)
+        self.assertIs(environment1['options'], test_options)
+
+    # ....................................................................... #
+    def test_bytecode_cache_path(self):
+
+        test_bytecode_cache_path = 'test_bytecode_cache_path'
+
+        dummy_asset_manager_factory = dummy_asset_manager_maker()
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            bytecode_cache_path=test_bytecode_cache_path,
+            _asset_manager_factory=dummy_asset_manager_factory)
+
+        self.assertEqual(config.bytecode_cache_path, test_bytecode_cache_path)
+
+    # ....................................................................... #
+    def test_bytecode_cache_path_default(self):
+
+        dummy_asset_manager_factory = dummy_asset_manager_maker()
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            _asset_manager_factory=dummy_asset_manager_factory)
+
+        self.assertIsNone(config.bytecode_cache_path)
+
+    # ....................................................................... #
+    def test_bytecode_cache_path_for_exceptions(self):
+
+        bad_path = 'bad_bytecode_cache_path'
+
+        dummy_asset_manager_factory = dummy_asset_manager_maker(bad_path)
+
+        config_args = dict(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            bytecode_cache_path=bad_path,
+            _asset_manager_factory=dummy_asset_manager_factory)
+
+        self.assertRaises(LocationNotFound, self._makeOne, **config_args)
+
+    # ....................................................................... #
+    def test_settings_cache_path(self):
+
+        parsers = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_settings_parser_factory(**kwargs):
+            parsers.append(kwargs)
+            return kwargs
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            settings_cache_path='test_settings_cache_path',
+            _settings_parser_factory=dummy_settings_parser_factory,
+            _asset_manager_factory=dummy_asset_manager_maker())
+
+        self.assertEqual(
+            config.settings_cache_path,
+            'test_settings_cache_path')
+
+        config.settings_parser('test.configme', {'test_var': 'test'})
+
+        self.assertListEqual(parsers, [{
+            'file_path': 'test.configme',
+            'variables': {'test_var': 'test'},
+            'cache_path': 'test_settings_cache_path',
+            'bases': config.settings_bases,
+            }])
+
+    # ....................................................................... #
+    def test_settings_cache_path_for_exceptions(self):
+
+        bad_path = 'bad_settings_cache_path'
+
+        config_args = dict(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            settings_cache_path=bad_path,
+            _asset_manager_factory=dummy_asset_manager_maker(bad_path))
+
+        self.assertRaises(LocationNotFound, self._makeOne, **config_args)
+
+    # ....................................................................... #
+    def test_compiled_templates_path(self):
+
+        test_compiled_templates_path = 'test_compiled_templates_path'
+
+        dummy_asset_manager_factory = dummy_asset_manager_maker()
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            compiled_templates_path=test_compiled_templates_path,
+            _asset_manager_factory=dummy_asset_manager_factory)
+
+        self.assertEqual(
+            config.compiled_templates_path,
+            test_compiled_templates_path)
+
+    # ....................................................................... #
+    def test_compiled_templates_path_for_exceptions(self):
+
+        bad_path = 'bad_compiled_templates_path'
+
+        dummy_asset_manager_factory = dummy_asset_manager_maker(bad_path)
+
+        config_args = dict(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            compiled_templates_path=bad_path,
+            _asset_manager_factory=dummy_asset_manager_factory)
+
+        self.assertRaises(LocationNotFound, self._makeOne, **config_args)
+
+    # ....................................................................... #
+    def _makeRolesConfig(self):
+
+        dummy_asset_manager_factory = dummy_asset_manager_maker(
+            folder_names=(
+                'prod-b.configme',
+                'prod-a.configme',
+                'dev.configme',
+                'prod-c.txt',
+                ))
+
+        return self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            _asset_manager_factory=dummy_asset_manager_factory)
+
+    # ....................................................................... #
+    def test_role_names(self):
+
+        config = self._makeRolesConfig()
+
+        self.assertListEqual(
+            config.role_names(),
+            ['dev', 'prod-a', 'prod-b'])
+
+    # ....................................................................... #
+    def test_role_names_patterns(self):
+
+        config = self._makeRolesConfig()
+
+        self.assertListEqual(
+            config.role_names(['prod-*', 'other', 'prod-a']),
+            ['prod-a', 'prod-b', 'other'])
+
+    # ....................................................................... #
+    def test_role_names_for_exceptions(self):
+
+        config = self._makeRolesConfig()
+
+        self.assertRaisesRegexp(
+            RoleNotFound,
+            "match: test-\\*",
+            config.role_names,
+            ['test-*'])
+
+    # ....................................................................... #
+    def test_invalidate_templates(self):
+
+        invalidated = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyTemplateRenderer(object):
+
+            @classmethod
+            def create_environment(cls, config):
+                return 'test_environment'
+
+            @classmethod
+            def invalidate(cls, config, names=None):
+                invalidated.append(names)
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            _template_renderer_factory=DummyTemplateRenderer,
+            _asset_manager_factory=dummy_asset_manager_maker())
+
+        # environments not created yet have nothing to invalidate
+        config.invalidate_templates(['test.conf'])
+        config.template_environment(DummyTemplateRenderer)
+        config.invalidate_templates(['test.conf'])
+        config.invalidate_templates()
+
+        self.assertListEqual(invalidated, [['test.conf'], None])
+
+    # ....................................................................... #
+    def test_template_renderer_factory(self):
+        from ...renderers.substitution_rendering import \
+            SubstitutionTemplateRenderer
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyTemplateRenderer(object):
+            pass
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyOtherTemplateRenderer(object):
+            pass
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            template_renderers=[
+                ('*.conf', 'substitution'),
+                ('etc/*', DummyOtherTemplateRenderer),
+                ],
+            _template_renderer_factory=DummyTemplateRenderer,
+            _asset_manager_factory=dummy_asset_manager_maker())
+
+        self.assertIs(
+            config.template_renderer_factory('etc/test.conf', {}),
+            SubstitutionTemplateRenderer)
+        self.assertIs(
+            config.template_renderer_factory('etc/test.ini', {}),
+            DummyOtherTemplateRenderer)
+        self.assertIs(
+            config.template_renderer_factory('test.ini', {}),
+            DummyTemplateRenderer)
+
+        # sections select renderers by name
+        self.assertIs(
+            config.template_renderer_factory(
+                'test.ini', {'configme_renderer': 'substitution'}),
+            SubstitutionTemplateRenderer)
+
+    # ....................................................................... #
+    def test_template_renderer_factory_for_exceptions(self):
+        from ...exceptions import InvalidName
+        from ...exceptions import SettingsParsingError
+
+        self.assertRaisesRegexp(
+            InvalidName,
+            "Unknown template renderer 'unknown', available renderers: "
+            "jinja2, substitution, verbatim",
+            self._makeOne,
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            template_renderers=[('*.conf', 'unknown')],
+            _asset_manager_factory=dummy_asset_manager_maker())
+
+        config = self._makeOne(
+            templates_path='some_templates_path',
+            settings_path='some_settings_path',
+            output_path='some_output_path',
+            _asset_manager_factory=dummy_asset_manager_maker())
+
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            "in section: test.conf",
+            config.template_renderer_factory,
+            'test.conf',
+            {'configme_renderer': 'unknown'})
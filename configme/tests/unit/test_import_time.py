@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test the CLI cold start, importing `configme.cli` in fresh interpreters.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from unittest import TestCase
+
+
+# --------------------------------------------------------------------------- #
+# budget of the cold import of the CLI module, in seconds, the best of
+# `IMPORT_TIME_RUNS` runs. Importing Jinja2 alone takes more than that.
+IMPORT_TIME_BUDGET = 0.05
+IMPORT_TIME_RUNS = 5
+
+# modules only imported by the commands and the features using them
+DEFERRED_MODULES = (
+    'ctypes',
+    'jinja2',
+    'multiprocessing',
+    'pkg_resources',
+    'SocketServer',
+    'socketserver',
+    'zipfile',
+    'configme.renderers.jinja2_rendering',
+    'configme.server',
+    'configme.watch',
+    )
+
+_IMPORT_SCRIPT = '''
+import json
+import sys
+import time
+
+start = time.time()
+import configme.cli
+elapsed = time.time() - start
+
+sys.stdout.write(json.dumps({
+    'elapsed': elapsed,
+    'modules': sorted(name for name, module in sys.modules.items()
+                      if module is not None),
+    }))
+'''
+
+
+# --------------------------------------------------------------------------- #
+def _import_cli(importtime=False):
+    """
+    Import the CLI module in a fresh interpreter.
+
+    :return: two element tuple of the import time and the imported modules.
+    :rtype: tuple
+    """
+
+    package_folder = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__)))))
+
+    command = [sys.executable]
+    if importtime:
+        command.extend(['-X', 'importtime'])
+    command.extend(['-c', _IMPORT_SCRIPT])
+
+    process = subprocess.Popen(
+        command,
+        cwd=package_folder,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE)
+    out, err = process.communicate()
+
+    if process.returncode != 0:  # pragma: no cover
+        raise AssertionError(err.decode('utf-8', 'replace'))
+
+    result = json.loads(out.decode('utf-8'))
+    elapsed = result['elapsed']
+
+    # the cumulative microseconds of the module reported by -X importtime
+    # leave out the time measuring it
+    for line in err.decode('utf-8', 'replace').splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == 'configme.cli':
+            elapsed = int(fields[1]) / 1000000.0
+
+    return elapsed, result['modules']
+
+
+# --------------------------------------------------------------------------- #
+class Test_cli_import(TestCase):
+
+    # ....................................................................... #
+    def test_deferred_modules(self):
+
+        _, modules = _import_cli()
+
+        self.assertListEqual(
+            [name for name in DEFERRED_MODULES if name in modules],
+            [])
+
+    # ....................................................................... #
+    def test_import_time_budget(self):
+
+        # -X importtime is only available in Python 3.7 and later
+        importtime = sys.version_info >= (3, 7)
+
+        # the first run compiles the bytecode of the package
+        _import_cli(importtime)
+
+        elapsed = min(
+            _import_cli(importtime)[0] for _ in range(IMPORT_TIME_RUNS))
+
+        self.assertLess(
+            elapsed,
+            IMPORT_TIME_BUDGET,
+            "Importing configme.cli took %.1f ms, the budget is %.1f ms"
+            % (elapsed * 1000, IMPORT_TIME_BUDGET * 1000))
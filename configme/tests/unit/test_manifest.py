@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test output manifest.
+"""
+
+from unittest import TestCase
+
+
+# --------------------------------------------------------------------------- #
+class Test_Manifest(TestCase):
+
+    # ....................................................................... #
+    def _getTargetClass(self):
+        from ...manifest import Manifest
+        return Manifest
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        return self._getTargetClass()(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_init_defaults(self):
+
+        manifest = self._makeOne()
+
+        self.assertDictEqual(manifest.previous_entries, {})
+        self.assertDictEqual(manifest.entries, {})
+
+    # ....................................................................... #
+    def test_digest(self):
+
+        manifest_class = self._getTargetClass()
+
+        self.assertEqual(
+            manifest_class.digest([u'some ', u'content']),
+            manifest_class.digest([u'some content']))
+        self.assertNotEqual(
+            manifest_class.digest([u'some content']),
+            manifest_class.digest([u'other content']))
+        self.assertEqual(
+            manifest_class.digest([u'ž']),
+            manifest_class.digest([u'ž']))
+
+        # bytes chunks are digested as they are
+        self.assertEqual(
+            manifest_class.digest([u'ž'.encode('utf-8'), b'\x00']),
+            manifest_class.digest([u'ž\x00']))
+
+    # ....................................................................... #
+    def test_digesting(self):
+
+        from hashlib import sha1
+
+        manifest_class = self._getTargetClass()
+        content_hash = sha1()
+
+        chunks = manifest_class.digesting(
+            iter([u'some ', b'content']),
+            content_hash)
+
+        self.assertListEqual(list(chunks), [u'some ', b'content'])
+        self.assertEqual(
+            content_hash.hexdigest(),
+            manifest_class.digest([u'some content']))
+
+    # ....................................................................... #
+    def test_unchanged(self):
+
+        manifest = self._makeOne({
+            'test/test.conf': {
+                'hash': 'test_digest',
+                'size': 10,
+                'dependencies': None,
+                },
+            })
+
+        self.assertTrue(
+            manifest.unchanged('test/test.conf', 'test_digest', 10))
+        self.assertFalse(
+            manifest.unchanged('test/test.conf', 'other_digest', 10))
+        self.assertFalse(
+            manifest.unchanged('test/test.conf', 'test_digest', 11))
+        self.assertFalse(
+            manifest.unchanged('test/test.conf', 'test_digest', None))
+        self.assertFalse(
+            manifest.unchanged('test/other.conf', 'test_digest', 10))
+
+    # ....................................................................... #
+    def test_removed(self):
+
+        entry = {'hash': 'test_digest', 'size': 10, 'dependencies': None}
+
+        manifest = self._makeOne({
+            'test/test1.conf': entry,
+            'test/test2.conf': entry,
+            'test/test3.conf': entry,
+            })
+
+        manifest.record('test/test2.conf', 'test_digest', 10)
+        manifest.record('test/test4.conf', 'test_digest', 10)
+
+        self.assertListEqual(
+            manifest.removed(),
+            ['test/test1.conf', 'test/test3.conf'])
+
+    # ....................................................................... #
+    def test_dumps_and_loads(self):
+
+        manifest_class = self._getTargetClass()
+
+        dependencies = manifest_class.dependencies(
+            {'test.conf': 'test_template_digest'},
+            {'test_key': 'test_value'})
+
+        manifest = self._makeOne()
+        manifest.record('test/test.conf', 'test_digest', 10, dependencies)
+
+        loaded = manifest_class.loads(manifest.dumps())
+
+        self.assertDictEqual(
+            loaded.previous_entries,
+            {'test/test.conf': {
+                'hash': 'test_digest',
+                'size': 10,
+                'dependencies': dependencies,
+                }})
+        self.assertDictEqual(loaded.entries, {})
+
+    # ....................................................................... #
+    def test_loads_invalid_content(self):
+
+        manifest_class = self._getTargetClass()
+
+        self.assertIsNone(manifest_class.loads(u'not json'))
+        self.assertIsNone(manifest_class.loads(u'[]'))
+        self.assertIsNone(manifest_class.loads(u'{"version": 1}'))
+        self.assertIsNone(
+            manifest_class.loads(u'{"version": 0, "files": {}}'))
+        self.assertIsNone(
+            manifest_class.loads(u'{"version": 2, "files": {"a": 1}}'))
+        self.assertIsNone(
+            manifest_class.loads(u'{"version": 2, "files": {"a": {}}}'))
+
+    # ....................................................................... #
+    def test_dependencies(self):
+
+        dependencies = self._getTargetClass().dependencies
+
+        test_dependencies = dependencies(
+            {'test.conf': 'digest1', 'base.conf': 'digest2'},
+            {'key1': 'value1', 'key2': None})
+
+        self.assertListEqual(
+            test_dependencies['templates'],
+            ['base.conf', 'test.conf'])
+        self.assertListEqual(test_dependencies['settings'], ['key1', 'key2'])
+
+        # any template source or settings value change changes the digest
+        for templates, settings in (
+                ({'test.conf': 'digest1', 'base.conf': 'digest3'},
+                 {'key1': 'value1', 'key2': None}),
+                ({'test.conf': 'digest1'},
+                 {'key1': 'value1', 'key2': None}),
+                ({'test.conf': 'digest1', 'base.conf': 'digest2'},
+                 {'key1': 'value1', 'key2': 'value2'}),
+                ):
+            self.assertNotEqual(
+                dependencies(templates, settings)['digest'],
+                test_dependencies['digest'])
+
+    # ....................................................................... #
+    def test_up_to_date(self):
+
+        dependencies = self._getTargetClass().dependencies
+        test_dependencies = dependencies({'test.conf': 'digest1'}, {})
+        other_dependencies = dependencies({'test.conf': 'digest2'}, {})
+
+        entry = {'hash': 'test_digest', 'size': 10,
+                 'dependencies': test_dependencies}
+
+        manifest = self._makeOne({
+            'test/test.conf': entry,
+            'test/unknown.conf': dict(entry, dependencies=None),
+            })
+
+        self.assertFalse(
+            manifest.up_to_date('test/test.conf', other_dependencies, 10))
+        self.assertFalse(
+            manifest.up_to_date('test/test.conf', test_dependencies, 11))
+        self.assertFalse(
+            manifest.up_to_date('test/test.conf', test_dependencies, None))
+        self.assertFalse(
+            manifest.up_to_date('test/unknown.conf', test_dependencies, 10))
+        self.assertFalse(
+            manifest.up_to_date('test/other.conf', test_dependencies, 10))
+        self.assertDictEqual(manifest.entries, {})
+
+        self.assertTrue(
+            manifest.up_to_date('test/test.conf', test_dependencies, 10))
+        self.assertDictEqual(manifest.entries, {'test/test.conf': entry})
+
+    # ....................................................................... #
+    def test_recorded_dependencies(self):
+
+        test_dependencies = self._getTargetClass().dependencies(
+            {'test.conf': 'digest1'}, {})
+
+        manifest = self._makeOne({
+            'test/test.conf': {'hash': 'test_digest', 'size': 10,
+                               'dependencies': test_dependencies},
+            })
+
+        self.assertDictEqual(
+            manifest.recorded_dependencies('test/test.conf'),
+            test_dependencies)
+        self.assertIsNone(manifest.recorded_dependencies('test/other.conf'))
@@ -4,10 +4,16 @@
 Test Jinja2 Template Renderer
 """
 
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
+
 from unittest import TestCase
 
 from jinja2 import TemplateError
 
+from ....exceptions import TemplateBundleError
 from ....exceptions import TemplateRenderError
 
 
@@ -15,10 +21,30 @@ from ....exceptions import TemplateRenderError
 class DummyConfig(object):
 
     templates_path = None
+    template_environment_options = None
+    bytecode_cache_path = None
+    compiled_templates_path = None
 
     # ....................................................................... #
-    def __init__(self, templates_path, *args, **kwargs):
+    def __init__(self, templates_path, template_environment_options=None,
+                 bytecode_cache_path=None, compiled_templates_path=None,
+                 _jinja2_environment_factory=None):
         self.templates_path = templates_path
+        self.bytecode_cache_path = bytecode_cache_path
+        self.compiled_templates_path = compiled_templates_path
+
+        if template_environment_options is None:
+            template_environment_options = {}
+
+        self.template_environment_options = template_environment_options
+        self._jinja2_environment_factory = _jinja2_environment_factory
+
+    # ....................................................................... #
+    def template_environment(self, template_renderer_factory):
+        return template_renderer_factory.create_environment(
+            self,
+            _jinja2_filesystem_loader_factory=DummyFileSystemLoader,
+            _jinja2_environment_factory=self._jinja2_environment_factory)
 
 
 # --------------------------------------------------------------------------- #
@@ -51,7 +77,9 @@ class Test_Jinja2TemplateRenderer(TestCase):
                 self.loader = loader
 
         test_templates_path = 'test_templates_path'
-        test_config = DummyConfig(templates_path=test_templates_path)
+        test_config = DummyConfig(
+            templates_path=test_templates_path,
+            _jinja2_environment_factory=DummyEnvironment)
         test_role_output_path = 'test_role_output_path'
         test_path = 'test_path'
         test_settings = {'test_settings_key': 'test_settings_value'}
@@ -60,9 +88,7 @@ class Test_Jinja2TemplateRenderer(TestCase):
             config=test_config,
             role_output_folder_path=test_role_output_path,
             path=test_path,
-            settings=test_settings,
-            _jinja2_filesystem_loader_factory=DummyFileSystemLoader,
-            _jinja2_environment_factory=DummyEnvironment)
+            settings=test_settings)
 
         self.assertIs(jinja2_template_renderer.config, test_config)
         self.assertEqual(jinja2_template_renderer.path, test_path)
@@ -107,7 +133,9 @@ class Test_Jinja2TemplateRenderer(TestCase):
                 return DummyJinja2Template()
 
         test_templates_path = 'test_templates_path'
-        test_config = DummyConfig(templates_path=test_templates_path)
+        test_config = DummyConfig(
+            templates_path=test_templates_path,
+            _jinja2_environment_factory=DummyEnvironment)
         test_role_output_path = 'test_role_output_path'
         test_path = 'test_path'
         test_settings = {
@@ -123,18 +151,18 @@ class Test_Jinja2TemplateRenderer(TestCase):
             config=test_config,
             role_output_folder_path=test_role_output_path,
             path=test_path,
-            settings=test_settings,
-            _jinja2_filesystem_loader_factory=DummyFileSystemLoader,
-            _jinja2_environment_factory=DummyEnvironment)
+            settings=test_settings)
 
         self.assertEqual(
             jinja2_template_renderer.get_rendered_config(),
             desired_rendered_response)
+        self.assertIsInstance(
+            jinja2_template_renderer.load_template(),
+            DummyJinja2Template)
 
     # ....................................................................... #
     def test_get_rendered_config_for_exceptions(self):
 
-        config = DummyConfig(templates_path='some_templates_path')
         test_path = 'test_path'
         test_error_message = 'test_error_message'
 
@@ -149,6 +177,10 @@ class Test_Jinja2TemplateRenderer(TestCase):
             def get_template(self, path):
                 raise TemplateError(test_error_message)
 
+        config = DummyConfig(
+            templates_path='some_templates_path',
+            _jinja2_environment_factory=DummyEnvironment)
+
         desired_error_message = 'Failed to render config template: %s\n\n%s' \
                 % (test_path, test_error_message)
 
@@ -156,12 +188,704 @@ class Test_Jinja2TemplateRenderer(TestCase):
             config=config,
             role_output_folder_path='some_role_output_path',
             path=test_path,
-            settings={},
-            _jinja2_filesystem_loader_factory=DummyFileSystemLoader,
-            _jinja2_environment_factory=DummyEnvironment)
+            settings={})
 
         self.assertRaisesRegexp(
             TemplateRenderError,
             desired_error_message,
             jinja2_template_renderer.get_rendered_config
             )
+        self.assertRaisesRegexp(
+            TemplateRenderError,
+            desired_error_message,
+            jinja2_template_renderer.load_template
+            )
+
+    # ....................................................................... #
+    def test_generate_rendered_config(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyJinja2Template(object):
+
+            def generate(self, **settings):
+                for key in sorted(settings):
+                    yield '%s: %s,' % (key, settings[key])
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyEnvironment(object):
+
+            def __init__(self, loader):
+                pass
+
+            def get_template(self, path):
+                return DummyJinja2Template()
+
+        test_config = DummyConfig(
+            templates_path='some_templates_path',
+            _jinja2_environment_factory=DummyEnvironment)
+
+        jinja2_template_renderer = self._makeOne(
+            config=test_config,
+            role_output_folder_path='some_role_output_path',
+            path='test_path',
+            settings={'key1': 'value1', 'key2': 'value2'})
+
+        self.assertListEqual(
+            list(jinja2_template_renderer.generate_rendered_config()),
+            ['key1: value1,', 'key2: value2,'])
+
+    # ....................................................................... #
+    def test_generate_rendered_config_for_exceptions(self):
+
+        test_path = 'test_path'
+        test_error_message = 'test_error_message'
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyJinja2Template(object):
+
+            def generate(self, **settings):
+                yield 'test_chunk'
+                raise TemplateError(test_error_message)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyEnvironment(object):
+
+            def __init__(self, loader):
+                pass
+
+            def get_template(self, path):
+                return DummyJinja2Template()
+
+        desired_error_message = 'Failed to render config template: %s\n\n%s' \
+                % (test_path, test_error_message)
+
+        config = DummyConfig(
+            templates_path='some_templates_path',
+            _jinja2_environment_factory=DummyEnvironment)
+
+        jinja2_template_renderer = self._makeOne(
+            config=config,
+            role_output_folder_path='some_role_output_path',
+            path=test_path,
+            settings={})
+
+        chunks = jinja2_template_renderer.generate_rendered_config()
+
+        self.assertEqual(next(chunks), 'test_chunk')
+        self.assertRaisesRegexp(
+            TemplateRenderError,
+            desired_error_message,
+            next,
+            chunks)
+
+
+# --------------------------------------------------------------------------- #
+class Test_Jinja2TemplateRenderer_create_environment(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ....renderers.jinja2_rendering import Jinja2TemplateRenderer
+        return Jinja2TemplateRenderer.create_environment(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_create_environment_with_options(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyEnvironment(object):
+
+            loader = None
+            options = None
+
+            def __init__(self, loader, **options):
+                self.loader = loader
+                self.options = options
+
+        test_templates_path = 'test_templates_path'
+        test_options = {'cache_size': 1000, 'auto_reload': False}
+        test_config = DummyConfig(
+            templates_path=test_templates_path,
+            template_environment_options=test_options)
+
+        jinja2_env = self._callFUT(
+            test_config,
+            _jinja2_filesystem_loader_factory=DummyFileSystemLoader,
+            _jinja2_environment_factory=DummyEnvironment)
+
+        self.assertEqual(jinja2_env.loader.searchpath, test_templates_path)
+        self.assertDictEqual(jinja2_env.options, test_options)
+
+    # ....................................................................... #
+    def test_create_environment_with_bytecode_cache(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyEnvironment(object):
+
+            loader = None
+            options = None
+
+            def __init__(self, loader, **options):
+                self.loader = loader
+                self.options = options
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyBytecodeCache(object):
+
+            def __init__(self, directory):
+                self.directory = directory
+
+        test_bytecode_cache_path = 'test_bytecode_cache_path'
+        test_options = {'cache_size': 1000}
+        test_config = DummyConfig(
+            templates_path='some_templates_path',
+            template_environment_options=test_options,
+            bytecode_cache_path=test_bytecode_cache_path)
+
+        jinja2_env = self._callFUT(
+            test_config,
+            _jinja2_filesystem_loader_factory=DummyFileSystemLoader,
+            _jinja2_environment_factory=DummyEnvironment,
+            _jinja2_bytecode_cache_factory=DummyBytecodeCache)
+
+        self.assertEqual(
+            jinja2_env.options['bytecode_cache'].directory,
+            test_bytecode_cache_path)
+        self.assertEqual(jinja2_env.options['cache_size'], 1000)
+        # config options are not modified
+        self.assertDictEqual(test_options, {'cache_size': 1000})
+
+
+# --------------------------------------------------------------------------- #
+class Test_Jinja2TemplateRenderer_prewarm(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ....renderers.jinja2_rendering import Jinja2TemplateRenderer
+        return Jinja2TemplateRenderer.prewarm(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_prewarm(self):
+
+        loaded = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyJinja2Environment(object):
+
+            def __init__(self, loader, **options):
+                pass
+
+            def list_templates(self):
+                return ['good.conf', 'bad.conf']
+
+            def get_template(self, name):
+                loaded.append(name)
+                if name == 'bad.conf':
+                    raise TemplateError('test_error')
+
+        config = DummyConfig(
+            templates_path='some_templates_path',
+            _jinja2_environment_factory=DummyJinja2Environment)
+
+        self._callFUT(config)
+
+        self.assertListEqual(loaded, ['good.conf', 'bad.conf'])
+
+    # ....................................................................... #
+    def test_prewarm_binary_template(self):
+
+        from ....renderers.jinja2_rendering import Jinja2TemplateRenderer
+
+        templates_path = mkdtemp()
+        self.addCleanup(rmtree, templates_path)
+
+        with open(os.path.join(templates_path, 'key.pem'), 'wb') as f:
+            f.write(b'\x00\xff\xfe')
+
+        with open(os.path.join(templates_path, 'test.conf'), 'w') as f:
+            f.write('test {{ value }}')
+
+        config = DummyConfig(templates_path=templates_path)
+        jinja2_env = Jinja2TemplateRenderer.create_environment(config)
+        config.template_environment = lambda factory: jinja2_env
+
+        self._callFUT(config)
+
+        self.assertListEqual(
+            [template.name for template in jinja2_env.cache.values()],
+            ['test.conf'])
+
+    # ....................................................................... #
+    def test_prewarm_unlistable_loader(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyJinja2Environment(object):
+
+            def __init__(self, loader, **options):
+                pass
+
+            def list_templates(self):
+                raise TypeError('this loader cannot iterate over all '
+                                'templates')
+
+            def get_template(self, name):  # pragma: no cover
+                raise AssertionError('no template should be loaded')
+
+        config = DummyConfig(
+            templates_path='some_templates_path',
+            _jinja2_environment_factory=DummyJinja2Environment)
+
+        self._callFUT(config)
+
+
+# --------------------------------------------------------------------------- #
+class Test_Jinja2TemplateRenderer_template_dependencies(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        from jinja2 import Environment
+        from jinja2 import FileSystemLoader
+
+        self.templates_path = mkdtemp()
+        self.jinja2_env = Environment(
+            loader=FileSystemLoader(self.templates_path))
+
+        self._writeTemplate(
+            'base.conf',
+            '{% import "macros.conf" as macros %}'
+            '{{ title }} {% block body %}{% endblock %}')
+        self._writeTemplate(
+            'macros.conf',
+            '{% macro m(x) %}{{ x }}{% endmacro %}')
+        self._writeTemplate('part.conf', '{{ part_value }}')
+        self._writeTemplate(
+            'test.conf',
+            '{% extends "base.conf" %}{% block body %}{{ value }}'
+            '{% include "part.conf" %}{% endblock %}')
+        self._writeTemplate('dynamic.conf', '{% include name %}')
+        self._writeTemplate('broken.conf', '{% include "missing.conf" %}')
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.templates_path)
+
+    # ....................................................................... #
+    def _writeTemplate(self, name, content):
+        with open(os.path.join(self.templates_path, name), 'w') as f:
+            f.write(content)
+
+    # ....................................................................... #
+    def _callFUT(self, path):
+        from ....renderers.jinja2_rendering import Jinja2TemplateRenderer
+
+        jinja2_env = self.jinja2_env
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyEnvironmentConfig(object):
+
+            def template_environment(self, template_renderer_factory):
+                return jinja2_env
+
+        renderer = Jinja2TemplateRenderer(
+            DummyEnvironmentConfig(), 'some_output_path', path, {})
+
+        return renderer.template_dependencies()
+
+    # ....................................................................... #
+    def test_template_dependencies(self):
+
+        templates, variables = self._callFUT('test.conf')
+
+        self.assertListEqual(
+            sorted(templates),
+            ['base.conf', 'macros.conf', 'part.conf', 'test.conf'])
+        self.assertListEqual(variables, ['part_value', 'title', 'value'])
+
+    # ....................................................................... #
+    def test_template_dependencies_source_changed(self):
+
+        templates, _ = self._callFUT('test.conf')
+
+        self._writeTemplate('part.conf', '{{ other_value }}')
+
+        # analysis is cached for the lifetime of the environment
+        self.assertDictEqual(self._callFUT('test.conf')[0], templates)
+
+        self.jinja2_env = self.jinja2_env.overlay()
+        changed_templates, variables = self._callFUT('test.conf')
+
+        self.assertNotEqual(
+            changed_templates['part.conf'],
+            templates['part.conf'])
+        self.assertEqual(
+            changed_templates['base.conf'],
+            templates['base.conf'])
+        self.assertListEqual(variables, ['other_value', 'title', 'value'])
+
+    # ....................................................................... #
+    def test_invalidate(self):
+        from ....renderers.jinja2_rendering import Jinja2TemplateRenderer
+
+        jinja2_env = self.jinja2_env
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyEnvironmentConfig(object):
+
+            def template_environment(self, template_renderer_factory):
+                return jinja2_env
+
+        templates, _ = self._callFUT('test.conf')
+
+        self._writeTemplate('part.conf', '{{ other_value }}')
+        Jinja2TemplateRenderer.invalidate(
+            DummyEnvironmentConfig(),
+            ['part.conf'])
+
+        changed_templates, variables = self._callFUT('test.conf')
+
+        self.assertNotEqual(
+            changed_templates['part.conf'],
+            templates['part.conf'])
+        self.assertListEqual(variables, ['other_value', 'title', 'value'])
+
+        # invalidate all the templates
+        jinja2_env.get_template('test.conf')
+        Jinja2TemplateRenderer.invalidate(DummyEnvironmentConfig())
+
+        self.assertEqual(len(jinja2_env.cache), 0)
+
+    # ....................................................................... #
+    def test_template_digests(self):
+        from ....renderers.jinja2_rendering import Jinja2TemplateRenderer
+
+        jinja2_env = self.jinja2_env
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyEnvironmentConfig(object):
+
+            def template_environment(self, template_renderer_factory):
+                return jinja2_env
+
+        renderer = Jinja2TemplateRenderer(
+            DummyEnvironmentConfig(), 'some_output_path', 'test.conf', {})
+
+        templates, _ = self._callFUT('test.conf')
+
+        # the same digests, without analyzing the templates
+        self.assertDictEqual(renderer.template_digests(templates), templates)
+        self.assertDictEqual(renderer.template_digests([]), {})
+        self.assertIsNone(
+            renderer.template_digests(['test.conf', 'missing.conf']))
+
+    # ....................................................................... #
+    def test_template_dependencies_not_known(self):
+
+        self.assertIsNone(self._callFUT('dynamic.conf'))
+        self.assertIsNone(self._callFUT('broken.conf'))
+        self.assertIsNone(self._callFUT('missing.conf'))
+
+
+# --------------------------------------------------------------------------- #
+class Test_Jinja2BytecodeCache(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.templates_path = mkdtemp()
+        self.bytecode_cache_path = mkdtemp()
+
+        with open(os.path.join(self.templates_path, 'test.conf'), 'w') as f:
+            f.write('test {{ value }}')
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.templates_path)
+        rmtree(self.bytecode_cache_path)
+
+    # ....................................................................... #
+    def _makeEnvironment(self):
+        from jinja2 import Environment
+        from jinja2 import FileSystemLoader
+        from ....renderers.jinja2_rendering import Jinja2BytecodeCache
+
+        return Environment(
+            loader=FileSystemLoader(self.templates_path),
+            bytecode_cache=Jinja2BytecodeCache(self.bytecode_cache_path))
+
+    # ....................................................................... #
+    def test_dump_and_load_bytecode(self):
+
+        template = self._makeEnvironment().get_template('test.conf')
+        cache_files = os.listdir(self.bytecode_cache_path)
+
+        # one cache entry and no temporary files are left behind
+        self.assertEqual(len(cache_files), 1)
+        self.assertTrue(cache_files[0].startswith('__jinja2_'))
+
+        # fresh environment renders using the cached bytecode
+        cached_template = self._makeEnvironment().get_template('test.conf')
+
+        self.assertEqual(
+            cached_template.render(value=1),
+            template.render(value=1))
+
+    # ....................................................................... #
+    def test_dump_bytecode_rename_error(self):
+
+        from ....renderers.jinja2_rendering import Jinja2BytecodeCache
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyBucket(object):
+
+            key = 'test_key'
+
+            def write_bytecode(self, file_handler):
+                file_handler.write(b'test')
+
+        def dummy_os_rename(source, destination):
+            raise OSError(13, 'Permission denied', destination)
+
+        bytecode_cache = Jinja2BytecodeCache(self.bytecode_cache_path)
+        bytecode_cache.dump_bytecode(
+            DummyBucket(), _os_rename=dummy_os_rename)
+
+        # temporary file is removed
+        self.assertListEqual(os.listdir(self.bytecode_cache_path), [])
+
+    # ....................................................................... #
+    def test_dump_bytecode_cleanup_error(self):
+
+        from ....renderers.jinja2_rendering import Jinja2BytecodeCache
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyBucket(object):
+
+            key = 'test_key'
+
+            def write_bytecode(self, file_handler):
+                file_handler.write(b'test')
+
+        def dummy_os_rename(source, destination):
+            # the temporary file vanishes along with the failed rename
+            os.unlink(source)
+            raise OSError(13, 'Permission denied', destination)
+
+        bytecode_cache = Jinja2BytecodeCache(self.bytecode_cache_path)
+        bytecode_cache.dump_bytecode(
+            DummyBucket(), _os_rename=dummy_os_rename)
+
+        self.assertListEqual(os.listdir(self.bytecode_cache_path), [])
+
+
+# --------------------------------------------------------------------------- #
+class Test_warm_bytecode_cache(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.templates_path = mkdtemp()
+        self.bytecode_cache_path = mkdtemp()
+
+        with open(os.path.join(self.templates_path, 'good.conf'), 'w') as f:
+            f.write('test {{ value }}')
+
+        with open(os.path.join(self.templates_path, 'bad.conf'), 'w') as f:
+            f.write('test {{ value ')
+
+        with open(os.path.join(self.templates_path, 'key.pem'), 'wb') as f:
+            f.write(b'\x00\xff\xfe')
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.templates_path)
+        rmtree(self.bytecode_cache_path)
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ....renderers.jinja2_rendering import warm_bytecode_cache
+        return warm_bytecode_cache(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_warm_bytecode_cache_in_process(self):
+
+        result = self._callFUT(
+            self.templates_path,
+            self.bytecode_cache_path,
+            processes=1)
+
+        self.assertListEqual([name for name, error in result],
+                             ['bad.conf', 'good.conf'])
+        self.assertIsNotNone(result[0][1])
+        self.assertIsNone(result[1][1])
+        self.assertEqual(len(os.listdir(self.bytecode_cache_path)), 1)
+
+    # ....................................................................... #
+    def test_warm_bytecode_cache_with_pool(self):
+
+        pool_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyPool(object):
+
+            def __init__(self, processes, initializer, initargs):
+                pool_calls.append(processes)
+                initializer(*initargs)
+
+            def map(self, function, iterable):
+                return [function(item) for item in iterable]
+
+            def close(self):
+                pool_calls.append('close')
+
+            def join(self):
+                pool_calls.append('join')
+
+        result = self._callFUT(
+            self.templates_path,
+            self.bytecode_cache_path,
+            processes=4,
+            _pool_factory=DummyPool)
+
+        self.assertListEqual(pool_calls, [4, 'close', 'join'])
+        self.assertListEqual([name for name, error in result],
+                             ['bad.conf', 'good.conf'])
+
+
+# --------------------------------------------------------------------------- #
+class Test_compile_templates_bundle(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.templates_path = mkdtemp()
+        self.bundle_folder_path = mkdtemp()
+
+        os.mkdir(os.path.join(self.templates_path, 'etc'))
+        self._writeTemplate('base.conf', 'base {% block body %}{% endblock %}')
+        self._writeTemplate(
+            'etc/test.conf',
+            '{% extends "base.conf" %}{% block body %}{{ value }}'
+            '{% endblock %}')
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.templates_path)
+        rmtree(self.bundle_folder_path)
+
+    # ....................................................................... #
+    def _writeTemplate(self, name, content):
+        with open(os.path.join(self.templates_path, name), 'w') as f:
+            f.write(content)
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ....renderers.jinja2_rendering import compile_templates_bundle
+        return compile_templates_bundle(*args, **kwargs)
+
+    # ....................................................................... #
+    def _makeEnvironment(self, bundle_path):
+        from ....renderers.jinja2_rendering import Jinja2TemplateRenderer
+
+        config = DummyConfig(
+            templates_path=self.templates_path,
+            compiled_templates_path=bundle_path)
+
+        return Jinja2TemplateRenderer.create_environment(config)
+
+    # ....................................................................... #
+    def _assertBundleRenders(self, bundle_path):
+
+        jinja2_env = self._makeEnvironment(bundle_path)
+
+        self.assertEqual(
+            jinja2_env.get_template('etc/test.conf').render(value='test'),
+            'base test')
+
+    # ....................................................................... #
+    def test_compile_templates_bundle_folder(self):
+
+        bundle_path = os.path.join(self.bundle_folder_path, 'bundle')
+
+        self.assertListEqual(
+            self._callFUT(self.templates_path, bundle_path),
+            ['base.conf', 'etc/test.conf'])
+
+        self._assertBundleRenders(bundle_path)
+
+    # ....................................................................... #
+    def test_compile_templates_bundle_zip(self):
+
+        bundle_path = os.path.join(self.bundle_folder_path, 'bundle.zip')
+
+        self.assertListEqual(
+            self._callFUT(self.templates_path, bundle_path, zip=True),
+            ['base.conf', 'etc/test.conf'])
+
+        self._assertBundleRenders(bundle_path)
+
+    # ....................................................................... #
+    def test_compile_templates_bundle_binary_file(self):
+
+        with open(os.path.join(self.templates_path, 'key.pem'), 'wb') as f:
+            f.write(b'\x00\xff\xfe')
+
+        bundle_path = os.path.join(self.bundle_folder_path, 'bundle')
+
+        self.assertListEqual(
+            self._callFUT(self.templates_path, bundle_path),
+            ['base.conf', 'etc/test.conf'])
+
+        self._assertBundleRenders(bundle_path)
+
+    # ....................................................................... #
+    def test_compile_templates_bundle_for_exceptions(self):
+
+        self._writeTemplate('bad.conf', '{{ value ')
+        bundle_path = os.path.join(self.bundle_folder_path, 'bundle')
+
+        self.assertRaises(
+            TemplateBundleError,
+            self._callFUT,
+            self.templates_path,
+            bundle_path)
+
+    # ....................................................................... #
+    def test_stale_bundle(self):
+
+        bundle_path = os.path.join(self.bundle_folder_path, 'bundle')
+        self._callFUT(self.templates_path, bundle_path)
+
+        self._writeTemplate('base.conf', 'changed {% block body %}'
+                                         '{% endblock %}')
+
+        self.assertRaisesRegexp(
+            TemplateBundleError,
+            'Compiled templates bundle is stale',
+            self._makeEnvironment,
+            bundle_path)
+
+    # ....................................................................... #
+    def test_incompatible_bundle(self):
+
+        from ....renderers.jinja2_rendering import BUNDLE_MANIFEST_NAME
+
+        bundle_path = os.path.join(self.bundle_folder_path, 'bundle')
+        self._callFUT(self.templates_path, bundle_path)
+
+        manifest_path = os.path.join(bundle_path, BUNDLE_MANIFEST_NAME)
+        with open(manifest_path) as f:
+            manifest = f.read()
+
+        with open(manifest_path, 'w') as f:
+            f.write(manifest.replace('"python_version": "', '"python_version"'
+                                     ': "0.'))
+
+        self.assertRaisesRegexp(
+            TemplateBundleError,
+            'is incompatible',
+            self._makeEnvironment,
+            bundle_path)
+
+    # ....................................................................... #
+    def test_missing_manifest(self):
+
+        self.assertRaisesRegexp(
+            TemplateBundleError,
+            'Could not read compiled templates bundle manifest',
+            self._makeEnvironment,
+            self.bundle_folder_path)
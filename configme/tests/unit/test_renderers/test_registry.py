@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test template renderer registry.
+"""
+
+from unittest import TestCase
+
+from ....exceptions import InvalidName
+
+
+# --------------------------------------------------------------------------- #
+class DummyTemplateRenderer(object):
+    pass
+
+
+# --------------------------------------------------------------------------- #
+class DummyOtherTemplateRenderer(object):
+    pass
+
+
+# --------------------------------------------------------------------------- #
+class DummyModule(object):
+    DummyTemplateRenderer = DummyTemplateRenderer
+
+
+# --------------------------------------------------------------------------- #
+class DummyEntryPoint(object):
+
+    # ....................................................................... #
+    def __init__(self, name, renderer=None, error=None):
+        self.name = name
+        self.renderer = renderer
+        self.error = error
+        self.loaded = 0
+
+    # ....................................................................... #
+    def load(self):
+        self.loaded += 1
+        if self.error is not None:
+            raise ImportError(self.error)
+        return self.renderer
+
+
+# --------------------------------------------------------------------------- #
+class Test_TemplateRendererRegistry(TestCase):
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        from ....renderers.registry import TemplateRendererRegistry
+
+        self.imported = []
+        self.entry_points = [
+            DummyEntryPoint('external', DummyOtherTemplateRenderer),
+            DummyEntryPoint('broken', error='No module named broken'),
+            ]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_import_module(name):
+            self.imported.append(name)
+            if name != 'dummy_module':
+                raise ImportError('No module named %s' % name)
+            return DummyModule
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_iter_entry_points(group):
+            self.assertEqual(group, 'configme.renderers')
+            return iter(self.entry_points)
+
+        kwargs.setdefault('_import_module', dummy_import_module)
+        kwargs.setdefault('_iter_entry_points', dummy_iter_entry_points)
+
+        return TemplateRendererRegistry(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_names(self):
+
+        self.assertListEqual(
+            self._makeOne().names(),
+            ['broken', 'external', 'jinja2', 'substitution', 'verbatim'])
+
+    # ....................................................................... #
+    def test_get(self):
+
+        registry = self._makeOne()
+        registry.register('dummy', 'dummy_module:DummyTemplateRenderer')
+
+        # renderers are imported on first use only
+        self.assertListEqual(self.imported, [])
+        self.assertIs(registry.get('dummy'), DummyTemplateRenderer)
+        self.assertIs(registry.get('dummy'), DummyTemplateRenderer)
+        self.assertListEqual(self.imported, ['dummy_module'])
+
+        registry.register('dummy', DummyOtherTemplateRenderer)
+        self.assertIs(registry.get('dummy'), DummyOtherTemplateRenderer)
+
+    # ....................................................................... #
+    def test_get_entry_point(self):
+
+        registry = self._makeOne()
+
+        self.assertIs(registry.get('external'), DummyOtherTemplateRenderer)
+        self.assertIs(registry.get('external'), DummyOtherTemplateRenderer)
+        self.assertEqual(self.entry_points[0].loaded, 1)
+
+    # ....................................................................... #
+    def test_get_for_exceptions(self):
+
+        registry = self._makeOne()
+        registry.register('missing', 'missing_module:DummyTemplateRenderer')
+        registry.register('typo', 'dummy_module:DummyTypoRenderer')
+
+        self.assertRaisesRegexp(
+            InvalidName,
+            "Unknown template renderer 'unknown', available renderers: "
+            "broken, external, jinja2, missing, substitution, typo, "
+            "verbatim",
+            registry.get,
+            'unknown')
+
+        for name in ('missing', 'typo', 'broken'):
+            self.assertRaisesRegexp(
+                InvalidName,
+                "Could not import template renderer '%s'" % name,
+                registry.get,
+                name)
+
+    # ....................................................................... #
+    def test_match(self):
+
+        registry = self._makeOne(
+            patterns=[('*.pem', 'verbatim'), ('*.conf', 'external')],
+            default=DummyTemplateRenderer)
+
+        self.assertIs(
+            registry.match('etc/test.conf'),
+            DummyOtherTemplateRenderer)
+        self.assertIs(
+            registry.match('etc/test.ini'),
+            DummyTemplateRenderer)
+
+        # the given patterns are checked first, then the registered ones
+        self.assertIs(
+            registry.match(
+                'etc/test.conf',
+                [('etc/*', DummyTemplateRenderer)]),
+            DummyTemplateRenderer)
+        self.assertIs(
+            registry.match('etc/test.ini', default='external'),
+            DummyOtherTemplateRenderer)
+
+        # matching a pattern only imports its renderer
+        self.assertListEqual(self.imported, [])
+
+    # ....................................................................... #
+    def test_register_pattern_for_exceptions(self):
+
+        registry = self._makeOne()
+
+        self.assertRaisesRegexp(
+            InvalidName,
+            "Unknown template renderer 'unknown'",
+            registry.register_pattern,
+            '*.conf',
+            'unknown')
+        self.assertListEqual(registry.patterns, [])
+
+    # ....................................................................... #
+    def test_builtin_renderers(self):
+        from ....renderers.registry import TemplateRendererRegistry
+
+        registry = TemplateRendererRegistry(_iter_entry_points=lambda _: [])
+
+        for name in ('jinja2', 'substitution', 'verbatim'):
+            self.assertEqual(registry.get(name).name, name)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test Substitution Template Renderer
+"""
+
+import io
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from unittest import TestCase
+
+from ....exceptions import TemplateRenderError
+
+
+# --------------------------------------------------------------------------- #
+class DummyConfig(object):
+
+    # ....................................................................... #
+    def __init__(self, templates_path, template_environment_options=None):
+        self.templates_path = templates_path
+        self.template_environment_options = template_environment_options
+        self._template_environments = {}
+
+    # ....................................................................... #
+    def template_environment(self, template_renderer_factory):
+        try:
+            return self._template_environments[template_renderer_factory]
+        except KeyError:
+            environment = template_renderer_factory.create_environment(self)
+            self._template_environments[template_renderer_factory] = \
+                environment
+            return environment
+
+
+# --------------------------------------------------------------------------- #
+class Test_SubstitutionTemplate(TestCase):
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        from ....renderers.substitution_rendering import SubstitutionTemplate
+        return SubstitutionTemplate(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_render(self):
+
+        template = self._makeOne(
+            u'host = {{host}}\nport = {{ port }}\nurl = {{ host }}:{{port}}'
+            u'\nuser = {{ user }}\n{ not = a placeholder }\n')
+
+        self.assertListEqual(template.names, ['host', 'port', 'user'])
+        self.assertEqual(
+            template.render({'host': u'example.com', 'port': u'80'}),
+            u'host = example.com\nport = 80\nurl = example.com:80'
+            u'\nuser = \n{ not = a placeholder }')
+
+    # ....................................................................... #
+    def test_render_keep_trailing_newline(self):
+
+        template = self._makeOne(u'{{ a }}\n', keep_trailing_newline=True)
+
+        self.assertEqual(template.render({'a': u'b'}), u'b\n')
+        self.assertEqual(self._makeOne(u'{{ a }}\n\n').render({}), u'\n')
+
+    # ....................................................................... #
+    def test_digest(self):
+
+        self.assertEqual(
+            self._makeOne(u'{{ a }}').digest,
+            self._makeOne(u'{{ a }}').digest)
+        self.assertNotEqual(
+            self._makeOne(u'{{ a }}').digest,
+            self._makeOne(u'{{ b }}').digest)
+
+    # ....................................................................... #
+    def test_unsupported_syntax_for_exceptions(self):
+
+        for source, message in (
+                (u'a\n{% if a %}b{% endif %}', "'{%' on line 2"),
+                (u'{{ a|upper }}', "'{{' on line 1"),
+                (u'{# comment #}', "'{#' on line 1"),
+                ):
+            self.assertRaisesRegexp(ValueError, message, self._makeOne, source)
+
+
+# --------------------------------------------------------------------------- #
+class Test_SubstitutionTemplateRenderer(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.templates_path = mkdtemp()
+        os.mkdir(os.path.join(self.templates_path, 'etc'))
+
+        self._write('etc/test.conf', u'name = {{ name }} ž\n')
+        self._write('etc/bad.conf', u'{% if name %}{{ name }}{% endif %}')
+
+        self.config = DummyConfig(self.templates_path)
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.templates_path)
+
+    # ....................................................................... #
+    def _write(self, name, content):
+        file_path = os.path.join(self.templates_path, *name.split('/'))
+        with io.open(file_path, 'w', encoding='utf-8') as file_handler:
+            file_handler.write(content)
+
+    # ....................................................................... #
+    def _makeOne(self, path, settings):
+        from ....renderers.substitution_rendering import \
+            SubstitutionTemplateRenderer
+        return SubstitutionTemplateRenderer(
+            self.config, 'role_path', path, settings)
+
+    # ....................................................................... #
+    def test_get_rendered_config(self):
+
+        renderer = self._makeOne('etc/test.conf', {'name': u'test'})
+
+        self.assertEqual(renderer.get_rendered_config(), u'name = test ž')
+        self.assertListEqual(
+            renderer.generate_rendered_config(),
+            [u'name = test ž'])
+
+    # ....................................................................... #
+    def test_get_rendered_config_keep_trailing_newline(self):
+
+        self.config.template_environment_options = {
+            'keep_trailing_newline': True}
+
+        renderer = self._makeOne('etc/test.conf', {'name': u'test'})
+
+        self.assertEqual(renderer.get_rendered_config(), u'name = test ž\n')
+
+    # ....................................................................... #
+    def test_get_rendered_config_for_exceptions(self):
+
+        self.assertRaisesRegexp(
+            TemplateRenderError,
+            "etc/bad.conf",
+            self._makeOne('etc/bad.conf', {}).get_rendered_config)
+        self.assertRaisesRegexp(
+            TemplateRenderError,
+            "etc/missing.conf",
+            self._makeOne('etc/missing.conf', {}).get_rendered_config)
+
+    # ....................................................................... #
+    def test_load_template(self):
+
+        renderer = self._makeOne('etc/test.conf', {'name': u'test'})
+
+        self.assertListEqual(renderer.load_template().names, ['name'])
+        self.assertRaisesRegexp(
+            TemplateRenderError,
+            "etc/missing.conf",
+            self._makeOne('etc/missing.conf', {}).load_template)
+
+    # ....................................................................... #
+    def test_template_dependencies(self):
+
+        templates, names = \
+            self._makeOne('etc/test.conf', {}).template_dependencies()
+
+        self.assertListEqual(list(templates), ['etc/test.conf'])
+        self.assertListEqual(names, ['name'])
+
+        self.assertIsNone(
+            self._makeOne('etc/bad.conf', {}).template_dependencies())
+
+    # ....................................................................... #
+    def test_invalidate(self):
+        from ....renderers.substitution_rendering import \
+            SubstitutionTemplateRenderer
+
+        renderer = self._makeOne('etc/test.conf', {'name': u'test'})
+        renderer.get_rendered_config()
+
+        self._write('etc/test.conf', u'changed = {{ name }}')
+
+        # compiled templates are cached until invalidated
+        self.assertEqual(renderer.get_rendered_config(), u'name = test ž')
+
+        SubstitutionTemplateRenderer.invalidate(
+            self.config, ['etc/test.conf'])
+        self.assertEqual(renderer.get_rendered_config(), u'changed = test')
+
+        self._write('etc/test.conf', u'all = {{ name }}')
+
+        SubstitutionTemplateRenderer.invalidate(self.config)
+        self.assertEqual(renderer.get_rendered_config(), u'all = test')
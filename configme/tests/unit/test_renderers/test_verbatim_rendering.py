@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test Verbatim Template Renderer
+"""
+
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from unittest import TestCase
+
+from ....assets import AssetManager
+from ....exceptions import TemplateRenderError
+from ....manifest import Manifest
+
+
+# --------------------------------------------------------------------------- #
+class DummyConfig(object):
+
+    # ....................................................................... #
+    def __init__(self, templates_path):
+        self.templates_path = templates_path
+        self._asset_manager = AssetManager()
+
+
+# --------------------------------------------------------------------------- #
+class Test_VerbatimTemplateRenderer(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.path = mkdtemp()
+        self.templates_path = os.path.join(self.path, 'templates')
+        self.output_path = os.path.join(self.path, 'output')
+
+        os.makedirs(os.path.join(self.templates_path, 'ssl'))
+
+        self.content = b'\x00\xff{{ not_a_setting }}\r\n'
+        with open(os.path.join(
+                self.templates_path, 'ssl', 'test.pem'), 'wb') as handler:
+            handler.write(self.content)
+
+        self.config = DummyConfig(self.templates_path)
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def _makeOne(self, path, settings=None, **kwargs):
+        from ....renderers.verbatim_rendering import VerbatimTemplateRenderer
+        return VerbatimTemplateRenderer(
+            self.config, self.output_path, path, settings or {}, **kwargs)
+
+    # ....................................................................... #
+    def _read_output(self, path):
+        with open(os.path.join(self.output_path, path), 'rb') as handler:
+            return handler.read()
+
+    # ....................................................................... #
+    def test_get_rendered_config(self):
+
+        opened = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_io_open(file_path, mode):
+            opened.append(mode)
+            return open(file_path, mode)
+
+        renderer = self._makeOne(
+            'ssl/test.pem',
+            {'not_a_setting': u'test'},
+            _io_open=dummy_io_open)
+
+        self.assertEqual(renderer.get_rendered_config(), self.content)
+        self.assertEqual(renderer.get_rendered_config(), self.content)
+
+        # the template is read once
+        self.assertListEqual(opened, ['rb'])
+
+    # ....................................................................... #
+    def test_get_rendered_config_for_exceptions(self):
+
+        renderer = self._makeOne('ssl/missing.pem')
+
+        self.assertRaisesRegexp(
+            TemplateRenderError,
+            "ssl/missing.pem",
+            renderer.get_rendered_config)
+        self.assertIsNone(renderer.template_dependencies())
+
+    # ....................................................................... #
+    def test_write(self):
+
+        renderer = self._makeOne('ssl/test.pem')
+
+        self.assertEqual(
+            renderer.write(),
+            os.path.join(self.output_path, 'ssl', 'test.pem'))
+        self.assertEqual(self._read_output('ssl/test.pem'), self.content)
+
+        # content read ahead of time is written in binary mode too
+        rmtree(self.output_path)
+        renderer = self._makeOne('ssl/test.pem')
+        renderer.write(renderer.get_rendered_config())
+        self.assertEqual(self._read_output('ssl/test.pem'), self.content)
+
+    # ....................................................................... #
+    def test_write_incremental(self):
+
+        manifest = Manifest()
+
+        self._makeOne('ssl/test.pem').write(manifest=manifest)
+        self.assertEqual(self._read_output('ssl/test.pem'), self.content)
+
+        templates, keys = self._makeOne('ssl/test.pem').template_dependencies()
+        self.assertListEqual(list(templates), ['ssl/test.pem'])
+        self.assertListEqual(keys, [])
+
+        entry = manifest.entries['ssl/test.pem']
+        self.assertEqual(entry['hash'], Manifest.digest([self.content]))
+
+        # the next run keeps the config of the unchanged template
+        next_manifest = Manifest.loads(manifest.dumps())
+        self.assertTrue(
+            self._makeOne('ssl/test.pem').up_to_date(next_manifest))
+
+    # ....................................................................... #
+    def test_unchanged(self):
+
+        renderer = self._makeOne('ssl/test.pem')
+        self.assertFalse(renderer.unchanged())
+
+        renderer.write()
+
+        # the binary content is compared as it is
+        self.assertTrue(self._makeOne('ssl/test.pem').unchanged())
+
+        with open(os.path.join(
+                self.templates_path, 'ssl', 'test.pem'), 'wb') as handler:
+            handler.write(b'\x00\xfe')
+
+        self.assertFalse(self._makeOne('ssl/test.pem').unchanged())
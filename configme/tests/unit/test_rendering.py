@@ -28,7 +28,7 @@ class Test_BaseTemplateRender(TestCase):
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
         class TestBaseTemplateRenderer(BaseTemplateRenderer):
             def get_rendered_config(self):
-                pass
+                return u'test_rendered_config'
 
         return TestBaseTemplateRenderer(*args, **kwargs)
 
@@ -102,7 +102,8 @@ class Test_BaseTemplateRender(TestCase):
             def create_folder(self, path):
                 return path
 
-            def write_to_file(self, path, content):
+            def write_chunks_to_file(self, path, chunks):
+                self.chunks = list(chunks)
                 return path
 
         test_config = DummyConfig(_asset_manager_factory=DummyAssetManager)
@@ -123,6 +124,150 @@ class Test_BaseTemplateRender(TestCase):
 
         self.assertEqual(template_renderer.write(),
             desired_return)
+        self.assertListEqual(test_config._asset_manager.chunks,
+            [u'test_rendered_config'])
+
+    # ....................................................................... #
+    def test_write_with_content(self):
+
+        test_content = u'test_content'
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyAssetManager(object):
+
+            content = None
+
+            def path_join(self, path_parts):
+                return '/'.join(path_parts)
+
+            def path_folder(self, path):
+                return 'some_folder'
+
+            def asset_or_location_exists(self, path):
+                pass
+
+            def create_folder(self, path):
+                return path
+
+            def write_chunks_to_file(self, path, chunks):
+                self.content = list(chunks)
+                return path
+
+        test_config = DummyConfig(_asset_manager_factory=DummyAssetManager)
+
+        template_renderer = self._makeOne(
+            config=test_config,
+            role_output_folder_path='test_role_output_folder_path',
+            path='test_path',
+            settings={})
+
+        self.assertEqual(template_renderer.write(test_content),
+            'test_role_output_folder_path/test_path')
+        self.assertListEqual(test_config._asset_manager.content,
+                             [test_content])
+
+    # ....................................................................... #
+    def test_generate_rendered_config(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyAssetManager(object):
+            pass
+
+        template_renderer = self._makeOne(
+            config=DummyConfig(_asset_manager_factory=DummyAssetManager),
+            role_output_folder_path='some_role_output_folder_path',
+            path='some_path',
+            settings={})
+
+        self.assertListEqual(
+            list(template_renderer.generate_rendered_config()),
+            [u'test_rendered_config'])
+
+    # ....................................................................... #
+    def test_unchanged(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyAssetManager(object):
+
+            def path_join(self, path_parts):
+                return '/'.join(path_parts)
+
+            def file_matches(self, file_path, chunks):
+                self.file_path = file_path
+                return list(chunks) == [u'test_rendered_config']
+
+        template_renderer = self._makeOne(
+            config=DummyConfig(_asset_manager_factory=DummyAssetManager),
+            role_output_folder_path='some_role_output_folder_path',
+            path='some_path',
+            settings={})
+
+        self.assertTrue(template_renderer.unchanged())
+        self.assertEqual(
+            template_renderer.config._asset_manager.file_path,
+            'some_role_output_folder_path/some_path')
+
+    # ....................................................................... #
+    def test_up_to_date_recorded_dependencies(self):
+        from ...manifest import Manifest
+        from ...rendering import BaseTemplateRenderer
+
+        analyzed = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyAssetManager(object):
+
+            def path_join(self, path_parts):
+                return '/'.join(path_parts)
+
+            def file_size(self, file_path):
+                return 10
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyTemplateRenderer(BaseTemplateRenderer):
+
+            digests = {'some_path': 'digest1'}
+
+            def get_rendered_config(self):  # pragma: no cover
+                return u''
+
+            def template_dependencies(self):
+                analyzed.append(self.path)
+                return dict(self.digests), ['key']
+
+            def template_digests(self, names):
+                return dict((name, self.digests[name]) for name in names)
+
+        config = DummyConfig(_asset_manager_factory=DummyAssetManager)
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def up_to_date(manifest, settings):
+            return DummyTemplateRenderer(
+                config,
+                'some_role_output_folder_path',
+                'some_path',
+                settings).up_to_date(manifest)
+
+        # nothing is recorded, the templates are analyzed
+        manifest = Manifest()
+        self.assertFalse(up_to_date(manifest, {'key': 'a'}))
+        self.assertListEqual(analyzed, ['some_path'])
+
+        manifest.record(
+            'some_path',
+            'some_digest',
+            10,
+            Manifest.dependencies({'some_path': 'digest1'}, {'key': 'a'}))
+        manifest = Manifest(manifest.entries)
+
+        # recorded templates and settings did not change, no analysis
+        self.assertTrue(up_to_date(manifest, {'key': 'a', 'other': 'b'}))
+        self.assertFalse(up_to_date(manifest, {'key': 'b'}))
+
+        DummyTemplateRenderer.digests = {'some_path': 'digest2'}
+        self.assertFalse(up_to_date(manifest, {'key': 'a'}))
+
+        self.assertListEqual(analyzed, ['some_path'])
 
 
 # --------------------------------------------------------------------------- #
@@ -2,9 +2,15 @@
 
 import os
 
+from shutil import rmtree
+from tempfile import mkdtemp
+
 from unittest import TestCase
 
+from ...exceptions import AssetCreationError
 from ...exceptions import InvalidName
+from ...exceptions import SettingsParsingError
+from ...exceptions import TemplateRenderError
 
 
 # --------------------------------------------------------------------------- #
@@ -38,6 +44,14 @@ class DummyConfig(object):
         self.output_path = output_path
         self.settings_file_extension = settings_file_extension
 
+    # ................................................................... #
+    def settings_parser(self, file_path, variables=None):
+        return self._settings_parser_factory(file_path, variables)
+
+    # ................................................................... #
+    def template_renderer_factory(self, path, settings):
+        return self._template_renderer_factory
+
 
 # --------------------------------------------------------------------------- #
 def dummy_setting_parser_maker(content):
@@ -64,18 +78,22 @@ def dummy_setting_parser_maker(content):
             self._variables = variables
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
-        def read(self):
+        def read(self, lazy=False):
 
             result = []
 
-            for section_name in self.__content:
+            for section_name in sorted(self.__content):
                 # interpolate values into section settings
-                section_settings = [(k, v % self._variables) for k, v in
-                            self.__content[section_name].iteritems()]
+                section_settings = dict((k, v % self._variables) for k, v in
+                            self.__content[section_name].iteritems())
 
                 result.append((section_name, section_settings))
 
-            return result
+            return iter(result) if lazy else result
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def section_names(self):
+            return sorted(self.__content)
 
     return DummySettingsParser
 
@@ -91,9 +109,20 @@ class DummyTemplateRenderer(object):
     def __init__(self, config, role_output_folder_path, path, settings):
         self.role_output_folder_path = role_output_folder_path
         self.path = path
+        self.settings = settings
 
     # ....................................................................... #
-    def write(self):
+    def get_rendered_config(self):
+        if 'fail_render' in dict(self.settings):
+            raise TemplateRenderError(self.path)
+        return self.path
+
+    # ....................................................................... #
+    def write(self, content=None, manifest=None):
+        if 'fail_write' in dict(self.settings):
+            raise AssetCreationError(self.path)
+        # content is what get_rendered_config returned
+        assert content in (None, self.path)
         return os.path.join(self.role_output_folder_path, self.path)
 
 
@@ -107,14 +136,28 @@ def dummy_asset_manager_maker():
         def path_join(self, path_parts):
             return '/'.join(path_parts)
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def path_folder(self, path):
+            return os.path.dirname(path)
+
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
         def create_folder(self, folder_path):
             return folder_path
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def create_folders(self, folder_paths, exist_ok=False,
+                           replace_files=False):
+            self.created_folders = folder_paths
+            return folder_paths
+
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
         def remove_folder(self, folder_path):
             return folder_path
 
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def remove_file(self, file_path):
+            return file_path
+
     return DummyAssetManager
 
 
@@ -389,6 +432,132 @@ class Test_Role(TestCase):
 
         self.assertListEqual(role.write_configs(), desired_output_list)
 
+    # ....................................................................... #
+    def _makeWorkersRole(self, settings_content):
+
+        config = DummyConfig(
+            templates_path='/some_templates_path',
+            settings_path='/some_settings_path',
+            output_path='/test_output_path',
+            _settings_parser_factory=dummy_setting_parser_maker(
+                content=settings_content),
+            _template_renderer_factory=DummyTemplateRenderer,
+            _asset_manager_factory=dummy_asset_manager_maker()
+            )
+
+        return self._makeOne(config=config, name='test_role')
+
+    # ....................................................................... #
+    def test_write_configs_with_workers(self):
+
+        settings_content = dict(
+            ('test/test_config%02d.conf' % index, {'test_setting': 'value'})
+            for index in range(20))
+
+        desired_output_list = sorted(
+            '/test_output_path/test_role/%s' % path
+            for path in settings_content)
+
+        role = self._makeWorkersRole(settings_content)
+
+        self.assertListEqual(role.write_configs(workers=4),
+                             desired_output_list)
+
+    # ....................................................................... #
+    def test_write_configs_with_workers_for_exceptions(self):
+
+        settings_content = dict(
+            ('test/test_config%02d.conf' % index, {'test_setting': 'value'})
+            for index in range(20))
+
+        # the first failing section is always the one raised
+        settings_content['test/test_config05.conf'] = {'fail_write': 'yes'}
+        settings_content['test/test_config07.conf'] = {'fail_render': 'yes'}
+        settings_content['test/test_config15.conf'] = {'fail_render': 'yes'}
+
+        role = self._makeWorkersRole(settings_content)
+
+        for _ in range(10):
+            self.assertRaisesRegexp(
+                AssetCreationError,
+                'test/test_config05.conf',
+                role.write_configs,
+                workers=4)
+
+    # ....................................................................... #
+    def test_write_configs_with_workers_for_renderer_exceptions(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyRendererConfig(DummyConfig):
+
+            def template_renderer_factory(self, path, settings):
+                if 'fail_renderer' in settings:
+                    raise SettingsParsingError(path)
+                return DummyTemplateRenderer
+
+        settings_content = dict(
+            ('test/test_config%02d.conf' % index, {'test_setting': 'value'})
+            for index in range(20))
+
+        settings_content['test/test_config09.conf'] = {'fail_renderer': 'yes'}
+        settings_content['test/test_config15.conf'] = {'fail_render': 'yes'}
+
+        config = DummyRendererConfig(
+            templates_path='/some_templates_path',
+            settings_path='/some_settings_path',
+            output_path='/test_output_path',
+            _settings_parser_factory=dummy_setting_parser_maker(
+                settings_content),
+            _asset_manager_factory=dummy_asset_manager_maker())
+
+        role = self._makeOne(config=config, name='test_role')
+
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'test/test_config09.conf',
+            role.write_configs,
+            workers=4)
+
+        settings_content['test/test_config03.conf'] = {'fail_render': 'yes'}
+
+        self.assertRaisesRegexp(
+            TemplateRenderError,
+            'test/test_config03.conf',
+            role.write_configs,
+            workers=4)
+
+    # ....................................................................... #
+    def test_write_configs_output_folders(self):
+
+        settings_content = {
+            'etc/a/x.conf': {'test_setting': 'value'},
+            'etc/a/y.conf': {'test_setting': 'value'},
+            'etc/b.conf': {'test_setting': 'value'},
+            'top.conf': {'test_setting': 'value'},
+            }
+
+        role = self._makeWorkersRole(settings_content)
+        role.write_configs()
+
+        # every folder is created once, parents first
+        self.assertListEqual(
+            role.config._asset_manager.created_folders,
+            ['/test_output_path/test_role/etc',
+             '/test_output_path/test_role/etc/a'])
+
+        settings_content['../test.conf'] = {'test_setting': 'value'}
+
+        role = self._makeWorkersRole(settings_content)
+        self.assertRaises(InvalidName, role.write_configs)
+
+    # ....................................................................... #
+    def test_template_renderer(self):
+
+        role = self._makeWorkersRole({})
+
+        self.assertTrue(
+            role._template_renderer('test.conf', {}).output_folder_exists)
+
 
 class Test_Role_validate_role_name(TestCase):
 
@@ -448,3 +617,768 @@ class Test_Role_validate_role_name(TestCase):
             desired_error_message,
             self._callFUT,
             test_role_name)
+
+
+# --------------------------------------------------------------------------- #
+class Test_write_roles(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...role import write_roles
+        return write_roles(*args, **kwargs)
+
+    # ....................................................................... #
+    def _makeRoleFactory(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyRole(object):
+
+            def __init__(self, config, name, suffix, variables):
+                self.name = name
+                self.suffix = suffix
+
+            def write_configs(self, workers=1, incremental=False,
+                              timings=None, keep_unchanged=False):
+                if self.name == 'bad_role':
+                    raise InvalidName('test_error_message')
+                if self.name == 'broken_role':
+                    raise ValueError('test_value_error')
+                return ['%s%s/%d' % (self.name, self.suffix, workers)]
+
+        return DummyRole
+
+    # ....................................................................... #
+    def test_write_roles(self):
+
+        desired_results = [
+            ('role_a', ['role_a-x/2'], None),
+            ('bad_role', [], 'test_error_message'),
+            ('broken_role', [], 'Unknown Error: test_value_error'),
+            ]
+
+        results = self._callFUT(
+            DummyConfig(),
+            ['role_a', 'bad_role', 'broken_role'],
+            suffix='-x',
+            workers=2,
+            _role_factory=self._makeRoleFactory())
+
+        self.assertListEqual(results, desired_results)
+
+    # ....................................................................... #
+    def test_write_roles_with_processes(self):
+
+        calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyPrewarmConfig(DummyConfig):
+
+            def prewarm_templates(self):
+                calls.append('prewarm')
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyPool(object):
+
+            def __init__(self, processes):
+                calls.append(('pool', processes))
+
+            def map(self, function, iterable, chunksize):
+                calls.append('map')
+                return [function(item) for item in iterable]
+
+            def close(self):
+                calls.append('close')
+
+            def join(self):
+                calls.append('join')
+
+        desired_calls = ['prewarm', ('pool', 3), 'map', 'close', 'join']
+        desired_results = [
+            ('role_a', ['role_a/1'], None),
+            ('role_b', ['role_b/1'], None),
+            ]
+
+        results = self._callFUT(
+            DummyPrewarmConfig(),
+            ['role_a', 'role_b'],
+            processes=3,
+            _pool_factory=DummyPool,
+            _role_factory=self._makeRoleFactory())
+
+        self.assertListEqual(results, desired_results)
+        self.assertListEqual(calls, desired_calls)
+
+    # ....................................................................... #
+    def test_write_roles_with_processes_timings(self):
+        from ...timings import Timings
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyRole(object):
+
+            def __init__(self, config, name, suffix, variables):
+                self.name = name
+
+            def write_configs(self, workers=1, incremental=False,
+                              timings=None, keep_unchanged=False):
+                timings.add('render', 1, self.name)
+                return [self.name]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyPool(object):
+
+            def __init__(self, processes):
+                pass
+
+            def map(self, function, iterable, chunksize):
+                return [function(item) for item in iterable]
+
+            def close(self):
+                pass
+
+            def join(self):
+                pass
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyPrewarmConfig(DummyConfig):
+
+            def prewarm_templates(self):
+                pass
+
+        timings = Timings()
+
+        results = self._callFUT(
+            DummyPrewarmConfig(),
+            ['role_a', 'role_b'],
+            processes=2,
+            timings=timings,
+            _pool_factory=DummyPool,
+            _role_factory=DummyRole)
+
+        self.assertListEqual(results, [
+            ('role_a', ['role_a'], None),
+            ('role_b', ['role_b'], None),
+            ])
+
+        # the timings of the worker processes are merged
+        self.assertDictEqual(timings.phases, {'render': 2})
+        self.assertListEqual(sorted(timings.sections), ['role_a', 'role_b'])
+
+
+# --------------------------------------------------------------------------- #
+class Test_Role_write_configs_incremental(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.output_path = mkdtemp()
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.output_path)
+
+    # ....................................................................... #
+    def _makeOne(self, settings_content):
+        from ...assets import AssetManager
+        from ...exceptions import TemplateRenderError
+        from ...rendering import BaseTemplateRenderer
+        from ...role import Role
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyContentRenderer(BaseTemplateRenderer):
+
+            def get_rendered_config(self):
+                return dict(self.settings)['content']
+
+            def generate_rendered_config(self):
+                content = self.get_rendered_config()
+                yield content
+                # the failing content fails once its chunk is streamed
+                if content == u'fail':
+                    raise TemplateRenderError(content)
+
+        config = DummyConfig(
+            templates_path='/some_templates_path',
+            settings_path='/some_settings_path',
+            output_path=self.output_path,
+            _settings_parser_factory=dummy_setting_parser_maker(
+                content=settings_content),
+            _template_renderer_factory=DummyContentRenderer,
+            _asset_manager_factory=AssetManager
+            )
+
+        return Role(config=config, name='test_role')
+
+    # ....................................................................... #
+    def _path(self, *path_parts):
+        return os.path.join(self.output_path, 'test_role', *path_parts)
+
+    # ....................................................................... #
+    def _read(self, *path_parts):
+        with open(self._path(*path_parts)) as file_handler:
+            return file_handler.read()
+
+    # ....................................................................... #
+    def test_write_configs_incremental(self):
+
+        settings_content = {
+            'a/test1.conf': {'content': 'one'},
+            'a/test2.conf': {'content': 'two'},
+            'b/c/test3.conf': {'content': 'three'},
+            }
+
+        role = self._makeOne(settings_content)
+        role.write_configs(incremental=True)
+
+        self.assertTrue(os.path.isfile(role.manifest_file_path))
+
+        # files rewritten by the second run are recognized by their inode
+        for path in ('a/test1.conf', 'a/test2.conf'):
+            os.rename(self._path(path), self._path(path + '.old'))
+            with open(self._path(path + '.old')) as source:
+                with open(self._path(path), 'w') as destination:
+                    destination.write(source.read())
+            os.remove(self._path(path + '.old'))
+
+        inode = os.stat(self._path('a/test1.conf')).st_ino
+
+        settings_content['a/test2.conf'] = {'content': 'changed'}
+        del settings_content['b/c/test3.conf']
+
+        role = self._makeOne(settings_content)
+        output_list = role.write_configs(incremental=True, workers=2)
+
+        self.assertListEqual(
+            output_list,
+            [self._path('a/test1.conf'), self._path('a/test2.conf')])
+        self.assertEqual(os.stat(self._path('a/test1.conf')).st_ino, inode)
+        self.assertEqual(self._read('a/test2.conf'), 'changed')
+        self.assertFalse(os.path.exists(self._path('b')))
+
+    # ....................................................................... #
+    def test_write_configs_incremental_streamed(self):
+
+        from ...exceptions import TemplateRenderError
+
+        settings_content = {'a/test1.conf': {'content': u'one'}}
+
+        role = self._makeOne(settings_content)
+        role.write_configs(incremental=True)
+
+        inode = os.stat(self._path('a/test1.conf')).st_ino
+
+        settings_content['a/test1.conf'] = {'content': u'fail'}
+        role = self._makeOne(settings_content)
+
+        # a config failing while streamed leaves the previous one untouched
+        self.assertRaises(
+            TemplateRenderError,
+            role.write_configs,
+            incremental=True)
+        self.assertEqual(self._read('a/test1.conf'), 'one')
+        self.assertListEqual(os.listdir(self._path('a')), ['test1.conf'])
+
+        # an unchanged config is discarded, a changed one renamed into place
+        settings_content['a/test1.conf'] = {'content': u'one'}
+        self._makeOne(settings_content).write_configs(incremental=True)
+        self.assertEqual(os.stat(self._path('a/test1.conf')).st_ino, inode)
+
+        settings_content['a/test1.conf'] = {'content': u'two'}
+        self._makeOne(settings_content).write_configs(incremental=True)
+        self.assertEqual(self._read('a/test1.conf'), 'two')
+        self.assertListEqual(os.listdir(self._path('a')), ['test1.conf'])
+
+    # ....................................................................... #
+    def test_write_configs_incremental_keep_unchanged(self):
+
+        settings_content = {'a/test1.conf': {'content': u'one'}}
+
+        role = self._makeOne(settings_content)
+        role.write_configs(incremental=True, keep_unchanged=True)
+
+        # the file on disk already has the changed content
+        with open(self._path('a/test1.conf'), 'w') as file_handler:
+            file_handler.write('two')
+        os.utime(self._path('a/test1.conf'), (1000000000, 1000000000))
+
+        settings_content['a/test1.conf'] = {'content': u'two'}
+        role = self._makeOne(settings_content)
+        role.write_configs(incremental=True, keep_unchanged=True)
+
+        self.assertEqual(
+            os.stat(self._path('a/test1.conf')).st_mtime,
+            1000000000)
+        self.assertListEqual(os.listdir(self._path('a')), ['test1.conf'])
+
+    # ....................................................................... #
+    def test_write_configs_incremental_modified_file(self):
+
+        settings_content = {'a/test1.conf': {'content': 'one'}}
+
+        role = self._makeOne(settings_content)
+        role.write_configs(incremental=True)
+
+        with open(self._path('a/test1.conf'), 'w') as file_handler:
+            file_handler.write('modified')
+
+        role.write_configs(incremental=True)
+
+        self.assertEqual(self._read('a/test1.conf'), 'one')
+
+    # ....................................................................... #
+    def test_write_configs_incremental_without_manifest(self):
+
+        settings_content = {'a/test1.conf': {'content': 'one'}}
+
+        role = self._makeOne(settings_content)
+        role.write_configs()
+
+        self.assertFalse(os.path.exists(role.manifest_file_path))
+
+        # an unknown file is removed by the rebuild
+        with open(self._path('a/unknown.conf'), 'w') as file_handler:
+            file_handler.write('unknown')
+
+        role.write_configs(incremental=True)
+
+        self.assertTrue(os.path.isfile(role.manifest_file_path))
+        self.assertFalse(os.path.exists(self._path('a/unknown.conf')))
+        self.assertEqual(self._read('a/test1.conf'), 'one')
+
+    # ....................................................................... #
+    def test_write_configs_keep_unchanged(self):
+
+        settings_content = {
+            'a/test1.conf': {'content': u'one'},
+            'a/test2.conf': {'content': u'two'},
+            'b/c/test3.conf': {'content': u'three'},
+            }
+
+        role = self._makeOne(settings_content)
+        role.write_configs(keep_unchanged=True)
+
+        # unchanged files keep their modification times
+        for path in ('a/test1.conf', 'a/test2.conf'):
+            os.utime(self._path(path), (1000000000, 1000000000))
+
+        with open(self._path('a/unknown.conf'), 'w') as file_handler:
+            file_handler.write('unknown')
+
+        settings_content['a/test2.conf'] = {'content': u'changed'}
+        del settings_content['b/c/test3.conf']
+
+        for workers in (1, 2):
+            role = self._makeOne(settings_content)
+            output_list = role.write_configs(
+                workers=workers,
+                keep_unchanged=True)
+
+            self.assertListEqual(
+                output_list,
+                [self._path('a/test1.conf'), self._path('a/test2.conf')])
+            self.assertEqual(
+                os.stat(self._path('a/test1.conf')).st_mtime,
+                1000000000)
+            self.assertEqual(self._read('a/test2.conf'), 'changed')
+            self.assertNotEqual(
+                os.stat(self._path('a/test2.conf')).st_mtime,
+                1000000000)
+
+            # files which are not configs of the role are removed
+            self.assertFalse(os.path.exists(self._path('a/unknown.conf')))
+            self.assertFalse(os.path.exists(self._path('b')))
+
+        # with incremental generation the manifest is used once written
+        role.write_configs(incremental=True, keep_unchanged=True)
+        role.write_configs(incremental=True, keep_unchanged=True)
+
+        self.assertTrue(os.path.isfile(role.manifest_file_path))
+        self.assertEqual(
+            os.stat(self._path('a/test1.conf')).st_mtime,
+            1000000000)
+
+    # ....................................................................... #
+    def test_write_configs_replace_folders_and_files(self):
+
+        for kwargs in ({'keep_unchanged': True},
+                       {'incremental': True},
+                       {'incremental': True, 'keep_unchanged': True}):
+            rmtree(self.output_path)
+            os.mkdir(self.output_path)
+
+            # a config becomes a folder of configs
+            self._makeOne({'a': {'content': u'file'}}).write_configs(**kwargs)
+            role = self._makeOne({'a/b': {'content': u'folder'}})
+            self.assertListEqual(
+                role.write_configs(**kwargs),
+                [self._path('a', 'b')])
+            self.assertEqual(self._read('a', 'b'), 'folder')
+
+            # and back again
+            role = self._makeOne({'a': {'content': u'file'}})
+            self.assertListEqual(
+                role.write_configs(**kwargs),
+                [self._path('a')])
+            self.assertEqual(self._read('a'), 'file')
+
+    # ....................................................................... #
+    def test_write_configs_shared_folders(self):
+
+        settings_content = dict(
+            ('a/b/test%d.conf' % index, {'content': u'%d' % index})
+            for index in range(5))
+        settings_content['a/test.conf'] = {'content': u'a'}
+        settings_content['test.conf'] = {'content': u'test'}
+
+        for workers in (1, 4):
+            role = self._makeOne(settings_content)
+            role.write_configs(workers=workers)
+
+            self.assertEqual(self._read('a/b/test4.conf'), '4')
+            self.assertEqual(self._read('test.conf'), 'test')
+
+        # configs are not written where a folder of a config would be
+        role = self._makeOne({
+            'a': {'content': u'file'},
+            'a/test.conf': {'content': u'test'},
+            })
+
+        self.assertRaises(AssetCreationError, role.write_configs)
+
+    # ....................................................................... #
+    def test_write_configs_removes_stale_manifest(self):
+
+        settings_content = {'a/test1.conf': {'content': 'one'}}
+
+        role = self._makeOne(settings_content)
+        role.write_configs(incremental=True)
+        role.write_configs()
+
+        self.assertFalse(os.path.exists(role.manifest_file_path))
+
+    # ....................................................................... #
+    def test_write_configs_incremental_dependencies(self):
+
+        rendered = []
+
+        settings_content = {
+            'a/test1.conf': {'content': 'one', 'version': '1'},
+            'a/test2.conf': {'content': 'two', 'version': '1'},
+            'a/test3.conf': {'content': 'three', 'unused': '1'},
+            }
+
+        role = self._makeOne(settings_content)
+        renderer_class = role.config._template_renderer_factory
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyDependenciesRenderer(renderer_class):
+
+            def get_rendered_config(self):
+                rendered.append(self.path)
+                return dict(self.settings)['content']
+
+            def template_dependencies(self):
+                return {self.path: 'test_digest'}, ['content', 'version']
+
+        role.config._template_renderer_factory = DummyDependenciesRenderer
+        role.write_configs(incremental=True)
+
+        settings_content['a/test2.conf']['version'] = '2'
+        settings_content['a/test3.conf']['unused'] = '2'
+
+        del rendered[:]
+        role.write_configs(incremental=True)
+
+        self.assertListEqual(rendered, ['a/test2.conf'])
+
+        del rendered[:]
+        role.write_configs(incremental=True, workers=2)
+
+        self.assertListEqual(rendered, [])
+
+    # ....................................................................... #
+    def test_write_configs_timings(self):
+        from ...timings import Timings
+
+        settings_content = {
+            'a/test1.conf': {'content': u'one'},
+            'b/test2.conf': {'content': u'two'},
+            }
+
+        # every call of the timer takes a second
+        ticks = iter(range(100))
+        timings = Timings(_timer=lambda: next(ticks))
+
+        role = self._makeOne(settings_content)
+        output_list = role.write_configs(timings=timings)
+
+        self.assertEqual(self._read('b/test2.conf'), 'two')
+        self.assertDictEqual(timings.phases, {
+            'settings': 1,
+            'manifest': 1,
+            'remove_folder': 1,
+            'create_folder': 1,
+            'load': 2,
+            'render': 2,
+            'write': 2,
+            'total': 13,
+            })
+        self.assertDictEqual(timings.sections, dict(
+            (path, {'load': 1, 'render': 1, 'write': 1})
+            for path in output_list))
+
+    # ....................................................................... #
+    def test_write_configs_timings_with_workers(self):
+        from ...timings import Timings
+
+        settings_content = dict(
+            ('a/test%02d.conf' % index, {'content': str(index)})
+            for index in range(10))
+
+        role = self._makeOne(settings_content)
+        role.write_configs(incremental=True)
+
+        timings = Timings()
+        output_list = role.write_configs(
+            workers=4,
+            incremental=True,
+            timings=timings)
+
+        self.assertEqual(self._read('a/test05.conf'), '5')
+        self.assertListEqual(sorted(timings.sections), output_list)
+        for section in timings.sections.values():
+            self.assertListEqual(
+                sorted(section),
+                ['check', 'load', 'render', 'write'])
+
+
+# --------------------------------------------------------------------------- #
+class Test_Role_render(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        from ...bench import generate_project
+
+        self.path = mkdtemp()
+        self.paths = generate_project(
+            self.path,
+            roles=1,
+            sections=3,
+            settings=2,
+            template_size=40)
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def _makeOne(self, **kwargs):
+        from ...config import Configurator
+        from ...role import Role
+
+        config = Configurator(
+            templates_path=self.paths['templates_path'],
+            settings_path=self.paths['settings_path'],
+            **kwargs)
+
+        return Role(config, 'role-000')
+
+    # ....................................................................... #
+    def test_render(self):
+        from ...bench import section_name
+
+        role = self._makeOne()
+
+        rendered = list(role.render())
+
+        self.assertListEqual(
+            [path for path, _ in rendered],
+            [section_name(index) for index in range(3)])
+        self.assertEqual(
+            rendered[2][1],
+            u'# generated for role-000\n'
+            u'key_0 = role-000-2-0\n'
+            u'key_1 = role-000-2-1\n')
+
+        # without an output path configs are written to memory
+        self.assertListEqual(
+            role.write_configs(workers=2),
+            [role.config._asset_manager.path_join(('role-000', path))
+             for path, _ in rendered])
+        self.assertListEqual(
+            role.config._asset_manager.files(),
+            [('role-000/' + path, content.encode('utf-8'))
+             for path, content in rendered])
+
+        # the manifest of incremental generation is kept in memory too
+        role.write_configs(incremental=True)
+        self.assertIsNotNone(role._read_manifest())
+
+        # nothing was written to the output folder
+        self.assertListEqual(os.listdir(self.paths['output_path']), [])
+
+    # ....................................................................... #
+    def test_render_for_exceptions(self):
+
+        with open(os.path.join(
+                self.paths['settings_path'],
+                'role-000.configme'), 'a') as file_handler:
+            file_handler.write('\n[../outside.conf]\n')
+
+        rendered = self._makeOne(
+            output_path=self.paths['output_path']).render()
+
+        # the configs before the invalid section are rendered
+        self.assertEqual(len([next(rendered) for _ in range(3)]), 3)
+        self.assertRaises(InvalidName, next, rendered)
+
+
+# --------------------------------------------------------------------------- #
+class Test_Role_check_configs(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        from ...bench import generate_project
+
+        self.path = mkdtemp()
+        self.paths = generate_project(
+            self.path,
+            roles=1,
+            sections=3,
+            settings=2,
+            template_size=40)
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def _makeOne(self):
+        from ...config import Configurator
+        from ...role import Role
+        return Role(Configurator(**self.paths), 'role-000')
+
+    # ....................................................................... #
+    def _output(self, index):
+        from ...bench import section_name
+        return os.path.join(
+            self.paths['output_path'],
+            'role-000',
+            *section_name(index).split('/'))
+
+    # ....................................................................... #
+    def _modify(self):
+
+        # same size, different content
+        with open(self._output(1), 'rb') as file_handler:
+            content = file_handler.read()
+        with open(self._output(1), 'wb') as file_handler:
+            file_handler.write(content.replace(b'key_0', b'kez_0'))
+
+        os.remove(self._output(2))
+
+        stray_path = os.path.join(
+            self.paths['output_path'], 'role-000', 'stray.conf')
+        open(stray_path, 'w').close()
+
+        return stray_path
+
+    # ....................................................................... #
+    def test_check_configs(self):
+
+        # nothing is written, everything would be added
+        self.assertTupleEqual(
+            self._makeOne().check_configs(),
+            ([self._output(index) for index in range(3)], [], []))
+        self.assertListEqual(os.listdir(self.paths['output_path']), [])
+
+        self._makeOne().write_configs()
+        self.assertTupleEqual(self._makeOne().check_configs(), ([], [], []))
+
+        stray_path = self._modify()
+        file_stat = os.stat(self._output(1))
+
+        self.assertTupleEqual(
+            self._makeOne().check_configs(),
+            ([self._output(2)], [self._output(1)], [stray_path]))
+
+        # nothing is removed nor written
+        self.assertTrue(os.path.isfile(stray_path))
+        self.assertEqual(os.stat(self._output(1)).st_mtime, file_stat.st_mtime)
+
+    # ....................................................................... #
+    def test_check_configs_incremental(self):
+
+        self._makeOne().write_configs(incremental=True)
+        self.assertTupleEqual(self._makeOne().check_configs(), ([], [], []))
+
+        # configs whose dependencies did not change are compared with the
+        # manifest, the others are rendered
+        with open(os.path.join(
+                self.paths['settings_path'],
+                'role-000.configme'), 'rb') as file_handler:
+            content = file_handler.read()
+        with open(os.path.join(
+                self.paths['settings_path'],
+                'role-000.configme'), 'wb') as file_handler:
+            file_handler.write(content.replace(b'role-000-0-1', b'changed'))
+
+        stray_path = self._modify()
+
+        self.assertTupleEqual(
+            self._makeOne().check_configs(),
+            ([self._output(2)],
+             [self._output(0), self._output(1)],
+             [stray_path]))
+
+    # ....................................................................... #
+    def test_check_configs_in_memory(self):
+        from ...config import Configurator
+        from ...role import Role
+
+        role = Role(
+            Configurator(
+                templates_path=self.paths['templates_path'],
+                settings_path=self.paths['settings_path']),
+            'role-000')
+
+        self.assertEqual(len(role.check_configs()[0]), 3)
+
+        role.write_configs()
+        self.assertTupleEqual(role.check_configs(), ([], [], []))
+
+
+# --------------------------------------------------------------------------- #
+class Test_check_roles(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...role import check_roles
+        return check_roles(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_check_roles(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyRole(object):
+
+            def __init__(self, config, name, suffix, variables):
+                self.name = name
+                self.suffix = suffix
+
+            def check_configs(self):
+                if self.name == 'bad_role':
+                    raise InvalidName('test_error_message')
+                if self.name == 'broken_role':
+                    raise ValueError('test_value_error')
+                return (['%s%s/a' % (self.name, self.suffix)], [], [])
+
+        results = self._callFUT(
+            DummyConfig(),
+            ['role_a', 'bad_role', 'broken_role'],
+            suffix='-x',
+            _role_factory=DummyRole)
+
+        self.assertListEqual(results, [
+            ('role_a', ['role_a-x/a'], [], [], None),
+            ('bad_role', [], [], [], 'test_error_message'),
+            ('broken_role', [], [], [], 'Unknown Error: test_value_error'),
+            ])
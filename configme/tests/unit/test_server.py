@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test render server.
+"""
+
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Thread
+
+from unittest import TestCase
+
+
+# --------------------------------------------------------------------------- #
+class DummyConfigurator(object):
+
+    # ....................................................................... #
+    def __init__(self, templates_path, **kwargs):
+        self.templates_path = templates_path
+        self.kwargs = kwargs
+        self.invalidated = []
+
+    # ....................................................................... #
+    def invalidate_templates(self, names=None):
+        self.invalidated.append(names)
+
+    # ....................................................................... #
+    def role_names(self, patterns=None):
+        if patterns is None:
+            return ['all']
+        return patterns
+
+
+# --------------------------------------------------------------------------- #
+class DummyWatcher(object):
+
+    # ....................................................................... #
+    def __init__(self, paths):
+        self.paths = paths
+        self.changed = []
+
+    # ....................................................................... #
+    def changes(self, timeout=None):
+        return self.changed.pop(0) if self.changed else set()
+
+
+# --------------------------------------------------------------------------- #
+class Test_RenderService(TestCase):
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        from ...server import RenderService
+
+        self.write_roles_calls = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, **kwargs):
+            self.write_roles_calls.append((config, names, kwargs))
+            return [(name, ['/out/%s/test.conf' % name], None)
+                    for name in names]
+
+        kwargs.setdefault('_configurator_factory', DummyConfigurator)
+        kwargs.setdefault('_write_roles', dummy_write_roles)
+        kwargs.setdefault('_watcher_factory', DummyWatcher)
+
+        return RenderService(*args, **kwargs)
+
+    # ....................................................................... #
+    def _request(self, **kwargs):
+        request = {
+            'templates_path': '/templates',
+            'settings_path': '/settings',
+            'output_path': '/out',
+            }
+        request.update(kwargs)
+        return request
+
+    # ....................................................................... #
+    def test_handle(self):
+
+        service = self._makeOne()
+
+        self.assertDictEqual(
+            service.handle(self._request(roles=['dev'], suffix='-1')),
+            {'results': [('dev', ['/out/dev/test.conf'], None)]})
+        self.assertDictEqual(
+            service.handle(self._request()),
+            {'results': [('all', ['/out/all/test.conf'], None)]})
+
+        first_config, first_names, first_kwargs = self.write_roles_calls[0]
+
+        self.assertListEqual(first_names, ['dev'])
+        self.assertDictEqual(first_kwargs, {
+            'suffix': '-1',
+            'variables': {},
+            'processes': 1,
+            'workers': 1,
+            'incremental': False,
+            'keep_unchanged': False,
+            })
+
+        # configurators are kept between requests for the same paths
+        self.assertIs(self.write_roles_calls[1][0], first_config)
+
+        service.handle(self._request(output_path='/other'))
+        self.assertIsNot(self.write_roles_calls[2][0], first_config)
+
+    # ....................................................................... #
+    def test_handle_invalidates_changed_templates(self):
+
+        service = self._makeOne()
+
+        service.handle(self._request())
+
+        config, watcher = list(service._configurators.values())[0]
+        self.assertListEqual(watcher.paths, ['/templates'])
+
+        watcher.changed.append(set([os.path.join('/templates', 'a.conf')]))
+
+        service.handle(self._request())
+        service.handle(self._request())
+
+        self.assertListEqual(config.invalidated, [['a.conf']])
+
+    # ....................................................................... #
+    def test_handle_errors(self):
+        from ...exceptions import RoleNotFound
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_write_roles(config, names, **kwargs):
+            if names == ['missing']:
+                raise RoleNotFound('No role settings files')
+            raise ValueError('bad value')
+
+        service = self._makeOne(_write_roles=dummy_write_roles)
+
+        self.assertDictEqual(
+            service.handle(self._request(roles=['missing'])),
+            {'error': 'No role settings files'})
+        self.assertDictEqual(
+            service.handle(self._request(roles=['dev'])),
+            {'error': 'Unknown Error: bad value'})
+
+
+# --------------------------------------------------------------------------- #
+class Test_remote_write_roles(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...server import remote_write_roles
+        return remote_write_roles(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_remote_write_roles(self):
+
+        requests = []
+        output_path = os.path.abspath('out')
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_send_request(socket_path, request):
+            requests.append((socket_path, request))
+            return {'results': [
+                ['dev', [os.path.join(output_path, 'dev', 'test.conf')],
+                 None],
+                ['prod', [], 'bad settings'],
+                ]}
+
+        result = self._callFUT(
+            'test.sock',
+            templates_path='templates',
+            settings_path='settings',
+            output_path='out',
+            roles=['dev', 'prod'],
+            _send_request=dummy_send_request)
+
+        self.assertListEqual(result, [
+            ('dev', [os.path.join('out', 'dev', 'test.conf')], None),
+            ('prod', [], 'bad settings'),
+            ])
+
+        socket_path, request = requests[0]
+
+        self.assertEqual(socket_path, 'test.sock')
+        self.assertEqual(
+            request['templates_path'], os.path.abspath('templates'))
+        self.assertEqual(request['output_path'], output_path)
+        self.assertIsNone(request['bytecode_cache_path'])
+        self.assertListEqual(request['roles'], ['dev', 'prod'])
+
+    # ....................................................................... #
+    def test_remote_write_roles_error(self):
+        from ...exceptions import RenderServerError
+
+        self.assertRaises(
+            RenderServerError,
+            self._callFUT,
+            'test.sock',
+            templates_path='templates',
+            settings_path='settings',
+            output_path='out',
+            _send_request=lambda *args: {'error': 'No role settings files'})
+
+
+# --------------------------------------------------------------------------- #
+class Test_serve(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.path = mkdtemp()
+        self.socket_path = os.path.join(self.path, 'test.sock')
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def test_serve_and_send_request(self):
+        from ...server import UnixStreamServer
+        from ...exceptions import RenderServerError
+        from ...server import send_request
+        from ...server import serve
+
+        servers = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyService(object):
+
+            def handle(self, request):
+                return {'results': [[request['roles'][0], [], None]]}
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def server_factory(*args):
+            server = UnixStreamServer(*args)
+            servers.append(server)
+            return server
+
+        # the daemon is not running
+        self.assertRaises(
+            EnvironmentError,
+            send_request,
+            self.socket_path,
+            {'roles': ['dev']})
+
+        # a stale socket file is replaced
+        open(self.socket_path, 'w').close()
+
+        thread = Thread(
+            target=serve,
+            args=(self.socket_path, DummyService(), server_factory))
+        thread.start()
+
+        try:
+            for _ in range(100):
+                try:
+                    response = send_request(
+                        self.socket_path, {'roles': ['dev']}, timeout=5)
+                except EnvironmentError:  # pragma: no cover
+                    thread.join(0.05)
+                else:
+                    break
+
+            self.assertDictEqual(response, {'results': [['dev', [], None]]})
+
+            # only one daemon listens on the socket
+            self.assertRaises(
+                RenderServerError,
+                serve,
+                self.socket_path,
+                DummyService())
+        finally:
+            servers[0].shutdown()
+            thread.join()
+
+        self.assertFalse(os.path.exists(self.socket_path))
@@ -4,6 +4,10 @@
 Test Settings Parser
 """
 
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
 
 from unittest import TestCase
 
@@ -27,6 +31,7 @@ def dummy_config_parser_maker(content=None,
         __raise_items_exception_message = ''
         __make_read_loaded_files_empty = False
         defaults = {}
+        _dict = dict
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
         def __init__(self, defaults=None):
@@ -45,7 +50,7 @@ def dummy_config_parser_maker(content=None,
             self.__make_read_loaded_files_empty = \
                 make_read_loaded_files_empty
 
-            self.defaults = defaults
+            self.defaults = self._defaults = defaults
 
         # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
         def read(self, file_path):
@@ -282,3 +287,633 @@ class Test_settings_parser(TestCase):
             SettingsParsingError,
             test_file_path,
             settings_parser.read)
+
+
+# --------------------------------------------------------------------------- #
+class Test_LayeredSettings(TestCase):
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        from ...settings import LayeredSettings
+        return LayeredSettings(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_layered_settings(self):
+
+        shared = {'name': 'shared', 'port': '80'}
+        settings = self._makeOne(({'name': 'own'}, shared, {'env': 'dev'}))
+
+        self.assertEqual(settings['name'], 'own')
+        self.assertEqual(settings['port'], '80')
+        self.assertEqual(settings['env'], 'dev')
+        self.assertRaises(KeyError, settings.__getitem__, 'missing')
+        self.assertIn('env', settings)
+        self.assertNotIn('missing', settings)
+        self.assertEqual(len(settings), 3)
+        self.assertListEqual(sorted(settings), ['env', 'name', 'port'])
+        self.assertDictEqual(
+            dict(settings),
+            {'name': 'own', 'port': '80', 'env': 'dev'})
+
+        # layers are not copied
+        self.assertIs(settings.layers[1], shared)
+
+
+# --------------------------------------------------------------------------- #
+class Test_settings_parser_lazy(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.path = mkdtemp()
+        self.file_path = os.path.join(self.path, 'test.configme')
+
+        with open(self.file_path, 'w') as file_handler:
+            file_handler.write(
+                '[DEFAULT]\n'
+                'name = %(env)s-test\n'
+                '\n'
+                '[etc/test.conf]\n'
+                'port = 80\n'
+                '\n'
+                '[etc/bad.conf]\n'
+                'port = %(missing)s\n'
+                'host = localhost\n')
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def _makeOne(self, **kwargs):
+        from ...settings import SettingsParser
+        return SettingsParser(
+            self.file_path,
+            variables={'env': 'dev'},
+            **kwargs)
+
+    # ....................................................................... #
+    def test_read(self):
+
+        sections = self._makeOne().read(lazy=True)
+
+        # sections are not interpolated until they are accessed
+        name, settings = next(sections)
+        self.assertEqual(name, 'etc/test.conf')
+        self.assertDictEqual(settings._own, {})
+
+        self.assertEqual(settings['port'], '80')
+        self.assertEqual(settings.get('name'), 'dev-test')
+        self.assertIsNone(settings.get('missing'))
+        self.assertIsNone(settings.get('PORT'))
+        self.assertIn('port', settings)
+        self.assertNotIn('PORT', settings)
+
+        # only the section's own settings are interpolated for it
+        self.assertDictEqual(settings._own, {'port': '80'})
+
+        self.assertDictEqual(
+            dict(settings),
+            {'name': 'dev-test', 'port': '80', 'env': 'dev'})
+        self.assertEqual(len(settings), 3)
+        self.assertIn('port', settings)
+        self.assertRaises(KeyError, settings.__getitem__, 'missing')
+
+        name, settings = next(sections)
+        self.assertEqual(name, 'etc/bad.conf')
+        self.assertRaises(StopIteration, next, sections)
+
+        # only the settings accessed fail to interpolate
+        self.assertEqual(settings['host'], 'localhost')
+
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Bad variable interpolation for file: %s' % self.file_path,
+            settings.__getitem__,
+            'port')
+
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Bad variable interpolation',
+            dict,
+            settings)
+
+    # ....................................................................... #
+    def test_read_layers(self):
+
+        with open(self.file_path, 'w') as file_handler:
+            file_handler.write(
+                '[DEFAULT]\n'
+                'name = %(env)s-test\n'
+                'url = http://%(name)s:%(port)s\n'
+                'port = 80\n'
+                '\n'
+                '[etc/a.conf]\n'
+                'host = a\n'
+                '\n'
+                '[etc/b.conf]\n'
+                'env = prod\n'
+                '\n'
+                '[etc/c.conf]\n'
+                'port = 81\n')
+
+        sections = list(self._makeOne().read(lazy=True))
+
+        self.assertListEqual(
+            [(name, dict(settings)) for name, settings in sections],
+            [('etc/a.conf', {'env': 'dev', 'name': 'dev-test', 'port': '80',
+                             'url': 'http://dev-test:80', 'host': 'a'}),
+             ('etc/b.conf', {'env': 'prod', 'name': 'prod-test',
+                             'port': '80', 'url': 'http://prod-test:80'}),
+             ('etc/c.conf', {'env': 'dev', 'name': 'dev-test', 'port': '81',
+                             'url': 'http://dev-test:81'})])
+
+        # the DEFAULT section and the variables are shared, the defaults
+        # depending on settings of a section are interpolated for it
+        (_, a), (_, b), (_, c) = sections
+        self.assertIs(a.layers[1], b.layers[1])
+        self.assertIs(a.layers[2], c.layers[2])
+        self.assertDictEqual(a.layers[2], {'env': 'dev'})
+        self.assertDictEqual(a._own, {'host': 'a'})
+        self.assertSetEqual(set(b._own), set(['env', 'name', 'url']))
+        self.assertSetEqual(set(c._own), set(['port', 'url']))
+
+    # ....................................................................... #
+    def test_read_layers_unshared(self):
+
+        with open(self.file_path, 'w') as file_handler:
+            file_handler.write(
+                '[DEFAULT]\n'
+                'url = http://%(host)s\n'
+                '\n'
+                '[etc/a.conf]\n'
+                'host = a\n'
+                '\n'
+                '[etc/b.conf]\n'
+                'port = 80\n')
+
+        (_, a), (_, b) = self._makeOne().read(lazy=True)
+
+        # defaults referencing settings missing from the DEFAULT section
+        # are interpolated for every section
+        self.assertEqual(a['url'], 'http://a')
+        self.assertEqual(len(a), 3)
+        self.assertEqual(b['port'], '80')
+
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Bad variable interpolation',
+            b.__getitem__,
+            'url')
+
+    # ....................................................................... #
+    def test_read_cached(self):
+
+        cache_path = os.path.join(self.path, 'cache')
+        os.mkdir(cache_path)
+
+        with open(self.file_path, 'w') as file_handler:
+            file_handler.write('[etc/test.conf]\nport = 80\n')
+
+        for _ in range(2):
+            sections = self._makeOne(cache_path=cache_path).read(lazy=True)
+
+            self.assertListEqual(
+                list(sections),
+                [('etc/test.conf', {'port': '80', 'env': 'dev'})])
+
+        self.assertEqual(len(os.listdir(cache_path)), 1)
+
+
+# --------------------------------------------------------------------------- #
+class Test_settings_parser_extends(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.path = mkdtemp()
+        self.parsed = []
+
+        self._write(
+            'base',
+            '[DEFAULT]\n'
+            'name = %(env)s-base\n'
+            'port = 80\n'
+            '\n'
+            '[etc/a.conf]\n'
+            'host = a\n'
+            'url = http://%(host)s:%(port)s\n'
+            '\n'
+            '[etc/b.conf]\n'
+            'host = b\n')
+
+        self._write(
+            'dev',
+            '[configme]\n'
+            'extends = base\n'
+            '\n'
+            '[DEFAULT]\n'
+            'port = 8080\n'
+            '\n'
+            '[etc/b.conf]\n'
+            'user = dev\n'
+            '\n'
+            '[etc/c.conf]\n'
+            'host = c\n')
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def _path(self, name):
+        return os.path.join(self.path, '%s.configme' % name)
+
+    # ....................................................................... #
+    def _write(self, name, content):
+        with open(self._path(name), 'w') as file_handler:
+            file_handler.write(content)
+
+    # ....................................................................... #
+    def _makeOne(self, name='dev', **kwargs):
+        from ConfigParser import SafeConfigParser
+        from ...settings import SettingsParser
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyConfigParser(SafeConfigParser):
+
+            def readfp(this, file_handler, file_path):
+                self.parsed.append(os.path.basename(file_path))
+                return SafeConfigParser.readfp(this, file_handler, file_path)
+
+        kwargs.setdefault('variables', {'env': 'dev'})
+
+        return SettingsParser(
+            self._path(name),
+            _config_parser_factory=DummyConfigParser,
+            **kwargs)
+
+    # ....................................................................... #
+    def test_read(self):
+
+        desired_result = [
+            ('etc/a.conf', {'env': 'dev', 'name': 'dev-base', 'port': '8080',
+                            'host': 'a', 'url': 'http://a:8080'}),
+            ('etc/b.conf', {'env': 'dev', 'name': 'dev-base', 'port': '8080',
+                            'host': 'b', 'user': 'dev'}),
+            ('etc/c.conf', {'env': 'dev', 'name': 'dev-base', 'port': '8080',
+                            'host': 'c'}),
+            ]
+
+        self.assertListEqual(self._makeOne().read(), desired_result)
+        self.assertListEqual(
+            [(name, dict(settings))
+             for name, settings in self._makeOne().read(lazy=True)],
+            desired_result)
+
+        # the base is a role too, and the configme section is not a config
+        self.assertListEqual(
+            [name for name, _ in self._makeOne('base').read()],
+            ['etc/a.conf', 'etc/b.conf'])
+
+        self._write('plain', '[configme]\n\n[etc/d.conf]\nhost = d\n')
+        self.assertListEqual(
+            self._makeOne('plain', variables={}).read(),
+            [('etc/d.conf', {'host': 'd'})])
+
+    # ....................................................................... #
+    def test_read_bases(self):
+
+        self._write(
+            'prod',
+            '[configme]\n'
+            'extends = dev\n'
+            '\n'
+            '[etc/a.conf]\n'
+            'host = prod\n')
+
+        bases = {}
+
+        settings = dict(self._makeOne('prod', bases=bases).read())
+        self.assertEqual(settings['etc/a.conf']['url'], 'http://prod:8080')
+        self.assertEqual(settings['etc/c.conf']['host'], 'c')
+
+        self.assertListEqual(
+            sorted(bases),
+            [self._path('base'), self._path('dev')])
+
+        # the bases are parsed once, the settings files extending them share
+        # the sections they do not extend
+        settings_parser = self._makeOne('dev', bases=bases)
+        settings_parser.read()
+
+        self.assertListEqual(self.parsed, ['dev.configme', 'base.configme'])
+        self.assertListEqual(
+            settings_parser.files,
+            [(self._path('base'), open(self._path('base'), 'rb').read())])
+        self.assertIs(
+            settings_parser.parser._sections['etc/a.conf'],
+            bases[self._path('base')].sections['etc/a.conf'])
+
+        # changed bases are parsed again
+        self._write('base', '[etc/a.conf]\nhost = new\n')
+        del self.parsed[:]
+
+        settings = dict(self._makeOne('prod', bases=bases).read())
+        self.assertEqual(settings['etc/a.conf']['host'], 'prod')
+        self.assertNotIn('url', settings['etc/a.conf'])
+        self.assertListEqual(self.parsed, ['base.configme'])
+
+    # ....................................................................... #
+    def test_read_cached(self):
+
+        cache_path = os.path.join(self.path, 'cache')
+        os.mkdir(cache_path)
+
+        for _ in range(2):
+            settings = dict(self._makeOne(cache_path=cache_path).read())
+            self.assertEqual(settings['etc/a.conf']['url'], 'http://a:8080')
+
+        self.assertListEqual(self.parsed, ['dev.configme', 'base.configme'])
+
+        # entries of settings files whose bases changed are not used
+        self._write('base', '[etc/a.conf]\nhost = new\n')
+
+        settings = dict(self._makeOne(cache_path=cache_path).read())
+        self.assertEqual(settings['etc/a.conf']['host'], 'new')
+
+        os.remove(self._path('base'))
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Could not load file: %s, extended by: %s'
+            % (self._path('base'), self._path('dev')),
+            self._makeOne(cache_path=cache_path).read)
+
+    # ....................................................................... #
+    def test_read_cached_other_folder(self):
+
+        cache_path = os.path.join(self.path, 'cache')
+        os.mkdir(cache_path)
+
+        other_path = os.path.join(self.path, 'other')
+        os.mkdir(other_path)
+
+        from ...settings import SettingsParser
+
+        for path, value in ((self.path, 'A'), (other_path, 'B')):
+            for name, content in (
+                    ('dev', '[configme]\nextends = base\n'),
+                    ('base', '[etc/a.conf]\nv = %s\n' % value)):
+                file_path = os.path.join(path, '%s.configme' % name)
+                with open(file_path, 'w') as file_handler:
+                    file_handler.write(content)
+
+        # identical settings files of other folders extend other bases, they
+        # do not share cache entries
+        for path, value in ((self.path, 'A'), (other_path, 'B')):
+            settings = dict(SettingsParser(
+                os.path.join(path, 'dev.configme'),
+                cache_path=cache_path).read())
+            self.assertDictEqual(settings['etc/a.conf'], {'v': value})
+
+        self.assertEqual(len(os.listdir(cache_path)), 2)
+
+    # ....................................................................... #
+    def test_read_defaults_over_variables(self):
+
+        cache_path = os.path.join(self.path, 'cache')
+        os.mkdir(cache_path)
+
+        self._write('base', '[DEFAULT]\nx = 2\ny = 2\n\n[etc/a.conf]\n')
+        self._write('dev', '[configme]\nextends = base\n\n'
+                           '[DEFAULT]\nx = 1\n')
+
+        # own defaults override the base defaults, which override the
+        # variables, even when the variables have the same values
+        for kwargs in ({}, {'cache_path': cache_path}):
+            settings = dict(self._makeOne(
+                variables={'x': '1', 'y': '1', 'z': '1'}, **kwargs).read())
+            self.assertDictEqual(
+                settings['etc/a.conf'], {'x': '1', 'y': '2', 'z': '1'})
+
+    # ....................................................................... #
+    def test_read_for_exceptions(self):
+
+        self._write('base', '[configme]\nextends = dev\n')
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Settings files extend each other: %s -> %s -> %s' % (
+                self._path('dev'), self._path('base'), self._path('dev')),
+            self._makeOne().read)
+
+        self._write('base', 'no section\n')
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Could not parse file: %s' % self._path('base'),
+            self._makeOne().read)
+
+        for name in ('missing', '../base', ' '):
+            self._write('dev', '[configme]\nextends = %s\n' % name)
+            self.assertRaises(SettingsParsingError, self._makeOne().read)
+
+    # ....................................................................... #
+    def test_extended_role_name(self):
+
+        from ...settings import extended_role_name
+
+        self.assertEqual(extended_role_name(self._path('dev')), 'base')
+        self.assertIsNone(extended_role_name(self._path('base')))
+        self.assertIsNone(extended_role_name(self._path('missing')))
+
+        self._write('broken', 'no section\n')
+        self.assertIsNone(extended_role_name(self._path('broken')))
+
+
+# --------------------------------------------------------------------------- #
+class Test_settings_cache_key(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...settings import settings_cache_key
+        return settings_cache_key(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_settings_cache_key(self):
+
+        files = [('/a/dev.cfg', b'[a]\nb = c\n'), ('/a/base.cfg', b'')]
+        key = self._callFUT(files, {'x': 'y'})
+
+        self.assertEqual(key, self._callFUT(files, {'x': 'y'}))
+        self.assertEqual(key, self._callFUT(
+            [('/a/../a/dev.cfg', b'[a]\nb = c\n'), ('/a/base.cfg', b'')],
+            {'x': 'y'}))
+
+        for files, variables in (
+                ([('/a/dev.cfg', b'[a]\nb = d\n'), ('/a/base.cfg', b'')],
+                 {'x': 'y'}),
+                ([('/b/dev.cfg', b'[a]\nb = c\n'), ('/a/base.cfg', b'')],
+                 {'x': 'y'}),
+                ([('/a/dev.cfg', b'[a]\nb = c\n'), ('/b/base.cfg', b'')],
+                 {'x': 'y'}),
+                ([('/a/dev.cfg', b'[a]\nb = c\n'), ('/a/base.cfg', b'\n')],
+                 {'x': 'y'}),
+                ([('/a/dev.cfg', b'[a]\nb = c\n')], {'x': 'y'}),
+                ([('/a/dev.cfg', b'[a]\nb = c\n'), ('/a/base.cfg', b'')],
+                 {'x': 'z'}),
+                ([('/a/dev.cfg', b'[a]\nb = c\n'), ('/a/base.cfg', b'')],
+                 {}),
+                ([('/a/dev.cfg', b'[a]\nb'), ('/a/base.cfg', b' = c\n')],
+                 {'x': 'y'})):
+            self.assertNotEqual(key, self._callFUT(files, variables))
+
+
+# --------------------------------------------------------------------------- #
+class Test_settings_parser_cache(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.path = mkdtemp()
+        self.cache_path = os.path.join(self.path, 'cache')
+        self.file_path = os.path.join(self.path, 'test.configme')
+
+        os.mkdir(self.cache_path)
+
+        self._write(
+            '[DEFAULT]\n'
+            'name = %(env)s-test\n'
+            '\n'
+            '[etc/test.conf]\n'
+            'port = 80\n')
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def _write(self, content):
+        with open(self.file_path, 'w') as file_handler:
+            file_handler.write(content)
+
+    # ....................................................................... #
+    def _makeOne(self, variables=None, **kwargs):
+        from ...settings import SettingsParser
+
+        if variables is None:
+            variables = {'env': 'dev'}
+
+        return SettingsParser(
+            self.file_path,
+            variables=variables,
+            cache_path=self.cache_path,
+            **kwargs)
+
+    # ....................................................................... #
+    def _entries(self):
+        return sorted(os.listdir(self.cache_path))
+
+    # ....................................................................... #
+    def test_read(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyConfigParser(object):
+
+            def __init__(self, defaults):
+                pass
+
+            def readfp(self, *args):  # pragma: no cover
+                raise AssertionError('cached settings are not parsed')
+
+        desired_result = [
+            ('etc/test.conf',
+             {'name': 'dev-test', 'port': '80', 'env': 'dev'}),
+            ]
+
+        self.assertListEqual(self._makeOne().read(), desired_result)
+        self.assertEqual(len(self._entries()), 1)
+
+        # the second run reads the cache entry
+        self.assertListEqual(
+            self._makeOne(_config_parser_factory=DummyConfigParser).read(),
+            desired_result)
+
+        # other variables and changed settings are parsed again
+        self.assertListEqual(
+            self._makeOne({'env': 'prod'}).read(),
+            [('etc/test.conf',
+              {'name': 'prod-test', 'port': '80', 'env': 'prod'})])
+
+        self._write('[etc/test.conf]\nport = 81\n')
+        self.assertListEqual(
+            self._makeOne().read(),
+            [('etc/test.conf', {'port': '81', 'env': 'dev'})])
+
+        self.assertEqual(len(self._entries()), 3)
+
+    # ....................................................................... #
+    def test_read_invalid_entry(self):
+
+        self._makeOne().read()
+
+        import marshal
+
+        entry_path = os.path.join(self.cache_path, self._entries()[0])
+
+        for content in (b'\x00invalid', marshal.dumps([1, 2])):
+            with open(entry_path, 'wb') as file_handler:
+                file_handler.write(content)
+
+            self.assertEqual(self._makeOne().read()[0][1]['port'], '80')
+
+        # the entry is replaced
+        self.assertEqual(self._makeOne().read()[0][1]['port'], '80')
+        with open(entry_path, 'rb') as file_handler:
+            self.assertEqual(
+                marshal.loads(file_handler.read())[1],
+                [('etc/test.conf', {'port': '80'})])
+
+    # ....................................................................... #
+    def test_read_cache_not_written(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_rename(source, destination):
+            raise OSError(13, 'Permission denied')
+
+        settings = self._makeOne(_os_rename=dummy_os_rename).read()
+
+        self.assertEqual(settings[0][1]['port'], '80')
+        self.assertListEqual(self._entries(), [])
+
+    # ....................................................................... #
+    def test_read_cache_not_cleaned_up(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_rename(source, destination):
+            # the temporary file vanishes along with the failed rename
+            os.remove(source)
+            raise OSError(13, 'Permission denied')
+
+        settings = self._makeOne(_os_rename=dummy_os_rename).read()
+
+        self.assertEqual(settings[0][1]['port'], '80')
+        self.assertListEqual(self._entries(), [])
+
+    # ....................................................................... #
+    def test_read_for_exceptions(self):
+
+        os.remove(self.file_path)
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Could not load file: %s' % self.file_path,
+            self._makeOne().read)
+
+        self._write('no section\n')
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Could not parse file: %s' % self.file_path,
+            self._makeOne().read)
+
+        self._write('[etc/test.conf]\nport = %(missing)s\n')
+        self.assertRaisesRegexp(
+            SettingsParsingError,
+            'Bad variable interpolation',
+            self._makeOne().read)
+
+        self.assertListEqual(self._entries(), [])
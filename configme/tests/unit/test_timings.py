@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test role generation timings.
+"""
+
+from unittest import TestCase
+
+
+# --------------------------------------------------------------------------- #
+class Test_Timings(TestCase):
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        from ...timings import Timings
+
+        # every call of the timer takes a second
+        ticks = iter(range(100))
+        kwargs.setdefault('_timer', lambda: next(ticks))
+
+        return Timings(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_since(self):
+
+        timings = self._makeOne()
+
+        start = timings.start()
+        start = timings.since('settings', start)
+        start = timings.since('render', start, 'role/a.conf')
+        timings.since('render', start, 'role/b.conf')
+        timings.add('render', 2, 'role/a.conf')
+
+        self.assertDictEqual(timings.phases, {'settings': 1, 'render': 4})
+        self.assertDictEqual(
+            timings.sections,
+            {'role/a.conf': {'render': 3}, 'role/b.conf': {'render': 1}})
+
+    # ....................................................................... #
+    def test_merge(self):
+
+        timings = self._makeOne()
+        timings.add('render', 1, 'role/a.conf')
+
+        other = self._makeOne()
+        other.add('render', 2, 'role/a.conf')
+        other.add('write', 3, 'role/b.conf')
+
+        timings.merge(other)
+        timings.merge(other.as_dict())
+
+        self.assertDictEqual(timings.phases, {'render': 5, 'write': 6})
+        self.assertDictEqual(
+            timings.sections,
+            {'role/a.conf': {'render': 5}, 'role/b.conf': {'write': 6}})
+
+    # ....................................................................... #
+    def test_slowest(self):
+
+        timings = self._makeOne()
+        timings.add('render', 1, 'role/a.conf')
+        timings.add('write', 1, 'role/a.conf')
+        timings.add('render', 3, 'role/b.conf')
+        timings.add('render', 2, 'role/c.conf')
+
+        self.assertListEqual(
+            timings.slowest(2),
+            [('role/b.conf', 3), ('role/a.conf', 2)])
+
+    # ....................................................................... #
+    def test_report(self):
+
+        timings = self._makeOne()
+        timings.add('total', 4)
+        timings.add('custom', 0.5)
+        timings.add('settings', 0.25)
+        timings.add('write', 0.75, 'role/a.conf')
+        timings.add('render', 1.5, 'role/a.conf')
+        timings.add('render', 1, 'role/b.conf')
+
+        self.assertListEqual(timings.report(1), [
+            'Timings:',
+            '  settings           0.250s',
+            '  render             2.500s',
+            '  write              0.750s',
+            '  total              4.000s',
+            '  custom             0.500s',
+            'Slowest templates:',
+            '      2.250s role/a.conf (render 1.500s, write 0.750s)',
+            ])
+
+        # no sections were timed
+        self.assertListEqual(self._makeOne().report(), ['Timings:'])
+
+
+# --------------------------------------------------------------------------- #
+class Test_NullTimings(TestCase):
+
+    # ....................................................................... #
+    def test_null_timings(self):
+        from ...timings import NULL_TIMINGS
+
+        self.assertFalse(NULL_TIMINGS.enabled)
+        self.assertIsNone(NULL_TIMINGS.start())
+        self.assertIsNone(NULL_TIMINGS.since('render', None, 'role/a.conf'))
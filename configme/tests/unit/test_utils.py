@@ -36,3 +36,41 @@ class Test_AllowedLevelsFilter(TestCase):
         level_filter = self._makeOne([10, 20, 30])
 
         self.assertFalse(level_filter.filter(logging_record))
+
+
+# --------------------------------------------------------------------------- #
+class Test_deferred(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...utils import deferred
+        return deferred(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_deferred(self):
+
+        imported = []
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyModule(object):
+
+            @staticmethod
+            def test_function(*args, **kwargs):
+                return args, kwargs
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_import_module(name):
+            imported.append(name)
+            return DummyModule
+
+        function = self._callFUT(
+            'test_module',
+            'test_function',
+            _import_module=dummy_import_module)
+
+        # nothing is imported until the function is called
+        self.assertListEqual(imported, [])
+        self.assertEqual(function.__name__, 'test_function')
+
+        self.assertEqual(function(1, test=2), ((1,), {'test': 2}))
+        self.assertListEqual(imported, ['test_module'])
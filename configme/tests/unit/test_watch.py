@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test file system watching.
+"""
+
+import os
+
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from unittest import TestCase
+
+
+# --------------------------------------------------------------------------- #
+class DummyStat(object):
+
+    def __init__(self, st_mtime, st_size):
+        self.st_mtime = st_mtime
+        self.st_size = st_size
+
+
+# --------------------------------------------------------------------------- #
+class Test_PollingWatcher(TestCase):
+
+    # ....................................................................... #
+    def _makeOne(self, files, **kwargs):
+        from ...watch import PollingWatcher
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_walk(path):
+            return [(path, [], sorted(files))]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_os_stat(path):
+            return files[os.path.basename(path)]
+
+        self.now = [0]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_time():
+            return self.now[0]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_sleep(seconds):
+            self.now[0] += seconds
+
+        return PollingWatcher(
+            ['test_path'],
+            _os_walk=dummy_os_walk,
+            _os_stat=dummy_os_stat,
+            _time=dummy_time,
+            _sleep=dummy_sleep,
+            **kwargs)
+
+    # ....................................................................... #
+    def test_changes(self):
+
+        files = {
+            'a.conf': DummyStat(1, 10),
+            'b.conf': DummyStat(1, 10),
+            'c.conf': DummyStat(1, 10),
+            }
+
+        watcher = self._makeOne(files)
+
+        files['a.conf'] = DummyStat(2, 10)
+        files['b.conf'] = DummyStat(1, 11)
+        files['d.conf'] = DummyStat(1, 10)
+        del files['c.conf']
+
+        self.assertSetEqual(
+            watcher.changes(),
+            set(os.path.join('test_path', name)
+                for name in ('a.conf', 'b.conf', 'c.conf', 'd.conf')))
+
+    # ....................................................................... #
+    def test_changes_timeout(self):
+
+        watcher = self._makeOne({'a.conf': DummyStat(1, 10)}, interval=0.5)
+
+        self.assertSetEqual(watcher.changes(2), set())
+        self.assertEqual(self.now[0], 2)
+
+
+# --------------------------------------------------------------------------- #
+class Test_InotifyWatcher(TestCase):
+
+    # ....................................................................... #
+    def setUp(self):
+        self.path = mkdtemp()
+        os.mkdir(os.path.join(self.path, 'etc'))
+
+    # ....................................................................... #
+    def tearDown(self):
+        rmtree(self.path)
+
+    # ....................................................................... #
+    def _makeOne(self, *args, **kwargs):
+        from ...watch import InotifyWatcher
+
+        try:
+            return InotifyWatcher(*args, **kwargs)
+        except EnvironmentError:  # pragma: no cover
+            self.skipTest('inotify is not available')
+
+    # ....................................................................... #
+    def _write(self, *path_parts):
+        with open(os.path.join(self.path, *path_parts), 'w') as f:
+            f.write('test')
+
+    # ....................................................................... #
+    def test_changes(self):
+
+        watcher = self._makeOne([self.path])
+
+        try:
+            self.assertSetEqual(watcher.changes(0), set())
+
+            self._write('etc', 'test.conf')
+            os.mkdir(os.path.join(self.path, 'new'))
+
+            test_file_path = os.path.join(self.path, 'etc', 'test.conf')
+
+            changed = set()
+            for _ in range(10):
+                changed.update(watcher.changes(0.1))
+                if test_file_path in changed:
+                    break
+
+            self.assertIn(test_file_path, changed)
+
+            # new folders are watched as well
+            self._write('new', 'test.conf')
+
+            self.assertIn(
+                os.path.join(self.path, 'new', 'test.conf'),
+                watcher.changes(1))
+        finally:
+            watcher.close()
+
+    # ....................................................................... #
+    def test_inotify_not_available(self):
+        from ...watch import InotifyWatcher
+
+        self.assertRaises(
+            EnvironmentError,
+            InotifyWatcher,
+            [self.path],
+            _libc=object())
+
+
+# --------------------------------------------------------------------------- #
+class Test_create_watcher(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...watch import create_watcher
+        return create_watcher(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_create_watcher_fallback(self):
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        def dummy_inotify_watcher_factory(paths):
+            raise EnvironmentError('inotify is not available')
+
+        self.assertEqual(
+            self._callFUT(
+                ['test_path'],
+                _inotify_watcher_factory=dummy_inotify_watcher_factory,
+                _polling_watcher_factory=lambda paths: ('polling', paths)),
+            ('polling', ['test_path']))
+
+
+# --------------------------------------------------------------------------- #
+class Test_watch_changes(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...watch import watch_changes
+        return watch_changes(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_watch_changes(self):
+
+        calls = []
+
+        # changes returned by each call, empty sets are quiet periods
+        changes = [
+            set(), set(['a']), set(['b']), set(['a', 'c']), set(),
+            set(['d']), None, set(['e']), set(),
+            ]
+
+        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+        class DummyWatcher(object):
+
+            def __init__(self, paths):
+                calls.append(('init', paths))
+
+            def changes(self, timeout=None):
+                calls.append(('changes', timeout))
+                return changes.pop(0)
+
+            def close(self):
+                calls.append('close')
+
+        generator = self._callFUT(
+            ['test_path'],
+            debounce=1,
+            _watcher_factory=DummyWatcher)
+
+        self.assertSetEqual(next(generator), set(['a', 'b', 'c']))
+        self.assertIsNone(next(generator))
+
+        generator.close()
+
+        self.assertListEqual(calls, [
+            ('init', ['test_path']),
+            ('changes', None),
+            ('changes', None),
+            ('changes', 1),
+            ('changes', 1),
+            ('changes', 1),
+            ('changes', None),
+            ('changes', 1),
+            ('changes', 1),
+            ('changes', 1),
+            'close',
+            ])
+
+
+# --------------------------------------------------------------------------- #
+class DummyConfig(object):
+
+    templates_path = os.path.join('test', 'templates')
+    settings_path = os.path.join('test', 'settings')
+    settings_file_extension = 'configme'
+
+
+# --------------------------------------------------------------------------- #
+class Test_changed_template_names(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...watch import changed_template_names
+        return changed_template_names(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_changed_template_names(self):
+
+        templates_path = DummyConfig.templates_path
+
+        changed = set([
+            os.path.join(templates_path, 'etc', 'test.conf'),
+            os.path.join(templates_path, 'base.conf'),
+            os.path.join(DummyConfig.settings_path, 'dev.configme'),
+            ])
+
+        self.assertListEqual(
+            self._callFUT(templates_path, changed),
+            ['base.conf', 'etc/test.conf'])
+        self.assertIsNone(self._callFUT(templates_path, None))
+
+
+# --------------------------------------------------------------------------- #
+class Test_affected_role_names(TestCase):
+
+    # ....................................................................... #
+    def _callFUT(self, *args, **kwargs):
+        from ...watch import affected_role_names
+        return affected_role_names(*args, **kwargs)
+
+    # ....................................................................... #
+    def test_settings_changed(self):
+
+        changed = set([
+            os.path.join(DummyConfig.settings_path, 'dev.configme'),
+            os.path.join(DummyConfig.settings_path, 'new.configme'),
+            os.path.join(DummyConfig.settings_path, 'prod.configme~'),
+            ])
+
+        self.assertListEqual(
+            self._callFUT(DummyConfig(), ['dev', 'prod'], changed),
+            ['dev'])
+
+    # ....................................................................... #
+    def test_settings_base_changed(self):
+
+        config = DummyConfig()
+        config.settings_path = mkdtemp()
+        self.addCleanup(rmtree, config.settings_path)
+
+        for name, content in (
+                ('base', '[a.conf]\n'),
+                ('dev', '[configme]\nextends = base\n'),
+                ('prod', '[configme]\nextends = dev\n'),
+                ('loop', '[configme]\nextends = loop\n'),
+                ('other', '[b.conf]\n')):
+            file_path = os.path.join(config.settings_path,
+                                     '%s.configme' % name)
+            with open(file_path, 'w') as file_handler:
+                file_handler.write(content)
+
+        names = ['base', 'dev', 'loop', 'other', 'prod']
+        base_path = os.path.join(config.settings_path, 'base.configme')
+        dev_path = os.path.join(config.settings_path, 'dev.configme')
+
+        # roles extending the changed settings file through other roles too
+        self.assertListEqual(
+            self._callFUT(config, names, set([base_path])),
+            ['base', 'dev', 'prod'])
+        self.assertListEqual(
+            self._callFUT(config, names, set([dev_path])),
+            ['dev', 'prod'])
+        self.assertListEqual(self._callFUT(config, names, set()), [])
+
+    # ....................................................................... #
+    def test_templates_changed(self):
+
+        changed = set([
+            os.path.join(DummyConfig.templates_path, 'test.conf'),
+            ])
+
+        self.assertListEqual(
+            self._callFUT(DummyConfig(), ['dev', 'prod'], changed),
+            ['dev', 'prod'])
+        self.assertListEqual(
+            self._callFUT(DummyConfig(), ['dev', 'prod'], None),
+            ['dev', 'prod'])
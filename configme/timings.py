@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""
+Role generation timings module.
+"""
+
+from threading import Lock
+
+from time import time
+
+# --------------------------------------------------------------------------- #
+# phases of role generation, in the order they run and are reported in
+ROLE_PHASES = ('settings', 'manifest', 'remove_folder', 'create_folder')
+
+# phases of each section, summed up over all the sections of a role
+SECTION_PHASES = ('check', 'load', 'render', 'write')
+
+# wall time of the whole role generation
+TOTAL_PHASE = 'total'
+
+
+# --------------------------------------------------------------------------- #
+class Timings(object):
+    """
+    Timings of the phases of role generation, collected by
+    :meth:`Role.write_configs` when it is given an instance: reading the
+    settings, the manifest, removing and creating the role folder, and for
+    each section checking whether it is up to date, loading its template,
+    rendering it and writing it out.
+
+    Sections are timed by the thread processing them, so with several
+    workers the section phases add up to more than the wall time. Timings
+    are safe to collect from several threads and roles at once.
+
+    :param _timer: Optional, timer returning seconds. Defaults to time.time.
+    :type _timer: callable
+    """
+
+    # ....................................................................... #
+    enabled = True
+
+    # ....................................................................... #
+    # seconds spent in each phase
+    phases = None
+
+    # ....................................................................... #
+    # seconds spent in each phase of each section, by output file path
+    sections = None
+
+    # ....................................................................... #
+    def __init__(self, _timer=time):
+
+        self.phases = {}
+        self.sections = {}
+        self.timer = _timer
+        self._lock = Lock()
+
+    # ....................................................................... #
+    def start(self):
+        """
+        :return: current time, the start of the next phase.
+        :rtype: float
+        """
+        return self.timer()
+
+    # ....................................................................... #
+    def since(self, phase, start, path=None):
+        """
+        Record the time elapsed since `start` in the given phase.
+
+        :param phase: phase name
+        :type phase: str
+
+        :param start: time the phase started, as returned by :meth:`start`.
+        :type start: float
+
+        :param path: Optional, output file path of the section timed.
+        :type path: str/unicode
+
+        :return: current time, the start of the next phase.
+        :rtype: float
+        """
+
+        now = self.timer()
+        self.add(phase, now - start, path)
+        return now
+
+    # ....................................................................... #
+    def add(self, phase, elapsed, path=None):
+        """
+        Add the elapsed seconds to the given phase, and to the phase of the
+        section with the given output file path if any.
+        """
+
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0) + elapsed
+
+            if path is not None:
+                section = self.sections.setdefault(path, {})
+                section[phase] = section.get(phase, 0) + elapsed
+
+    # ....................................................................... #
+    def as_dict(self):
+        """
+        :return:
+
+            JSON serializable dictionary of the `phases` and `sections`,
+            accepted by :meth:`merge`.
+
+        :rtype: dict
+        """
+
+        with self._lock:
+            return {
+                'phases': dict(self.phases),
+                'sections': dict(
+                    (path, dict(section))
+                    for path, section in self.sections.items()),
+                }
+
+    # ....................................................................... #
+    def merge(self, other):
+        """
+        Add the timings of another role, such as one generated in a worker
+        process.
+
+        :param other: timings, or dictionary returned by :meth:`as_dict`.
+        :type other: :class:`Timings`/dict
+        """
+
+        if isinstance(other, Timings):
+            other = other.as_dict()
+
+        for phase, elapsed in other['phases'].items():
+            self.add(phase, elapsed)
+
+        with self._lock:
+            for path, section in other['sections'].items():
+                target = self.sections.setdefault(path, {})
+                for phase, elapsed in section.items():
+                    target[phase] = target.get(phase, 0) + elapsed
+
+    # ....................................................................... #
+    def slowest(self, count):
+        """
+        :return:
+
+            list of up to `count` two element tuples of the output file path
+            and the total seconds of the slowest sections, slowest first.
+
+        :rtype: list
+        """
+
+        with self._lock:
+            totals = [(path, sum(section.values()))
+                      for path, section in self.sections.items()]
+
+        totals.sort(key=lambda item: (-item[1], item[0]))
+
+        return totals[:count]
+
+    # ....................................................................... #
+    def report(self, count=10):
+        """
+        :return:
+
+            list of lines summarizing the time spent in each phase, followed
+            by the `count` slowest sections and their phases.
+
+        :rtype: list
+        """
+
+        with self._lock:
+            phases = dict(self.phases)
+            sections = dict(self.sections)
+
+        known = ROLE_PHASES + SECTION_PHASES + (TOTAL_PHASE,)
+        names = [phase for phase in known if phase in phases]
+        names.extend(sorted(set(phases) - set(known)))
+
+        lines = ['Timings:']
+        lines.extend('  %-14s %9.3fs' % (phase, phases[phase])
+                     for phase in names)
+
+        slowest = self.slowest(count)
+        if slowest:
+            lines.append('Slowest templates:')
+
+        for path, elapsed in slowest:
+            section = sections[path]
+            lines.append('  %9.3fs %s (%s)' % (elapsed, path, ', '.join(
+                '%s %.3fs' % (phase, section[phase])
+                for phase in SECTION_PHASES if phase in section)))
+
+        return lines
+
+
+# --------------------------------------------------------------------------- #
+class NullTimings(object):
+    """
+    Timings used when timings are not collected. Its methods do nothing,
+    so role generation only pays for a few calls per role.
+    """
+
+    enabled = False
+
+    # ....................................................................... #
+    def start(self):
+        return None
+
+    # ....................................................................... #
+    def since(self, phase, start, path=None):
+        return None
+
+
+# --------------------------------------------------------------------------- #
+NULL_TIMINGS = NullTimings()
@@ -4,6 +4,8 @@
 Miscellaneous Utilities
 """
 
+from importlib import import_module
+
 from logging import Filter
 
 
@@ -49,3 +51,31 @@ class AllowedLevelsFilter(Filter):
         :rtype: bool
         """
         return record.levelno in self._levels
+
+
+# --------------------------------------------------------------------------- #
+def deferred(module_name, name, _import_module=import_module):
+    """
+    Return a callable which imports the module with the given name when it
+    is first called and calls the module's attribute with the given name.
+    Used to keep the modules of optional features, and Jinja2, out of the
+    CLI start up.
+
+    :param module_name: absolute module name, such as `configme.server`.
+    :type module_name: str
+
+    :param name: name of the callable in the module.
+    :type name: str
+
+    :return: callable taking the arguments of the deferred callable.
+    :rtype: callable
+    """
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ #
+    def call(*args, **kwargs):
+        return getattr(_import_module(module_name), name)(*args, **kwargs)
+
+    call.__name__ = name
+    call.__doc__ = "Deferred :func:`%s.%s`." % (module_name, name)
+
+    return call
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+
+"""
+File system watching module, used by the watch mode to regenerate roles when
+templates or settings change.
+"""
+
+import ctypes
+import ctypes.util
+
+from errno import EINTR
+
+from os import close as os_close
+from os import read as os_read
+from os import stat
+from os import walk
+
+from os.path import basename
+from os.path import join
+from os.path import relpath
+from os.path import sep
+
+from select import error as select_error
+from select import select
+
+from struct import calcsize
+from struct import unpack_from
+
+from time import sleep
+from time import time
+
+from .settings import extended_role_name
+
+# --------------------------------------------------------------------------- #
+# seconds without further changes after which a burst of changes is handled
+DEBOUNCE_DELAY = 0.2
+
+# seconds between the scans of the polling watcher
+POLL_INTERVAL = 0.5
+
+# inotify flags and event masks, see inotify(7)
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+
+INOTIFY_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | \
+    IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | \
+    IN_MOVE_SELF
+
+# inotify_event struct header: wd, mask, cookie, len
+_INOTIFY_EVENT_FORMAT = 'iIII'
+_INOTIFY_EVENT_SIZE = calcsize(_INOTIFY_EVENT_FORMAT)
+_INOTIFY_READ_SIZE = 64 * 1024
+
+
+# --------------------------------------------------------------------------- #
+class InotifyWatcher(object):
+    """
+    Watch folders and all their subfolders for changes using Linux inotify,
+    called through ctypes.
+
+    :param paths: list of folder paths to watch.
+    :type paths: list
+
+    :raises:
+
+        EnvironmentError if inotify is not available or the folders could not
+        be watched.
+    """
+
+    # ....................................................................... #
+    def __init__(self, paths, _libc=None):
+
+        if _libc is None:
+            _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+        self._libc = _libc
+
+        # inotify is not available outside of Linux
+        try:
+            self._libc.inotify_init1
+            self._libc.inotify_add_watch
+        except AttributeError:
+            raise EnvironmentError('inotify is not available')
+
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise EnvironmentError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        # watched folder paths by watch descriptor
+        self._folders = {}
+
+        try:
+            for path in paths:
+                self._watch_tree(path)
+        except EnvironmentError:
+            self.close()
+            raise
+
+    # ....................................................................... #
+    def _watch_tree(self, path):
+        """
+        Watch the folder and all its subfolders.
+        """
+        for folder_path, _, _ in walk(path):
+            self._watch_folder(folder_path)
+
+    # ....................................................................... #
+    def _watch_folder(self, folder_path):
+
+        encoded_path = folder_path
+        if not isinstance(encoded_path, bytes):
+            encoded_path = encoded_path.encode('utf-8')
+
+        wd = self._libc.inotify_add_watch(
+            self._fd,
+            encoded_path,
+            INOTIFY_WATCH_MASK)
+
+        if wd < 0:
+            raise EnvironmentError(
+                ctypes.get_errno(),
+                'inotify_add_watch failed',
+                folder_path)
+
+        self._folders[wd] = folder_path
+
+    # ....................................................................... #
+    def changes(self, timeout=None):
+        """
+        Wait for changes for at most `timeout` seconds, forever if None.
+
+        :return:
+
+            set of changed paths, empty if nothing changed, or None if the
+            changes could not be tracked and everything should be
+            considered changed.
+
+        :rtype: set
+        """
+
+        try:
+            readable = select([self._fd], [], [], timeout)[0]
+        except select_error as err:
+            if err.args[0] == EINTR:
+                return set()
+            raise
+
+        if not readable:
+            return set()
+
+        try:
+            data = os_read(self._fd, _INOTIFY_READ_SIZE)
+        except EnvironmentError as err:
+            if err.errno == EINTR:
+                return set()
+            raise
+
+        changed = set()
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, _, length = unpack_from(
+                _INOTIFY_EVENT_FORMAT, data, offset)
+            name = data[offset + _INOTIFY_EVENT_SIZE:
+                        offset + _INOTIFY_EVENT_SIZE + length].rstrip(b'\0')
+            offset += _INOTIFY_EVENT_SIZE + length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+
+            folder_path = self._folders.get(wd)
+            if folder_path is None:
+                continue
+
+            path = folder_path
+            if name:
+                path = join(folder_path, name.decode('utf-8'))
+
+            changed.add(path)
+
+            # watch new folders, including folders created inside of them
+            # before the watch was added
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._watch_tree(path)
+                except EnvironmentError:
+                    pass
+                for sub_folder_path, _, file_names in walk(path):
+                    changed.update(join(sub_folder_path, file_name)
+                                   for file_name in file_names)
+
+        return changed
+
+    # ....................................................................... #
+    def close(self):
+        """
+        Stop watching.
+        """
+        if self._fd >= 0:
+            os_close(self._fd)
+            self._fd = -1
+
+
+# --------------------------------------------------------------------------- #
+class PollingWatcher(object):
+    """
+    Watch folders and all their subfolders for changes by periodically
+    comparing modification times and sizes of the files in them. Used where
+    inotify is not available.
+
+    :param paths: list of folder paths to watch.
+    :type paths: list
+
+    :param interval: Optional, seconds between scans.
+    :type interval: float
+    """
+
+    # ....................................................................... #
+    def __init__(self, paths, interval=POLL_INTERVAL, _os_walk=walk,
+                 _os_stat=stat, _time=time, _sleep=sleep):
+
+        self.paths = paths
+        self.interval = interval
+
+        self._os_walk = _os_walk
+        self._os_stat = _os_stat
+        self._time = _time
+        self._sleep = _sleep
+
+        self._snapshot = self.snapshot()
+
+    # ....................................................................... #
+    def snapshot(self):
+        """
+        :return: dictionary of modification time and size by file path.
+        :rtype: dict
+        """
+
+        result = {}
+
+        for path in self.paths:
+            for folder_path, _, file_names in self._os_walk(path):
+                for file_name in file_names:
+                    file_path = join(folder_path, file_name)
+                    try:
+                        file_stat = self._os_stat(file_path)
+                    except EnvironmentError:
+                        continue
+                    result[file_path] = (file_stat.st_mtime, file_stat.st_size)
+
+        return result
+
+    # ....................................................................... #
+    def changes(self, timeout=None):
+        """
+        Wait for changes for at most `timeout` seconds, forever if None.
+
+        :return: set of changed paths, empty if nothing changed.
+        :rtype: set
+        """
+
+        deadline = None
+        if timeout is not None:
+            deadline = self._time() + timeout
+
+        while True:
+            snapshot = self.snapshot()
+            changed = set(
+                path for path in set(snapshot) | set(self._snapshot)
+                if snapshot.get(path) != self._snapshot.get(path))
+            self._snapshot = snapshot
+
+            if changed:
+                return changed
+
+            if deadline is not None:
+                remaining = deadline - self._time()
+                if remaining <= 0:
+                    return changed
+                self._sleep(min(self.interval, remaining))
+            else:
+                self._sleep(self.interval)
+
+    # ....................................................................... #
+    def close(self):
+        """
+        Stop watching.
+        """
+        pass
+
+
+# --------------------------------------------------------------------------- #
+def create_watcher(paths, _inotify_watcher_factory=InotifyWatcher,
+                   _polling_watcher_factory=PollingWatcher):
+    """
+    Return inotify watcher for the given folder paths, or a polling watcher
+    if inotify is not available.
+    """
+
+    try:
+        return _inotify_watcher_factory(paths)
+    except (EnvironmentError, TypeError):
+        return _polling_watcher_factory(paths)
+
+
+# --------------------------------------------------------------------------- #
+def watch_changes(paths, debounce=DEBOUNCE_DELAY,
+                  _watcher_factory=create_watcher):
+    """
+    Watch the given folder paths and yield the changes made to them. Changes
+    arriving in bursts are debounced: once something changes, changes are
+    collected until nothing changes for `debounce` seconds and then yielded
+    all at once.
+
+    :param paths: list of folder paths to watch.
+    :type paths: list
+
+    :param debounce: Optional, seconds of quiet ending a burst of changes.
+    :type debounce: float
+
+    :return:
+
+        generator of sets of changed paths, or None if the changes could not
+        be tracked and everything should be considered changed.
+    """
+
+    watcher = _watcher_factory(paths)
+
+    try:
+        while True:
+            changed = watcher.changes()
+            if changed is not None and not changed:
+                continue
+
+            # collect changes until there is a quiet period
+            while True:
+                more = watcher.changes(debounce)
+                if more is not None and not more:
+                    break
+
+                if changed is not None:
+                    changed = None if more is None else changed | more
+
+            yield changed
+    finally:
+        watcher.close()
+
+
+# --------------------------------------------------------------------------- #
+def changed_template_names(templates_path, changed):
+    """
+    :param templates_path: templates folder path
+    :type templates_path: str/unicode
+
+    :param changed: set of changed paths, as yielded by `watch_changes`.
+    :type changed: set
+
+    :return:
+
+        sorted list of the names of the changed templates, or None if all the
+        templates should be considered changed.
+
+    :rtype: list
+    """
+
+    if changed is None:
+        return None
+
+    prefix = join(templates_path, '')
+
+    return sorted(
+        relpath(path, templates_path).replace(sep, '/')
+        for path in changed if path.startswith(prefix))
+
+
+# --------------------------------------------------------------------------- #
+def affected_role_names(config, names, changed):
+    """
+    :param config: configurator of the watched roles
+    :type config: :class:`Configurator`
+
+    :param names: list of the names of the watched roles
+    :type names: list
+
+    :param changed: set of changed paths, as yielded by `watch_changes`.
+    :type changed: set
+
+    :return:
+
+        list of the names of the roles affected by the changes. All the
+        roles are affected by template changes, otherwise only the roles
+        whose settings files changed and the roles extending them, directly
+        or through other roles.
+
+    :rtype: list
+    """
+
+    if changed is None or changed_template_names(config.templates_path,
+                                                 changed):
+        return list(names)
+
+    settings_prefix = join(config.settings_path, '')
+    extension = '.%s' % config.settings_file_extension
+
+    changed_settings = [
+        path for path in changed
+        if path.startswith(settings_prefix) and path.endswith(extension)]
+
+    if not changed_settings:
+        return []
+
+    changed_names = set(
+        basename(path)[:-len(extension)] for path in changed_settings)
+
+    # the settings files extended are read again, settings read from the
+    # settings cache or by worker processes do not record them
+    extends = {}
+    affected = []
+
+    for name in names:
+        seen = set()
+        role_name = name
+        while role_name is not None and role_name not in seen:
+            if role_name in changed_names:
+                affected.append(name)
+                break
+
+            seen.add(role_name)
+            if role_name not in extends:
+                extends[role_name] = extended_role_name(
+                    join(config.settings_path, role_name + extension))
+            role_name = extends[role_name]
+
+    return affected
@@ -98,7 +98,9 @@ def main():
             },
         tests_require=tests_require,
         test_suite="configme.tests",
-        entry_points={'console_scripts': ['configme = configme.cli:main']}
+        # a plain script rather than a console_scripts entry point, whose
+        # wrapper imports pkg_resources, slower than the whole CLI start up
+        scripts=['bin/configme'],
         )
 
 if __name__ == '__main__':